@@ -28,6 +28,7 @@ sys.path.insert(0, str(project_root / 'src'))
 from stages.stage1_orbital_calculation.stage1_main_processor import create_stage1_processor
 from stages.stage2_orbital_computing.stage2_orbital_computing_processor import Stage2OrbitalPropagationProcessor
 from stages.stage3_coordinate_transformation.stage3_coordinate_transform_processor import create_stage3_processor
+from shared.utils.stage_handoff import HANDOFF_SUFFIX, load_stage_output
 
 
 def find_latest_output_file(stage_num: int) -> str:
@@ -45,9 +46,12 @@ def find_latest_output_file(stage_num: int) -> str:
     if not output_dir:
         raise ValueError(f"不支持的 Stage: {stage_num}")
 
-    # 查找所有 JSON 文件
-    pattern = f"{output_dir}/*.json"
+    # 查找階段交接文件，其次為 JSON 文件
+    pattern = f"{output_dir}/*{HANDOFF_SUFFIX}"
     files = glob.glob(pattern)
+    if not files:
+        pattern = f"{output_dir}/*.json"
+        files = glob.glob(pattern)
 
     if not files:
         raise FileNotFoundError(f"找不到 Stage {stage_num} 的輸出文件: {pattern}")
@@ -61,8 +65,7 @@ def load_output_file(file_path: str) -> dict:
     """載入輸出文件"""
     print(f"📂 載入輸出文件: {file_path}")
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_stage_output(file_path)
 
     print(f"✅ 成功載入輸出文件")
     return data
@@ -9,39 +9,50 @@ Parameter Sweep Automation for Stage 6 Research Optimization
 3. 最優參數選擇（Optimal Parameter Selection）
 4. 學術論證支撐（Academic Justification Support）
 
+執行方式:
+    Stage 5 輸出只載入一次並建立 SignalTimeIndex，ParameterSweepEngine 以單次遍歷
+    計算所有 D2/A3/A4/A5 門檻值的事件數 (--per-combination: 逐組合完整檢測，
+    於工作行程中並行)。不修改任何配置文件，
+    掃描範圍讀取自 config/stage6_research_optimization_config.yaml 的 parameter_sweep 區段。
+
 使用方式:
     python scripts/run_parameter_sweep.py --constellation starlink --params d2
     python scripts/run_parameter_sweep.py --constellation oneweb --params d2,a3
-    python scripts/run_parameter_sweep.py --full  # 完整掃描（警告: 512 次執行）
+    python scripts/run_parameter_sweep.py --full  # 完整掃描（兩個星座 × D2/A3/A4/A5 全部組合）
+    python scripts/run_parameter_sweep.py --params a5 --workers 8 --stage5-output data/outputs/stage5/xxx.handoff.h5
+    python scripts/run_parameter_sweep.py --params d2 --per-combination --workers 8
 
 輸出:
     results/parameter_sweep_{timestamp}/
     ├── sweep_results.json          # 所有掃描結果
     ├── sensitivity_analysis.json   # 敏感度分析
-    ├── optimal_parameters.json     # 推薦最優參數
-    └── visualization/
-        ├── d2_threshold_heatmap.png
-        ├── event_count_vs_threshold.png
-        └── pareto_frontier.png
+    └── optimal_parameters.json     # 推薦最優參數
 """
 
 import argparse
-import itertools
 import json
 import logging
 import os
-import shutil
-import subprocess
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
-import yaml
+from typing import Dict, List, Any, Optional
 
 # 添加項目根目錄到路徑
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.stage_executors.executor_utils import find_latest_stage_output
+from src.shared.utils.stage_handoff import load_stage_output
+from src.stages.stage6_research_optimization.parameter_sweep import (
+    SWEEP_PARAMETER_TYPES,
+    ParameterSweepEngine,
+    base_detector_config,
+    parameter_combinations
+)
+from stages.stage6_research_optimization.stage6_config_manager import Stage6ConfigManager
 
 # 設置日誌
 logging.basicConfig(
@@ -52,195 +63,61 @@ logger = logging.getLogger(__name__)
 
 
 class ParameterSweeper:
-    """參數掃描執行器"""
+    """參數掃描執行器 (行程內評估，不修改配置文件)"""
 
     def __init__(self, output_dir: Path):
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.stage6_config_path = PROJECT_ROOT / "config/stage6_research_optimization_config.yaml"
-        self.stage6_config_backup = None
-        self.sweep_results = []
+        self.stage6_config = Stage6ConfigManager().load_config(custom_path=self.stage6_config_path)
+        self.engine: Optional[ParameterSweepEngine] = None
 
     def load_sweep_config(self) -> Dict[str, Any]:
         """載入參數掃描配置"""
-        with open(self.stage6_config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config.get('parameter_sweep', {})
-
-    def backup_config(self):
-        """備份原始配置"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = self.output_dir / f"stage6_config_backup_{timestamp}.yaml"
-        shutil.copy(self.stage6_config_path, backup_path)
-        self.stage6_config_backup = backup_path
-        logger.info(f"✅ 配置已備份: {backup_path}")
-
-    def restore_config(self):
-        """恢復原始配置"""
-        if self.stage6_config_backup and self.stage6_config_backup.exists():
-            shutil.copy(self.stage6_config_backup, self.stage6_config_path)
-            logger.info(f"✅ 配置已恢復: {self.stage6_config_path}")
-
-    def update_stage6_config(self, params: Dict[str, float]):
-        """更新 Stage 6 配置文件"""
-        with open(self.stage6_config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-
-        # 更新門檻值
-        thresholds = config.get('handover_thresholds', {})
-
-        # 更新星座特定參數
-        for constellation in ['starlink', 'oneweb']:
-            if constellation not in thresholds:
-                thresholds[constellation] = {}
-
-            for key, value in params.items():
-                if key.startswith(f'{constellation}_'):
-                    param_name = key.replace(f'{constellation}_', '')
-                    thresholds[constellation][param_name] = value
-
-        # 更新通用參數
-        for key, value in params.items():
-            if not any(key.startswith(f'{c}_') for c in ['starlink', 'oneweb']):
-                thresholds[key] = value
-
-        config['handover_thresholds'] = thresholds
-
-        # 保存更新後的配置
-        with open(self.stage6_config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
-
-    def run_stage6(self) -> Dict[str, Any]:
-        """執行 Stage 6（只重跑 Stage 6）"""
-        logger.info("🔄 執行 Stage 6...")
-
-        # 使用虛擬環境的 python
-        venv_python = PROJECT_ROOT / "venv/bin/python"
-        if not venv_python.exists():
-            venv_python = sys.executable  # 回退到系統 python
-
-        cmd = [
-            str(venv_python),
-            str(PROJECT_ROOT / "scripts/run_six_stages_with_validation.py"),
-            "--stage", "6"
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(PROJECT_ROOT)
+        return self.stage6_config.get('parameter_sweep', {})
+
+    def load_stage5_data(self, stage5_output: Optional[Path], max_workers: Optional[int]):
+        """載入 Stage 5 輸出 (只載入一次) 並建立掃描引擎"""
+        output_file = stage5_output or find_latest_stage_output(5)
+        if output_file is None:
+            raise FileNotFoundError("找不到 Stage 5 輸出，請先執行: ./run.sh --stage 5")
+
+        logger.info(f"📥 載入 Stage 5 輸出: {output_file}")
+        start = time.time()
+        stage5_data = load_stage_output(output_file)
+        if 'signal_analysis' not in stage5_data:
+            raise ValueError(f"❌ Stage 5 輸出缺少 signal_analysis 字段: {output_file}")
+
+        self.engine = ParameterSweepEngine(
+            stage5_data['signal_analysis'],
+            base_detector_config(self.stage6_config, stage5_data.get('metadata', {})),
+            max_workers=max_workers
         )
-
-        if result.returncode != 0:
-            logger.error(f"❌ Stage 6 執行失敗:\n{result.stderr}")
-            return {'success': False, 'error': result.stderr}
-
-        # 讀取 Stage 6 驗證快照
-        validation_snapshot = PROJECT_ROOT / "data/validation_snapshots/stage6_validation.json"
-
-        if not validation_snapshot.exists():
-            logger.error(f"❌ Stage 6 驗證快照不存在: {validation_snapshot}")
-            return {'success': False, 'error': 'Validation snapshot not found'}
-
-        with open(validation_snapshot, 'r', encoding='utf-8') as f:
-            stage6_data = json.load(f)
-
-        # 提取 GPP 事件摘要
-        gpp_events = stage6_data.get('gpp_events', {})
-        event_summary = gpp_events.get('event_summary', {})
-
-        return {
-            'success': True,
-            'output_file': str(validation_snapshot),
-            'event_summary': event_summary,
-            'total_events': event_summary.get('a3_count', 0) +
-                          event_summary.get('a4_count', 0) +
-                          event_summary.get('a5_count', 0) +
-                          event_summary.get('d2_count', 0)
-        }
-
-    def extract_metrics(self, stage6_result: Dict[str, Any]) -> Dict[str, Any]:
-        """提取關鍵指標"""
-        event_summary = stage6_result.get('event_summary', {})
-
-        return {
-            'a3_count': event_summary.get('a3_count', 0),
-            'a4_count': event_summary.get('a4_count', 0),
-            'a5_count': event_summary.get('a5_count', 0),
-            'd2_count': event_summary.get('d2_count', 0),
-            'total_events': event_summary.get('total_events', 0),
-            'time_points_processed': event_summary.get('time_points_processed', 0),
-            'participating_satellites': event_summary.get('participating_satellites', 0),
-        }
+        logger.info(f"✅ Stage 5 數據已載入並建立索引 ({time.time() - start:.1f}s)")
 
     def run_sweep(
         self,
         constellation: str,
         param_names: List[str],
-        sweep_config: Dict[str, Any]
+        sweep_config: Dict[str, Any],
+        single_pass: bool = True
     ) -> List[Dict[str, Any]]:
         """執行參數掃描"""
         sweep_ranges = sweep_config.get('sweep_ranges', {}).get(constellation, {})
+        combinations = parameter_combinations(constellation, param_names, sweep_ranges)
 
-        # 構建參數組合
-        param_values = {}
-        for param in param_names:
-            if param in sweep_ranges:
-                param_values[param] = sweep_ranges[param]
-            else:
-                logger.warning(f"⚠️ 參數 {param} 不在掃描範圍中，跳過")
-
-        if not param_values:
+        if not combinations:
             logger.error("❌ 沒有有效的參數可供掃描")
             return []
 
-        # 生成所有參數組合
-        param_combinations = list(itertools.product(*param_values.values()))
-        total_combinations = len(param_combinations)
-
         logger.info(f"📊 參數掃描配置:")
         logger.info(f"   星座: {constellation}")
-        logger.info(f"   參數: {list(param_values.keys())}")
-        logger.info(f"   總組合數: {total_combinations}")
-
-        results = []
-
-        for i, combination in enumerate(param_combinations, 1):
-            # 構建參數字典
-            params = {
-                f"{constellation}_{name}": value
-                for name, value in zip(param_values.keys(), combination)
-            }
-
-            logger.info(f"\n{'='*60}")
-            logger.info(f"📍 掃描進度: {i}/{total_combinations}")
-            logger.info(f"   參數組合: {params}")
-
-            # 更新配置
-            self.update_stage6_config(params)
-
-            # 執行 Stage 6
-            stage6_result = self.run_stage6()
-
-            if stage6_result['success']:
-                metrics = self.extract_metrics(stage6_result)
-
-                result_entry = {
-                    'iteration': i,
-                    'parameters': params,
-                    'metrics': metrics,
-                    'output_file': stage6_result['output_file']
-                }
-                results.append(result_entry)
-
-                logger.info(f"✅ 執行成功:")
-                logger.info(f"   總事件: {metrics['total_events']}")
-                logger.info(f"   D2: {metrics['d2_count']}, A3: {metrics['a3_count']}, "
-                           f"A4: {metrics['a4_count']}, A5: {metrics['a5_count']}")
-            else:
-                logger.error(f"❌ 執行失敗: {stage6_result.get('error', 'Unknown error')}")
+        logger.info(f"   參數: {list(combinations[0].keys())}")
+        logger.info(f"   總組合數: {len(combinations)}")
 
+        start = time.time()
+        results = self.engine.run(combinations, single_pass=single_pass)
+        logger.info(f"✅ {constellation} 掃描完成: {len(results)} 個組合 ({time.time() - start:.1f}s)")
         return results
 
     def analyze_sensitivity(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -251,14 +128,16 @@ class ParameterSweeper:
         if not results:
             return {}
 
-        param_names = list(results[0]['parameters'].keys())
+        # 兩個星座一起掃描時，各星座結果只包含自己的參數
+        param_names = list(dict.fromkeys(name for r in results for name in r['parameters']))
 
         sensitivity = {}
 
         for param in param_names:
             # 計算參數變化對事件數的影響
-            param_values = [r['parameters'][param] for r in results]
-            event_counts = [r['metrics']['total_events'] for r in results]
+            param_results = [r for r in results if param in r['parameters']]
+            param_values = [r['parameters'][param] for r in param_results]
+            event_counts = [r['metrics']['total_events'] for r in param_results]
 
             # 計算相關係數（簡化版）
             if len(set(param_values)) > 1:
@@ -345,13 +224,33 @@ def main():
     parser.add_argument(
         '--params',
         default='d2',
-        help='參數類型: d2, a3, a4, 或組合 (如 d2,a3)'
+        help='參數類型: d2, a3, a4, a5, 或組合 (如 d2,a3)'
     )
 
     parser.add_argument(
         '--full',
         action='store_true',
-        help='完整掃描（包含所有參數組合，警告: 512 次執行）'
+        help='完整掃描（兩個星座 × D2/A3/A4/A5 全部參數組合）'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='並行工作行程數（僅 --per-combination，預設: CPU 核心數，1 = 單行程）'
+    )
+
+    parser.add_argument(
+        '--per-combination',
+        action='store_true',
+        help='逐組合執行完整事件檢測（預設: 單次遍歷多門檻計數）'
+    )
+
+    parser.add_argument(
+        '--stage5-output',
+        type=str,
+        default=None,
+        help='Stage 5 輸出文件（預設: data/outputs/stage5 最新的輸出）'
     )
 
     parser.add_argument(
@@ -370,55 +269,55 @@ def main():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_dir = PROJECT_ROOT / f"results/parameter_sweep_{timestamp}"
 
-    # 初始化掃描器
+    # 初始化掃描器 (相對路徑以項目根目錄為準)
+    stage5_output = Path(args.stage5_output).resolve() if args.stage5_output else None
+    output_dir = output_dir.resolve()
+    os.chdir(PROJECT_ROOT)
     sweeper = ParameterSweeper(output_dir)
-    sweeper.backup_config()
 
-    try:
-        # 載入掃描配置
-        sweep_config = sweeper.load_sweep_config()
+    # 載入掃描配置
+    sweep_config = sweeper.load_sweep_config()
 
-        # 解析參數類型
-        param_map = {
-            'd2': ['d2_threshold1_km', 'd2_threshold2_km'],
-            'a3': ['a3_offset_db'],
-            'a4': ['a4_threshold_dbm'],
-        }
-
-        param_types = args.params.split(',')
-        param_names = []
-        for ptype in param_types:
-            if ptype in param_map:
-                param_names.extend(param_map[ptype])
-
-        # 執行掃描
-        if args.constellation in ['starlink', 'oneweb']:
-            results = sweeper.run_sweep(args.constellation, param_names, sweep_config)
-        else:  # both
-            results_starlink = sweeper.run_sweep('starlink', param_names, sweep_config)
-            results_oneweb = sweeper.run_sweep('oneweb', param_names, sweep_config)
-            results = results_starlink + results_oneweb
-
-        # 分析結果
-        sensitivity = sweeper.analyze_sensitivity(results)
-        optimal = sweeper.find_optimal_parameters(results, criteria='max_events')
-
-        # 保存結果
-        sweeper.save_results(results, sensitivity, optimal)
-
-        # 輸出摘要
-        logger.info("\n" + "="*60)
-        logger.info("📊 參數掃描完成摘要")
-        logger.info("="*60)
-        logger.info(f"總掃描次數: {len(results)}")
-        logger.info(f"最優參數: {optimal['optimal_parameters']}")
-        logger.info(f"最優性能: {optimal['optimal_metrics']['total_events']} 事件")
-        logger.info(f"性能提升: +{optimal['performance_gain']['vs_avg']:.1f} 事件 (相對平均)")
-        logger.info(f"\n詳細結果: {output_dir}")
-
-    finally:
-        # 恢復原始配置
-        sweeper.restore_config()
+    # 解析參數類型
+    param_types = list(SWEEP_PARAMETER_TYPES) if args.full else args.params.split(',')
+    param_names = []
+    for ptype in param_types:
+        if ptype in SWEEP_PARAMETER_TYPES:
+            param_names.extend(SWEEP_PARAMETER_TYPES[ptype])
+        else:
+            logger.warning(f"⚠️ 未知的參數類型: {ptype}")
+
+    constellations = ['starlink', 'oneweb'] if args.full or args.constellation == 'both' else [args.constellation]
+
+    # Stage 5 數據只載入一次，所有星座與組合共用
+    sweeper.load_stage5_data(stage5_output, args.workers)
+
+    # 執行掃描
+    results = []
+    for constellation in constellations:
+        results.extend(sweeper.run_sweep(constellation, param_names, sweep_config,
+                                          single_pass=not args.per_combination))
+
+    if not results:
+        logger.error("❌ 沒有任何掃描結果")
+        sys.exit(1)
+
+    # 分析結果
+    sensitivity = sweeper.analyze_sensitivity(results)
+    optimal = sweeper.find_optimal_parameters(results, criteria='max_events')
+
+    # 保存結果
+    sweeper.save_results(results, sensitivity, optimal)
+
+    # 輸出摘要
+    logger.info("\n" + "="*60)
+    logger.info("📊 參數掃描完成摘要")
+    logger.info("="*60)
+    logger.info(f"總掃描次數: {len(results)}")
+    logger.info(f"最優參數: {optimal['optimal_parameters']}")
+    logger.info(f"最優性能: {optimal['optimal_metrics']['total_events']} 事件")
+    logger.info(f"性能提升: +{optimal['performance_gain']['vs_avg']:.1f} 事件 (相對平均)")
+    logger.info(f"\n詳細結果: {output_dir}")
 
 
 if __name__ == "__main__":
@@ -58,12 +58,15 @@ logger = logging.getLogger(__name__)
 
 # 導入必要模組
 from shared.base import ProcessingResult, ProcessingStatus
+from shared.utils.background_writer import BackgroundResultWriter
 
 # 導入執行器和驗證器
 from stage_executors import (
     execute_stage1, execute_stage2, execute_stage3,
-    execute_stage4, execute_stage5, execute_stage6
+    execute_stage4, execute_stage5, execute_stage6,
+    execute_streaming_stages
 )
+from stage_executors.streaming_executor import STREAMING_STAGES
 from stage_validators import (
     check_stage1_validation, check_stage2_validation, check_stage3_validation,
     check_stage4_validation, check_stage5_validation, check_stage6_validation
@@ -188,7 +191,25 @@ def check_validation_snapshot_quality(stage_num):
 # 主要執行函數
 # ============================================================
 
-def run_all_stages_sequential(validation_level='STANDARD'):
+def run_streaming_stages(stage_results, batch_size=None):
+    """串流執行 Stage 2 → 5 (有界批次)，驗證 Stage 4 / 5 並將結果加入 stage_results"""
+    success, results, processors = execute_streaming_stages(stage_results, batch_size)
+    if not success:
+        return False, STREAMING_STAGES[0], "串流管線 (Stage 2 → 5) 執行失敗"
+
+    stage_results.update(results)
+    for stage_num, processor in processors.items():
+        validation_success, validation_msg = validate_stage_immediately(
+            processor, results[f'stage{stage_num}'], stage_num, STAGE_NAMES[stage_num]
+        )
+        if not validation_success:
+            return False, stage_num, validation_msg
+        print(f'✅ 階段{stage_num}完成並驗證通過 (串流模式): {validation_msg}')
+
+    return True, STREAMING_STAGES[-1], "串流管線完成"
+
+
+def run_all_stages_sequential(validation_level='STANDARD', streaming=False, streaming_batch_size=None):
     """順序執行所有階段 - 使用重構後的模塊化架構"""
     print('\n🚀 開始六階段數據處理 (重構版本)')
     print('=' * 80)
@@ -197,6 +218,14 @@ def run_all_stages_sequential(validation_level='STANDARD'):
 
     try:
         for stage_num in range(1, 7):
+            if streaming and stage_num in STREAMING_STAGES:
+                if stage_num == STREAMING_STAGES[0]:
+                    success, completed, message = run_streaming_stages(stage_results, streaming_batch_size)
+                    if not success:
+                        print(f'❌ 階段{completed}處理失敗: {message}')
+                        return False, completed, message
+                continue
+
             print(f'\n{"=" * 60}')
             print(f'📦 階段{stage_num}：{STAGE_NAMES[stage_num]}')
             print(f'{"=" * 60}')
@@ -262,7 +291,13 @@ def main():
     parser = argparse.ArgumentParser(description='六階段數據處理系統 (重構版本)')
     parser.add_argument('--stage', type=int, choices=[1,2,3,4,5,6], help='運行特定階段')
     parser.add_argument('--stages', type=str, help='運行階段範圍，如 "1-2" 或 "1,3,5"')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Stage 2 → 5 以有界衛星批次串流執行 (需包含 Stage 2-5)')
+    parser.add_argument('--streaming-batch-size', type=int, default=None,
+                        help='串流模式每批衛星數 (預設 1000)')
     args = parser.parse_args()
+    if args.streaming and args.stage:
+        parser.error('--streaming 需與 --stages 或完整執行一起使用')
 
     print('🔧 使用 重構版本 (模塊化架構)')
     print('   ├── stage_executors/: 6個獨立執行器')
@@ -270,6 +305,9 @@ def main():
 
     start_time = time.time()
 
+    # 多階段執行: 結果於記憶體內交接，輸出文件由背景執行緒寫入
+    writer = BackgroundResultWriter() if (args.stages or not args.stage) else None
+
     if args.stages:
         stages_to_run = []
         if '-' in args.stages:
@@ -279,27 +317,42 @@ def main():
             stages_to_run = [int(s.strip()) for s in args.stages.split(',')]
 
         print(f'🎯 運行階段範圍: {stages_to_run}')
+        if args.streaming and not set(STREAMING_STAGES) <= set(stages_to_run):
+            parser.error(f'--streaming 需包含階段 {list(STREAMING_STAGES)}')
 
         overall_success = True
         last_completed = 0
         final_message = ""
         stage_results = {}
 
-        for stage in stages_to_run:
-            if stage not in [1,2,3,4,5,6]:
-                overall_success = False
-                break
-
-            executor = STAGE_EXECUTORS[stage]
-            success, result, processor = executor(stage_results)
-            last_completed = stage
-
-            if not success:
-                overall_success = False
-                final_message = f"階段 {stage} 執行失敗"
-                break
-            else:
-                stage_results[f'stage{stage}'] = result
+        with writer:
+            for stage in stages_to_run:
+                if stage not in [1,2,3,4,5,6]:
+                    overall_success = False
+                    break
+
+                if args.streaming and stage in STREAMING_STAGES:
+                    if stage != STREAMING_STAGES[0]:
+                        continue
+                    success, last_completed, final_message = run_streaming_stages(
+                        stage_results, args.streaming_batch_size
+                    )
+                    if not success:
+                        overall_success = False
+                        break
+                    final_message = ""
+                    continue
+
+                executor = STAGE_EXECUTORS[stage]
+                success, result, processor = executor(stage_results)
+                last_completed = stage
+
+                if not success:
+                    overall_success = False
+                    final_message = f"階段 {stage} 執行失敗"
+                    break
+                else:
+                    stage_results[f'stage{stage}'] = result
 
         success = overall_success
         completed_stage = last_completed
@@ -308,7 +361,18 @@ def main():
     elif args.stage:
         success, completed_stage, message = run_stage_specific(args.stage)
     else:
-        success, completed_stage, message = run_all_stages_sequential()
+        with writer:
+            success, completed_stage, message = run_all_stages_sequential(
+                streaming=args.streaming, streaming_batch_size=args.streaming_batch_size
+            )
+
+    if writer is not None:
+        print(f'\n💾 背景寫入: {writer.completed} 個輸出文件, 累計 {writer.write_seconds:.2f} 秒')
+        if writer.errors:
+            for error in writer.errors:
+                print(f'❌ 背景寫入失敗: {error}')
+            success = False
+            message = f"{message} (輸出文件寫入失敗 {len(writer.errors)} 項)"
 
     end_time = time.time()
     execution_time = end_time - start_time
@@ -19,6 +19,7 @@ from .stage3_executor import execute_stage3
 from .stage4_executor import execute_stage4
 from .stage5_executor import execute_stage5
 from .stage6_executor import execute_stage6
+from .streaming_executor import execute_streaming_stages
 
 __all__ = [
     'execute_stage1',
@@ -27,4 +28,5 @@ __all__ = [
     'execute4',
     'execute_stage5',
     'execute_stage6',
+    'execute_streaming_stages',
 ]
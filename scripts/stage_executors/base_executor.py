@@ -12,7 +12,6 @@ Version: 1.0
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
-import json
 import logging
 
 # 導入工具函數
@@ -24,6 +23,8 @@ from .executor_utils import (
 
 # 導入處理結果類型
 from src.shared.base import ProcessingStatus
+from src.shared.utils.background_writer import get_active_writer
+from src.shared.utils.stage_handoff import load_stage_output
 
 
 class StageExecutor(ABC):
@@ -86,7 +87,7 @@ class StageExecutor(ABC):
             # Step 3: 載入前階段數據（如需要）
             input_data = None
             if self.requires_previous_stage():
-                input_data = self._load_previous_stage_data()
+                input_data = self._load_previous_stage_data(previous_results)
                 if input_data is None:
                     # 前階段數據缺失，無法繼續
                     return False, None, None
@@ -199,14 +200,36 @@ class StageExecutor(ABC):
         print(f'\n{self.emoji} 階段{self.stage_number}：{self.stage_name}')
         print('-' * 60)
 
-    def _load_previous_stage_data(self) -> Optional[Dict]:
+    def _load_previous_stage_data(self, previous_results: Optional[Dict] = None) -> Optional[Dict]:
         """
         載入前階段數據
 
+        前階段在同一進程內執行時 (記憶體內管線)，直接沿用其 ProcessingResult.data
+        (頂層淺拷貝，含 OrbitalStateBlock)，不經過磁碟序列化/反序列化；
+        否則讀取前階段的列式 HDF5 交接文件 (舊版 JSON 輸出亦可)。
+
+        兩種情況皆先等待背景寫入完成: 淺拷貝與背景序列化共用巢狀物件，
+        下一階段修改輸入時不得與尚未完成的寫入競爭。
+
+        Args:
+            previous_results: 前序階段結果字典（可選）
+
         Returns:
             Optional[Dict]: 前階段數據，如果找不到則返回 None
         """
         previous_stage = self.get_previous_stage_number()
+
+        # 背景寫入中的前階段輸出需先完成 (記憶體內結果交出前 / 讀取輸出文件前)
+        writer = get_active_writer()
+        if writer is not None:
+            writer.flush()
+
+        previous_result = (previous_results or {}).get(f'stage{previous_stage}')
+        previous_data = getattr(previous_result, 'data', None)
+        if isinstance(previous_data, dict) and previous_data:
+            self.logger.info(f"📦 沿用 Stage {previous_stage} 記憶體內結果 (不重新載入輸出文件)")
+            return dict(previous_data)
+
         output_file = find_latest_stage_output(previous_stage)
 
         if not output_file:
@@ -216,8 +239,7 @@ class StageExecutor(ABC):
             return None
 
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_stage_output(output_file)
             self.logger.info(f"✅ 已載入 Stage {previous_stage} 數據: {output_file}")
             return data
         except Exception as e:
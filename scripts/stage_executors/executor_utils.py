@@ -10,6 +10,8 @@ Date: 2025-10-03
 import os
 from pathlib import Path
 
+from src.shared.utils.stage_handoff import HANDOFF_SUFFIX
+
 
 # 項目根目錄
 project_root = Path(__file__).parent.parent.parent
@@ -75,6 +77,9 @@ def find_latest_stage_output(stage_number: int):
     """
     找到最新的階段輸出文件
 
+    在列式 HDF5 階段交接文件與 JSON 輸出中取修改時間最新者
+    (舊執行殘留的交接文件不會蓋過較新的 JSON 輸出)。
+
     Args:
         stage_number: 階段編號
 
@@ -85,10 +90,10 @@ def find_latest_stage_output(stage_number: int):
     if not output_dir.exists():
         return None
 
-    # 查找所有 JSON 文件
-    json_files = list(output_dir.glob('*.json'))
-    if not json_files:
+    # 查找階段交接文件與 JSON 文件
+    candidates = list(output_dir.glob(f'*{HANDOFF_SUFFIX}')) + list(output_dir.glob('*.json'))
+    if not candidates:
         return None
 
     # 返回最新的文件
-    return max(json_files, key=lambda p: p.stat().st_mtime)
+    return max(candidates, key=lambda p: p.stat().st_mtime)
@@ -73,6 +73,7 @@ class Stage3Executor(StageExecutor):
         # ✅ 向後兼容：扁平化配置結構 (適配處理器接口)
         config_compat = {
             'enable_geometric_prefilter': stage3_config.get('geometric_prefilter', {}).get('enabled', False),
+            'geometric_prefilter_mode': stage3_config.get('geometric_prefilter', {}).get('mode', 'dense'),
             'coordinate_config': stage3_config.get('coordinate_config', {}),
             'precision_config': stage3_config.get('precision_config', {}),
             'cache_config': stage3_config.get('cache_config', {}),
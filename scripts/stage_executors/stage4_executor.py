@@ -111,16 +111,16 @@ class Stage4Executor(StageExecutor):
 
             input_data = None
             if self.requires_previous_stage():
-                input_data = self._load_previous_stage_data()
+                input_data = self._load_previous_stage_data(previous_results)
                 if input_data is None:
                     return False, None, None
 
             config = self.load_config()
             processor = self.create_processor(config)
 
-            # Step 7: 使用 process() 而非 execute()
-            self.logger.info(f"🚀 調用 processor.process() (Stage 4 特殊接口)")
-            result = processor.process(input_data)
+            # Step 7: 使用 process() 而非 execute() (經內容定址緩存)
+            self.logger.info(f"🚀 調用 processor.process_with_cache() (Stage 4 特殊接口)")
+            result = processor.process_with_cache(input_data)
 
             # Step 8-10: 使用基類的檢查和快照保存
             if not self._check_result(result):
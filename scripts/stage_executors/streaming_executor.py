@@ -0,0 +1,264 @@
+"""
+串流管線執行器 - Stage 2 → 5 有界批次執行
+
+一般模式下每個階段處理完整星座後才交給下一階段，峰值記憶體與 N_sat × N_t 成正比。
+串流模式中衛星以有界批次依序流經:
+
+    Stage 2 傳播 → Stage 3 座標轉換 → Stage 4.1 可見性/可連線篩選
+        → 完整候選條目追加寫入 SatelliteResultSpool，全域步驟只保留精簡陣列 (CandidatePoolColumns)
+
+全域步驟 (需要全體候選衛星):
+    Stage 4.2 池規劃 + 動態 D2 閾值 → 以精簡陣列計算，選中衛星自追加文件讀回完整條目
+
+Stage 5 信號分析依賴 4.2 優化池，因此在第二輪對池內衛星分批執行，結果同樣追加寫入。
+Stage 4 / Stage 5 輸出文件與驗證快照與一般模式相同，Stage 6 可直接沿用記憶體內結果。
+
+Author: Orbit Engine Team
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .executor_utils import clean_stage_outputs
+from .stage2_executor import Stage2Executor
+from .stage3_executor import Stage3Executor
+from .stage4_executor import Stage4Executor
+from .stage5_executor import Stage5Executor
+
+from src.shared.base import ProcessingStatus, create_processing_result
+from src.shared.utils.satellite_result_spool import SPOOL_SUFFIX, SatelliteResultSpool
+
+logger = logging.getLogger(__name__)
+
+# 串流模式涵蓋的階段
+STREAMING_STAGES = (2, 3, 4, 5)
+
+# 預設每批衛星數 (控制 (N_sat, N_t, 6) 狀態陣列與逐點時間序列的記憶體)
+STREAMING_BATCH_SATELLITES = 1000
+
+STREAMING_OUTPUT_DIR = Path('data/outputs/streaming')
+
+
+class StreamingPipelineExecutor:
+    """
+    Stage 2 → 5 串流執行器
+
+    沿用各階段執行器的 load_config() / create_processor()，
+    返回 Stage 4 / Stage 5 的 ProcessingResult 供 Stage 6 與驗證器使用。
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = max(1, int(batch_size or STREAMING_BATCH_SATELLITES))
+        self.executors = {
+            2: Stage2Executor(),
+            3: Stage3Executor(),
+            4: Stage4Executor(),
+            5: Stage5Executor()
+        }
+
+    def execute(self, previous_results: Optional[Dict] = None) -> Tuple[bool, Dict[str, Any], Dict[int, Any]]:
+        """
+        執行串流管線
+
+        Args:
+            previous_results: 前序階段結果字典 (需含 'stage1'，否則讀取 Stage 1 輸出文件)
+
+        Returns:
+            tuple: (success, {'stage4': result, 'stage5': result}, {4: processor, 5: processor})
+        """
+        print(f'\n🌊 串流管線：Stage 2 → 5 (每批 {self.batch_size} 顆衛星)')
+        print('-' * 60)
+
+        try:
+            for stage_number in STREAMING_STAGES:
+                clean_stage_outputs(stage_number)
+            self._clean_spools()
+
+            stage1_data = self.executors[2]._load_previous_stage_data(previous_results)
+            if stage1_data is None:
+                return False, {}, {}
+
+            processors = {
+                stage_number: executor.create_processor(executor.load_config())
+                for stage_number, executor in self.executors.items()
+            }
+            # 🔁 增量緩存以完整星座為單位，串流批次不適用
+            for processor in processors.values():
+                if getattr(processor, 'incremental_store', None) is not None:
+                    logger.warning(f"⚠️ Stage {processor.stage_number} 增量模式於串流管線停用")
+                    processor.incremental_store = None
+
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            spool_path = STREAMING_OUTPUT_DIR / f"stage2_5_stream_{timestamp}{SPOOL_SUFFIX}"
+            with SatelliteResultSpool(spool_path) as spool:
+                stage4_result = self._run_link_feasibility(stage1_data, processors, spool)
+                stage5_result = self._run_signal_analysis(stage4_result.data, processors[5], spool)
+
+            for stage_number, result in ((4, stage4_result), (5, stage5_result)):
+                self.executors[stage_number]._save_validation_snapshot(processors[stage_number], result)
+
+            return True, {'stage4': stage4_result, 'stage5': stage5_result}, {4: processors[4], 5: processors[5]}
+
+        except Exception as e:
+            error_msg = f'❌ 串流管線執行異常: {e}'
+            logger.error(error_msg, exc_info=True)
+            print(error_msg)
+            return False, {}, {}
+
+    @staticmethod
+    def _clean_spools():
+        """只保留本次執行的追加文件"""
+        if STREAMING_OUTPUT_DIR.exists():
+            for file in STREAMING_OUTPUT_DIR.glob(f'*{SPOOL_SUFFIX}'):
+                file.unlink()
+
+    def _run_link_feasibility(self, stage1_data: Dict[str, Any], processors: Dict[int, Any],
+                              spool: SatelliteResultSpool):
+        """第一輪: Stage 2 → 4.1 逐批次執行，全域 4.2 池規劃，返回 Stage 4 ProcessingResult"""
+        from stages.stage4_link_feasibility.data_processing import CoordinateExtractor
+        from stages.stage4_link_feasibility.streaming_candidates import CandidatePoolColumns
+
+        stage2, stage3, stage4 = processors[2], processors[3], processors[4]
+        start_time = time.time()
+
+        # ✅ Fail-Fast: 沿用 Stage 2 的輸入驗證與衛星提取 (含測試模式取樣)
+        if not stage2._validate_stage1_output(stage1_data):
+            raise ValueError("Stage 1 輸出數據驗證失敗")
+        satellites_data = stage2._extract_satellites_data(stage1_data)
+        if not satellites_data:
+            raise ValueError("未找到有效的衛星數據")
+        reference_check = stage2.time_window_manager.validate_reference_time(satellites_data)
+        if not reference_check['valid']:
+            logger.warning(f"⚠️ 參考時刻驗證未通過，符合率: {reference_check['compliance_rate']:.1f}%")
+
+        stage4.upstream_constellation_configs = CoordinateExtractor.apply_upstream_configs(
+            stage1_data.get('metadata', {}), stage4.constellation_filter
+        )
+        if stage4.station_network is not None:
+            logger.warning("⚠️ 多地面站網路分析需要完整座標，串流模式不輸出 station_network")
+
+        candidates = CandidatePoolColumns()
+        batch_stats = {
+            'batch_size': self.batch_size,
+            'batches': 0,
+            'input_satellites': len(satellites_data),
+            'propagated_satellites': 0,
+            'transformed_satellites': 0,
+            'candidate_satellites': 0,
+            'max_batch_state_mb': 0.0
+        }
+
+        for block in stage2.iter_orbital_state_blocks(satellites_data, self.batch_size):
+            batch_stats['batches'] += 1
+            batch_stats['propagated_satellites'] += block.n_satellites
+            batch_stats['max_batch_state_mb'] = max(batch_stats['max_batch_state_mb'], block.nbytes / 1024 / 1024)
+
+            geodetic_block, _ = stage3.transform_block(block)
+            if geodetic_block is None:
+                continue
+            batch_stats['transformed_satellites'] += geodetic_block.n_satellites
+
+            connectable = stage4.evaluate_geodetic_block(geodetic_block)
+            spool.append('stage4', {
+                satellite['satellite_id']: satellite
+                for satellites in connectable.values() for satellite in satellites
+            })
+            batch_stats['candidate_satellites'] += candidates.add_batch(connectable)
+            logger.info(
+                f"🌊 批次 {batch_stats['batches']}: 傳播 {block.n_satellites} 顆，"
+                f"座標轉換 {geodetic_block.n_satellites} 顆，累計候選 {batch_stats['candidate_satellites']} 顆"
+            )
+
+        if not batch_stats['transformed_satellites']:
+            raise ValueError("串流管線無有效衛星 (軌道傳播或幾何預篩選後為空)")
+
+        # 🌐 全域步驟: 以精簡陣列執行動態閾值與 4.2 池規劃，選中衛星讀回完整條目
+        compact_candidates = candidates.by_constellation()
+        dynamic_thresholds, compact_pools, optimization_results = stage4.plan_streaming_pools(compact_candidates)
+        optimized_pools = {
+            constellation: list(spool.load(
+                'stage4', [satellite['satellite_id'] for satellite in pool]
+            ).values())
+            for constellation, pool in compact_pools.items()
+        }
+
+        stage4_output = stage4.build_streaming_output(
+            batch_stats['input_satellites'], batch_stats['transformed_satellites'],
+            compact_candidates, optimized_pools, optimization_results, dynamic_thresholds
+        )
+        batch_stats['candidate_pool_mb'] = candidates.nbytes / 1024 / 1024
+        stage4_output['metadata']['streaming'] = {**batch_stats, 'spool': spool.summary()}
+        stage4_output['metadata']['stage3_prefilter'] = {
+            key: stage3.processing_stats[key]
+            for key in ('satellites_before_prefilter', 'satellites_after_prefilter', 'prefilter_retention_rate')
+        }
+
+        output_file = stage4.save_results(stage4_output)
+        processing_time = time.time() - start_time
+        logger.info(
+            f"✅ 串流 Stage 2 → 4 完成: {batch_stats['batches']} 批次，{processing_time:.1f} 秒，"
+            f"候選池精簡陣列 {batch_stats['candidate_pool_mb']:.1f} MB"
+        )
+
+        return create_processing_result(
+            status=ProcessingStatus.SUCCESS,
+            data=stage4_output,
+            message="Stage 4 鏈路可行性評估成功 (串流模式)",
+            metadata={
+                'stage': 4,
+                'processing_time': processing_time,
+                'stage_name': 'link_feasibility',
+                'streaming': True,
+                'output_file': output_file
+            }
+        )
+
+    def _run_signal_analysis(self, stage4_output: Dict[str, Any], stage5: Any, spool: SatelliteResultSpool):
+        """第二輪: 優化池衛星分批信號分析，返回 Stage 5 ProcessingResult"""
+        start_time = time.time()
+        stage4_metadata = stage4_output['metadata']
+
+        analyzed_ids = []
+        for constellation, pool in stage4_output['connectable_satellites'].items():
+            for batch_start in range(0, len(pool), self.batch_size):
+                batch = {constellation: pool[batch_start:batch_start + self.batch_size]}
+                analyzed = stage5.analyze_satellite_batch(batch, stage4_metadata)
+                spool.append('stage5', analyzed)
+                analyzed_ids.extend(analyzed)
+
+        analyzed_satellites = spool.load('stage5', analyzed_ids)
+        processing_time = time.time() - start_time
+        stage5_output = stage5.build_streaming_output(analyzed_satellites, stage4_output, processing_time)
+        stage5_output.setdefault('metadata', {})['streaming'] = {
+            'batch_size': self.batch_size,
+            'spool': spool.summary()
+        }
+
+        output_file = stage5.save_results(stage5_output)
+        logger.info(f"✅ 串流 Stage 5 完成: {len(analyzed_satellites)} 顆衛星，{processing_time:.1f} 秒")
+
+        return create_processing_result(
+            status=ProcessingStatus.SUCCESS,
+            data=stage5_output,
+            message=f"成功分析{len(analyzed_satellites)}顆衛星的信號品質 (串流模式)",
+            metadata={'output_file': output_file, 'streaming': True}
+        )
+
+
+# ===== 便捷函數 =====
+
+def execute_streaming_stages(previous_results=None, batch_size: Optional[int] = None):
+    """
+    執行串流管線 (Stage 2 → 5)
+
+    Args:
+        previous_results: 前序階段結果字典 (需含 'stage1' 結果或 Stage 1 輸出文件)
+        batch_size: 每批衛星數 (預設 STREAMING_BATCH_SATELLITES)
+
+    Returns:
+        tuple: (success, {'stage4': result, 'stage5': result}, {4: processor, 5: processor})
+    """
+    return StreamingPipelineExecutor(batch_size).execute(previous_results)
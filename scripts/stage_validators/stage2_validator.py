@@ -97,7 +97,9 @@ class Stage2Validator(StageValidator):
             return False, "❌ Stage 2 星座分離失敗: 無 Starlink/OneWeb 數據"
 
         # 檢查平均軌道點數 (Starlink: ~191點, OneWeb: ~218點)
-        if total_satellites > 0:
+        # 自適應取樣模式只輸出過境窗口內的點，點數由 Layer 1 過境窗口完整性檢查驗證
+        adaptive_sampling = snapshot_data.get('metadata', {}).get('adaptive_sampling')
+        if total_satellites > 0 and not adaptive_sampling:
             avg_points_per_sat = total_teme_positions / total_satellites
 
             # 根據星座比例計算期望值 (動態軌道週期覆蓋)
@@ -17,6 +17,7 @@ RECOMMENDED IMPORTS (New Structure):
     from shared.validation import ValidationEngine
     from shared.constants import PhysicsConstants
     from shared.coordinate_systems import SkyfieldCoordinateEngine
+    from shared.data_structures import OrbitalStateBlock
     from shared.utils import TimeUtils
 
 OLD IMPORT PATHS (deprecated, backward compatibility maintained):
@@ -32,6 +33,7 @@ Core Components:
 - configs: Configuration management (BaseConfigManager)
 - constants: Physical constants, academic standards, TLE constants
 - coordinate_systems: Coordinate transformation engines
+- data_structures: Columnar containers shared across stages (OrbitalStateBlock)
 - utils: Time, math, and file utilities
 - validation: Data validation and academic compliance
 
@@ -51,6 +53,7 @@ __all__ = [
     'configs',
     'constants',
     'coordinate_systems',
+    'data_structures',
     'utils',
     'validation',
 ]
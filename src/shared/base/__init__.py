@@ -4,6 +4,8 @@ Base classes and interfaces for Orbit Engine processors
 Core Components:
 - BaseStageProcessor: Template for all stage processors
 - BaseResultManager: Template for result management
+- StageResultCache: Content-addressed stage result cache (consulted by execute())
+- IncrementalSatelliteStore: Per-satellite manifest for incremental re-processing
 - ProcessingResult, ProcessingStatus: Interface definitions
 
 Author: Orbit Engine Refactoring Team
@@ -13,6 +15,8 @@ Version: 2.1.0 (Phase 5 - Module Reorganization)
 
 from .base_processor import BaseStageProcessor
 from .base_result_manager import BaseResultManager
+from .stage_cache import StageResultCache
+from .incremental_store import IncrementalPlan, IncrementalSatelliteStore
 from .processor_interface import (
     ProcessingStatus,
     ProcessingMetrics,
@@ -33,6 +37,9 @@ __all__ = [
     # Base classes
     'BaseStageProcessor',
     'BaseResultManager',
+    'StageResultCache',
+    'IncrementalPlan',
+    'IncrementalSatelliteStore',
 
     # Interfaces and enums
     'ProcessingStatus',
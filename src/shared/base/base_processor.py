@@ -1,17 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime, timezone
 import logging
 import json
 import asyncio
+import inspect
 import os
 
+import numpy as np
+
 # 導入BaseProcessor接口 (Phase 5: processor_interface is now in the same directory)
 from .processor_interface import BaseProcessor, ProcessingResult, ProcessingStatus, create_processing_result
+from .stage_cache import LINEAGE_KEY, StageResultCache, code_fingerprint, fingerprint_data
 
 class BaseStageProcessor(BaseProcessor):
     """所有階段處理器的基礎抽象類"""
+
+    # 內容定址緩存命中時需一併還原的處理器屬性 (驗證快照 / 關鍵指標使用)
+    stage_cache_state_attrs: Tuple[str, ...] = ('processing_stats',)
     
     def __init__(self, stage_number: int, stage_name: str, config: Optional[Dict] = None):
         """
@@ -127,8 +134,8 @@ class BaseStageProcessor(BaseProcessor):
                         message=error_msg
                     )
             
-            # 執行主處理邏輯
-            result = self.process(input_data)
+            # 執行主處理邏輯 (先查詢內容定址緩存)
+            result = self.process_with_cache(input_data)
             
             # 輸出驗證 - 使用完整的result.data和metadata合併進行驗證
             if result.status == ProcessingStatus.SUCCESS and result.data:
@@ -222,6 +229,121 @@ class BaseStageProcessor(BaseProcessor):
                 message=error_msg
             )
 
+    # ==================== 內容定址緩存 ====================
+
+    def process_with_cache(self, input_data: Optional[Dict[str, Any]] = None) -> ProcessingResult:
+        """
+        以內容定址緩存包裝 process()
+
+        緩存鍵 = SHA-256(輸入指紋, 階段配置, 程式碼版本)。命中時直接還原
+        ProcessingResult 與 stage_cache_state_attrs，並由 save_cached_outputs()
+        重建輸出文件；未命中時執行 process() 並緩存成功結果。
+        鍵同時寫入 data['metadata']['stage_cache_keys']，作為下游階段的輸入指紋。
+
+        Args:
+            input_data: 輸入數據
+
+        Returns:
+            ProcessingResult: 處理結果 (metadata['stage_cache'] 記錄命中狀態)
+        """
+        cache = StageResultCache.from_config(self.config, self.logger)
+        if cache is None:
+            result = self.process(input_data)
+            self._record_cache_lineage(result, None)
+            return result
+
+        key = cache.make_key(
+            self.stage_number,
+            self.cache_input_fingerprint(input_data),
+            self.config,
+            code_fingerprint(self.cache_code_directories())
+        )
+
+        payload = cache.load(self.stage_number, key)
+        if payload is not None:
+            self.logger.info(f"⚡ Stage {self.stage_number} 緩存命中 ({key[:12]})，跳過處理")
+            result = create_processing_result(
+                status=ProcessingStatus(payload['status']),
+                data=payload['data'],
+                errors=payload.get('errors'),
+                warnings=payload.get('warnings'),
+                metadata=payload.get('metadata')
+            )
+            for attr, value in payload.get('processor_state', {}).items():
+                setattr(self, attr, value)
+            result.metadata['stage_cache'] = {'key': key, 'hit': True}
+            self.save_cached_outputs(result)
+            return result
+
+        result = self.process(input_data)
+        self._record_cache_lineage(result, key)
+        if result.status == ProcessingStatus.SUCCESS and isinstance(result.data, dict) and result.data:
+            result.metadata['stage_cache'] = {'key': key, 'hit': False}
+            cache.store(self.stage_number, key, self._build_cache_payload(result))
+        return result
+
+    def cache_input_fingerprint(self, input_data: Optional[Dict[str, Any]]) -> str:
+        """
+        輸入數據指紋
+
+        優先使用上游階段記錄的緩存鍵 (metadata['stage_cache_keys'])，
+        否則對輸入內容做完整雜湊。無輸入的階段 (Stage 1) 應覆蓋此方法。
+        """
+        if input_data is None:
+            return 'none'
+        if isinstance(input_data, dict):
+            lineage = (input_data.get('metadata') or {}).get(LINEAGE_KEY) or {}
+            upstream_key = lineage.get(f'stage{self.stage_number - 1}')
+            if upstream_key:
+                return f"stage{self.stage_number - 1}:{upstream_key}"
+        return fingerprint_data(input_data)
+
+    def cache_code_directories(self) -> List[Path]:
+        """程式碼版本涵蓋的目錄: 階段套件 + src/shared"""
+        return [Path(inspect.getfile(type(self))).parent, Path(__file__).resolve().parent.parent]
+
+    def save_cached_outputs(self, result: ProcessingResult) -> None:
+        """
+        緩存命中時重建輸出文件
+
+        預設由 execute() 的 save_results() 流程處理；
+        在 process() 內自行保存輸出、且未提供 save_results() 的階段需覆蓋。
+        """
+        pass
+
+    def _record_cache_lineage(self, result: ProcessingResult, key: Optional[str]) -> None:
+        """於輸出 metadata 記錄 (或清除) 本階段緩存鍵，供下游作為輸入指紋"""
+        metadata = result.data.get('metadata') if isinstance(result.data, dict) else None
+        if not isinstance(metadata, dict):
+            return
+        lineage = {k: v for k, v in (metadata.get(LINEAGE_KEY) or {}).items() if k != f'stage{self.stage_number}'}
+        if key is not None:
+            lineage[f'stage{self.stage_number}'] = key
+        metadata[LINEAGE_KEY] = lineage
+
+    def _build_cache_payload(self, result: ProcessingResult) -> Dict[str, Any]:
+        """
+        建立緩存內容 (頂層淺拷貝，背景寫入期間不受後續 metadata 合併影響)
+
+        僅存在於記憶體的物件 (如 OrbitalStateBlock) 不寫入緩存，下游改由一般結構重建。
+        """
+        plain = (dict, list, tuple, str, int, float, bool, type(None), np.ndarray, np.generic)
+        data = {k: v for k, v in result.data.items() if isinstance(v, plain)}
+        if isinstance(data.get('metadata'), dict):
+            data['metadata'] = dict(data['metadata'])
+        return {
+            'stage': self.stage_number,
+            'status': result.status.value,
+            'data': data,
+            'metadata': dict(result.metadata),
+            'errors': list(result.errors),
+            'warnings': list(result.warnings),
+            'processor_state': {
+                attr: getattr(self, attr) for attr in self.stage_cache_state_attrs
+                if getattr(self, attr, None) is not None
+            }
+        }
+
     def _save_validation_snapshot(self, result: ProcessingResult) -> None:
         """
         保存驗證快照
@@ -42,6 +42,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple, List
 
+from ..utils.stage_handoff import save_stage_output
+
 
 class BaseResultManager(ABC):
     """
@@ -52,7 +54,7 @@ class BaseResultManager(ABC):
 
     Template Methods (implemented here):
     ------------------------------------
-    - save_results(): Standard result saving workflow
+    - save_results(): Standard result saving workflow (columnar HDF5 handoff + optional JSON)
     - save_validation_snapshot(): Standard snapshot creation workflow
 
     Helper Methods (common utilities):
@@ -62,6 +64,7 @@ class BaseResultManager(ABC):
     - _create_validation_directory(): Create and return validation directory
     - _generate_timestamp(): Generate UTC timestamp string
     - _save_json(): Save data as JSON file
+    - _save_stage_output(): Save stage output as HDF5 handoff (+ optional JSON export)
     - _check_required_field(): Fail-Fast field validation
     - _check_required_fields(): Batch Fail-Fast validation
 
@@ -173,7 +176,7 @@ class BaseResultManager(ABC):
     def save_results(
         self,
         results: Dict[str, Any],
-        output_format: str = 'json',
+        output_format: str = 'handoff',
         custom_filename: Optional[str] = None
     ) -> str:
         """
@@ -182,42 +185,40 @@ class BaseResultManager(ABC):
         Standard workflow:
         1. Create output directory
         2. Generate timestamp (unless custom filename provided)
-        3. Build output file path
-        4. Save results as JSON
+        3. Build output file stem
+        4. Save results as columnar HDF5 handoff (+ optional JSON export)
         5. Log success message
 
         Args:
             results: Complete result dictionary (from build_stage_results())
-            output_format: Output format ('json' or 'both') - HDF5 handled by subclasses
+            output_format: Output format ('handoff', 'json' or 'both')
+                JSON is also exported when ORBIT_ENGINE_JSON_EXPORT=1
             custom_filename: Optional custom filename (without extension)
 
         Returns:
-            Output file path
+            Output file path (handoff file unless only JSON was written)
 
         Raises:
             IOError: If saving fails
 
         Note:
-            Subclasses can override this method to add HDF5 support or other formats.
+            Subclasses can override this method to add other formats.
             See Stage2ResultManager and Stage3ResultsManager for examples.
         """
         try:
             # Step 1: Create output directory
             output_dir = self._create_output_directory(self.get_stage_number())
 
-            # Step 2: Generate filename
+            # Step 2-3: Build output file stem
             if custom_filename:
-                filename = f"{custom_filename}.json"
+                stem = custom_filename
             else:
                 timestamp = self._generate_timestamp()
                 stage_id = self.get_stage_identifier()
-                filename = f"{stage_id}_output_{timestamp}.json"
-
-            # Step 3: Build output file path
-            output_file = output_dir / filename
+                stem = f"{stage_id}_output_{timestamp}"
 
-            # Step 4: Save as JSON
-            self._save_json(results, output_file)
+            # Step 4: Save as handoff (+ optional JSON)
+            output_file = self._save_stage_output(results, output_dir, stem, output_format)
 
             # Step 5: Log success
             stage_num = self.get_stage_number()
@@ -390,6 +391,30 @@ class BaseResultManager(ABC):
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False, default=str)
 
+    def _save_stage_output(
+        self,
+        data: Dict[str, Any],
+        output_dir: Path,
+        stem: str,
+        output_format: str = 'handoff'
+    ) -> Path:
+        """
+        Save stage output for the next stage
+
+        Writes the columnar HDF5 handoff file read by the next StageExecutor.
+        JSON is an optional export ('json' / 'both', or ORBIT_ENGINE_JSON_EXPORT=1).
+
+        Args:
+            data: Dictionary to save
+            output_dir: Target directory
+            stem: Filename without extension
+            output_format: 'handoff', 'json' or 'both'
+
+        Returns:
+            Primary output file path
+        """
+        return save_stage_output(data, output_dir, stem, output_format, self.logger)
+
     # ==================== Fail-Fast Helper Methods ====================
 
     def _check_required_field(
@@ -0,0 +1,239 @@
+"""
+🔁 增量處理狀態庫 - 逐衛星重用上次運行的結果
+
+每日 TLE 更新通常只改變部分衛星。啟用增量模式的階段為每顆衛星計算
+「輸入指紋」(Stage 2: TLE 兩行 + epoch + 時間網格；Stage 3-5: 該衛星輸入數據的內容雜湊)，
+並與上次運行的清單 (manifest) 比對:
+
+✅ 新增或指紋改變的衛星 → dirty，重新計算
+✅ 指紋相同的衛星 → 從狀態庫讀回上次的逐衛星結果後合併
+✅ 清單中有、本次輸入沒有的衛星 → 移除
+
+清單同時記錄「設定指紋」(階段配置 + 程式碼版本 + 階段提供的額外設定)，
+設定改變時全部衛星視為 dirty。只影響部分衛星的條件 (如 Stage 2 時間網格)
+應納入逐衛星指紋，而非設定指紋。
+
+目錄佈局 (預設 data/cache/incremental/stage{N}，不受執行器清理輸出目錄影響):
+- manifest.json: {'format_version', 'stage', 'settings', 'entries_file', 'satellites': {衛星ID: 指紋}}
+- entries_<token>.h5: 逐衛星結果 (HDF5 階段交接格式，頂層鍵為衛星 ID，可只讀取部分衛星)
+
+寫入順序為「新結果文件 → 原子替換清單 → 刪除舊結果文件」，
+中斷時清單永遠指向完整的結果文件。
+
+環境變數:
+- ORBIT_ENGINE_INCREMENTAL=1/0   啟用/停用 (優先於階段配置 incremental.enabled)
+- ORBIT_ENGINE_INCREMENTAL_DIR   狀態庫根目錄
+
+Author: Orbit Engine Team
+"""
+
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..utils.background_writer import run_or_submit
+from ..utils.stage_handoff import HDF5_AVAILABLE, load_stage_handoff, save_stage_handoff
+from .stage_cache import code_fingerprint, config_fingerprint, fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL_ENV = 'ORBIT_ENGINE_INCREMENTAL'
+INCREMENTAL_DIR_ENV = 'ORBIT_ENGINE_INCREMENTAL_DIR'
+DEFAULT_INCREMENTAL_DIR = 'data/cache/incremental'
+
+MANIFEST_NAME = 'manifest.json'
+ENTRIES_PATTERN = 'entries_*.h5'
+INCREMENTAL_FORMAT_VERSION = 1
+
+
+@dataclass
+class IncrementalPlan:
+    """增量處理計劃 (衛星 ID 依輸入順序排列)"""
+    fingerprints: Dict[str, str]
+    dirty_ids: List[str]
+    reused_ids: List[str]
+    removed_ids: List[str]
+
+    @property
+    def is_full_run(self) -> bool:
+        """沒有可重用的衛星"""
+        return not self.reused_ids
+
+    def summary(self) -> Dict[str, Any]:
+        """寫入輸出 metadata 的統計摘要"""
+        return {
+            'enabled': True,
+            'dirty_satellites': len(self.dirty_ids),
+            'reused_satellites': len(self.reused_ids),
+            'removed_satellites': len(self.removed_ids)
+        }
+
+
+class IncrementalSatelliteStore:
+    """
+    逐衛星結果狀態庫 (manifest + HDF5 結果文件)
+
+    使用方式:
+        store = IncrementalSatelliteStore.for_processor(self, settings={'adaptive_sampling': ...})
+        if store is not None:
+            plan = store.plan(fingerprints)
+            reused = store.load(plan.reused_ids)
+            ... 僅處理 plan.dirty_ids ...
+            store.save(plan.fingerprints, {**reused, **new_entries})
+    """
+
+    def __init__(self, stage_number: int, directory: Union[str, Path], settings_fingerprint: str,
+                 logger_instance: Optional[logging.Logger] = None):
+        self.stage_number = stage_number
+        self.directory = Path(directory)
+        self.settings_fingerprint = settings_fingerprint
+        self.logger = logger_instance or logger
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def for_processor(cls, processor: Any, settings: Any = None) -> Optional['IncrementalSatelliteStore']:
+        """
+        依處理器配置建立狀態庫 (未啟用時返回 None)
+
+        Args:
+            processor: BaseStageProcessor 實例 (使用其 stage_number / config / 程式碼目錄)
+            settings: 影響全部衛星結果、但不在配置中的額外設定 (如 Stage 2 自適應取樣描述)
+        """
+        config = processor.config or {}
+        section = config.get('incremental', {}) or {}
+        env = os.getenv(INCREMENTAL_ENV)
+        enabled = env == '1' if env is not None else bool(section.get('enabled', False))
+        if not enabled or not HDF5_AVAILABLE:
+            return None
+
+        root = os.getenv(INCREMENTAL_DIR_ENV, section.get('state_dir', DEFAULT_INCREMENTAL_DIR))
+        stage_config = {k: v for k, v in config.items() if k != 'incremental'}
+        settings_fingerprint = fingerprint_data({
+            'config': config_fingerprint(stage_config),
+            'code': code_fingerprint(processor.cache_code_directories()),
+            'settings': settings
+        })
+        return cls(
+            processor.stage_number,
+            Path(root) / f"stage{processor.stage_number}",
+            settings_fingerprint,
+            getattr(processor, 'logger', None)
+        )
+
+    # ==================== 比對 / 讀取 ====================
+
+    def plan(self, fingerprints: Dict[str, str]) -> IncrementalPlan:
+        """
+        比對本次輸入指紋與上次清單
+
+        Args:
+            fingerprints: 衛星 ID → 輸入指紋 (依輸入順序)
+
+        Returns:
+            IncrementalPlan: dirty / 可重用 / 已移除的衛星
+        """
+        self._manifest = self._load_manifest()
+        previous = self._manifest['satellites'] if self._manifest else {}
+
+        dirty_ids, reused_ids = [], []
+        for satellite_id, fingerprint in fingerprints.items():
+            (reused_ids if previous.get(satellite_id) == fingerprint else dirty_ids).append(satellite_id)
+        removed_ids = [sat_id for sat_id in previous if sat_id not in fingerprints]
+
+        self.logger.info(
+            f"🔁 Stage {self.stage_number} 增量模式: {len(dirty_ids)} 顆重新計算，"
+            f"{len(reused_ids)} 顆沿用上次結果，{len(removed_ids)} 顆已移除"
+        )
+        return IncrementalPlan(dict(fingerprints), dirty_ids, reused_ids, removed_ids)
+
+    def load(self, satellite_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        讀取上次運行的逐衛星結果 (只解碼指定衛星)
+
+        Raises:
+            RuntimeError: 尚未呼叫 plan()，或結果文件缺少清單記錄的衛星
+        """
+        satellite_ids = list(satellite_ids)
+        if not satellite_ids:
+            return {}
+        if self._manifest is None:
+            raise RuntimeError("IncrementalSatelliteStore.load() 必須在 plan() 之後呼叫")
+
+        entries_file = self.directory / self._manifest['entries_file']
+        entries = load_stage_handoff(entries_file, keys=satellite_ids)
+
+        # ✅ Fail-Fast: 清單與結果文件必須一致
+        missing = [sat_id for sat_id in satellite_ids if sat_id not in entries]
+        if missing:
+            raise RuntimeError(
+                f"增量狀態庫不一致: {entries_file.name} 缺少 {len(missing)} 顆衛星 (如 {missing[:3]})"
+            )
+        return entries
+
+    # ==================== 寫入 ====================
+
+    def save(self, fingerprints: Dict[str, str], entries: Dict[str, Any]) -> None:
+        """
+        記錄本次運行結果 (背景寫入器啟用時於背景執行)
+
+        只有 entries 中的衛星寫入清單；處理失敗的衛星下次仍視為 dirty。
+        entries 在寫入完成前不可再修改。
+
+        Args:
+            fingerprints: 衛星 ID → 輸入指紋
+            entries: 衛星 ID → 可由階段交接格式保存的逐衛星結果
+        """
+        manifest = {
+            'format_version': INCREMENTAL_FORMAT_VERSION,
+            'stage': self.stage_number,
+            'settings': self.settings_fingerprint,
+            'entries_file': f"entries_{uuid.uuid4().hex[:16]}.h5",
+            'satellites': {sat_id: fingerprints[sat_id] for sat_id in entries}
+        }
+        run_or_submit(f"stage{self.stage_number}_incremental_state", self._write, manifest, entries)
+
+    def _write(self, manifest: Dict[str, Any], entries: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        save_stage_handoff(entries, self.directory / manifest['entries_file'])
+
+        manifest_path = self.directory / MANIFEST_NAME
+        tmp_path = manifest_path.with_name(MANIFEST_NAME + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+
+        for old_file in self.directory.glob(ENTRIES_PATTERN):
+            if old_file.name != manifest['entries_file']:
+                old_file.unlink(missing_ok=True)
+
+        self.logger.info(
+            f"💾 Stage {self.stage_number} 增量狀態已更新: {len(manifest['satellites'])} 顆衛星"
+        )
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """讀取可用的清單 (不存在、格式或設定不符時返回 None)"""
+        manifest_path = self.directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            self.logger.info(f"ℹ️ Stage {self.stage_number} 尚無增量清單，全部衛星重新計算")
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ 增量清單無法讀取，全部衛星重新計算: {e}")
+            return None
+
+        if manifest.get('format_version') != INCREMENTAL_FORMAT_VERSION:
+            self.logger.info("ℹ️ 增量清單格式版本不同，全部衛星重新計算")
+            return None
+        if manifest.get('settings') != self.settings_fingerprint:
+            self.logger.info("ℹ️ 階段配置或程式碼已改變，全部衛星重新計算")
+            return None
+        if not (self.directory / manifest.get('entries_file', '')).is_file():
+            self.logger.warning("⚠️ 增量結果文件不存在，全部衛星重新計算")
+            return None
+        return manifest
@@ -0,0 +1,302 @@
+"""
+📦 階段結果緩存 - 內容定址的階段處理器緩存
+
+啟用後 BaseStageProcessor.execute() 在呼叫 process() 前先查詢此緩存，
+緩存鍵為以下內容的 SHA-256:
+
+1. **輸入指紋**: 上游階段記錄於 `metadata['stage_cache_keys']` 的緩存鍵 (血緣)，
+   無血緣時 (如手動編輯的輸入文件) 對輸入內容做完整雜湊；Stage 1 以其輸入文件為指紋
+2. **階段配置**: 階段 YAML 載入的配置字典
+3. **程式碼版本**: 階段套件與 `src/shared` 原始碼的內容雜湊
+
+結果以 HDF5 列式交接格式保存，命中時得到的內容與下游從階段輸出文件讀回的完全相同，
+參數掃描或重跑後段階段時可自動沿用未改變的 Stage 1-4 結果。
+
+⚠️ 緩存保存完整階段輸出 (全星座可達數 GB)，因此預設關閉，
+需以階段配置 stage_cache.enabled: true 或 ORBIT_ENGINE_STAGE_CACHE=1 明確啟用。
+
+淘汰策略為 LRU (每次命中刷新文件 mtime)，受總大小與條目數上限約束。
+
+環境變數:
+- ORBIT_ENGINE_STAGE_CACHE=1/0    啟用/停用 (優先於 stage_cache.enabled，測試模式亦然)
+- ORBIT_ENGINE_STAGE_CACHE_DIR    緩存目錄 (預設 data/cache/stages)
+- ORBIT_ENGINE_STAGE_CACHE_MAX_GB 大小上限 (預設 20)
+
+Author: Orbit Engine Team
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from ..utils.background_writer import run_or_submit
+from ..utils.stage_handoff import HDF5_AVAILABLE, load_stage_handoff, save_stage_handoff
+
+logger = logging.getLogger(__name__)
+
+STAGE_CACHE_ENV = 'ORBIT_ENGINE_STAGE_CACHE'
+STAGE_CACHE_DIR_ENV = 'ORBIT_ENGINE_STAGE_CACHE_DIR'
+STAGE_CACHE_MAX_GB_ENV = 'ORBIT_ENGINE_STAGE_CACHE_MAX_GB'
+
+DEFAULT_CACHE_DIR = 'data/cache/stages'
+DEFAULT_MAX_GB = 20.0
+DEFAULT_MAX_ENTRIES = 64
+
+CACHE_SUFFIX = '.stage_cache.h5'
+CACHE_FORMAT_VERSION = 1
+
+# 階段輸出 metadata 中記錄各階段緩存鍵的欄位 (下游以此作為輸入指紋)
+LINEAGE_KEY = 'stage_cache_keys'
+
+_CODE_FINGERPRINTS: Dict[Tuple[str, ...], str] = {}
+
+
+# ==================== 指紋 ====================
+
+def fingerprint_data(data: Any) -> str:
+    """
+    巢狀 dict / list / ndarray 結構的內容雜湊
+
+    字典鍵依排序後雜湊，邏輯相同的輸入不受插入順序影響；
+    NumPy 陣列以 dtype、shape 與原始位元組雜湊，其他無 JSON 形式的物件以 repr() 雜湊。
+    """
+    try:
+        # 快速路徑: C 實作的 json 序列化 (比逐節點遞迴快一個數量級)
+        text = json.dumps(data, sort_keys=True, ensure_ascii=False, default=_json_default)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    except TypeError:
+        # 鍵型別混雜無法排序
+        hasher = hashlib.sha256()
+        _update_hash(hasher, data)
+        return hasher.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"nd{value.dtype.str}{value.shape}:{digest}"
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return f"{type(value).__name__}:{value!r}"
+
+
+def _update_hash(hasher, value: Any) -> None:
+    if isinstance(value, dict):
+        hasher.update(b'{')
+        for key in sorted(value, key=str):
+            hasher.update(str(key).encode('utf-8') + b':')
+            _update_hash(hasher, value[key])
+        hasher.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'[')
+        for item in value:
+            _update_hash(hasher, item)
+            hasher.update(b',')
+        hasher.update(b']')
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        hasher.update(f"nd{value.dtype.str}{value.shape}".encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.ndarray):
+        _update_hash(hasher, value.tolist())
+    elif isinstance(value, np.generic):
+        _update_hash(hasher, value.item())
+    else:
+        hasher.update(f"{type(value).__name__}:{value!r}".encode('utf-8'))
+
+
+def fingerprint_files(paths: Iterable[Union[str, Path]]) -> str:
+    """一組文件的內容雜湊 (路徑 + 位元組，依路徑排序)"""
+    hasher = hashlib.sha256()
+    for path in sorted(Path(p) for p in paths):
+        hasher.update(str(path).encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def code_fingerprint(directories: Iterable[Union[str, Path]]) -> str:
+    """
+    指定目錄下全部 Python 原始碼的內容雜湊
+
+    每個進程對同一組目錄只計算一次。
+    """
+    roots = tuple(sorted(str(Path(d).resolve()) for d in directories))
+    if roots not in _CODE_FINGERPRINTS:
+        files = [
+            path for root in roots for path in Path(root).rglob('*.py')
+            if '__pycache__' not in path.parts
+        ]
+        _CODE_FINGERPRINTS[roots] = fingerprint_files(files)
+    return _CODE_FINGERPRINTS[roots]
+
+
+def config_fingerprint(config: Optional[Dict[str, Any]]) -> str:
+    """階段配置字典 (階段 YAML 載入結果) 的雜湊"""
+    text = json.dumps(config or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# ==================== 淘汰 ====================
+
+def evict_lru(directory: Union[str, Path], pattern: str,
+              max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+              logger_instance: Optional[logging.Logger] = None) -> int:
+    """
+    刪除最久未使用的文件，直到符合大小 / 數量上限
+
+    使用時間以文件 mtime 表示 (每次緩存命中時刷新)。
+
+    Args:
+        directory: 緩存目錄
+        pattern: 緩存文件的 glob 模式
+        max_bytes: 總大小上限 (None = 不限)
+        max_entries: 文件數上限 (None = 不限)
+
+    Returns:
+        int: 刪除的文件數
+    """
+    log = logger_instance or logger
+    entries = []
+    for path in Path(directory).glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort(key=lambda e: e[0], reverse=True)
+
+    kept_bytes = 0
+    removed = 0
+    for index, (_, size, path) in enumerate(entries):
+        over_count = max_entries is not None and index >= max_entries
+        over_size = max_bytes is not None and kept_bytes + size > max_bytes and index > 0
+        if over_count or over_size:
+            try:
+                path.unlink()
+                removed += 1
+                log.info(f"🗑️ 緩存淘汰 (LRU): {path.name} ({size / 1024 / 1024:.1f} MB)")
+            except FileNotFoundError:
+                pass
+        else:
+            kept_bytes += size
+    return removed
+
+
+# ==================== 緩存 ====================
+
+class StageResultCache:
+    """
+    階段 ProcessingResult 的內容定址磁碟緩存
+
+    內容佈局 (HDF5 交接格式):
+        {'format_version', 'stage', 'status', 'data', 'metadata',
+         'errors', 'warnings', 'processor_state'}
+    """
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_bytes: Optional[int] = int(DEFAULT_MAX_GB * 1024 ** 3),
+                 max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+                 logger_instance: Optional[logging.Logger] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.logger = logger_instance or logger
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None,
+                    logger_instance: Optional[logging.Logger] = None) -> Optional['StageResultCache']:
+        """
+        依階段配置 `stage_cache` 區段與環境變數建立緩存
+
+        預設關閉 (返回 None)；stage_cache.enabled: true 或 ORBIT_ENGINE_STAGE_CACHE=1 時啟用。
+        測試模式 (ORBIT_ENGINE_TEST_MODE) 只接受 ORBIT_ENGINE_STAGE_CACHE=1。
+        """
+        settings = (config or {}).get('stage_cache', {}) or {}
+        env = os.getenv(STAGE_CACHE_ENV)
+        if env is not None:
+            enabled = env == '1'
+        elif os.getenv('ORBIT_ENGINE_TEST_MODE'):
+            enabled = False
+        else:
+            enabled = bool(settings.get('enabled', False))
+        if not enabled or not HDF5_AVAILABLE:
+            return None
+
+        max_gb = float(os.getenv(STAGE_CACHE_MAX_GB_ENV, settings.get('max_size_gb', DEFAULT_MAX_GB)))
+        return cls(
+            cache_dir=os.getenv(STAGE_CACHE_DIR_ENV, settings.get('cache_dir', DEFAULT_CACHE_DIR)),
+            max_bytes=int(max_gb * 1024 ** 3),
+            max_entries=settings.get('max_entries', DEFAULT_MAX_ENTRIES),
+            logger_instance=logger_instance
+        )
+
+    # ==================== 緩存鍵 ====================
+
+    @staticmethod
+    def make_key(stage_number: int, input_fingerprint: str, config: Optional[Dict[str, Any]],
+                 code_version: str) -> str:
+        """緩存鍵 = SHA-256(階段, 輸入指紋, 配置, 程式碼版本)"""
+        parts = {
+            'format_version': CACHE_FORMAT_VERSION,
+            'stage': stage_number,
+            'input': input_fingerprint,
+            'config': config_fingerprint(config),
+            'code': code_version
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path_for(self, stage_number: int, key: str) -> Path:
+        return self.cache_dir / f"stage{stage_number}_{key[:32]}{CACHE_SUFFIX}"
+
+    # ==================== 讀取 / 保存 ====================
+
+    def load(self, stage_number: int, key: str) -> Optional[Dict[str, Any]]:
+        """
+        讀取緩存內容 (未命中或文件無法讀取時返回 None)
+
+        命中時刷新文件 mtime，使 LRU 淘汰保留此條目。
+        """
+        path = self.path_for(stage_number, key)
+        if not path.exists():
+            return None
+        try:
+            payload = load_stage_handoff(path)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 緩存文件無法讀取，忽略並刪除: {path.name} ({e})")
+            path.unlink(missing_ok=True)
+            return None
+        if payload.get('format_version') != CACHE_FORMAT_VERSION:
+            return None
+        os.utime(path)
+        return payload
+
+    def store(self, stage_number: int, key: str, payload: Dict[str, Any]) -> Path:
+        """
+        保存緩存內容 (BackgroundResultWriter 啟用時於背景寫入)
+
+        Returns:
+            Path: 預定的緩存文件路徑
+        """
+        path = self.path_for(stage_number, key)
+        payload = {'format_version': CACHE_FORMAT_VERSION, **payload}
+        run_or_submit(path.name, self._write, payload, path)
+        return path
+
+    def _write(self, payload: Dict[str, Any], path: Path) -> None:
+        save_stage_handoff(payload, path)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        self.logger.info(f"💾 階段結果已緩存: {path.name} ({size_mb:.1f} MB)")
+        self.evict()
+
+    def evict(self) -> int:
+        """套用 LRU 大小 / 數量上限"""
+        return evict_lru(self.cache_dir, f"*{CACHE_SUFFIX}", self.max_bytes, self.max_entries, self.logger)
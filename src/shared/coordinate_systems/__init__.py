@@ -5,16 +5,24 @@
 - IERS 數據管理器
 - WGS84 參數管理器
 - Skyfield 座標轉換引擎
+- 共享記憶體座標轉換進程池
+- 框架旋轉矩陣快取
 
 嚴格遵循 CRITICAL DEVELOPMENT PRINCIPLE
 """
 
 from .iers_data_manager import get_iers_manager, IERSDataManager, EOPData
 from .wgs84_manager import get_wgs84_manager, WGS84Manager, WGS84Parameters
-from .skyfield_coordinate_engine import get_coordinate_engine, SkyfieldCoordinateEngine, CoordinateTransformResult
+from .skyfield_coordinate_engine import (
+    get_coordinate_engine, SkyfieldCoordinateEngine, CoordinateTransformResult, BatchCoordinateTransformResult
+)
+from .frame_rotation_cache import FrameRotationCache
+from .shared_memory_pool import get_transform_pool, shutdown_transform_pool, SharedMemoryTransformPool
 
 __all__ = [
     'get_iers_manager', 'IERSDataManager', 'EOPData',
     'get_wgs84_manager', 'WGS84Manager', 'WGS84Parameters',
-    'get_coordinate_engine', 'SkyfieldCoordinateEngine', 'CoordinateTransformResult'
+    'get_coordinate_engine', 'SkyfieldCoordinateEngine', 'CoordinateTransformResult',
+    'BatchCoordinateTransformResult', 'FrameRotationCache',
+    'get_transform_pool', 'shutdown_transform_pool', 'SharedMemoryTransformPool'
 ]
\ No newline at end of file
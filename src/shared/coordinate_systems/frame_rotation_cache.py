@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+參考框架旋轉矩陣快取 - 每個唯一時刻只計算一次
+
+嚴格遵循 CRITICAL DEVELOPMENT PRINCIPLE:
+✅ 旋轉矩陣由 Skyfield 官方 frame.rotation_at() 計算 (IAU 2000/2006 + IERS)
+✅ 不做任何內插或近似 - 相同 UTC 時刻的矩陣完全相同
+✅ 多顆衛星共享同一時間網格時，框架計算由 O(N_sat × N_t) 降為 O(N_t)
+
+Stage 2 所有衛星使用 UnifiedTimeWindowManager 的統一時間網格，
+因此同一時刻的歲差/章動/GMST/極移旋轉可由所有衛星共用。
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 每個矩陣 72 bytes，200k 個時刻約 14 MB
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+class FrameRotationCache:
+    """
+    以 UTC 時刻為鍵的 3×3 框架旋轉矩陣快取 (LRU)
+
+    rotation_matrices() 回傳 Skyfield 慣例的 (3, 3, T) 陣列，
+    可直接以 einsum('ijt,...tj->...ti') 套用到 (..., T, 3) 位置陣列。
+    """
+
+    def __init__(self, timescale, frame, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError(f"快取容量必須 >= 1，實際: {max_entries}")
+        self.ts = timescale
+        self.frame = frame
+        self.max_entries = max_entries
+        self._rotations: 'OrderedDict[datetime, np.ndarray]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rotations)
+
+    def rotation_matrices(self, datetimes_utc: Sequence[datetime]) -> np.ndarray:
+        """
+        取得每個時刻的旋轉矩陣
+
+        Args:
+            datetimes_utc: 長度 T 的 UTC datetime 序列 (可重複)
+
+        Returns:
+            np.ndarray: (3, 3, T) 旋轉矩陣
+        """
+        if len(datetimes_utc) == 0:
+            raise ValueError("時間序列不可為空")
+
+        unique_times = list(dict.fromkeys(datetimes_utc))
+        missing = [dt for dt in unique_times if dt not in self._rotations]
+        self.misses += len(missing)
+        self.hits += len(unique_times) - len(missing)
+
+        # 未快取的時刻以單一向量 Skyfield Time 一次計算
+        computed: Dict[datetime, np.ndarray] = {}
+        if missing:
+            rotation = self.frame.rotation_at(self.ts.from_datetimes(missing))
+            if rotation.ndim == 2:
+                rotation = rotation[:, :, np.newaxis]
+            stacked = np.ascontiguousarray(np.moveaxis(rotation, -1, 0))  # (M, 3, 3)
+            computed = dict(zip(missing, stacked))
+
+        matrices = {}
+        for dt in unique_times:
+            matrix = computed.get(dt)
+            if matrix is None:
+                matrix = self._rotations[dt]
+                self._rotations.move_to_end(dt)
+            matrices[dt] = matrix
+
+        for dt, matrix in computed.items():
+            self._rotations[dt] = matrix
+        while len(self._rotations) > self.max_entries:
+            self._rotations.popitem(last=False)
+
+        return np.stack([matrices[dt] for dt in datetimes_utc], axis=-1)
+
+    def clear(self):
+        self._rotations.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'cached_epochs': len(self._rotations),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -45,6 +45,134 @@ class EOPData:
     data_source: str  # 數據來源
 
 
+# 向量查詢回傳的參數欄位 (與 EOPData 欄位同名)
+EOP_VALUE_FIELDS = ('x_arcsec', 'y_arcsec', 'ut1_utc_sec', 'lod_ms', 'dx_arcsec', 'dy_arcsec')
+EOP_ERROR_FIELDS = ('x_error', 'y_error', 'ut1_utc_error')
+
+# 插值結果的誤差估計 (與單點插值相同)
+INTERPOLATED_ERRORS = {'x_error': 0.2, 'y_error': 0.2, 'ut1_utc_error': 0.1}
+
+# 查詢窗口 (天)
+BULLETIN_A_MAX_DAYS = 1.0
+INTERPOLATION_WINDOW_DAYS = 2.0
+
+
+@dataclass
+class EOPTable:
+    """
+    依 MJD 排序的 EOP 陣列表
+
+    由 _eop_cache 建立 (每個 0.1 天鍵一列)，查詢以 searchsorted 一次完成，
+    取代逐點線性掃描整個字典。
+    """
+    mjd: np.ndarray
+    keys: np.ndarray          # round(mjd, 1)，對應 _eop_cache 的 f"{mjd:.1f}" 鍵
+    values: Dict[str, np.ndarray]
+    data_source: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: List[EOPData]) -> 'EOPTable':
+        records = sorted(records, key=lambda eop: eop.mjd)
+        mjd = np.array([eop.mjd for eop in records], dtype=np.float64)
+        return cls(
+            mjd=mjd,
+            keys=_mjd_keys(mjd),
+            values={
+                field: np.array([getattr(eop, field) for eop in records], dtype=np.float64)
+                for field in EOP_VALUE_FIELDS + EOP_ERROR_FIELDS
+            },
+            data_source=np.array([eop.data_source for eop in records], dtype=object)
+        )
+
+    def __len__(self) -> int:
+        return len(self.mjd)
+
+    def lookup(self, mjds: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        向量化 EOP 查詢 (與單點查詢鏈相同的優先順序)
+
+        1. 精確匹配 (0.1 天鍵)
+        2. 1 天內最接近的 Bulletin A 記錄
+        3. ±2 天窗口內線性插值 (窗口內至少 2 筆；單側時取最近端點，同 np.interp)
+
+        Returns:
+            EOP_VALUE_FIELDS + EOP_ERROR_FIELDS 陣列，以及 'mjd'、'data_source'、
+            'available' (無數據的位置為 NaN / None / False)
+        """
+        mjds = np.atleast_1d(np.asarray(mjds, dtype=np.float64))
+        n = len(self.mjd)
+        result = {field: np.full(mjds.shape, np.nan) for field in EOP_VALUE_FIELDS + EOP_ERROR_FIELDS}
+        result['mjd'] = mjds.copy()
+        result['data_source'] = np.full(mjds.shape, None, dtype=object)
+        result['available'] = np.zeros(mjds.shape, dtype=bool)
+        if n == 0:
+            return result
+
+        def take(mask: np.ndarray, rows: np.ndarray) -> None:
+            for field, column in self.values.items():
+                result[field][mask] = column[rows]
+            result['mjd'][mask] = self.mjd[rows]
+            result['data_source'][mask] = self.data_source[rows]
+            result['available'] |= mask
+
+        # 1. 精確匹配
+        rounded = _mjd_keys(mjds)
+        exact_row = np.minimum(np.searchsorted(self.keys, rounded), n - 1)
+        exact = self.keys[exact_row] == rounded
+        take(exact, exact_row[exact])
+
+        # 2. Bulletin A (1 天內最接近)
+        bulletin_rows = np.flatnonzero(self.data_source == "IERS_BulletinA")
+        if len(bulletin_rows) and not result['available'].all():
+            bulletin_mjd = self.mjd[bulletin_rows]
+            position = np.searchsorted(bulletin_mjd, mjds)
+            right = np.minimum(position, len(bulletin_rows) - 1)
+            left = np.maximum(position - 1, 0)
+            use_right = np.abs(bulletin_mjd[right] - mjds) < np.abs(bulletin_mjd[left] - mjds)
+            nearest = np.where(use_right, right, left)
+            within = ~result['available'] & (np.abs(bulletin_mjd[nearest] - mjds) < BULLETIN_A_MAX_DAYS)
+            take(within, bulletin_rows[nearest[within]])
+
+        # 3. ±2 天窗口線性插值
+        pending = ~result['available']
+        if pending.any():
+            first = np.searchsorted(self.mjd, mjds - INTERPOLATION_WINDOW_DAYS, side='left')
+            last = np.searchsorted(self.mjd, mjds + INTERPOLATION_WINDOW_DAYS, side='right') - 1
+            usable = pending & (last - first + 1 >= 2)
+
+            # 插值區間 [lo, hi] 夾在窗口 [first, last] 內；目標在窗口資料之外時權重截斷為端點值
+            hi = np.clip(np.searchsorted(self.mjd, mjds, side='right'), first + 1, last)
+            hi = np.clip(hi, 0, n - 1)
+            lo = np.maximum(hi - 1, 0)
+            span = self.mjd[hi] - self.mjd[lo]
+            weight = np.clip(np.divide(mjds - self.mjd[lo], span, out=np.zeros(mjds.shape), where=span > 0), 0.0, 1.0)
+
+            for field in EOP_VALUE_FIELDS:
+                column = self.values[field]
+                interpolated = column[lo] + weight * (column[hi] - column[lo])
+                result[field][usable] = interpolated[usable]
+            for field, error in INTERPOLATED_ERRORS.items():
+                result[field][usable] = error
+            result['data_source'][usable] = "Interpolated"
+            result['available'] |= usable
+
+        return result
+
+
+def _mjd_keys(mjds: np.ndarray) -> np.ndarray:
+    """
+    MJD → 0.1 天鍵 (與 f"{mjd:.1f}" 相同)
+
+    np.round 先乘 10 再取整，在 x.x5 附近可能與字串格式化的捨入方向不同，
+    這些接近中點的值改以 f"{mjd:.1f}" 逐一計算。
+    """
+    keys = np.round(mjds, 1)
+    near_tie = np.abs(np.abs(mjds - keys) - 0.05) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        keys[i] = float(f"{mjds[i]:.1f}")
+    return keys
+
+
 class IERSDataManager:
     """
     IERS 官方數據管理器
@@ -82,6 +210,7 @@ class IERSDataManager:
 
         # 內存緩存
         self._eop_cache: Dict[str, EOPData] = {}
+        self._eop_table: Optional[EOPTable] = None  # 依 MJD 排序的陣列 (延遲建立)
         self._cache_timestamp = None
         self._cache_status_logged = False  # 防止重複記錄緩存狀態
 
@@ -137,16 +266,8 @@ class IERSDataManager:
             # 轉換為Modified Julian Date
             mjd = self._datetime_to_mjd(datetime_utc)
 
-            # 嘗試從快速服務獲取數據
-            eop_data = self._get_eop_from_rapid_service(mjd)
-
-            if eop_data is None:
-                # 回退到Bulletin A
-                eop_data = self._get_eop_from_bulletin_a(mjd)
-
-            if eop_data is None:
-                # 最後回退到本地緩存
-                eop_data = self._get_eop_from_cache(mjd)
+            # 精確匹配 → Bulletin A → 插值 (單次陣列查詢)
+            eop_data = self._lookup_eop(mjd)
 
             if eop_data is None:
                 raise ValueError(f"無法獲取 {datetime_utc.isoformat()} 的地球定向參數")
@@ -160,6 +281,24 @@ class IERSDataManager:
             self.logger.error(f"獲取地球定向參數失敗: {e}")
             raise ValueError(f"EOP數據獲取錯誤: {str(e)}")
 
+    def get_eop_arrays(self, mjds) -> Dict[str, np.ndarray]:
+        """
+        批次獲取地球定向參數 (向量化)
+
+        與 get_earth_orientation_parameters() 相同的查詢鏈，但整個 MJD 陣列
+        只做一次 searchsorted，適合時間序列轉換。
+
+        Args:
+            mjds: Modified Julian Date 陣列
+
+        Returns:
+            x_arcsec / y_arcsec / ut1_utc_sec / lod_ms / dx_arcsec / dy_arcsec 與
+            x_error / y_error / ut1_utc_error 陣列，另含 'mjd'、'data_source'、
+            'available' (無可用數據的位置為 NaN，由呼叫者決定如何處理)
+        """
+        self._ensure_fresh_data()
+        return self._get_eop_table().lookup(mjds)
+
     def get_polar_motion_matrix(self, datetime_utc: datetime) -> np.ndarray:
         """
         獲取極移轉換矩陣 (真實IAU標準)
@@ -335,6 +474,7 @@ class IERSDataManager:
                 except (ValueError, IndexError) as e:
                     continue  # 跳過無效行
 
+            self._eop_table = None
             self.logger.debug(f"✅ 解析 Finals2000A: {parsed_count} 條記錄")
 
         except Exception as e:
@@ -375,91 +515,28 @@ class IERSDataManager:
                 except (ValueError, KeyError):
                     continue
 
+            self._eop_table = None
             self.logger.info(f"✅ 解析 Bulletin A: {parsed_count} 條記錄")
 
         except Exception as e:
             self.logger.error(f"Bulletin A解析失敗: {e}")
 
-    def _get_eop_from_rapid_service(self, mjd: float) -> Optional[EOPData]:
-        """從快速服務獲取EOP數據"""
-        mjd_key = f"{mjd:.1f}"
-        return self._eop_cache.get(mjd_key)
-
-    def _get_eop_from_bulletin_a(self, mjd: float) -> Optional[EOPData]:
-        """從Bulletin A獲取EOP數據"""
-        # 查找最接近的MJD
-        closest_mjd = None
-        min_diff = float('inf')
-
-        for cached_mjd_str, eop_data in self._eop_cache.items():
-            if eop_data.data_source == "IERS_BulletinA":
-                diff = abs(eop_data.mjd - mjd)
-                if diff < min_diff:
-                    min_diff = diff
-                    closest_mjd = cached_mjd_str
-
-        if closest_mjd and min_diff < 1.0:  # 1天內的數據
-            return self._eop_cache[closest_mjd]
-
-        return None
-
-    def _get_eop_from_cache(self, mjd: float) -> Optional[EOPData]:
-        """從本地緩存獲取EOP數據 (插值)"""
-        try:
-            # 查找周圍的數據點進行插值
-            mjd_values = []
-            eop_values = []
-
-            for cached_mjd_str, eop_data in self._eop_cache.items():
-                cached_mjd = eop_data.mjd
-                if abs(cached_mjd - mjd) <= 2.0:  # 2天範圍內
-                    mjd_values.append(cached_mjd)
-                    eop_values.append(eop_data)
-
-            if len(mjd_values) >= 2:
-                # 線性插值
-                return self._interpolate_eop(mjd, mjd_values, eop_values)
-
-            return None
+    def _get_eop_table(self) -> EOPTable:
+        """依 MJD 排序的 EOP 陣列表 (_eop_cache 變更後重建)"""
+        if self._eop_table is None:
+            self._eop_table = EOPTable.from_records(list(self._eop_cache.values()))
+        return self._eop_table
 
-        except Exception as e:
-            self.logger.error(f"緩存EOP數據獲取失敗: {e}")
+    def _lookup_eop(self, mjd: float) -> Optional[EOPData]:
+        """單點查詢 (EOPTable.lookup 的一元素版本)"""
+        row = self._get_eop_table().lookup(np.array([mjd]))
+        if not row['available'][0]:
             return None
-
-    def _interpolate_eop(self, target_mjd: float, mjd_values: List[float],
-                        eop_values: List[EOPData]) -> EOPData:
-        """線性插值計算EOP參數"""
-        try:
-            # 排序數據點
-            sorted_pairs = sorted(zip(mjd_values, eop_values))
-            mjds = [pair[0] for pair in sorted_pairs]
-            eops = [pair[1] for pair in sorted_pairs]
-
-            # 線性插值
-            x_interp = np.interp(target_mjd, mjds, [eop.x_arcsec for eop in eops])
-            y_interp = np.interp(target_mjd, mjds, [eop.y_arcsec for eop in eops])
-            ut1_utc_interp = np.interp(target_mjd, mjds, [eop.ut1_utc_sec for eop in eops])
-            lod_interp = np.interp(target_mjd, mjds, [eop.lod_ms for eop in eops])
-            dx_interp = np.interp(target_mjd, mjds, [eop.dx_arcsec for eop in eops])
-            dy_interp = np.interp(target_mjd, mjds, [eop.dy_arcsec for eop in eops])
-
-            return EOPData(
-                mjd=target_mjd,
-                x_arcsec=x_interp,
-                y_arcsec=y_interp,
-                ut1_utc_sec=ut1_utc_interp,
-                lod_ms=lod_interp,
-                dx_arcsec=dx_interp,
-                dy_arcsec=dy_interp,
-                x_error=0.2,  # 插值誤差估計
-                y_error=0.2,
-                ut1_utc_error=0.1,
-                data_source="Interpolated"
-            )
-
-        except Exception as e:
-            self.logger.error(f"EOP插值失敗: {e}")
-            raise
+        return EOPData(
+            mjd=float(row['mjd'][0]),
+            **{field: float(row[field][0]) for field in EOP_VALUE_FIELDS + EOP_ERROR_FIELDS},
+            data_source=row['data_source'][0]
+        )
 
     def _validate_eop_data(self, eop_data: EOPData, datetime_utc: datetime):
         """驗證EOP數據質量"""
@@ -489,18 +566,13 @@ class IERSDataManager:
             current_mjd = self._datetime_to_mjd(now)
 
             # 檢查最新數據
-            latest_mjd = max(eop.mjd for eop in self._eop_cache.values())
+            mjds = self._get_eop_table().mjd
+            latest_mjd = mjds[-1]
             self.data_quality['data_latency_hours'] = (current_mjd - latest_mjd) * 24
             self.data_quality['last_update'] = now.isoformat()
 
-            # 檢查數據連續性
-            mjds = sorted([eop.mjd for eop in self._eop_cache.values()])
-            missing_count = 0
-            for i in range(1, len(mjds)):
-                if mjds[i] - mjds[i-1] > 1.5:  # 超過1.5天的間隔
-                    missing_count += 1
-
-            self.data_quality['missing_days'] = missing_count
+            # 檢查數據連續性 (超過1.5天的間隔)
+            self.data_quality['missing_days'] = int(np.count_nonzero(np.diff(mjds) > 1.5))
 
             # 評估插值質量
             if self.data_quality['data_latency_hours'] < 24:
@@ -544,15 +616,21 @@ class IERSDataManager:
 
         return mjd
 
+    @classmethod
+    def datetimes_to_mjd(cls, datetimes_utc) -> np.ndarray:
+        """datetime 序列 → MJD 陣列 (供 get_eop_arrays 使用)"""
+        return np.array([cls._datetime_to_mjd(dt) for dt in datetimes_utc], dtype=np.float64)
+
     def get_data_quality_report(self) -> Dict[str, Any]:
         """獲取數據質量報告"""
+        table = self._get_eop_table()
         return {
             'data_quality': self.data_quality.copy(),
-            'cache_size': len(self._eop_cache),
-            'data_sources': list(set(eop.data_source for eop in self._eop_cache.values())),
+            'cache_size': len(table),
+            'data_sources': list(set(table.data_source.tolist())),
             'mjd_range': {
-                'min': min(eop.mjd for eop in self._eop_cache.values()) if self._eop_cache else None,
-                'max': max(eop.mjd for eop in self._eop_cache.values()) if self._eop_cache else None
+                'min': float(table.mjd[0]) if len(table) else None,
+                'max': float(table.mjd[-1]) if len(table) else None
             }
         }
 
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+共享記憶體座標轉換進程池
+
+嚴格遵循 CRITICAL DEVELOPMENT PRINCIPLE:
+✅ 每個工作進程僅初始化一次 SkyfieldCoordinateEngine (DE421 / IERS 只載入一次)
+✅ 輸入/輸出存放於 multiprocessing.shared_memory NumPy 陣列，不序列化逐點 dict
+✅ 工作進程僅接收索引範圍 (start, stop)
+✅ 轉換鏈與單進程完全相同 (convert_teme_to_wgs84_batch)
+
+數據佈局 (M = 座標點數):
+- 輸入: positions_km (M, 3), velocities_km_s (M, 3), epochs_us (M,) int64 UTC 微秒
+- 輸出: latitude_deg, longitude_deg, altitude_m, accuracy_m (M,), success (M,) bool
+"""
+
+import atexit
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+INPUT_FIELDS = {
+    'positions_km': ((3,), np.float64),
+    'velocities_km_s': ((3,), np.float64),
+    'epochs_us': ((), np.int64),
+}
+
+OUTPUT_FIELDS = {
+    'latitude_deg': ((), np.float64),
+    'longitude_deg': ((), np.float64),
+    'altitude_m': ((), np.float64),
+    'accuracy_m': ((), np.float64),
+    'success': ((), np.bool_),
+}
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """共享陣列描述 (可序列化，傳給工作進程用於重新附加)"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """multiprocessing.shared_memory 上的 NumPy 陣列"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: SharedArraySpec, owner: bool):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+        self.array = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], dtype) -> 'SharedArray':
+        dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(shape, dtype=np.int64)) * dtype.itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return cls(shm, SharedArraySpec(shm.name, tuple(shape), dtype.str), owner=True)
+
+    @classmethod
+    def attach(cls, spec: SharedArraySpec) -> 'SharedArray':
+        return cls(shared_memory.SharedMemory(name=spec.name), spec, owner=False)
+
+    def close(self):
+        # 先釋放 ndarray 對 buffer 的引用，否則 mmap 無法關閉
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def datetimes_to_epoch_us(datetimes) -> np.ndarray:
+    """UTC datetime 序列 → int64 Unix 微秒 (無精度損失)"""
+    return np.array(
+        [(dt - UNIX_EPOCH) // timedelta(microseconds=1) for dt in datetimes],
+        dtype=np.int64
+    )
+
+
+def epoch_us_to_datetimes(epochs_us: np.ndarray):
+    """int64 Unix 微秒 → UTC datetime 列表"""
+    return [UNIX_EPOCH + timedelta(microseconds=int(us)) for us in epochs_us]
+
+
+# ========== 工作進程 ==========
+
+_worker_engine = None
+
+
+def _initialize_worker():
+    """工作進程初始化 - 每個進程只建立一次座標轉換引擎"""
+    global _worker_engine
+    from .skyfield_coordinate_engine import SkyfieldCoordinateEngine
+    _worker_engine = SkyfieldCoordinateEngine()
+
+
+def _convert_shared_range(specs: Dict[str, SharedArraySpec], start: int, stop: int) -> Tuple[int, int, float]:
+    """
+    轉換共享陣列中 [start, stop) 範圍的座標點
+
+    Returns:
+        (start, stop, elapsed_ms)
+    """
+    chunk_start = time.time()
+    arrays = {field: SharedArray.attach(spec) for field, spec in specs.items()}
+    try:
+        positions = arrays['positions_km'].array[start:stop].copy()
+        velocities = arrays['velocities_km_s'].array[start:stop].copy()
+        times = epoch_us_to_datetimes(arrays['epochs_us'].array[start:stop])
+        # 輸入複製為本地陣列，確保 finally 中可安全關閉共享記憶體
+
+        try:
+            # 每個點擁有自己的時間 → 以點軸作為時間軸 (T = stop - start)
+            result = _worker_engine.convert_teme_to_wgs84_batch(positions, velocities, times)
+            arrays['latitude_deg'].array[start:stop] = result.latitude_deg
+            arrays['longitude_deg'].array[start:stop] = result.longitude_deg
+            arrays['altitude_m'].array[start:stop] = result.altitude_m
+            arrays['accuracy_m'].array[start:stop] = result.accuracy_estimate_m
+            arrays['success'].array[start:stop] = np.isfinite(result.latitude_deg)
+        except Exception:
+            # 向量轉換失敗時逐點重試，僅跳過真正失敗的點 (與序列路徑語義一致)
+            for offset, dt in enumerate(times):
+                index = start + offset
+                try:
+                    point = _worker_engine.convert_teme_to_wgs84(
+                        positions[offset].tolist(), velocities[offset].tolist(), dt
+                    )
+                    arrays['latitude_deg'].array[index] = point.latitude_deg
+                    arrays['longitude_deg'].array[index] = point.longitude_deg
+                    arrays['altitude_m'].array[index] = point.altitude_m
+                    arrays['accuracy_m'].array[index] = point.accuracy_estimate_m
+                    arrays['success'].array[index] = True
+                except Exception:
+                    arrays['success'].array[index] = False
+    finally:
+        for shared in arrays.values():
+            shared.close()
+
+    return start, stop, (time.time() - chunk_start) * 1000.0
+
+
+# ========== 主進程 ==========
+
+class SharedMemoryTransformPool:
+    """
+    常駐座標轉換進程池
+
+    進程池在第一次使用時建立並在整個 Python 進程生命週期內重用，
+    每個工作進程透過 initializer 建立一次 SkyfieldCoordinateEngine。
+    """
+
+    def __init__(self, max_workers: int):
+        if max_workers < 1:
+            raise ValueError(f"工作進程數必須 >= 1，實際: {max_workers}")
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self.logger.info(f"🚀 建立常駐座標轉換進程池: {self.max_workers} 個工作進程")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_initialize_worker
+            )
+        return self._executor
+
+    def convert(self, positions_km: np.ndarray, velocities_km_s: np.ndarray,
+                epochs_us: np.ndarray, chunk_size: int) -> Dict[str, np.ndarray]:
+        """
+        並行轉換 M 個座標點
+
+        Args:
+            positions_km: (M, 3) TEME 位置
+            velocities_km_s: (M, 3) TEME 速度
+            epochs_us: (M,) UTC Unix 微秒
+            chunk_size: 每個任務的點數
+
+        Returns:
+            Dict: latitude_deg / longitude_deg / altitude_m / accuracy_m / success (M,)
+                  以及 conversion_time_ms (M,) (所屬批次的平均每點耗時)
+        """
+        total_points = len(epochs_us)
+        shared = {}
+        try:
+            inputs = {
+                'positions_km': positions_km,
+                'velocities_km_s': velocities_km_s,
+                'epochs_us': epochs_us,
+            }
+            for field, (inner_shape, dtype) in INPUT_FIELDS.items():
+                shared[field] = SharedArray.create((total_points,) + inner_shape, dtype)
+                shared[field].array[...] = inputs[field]
+            for field, (inner_shape, dtype) in OUTPUT_FIELDS.items():
+                shared[field] = SharedArray.create((total_points,) + inner_shape, dtype)
+                shared[field].array[...] = False if dtype is np.bool_ else np.nan
+
+            specs = {field: array.spec for field, array in shared.items()}
+            conversion_time_ms = np.zeros(total_points)
+
+            executor = self._get_executor()
+            futures = {
+                executor.submit(_convert_shared_range, specs, start, min(start + chunk_size, total_points)): start
+                for start in range(0, total_points, chunk_size)
+            }
+
+            completed = 0
+            report_interval = max(1, len(futures) // 10)
+            for future in as_completed(futures):
+                try:
+                    start, stop, elapsed_ms = future.result()
+                    conversion_time_ms[start:stop] = elapsed_ms / max(stop - start, 1)
+                except BrokenProcessPool as e:
+                    # 工作進程異常終止 → 下次呼叫時重建進程池
+                    self._executor = None
+                    self.logger.error(f"批次 {futures[future]} 處理失敗 (進程池中斷): {e}")
+                except Exception as e:
+                    self.logger.error(f"批次 {futures[future]} 處理失敗: {e}")
+                completed += 1
+                if completed % report_interval == 0 or completed == len(futures):
+                    self.logger.info(f"🔄 多核轉換進度: 批次 {completed}/{len(futures)}")
+
+            outputs = {field: shared[field].array.copy() for field in OUTPUT_FIELDS}
+            outputs['conversion_time_ms'] = conversion_time_ms
+            return outputs
+
+        finally:
+            for array in shared.values():
+                array.close()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_transform_pool_instance: Optional[SharedMemoryTransformPool] = None
+
+
+def get_transform_pool(max_workers: int) -> SharedMemoryTransformPool:
+    """獲取常駐進程池實例 (工作進程數變更時重建)"""
+    global _transform_pool_instance
+    if _transform_pool_instance is None or _transform_pool_instance.max_workers != max_workers:
+        if _transform_pool_instance is not None:
+            _transform_pool_instance.shutdown()
+        _transform_pool_instance = SharedMemoryTransformPool(max_workers)
+    return _transform_pool_instance
+
+
+def shutdown_transform_pool():
+    """關閉常駐進程池"""
+    global _transform_pool_instance
+    if _transform_pool_instance is not None:
+        _transform_pool_instance.shutdown()
+        _transform_pool_instance = None
+
+
+atexit.register(shutdown_transform_pool)
@@ -18,7 +18,6 @@ from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Tuple, List
 from dataclasses import dataclass
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 import os
 
@@ -43,6 +42,8 @@ except ImportError as e:
 # 自定義模組
 from .iers_data_manager import get_iers_manager, EOPData
 from .wgs84_manager import get_wgs84_manager, WGS84Parameters
+from .shared_memory_pool import get_transform_pool, datetimes_to_epoch_us
+from .frame_rotation_cache import FrameRotationCache
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,17 @@ class CoordinateTransformResult:
     conversion_time_ms: float
 
 
+@dataclass
+class BatchCoordinateTransformResult:
+    """向量化座標轉換結果 (陣列形狀與輸入時間網格一致)"""
+    latitude_deg: np.ndarray
+    longitude_deg: np.ndarray
+    altitude_m: np.ndarray
+    transformation_metadata: Dict[str, Any]
+    accuracy_estimate_m: np.ndarray
+    conversion_time_ms: float
+
+
 class SkyfieldCoordinateEngine:
     """
     Skyfield 真實座標轉換引擎
@@ -79,6 +91,9 @@ class SkyfieldCoordinateEngine:
         # 初始化 Skyfield 組件
         self._initialize_skyfield()
 
+        # 每個唯一時刻的 GCRS → ITRS 旋轉矩陣只計算一次 (所有衛星共享)
+        self.rotation_cache = FrameRotationCache(self.ts, self.itrs_frame)
+
         # 集成真實數據管理器
         self.iers_manager = get_iers_manager()
         self.wgs84_manager = get_wgs84_manager()
@@ -263,36 +278,142 @@ class SkyfieldCoordinateEngine:
             self.logger.error(f"❌ TEME→WGS84 轉換失敗: {e}")
             raise ValueError(f"座標轉換錯誤: {str(e)}")
 
-    def _create_precise_time(self, datetime_utc: datetime):
+    def convert_teme_to_wgs84_batch(self, positions_teme_km: np.ndarray,
+                                    velocities_teme_km_s: np.ndarray,
+                                    times) -> BatchCoordinateTransformResult:
         """
-        創建高精度 Skyfield 時間對象
+        向量化 TEME → WGS84 轉換 (完整 IAU 標準鏈，單次 NumPy 運算)
 
-        ✅ Fail-Fast 策略：Skyfield 時間對象創建必須成功
-        ✅ IERS 數據僅用於日誌記錄，Skyfield 內部有內置 IERS 數據
+        與 convert_teme_to_wgs84() 使用相同轉換鏈，但整個時間軸只建立一個
+        向量 Skyfield Time，地球定向旋轉矩陣 (IAU 2000/2006 歲差章動 + 真實
+        IERS 極移/UT1) 每個唯一時刻只計算一次 (FrameRotationCache)，
+        再以 einsum 套用到所有衛星。
+
+        轉換鏈: TEME → GCRS → ITRS → WGS84
+
+        Args:
+            positions_teme_km: TEME 位置陣列 (..., T, 3) (km)，例如 (N衛星, T, 3)
+            velocities_teme_km_s: TEME 速度陣列，形狀同 positions_teme_km (km/s)
+            times: 長度 T 的 UTC datetime 序列，或向量 Skyfield Time
+
+        Returns:
+            BatchCoordinateTransformResult: 形狀 (..., T) 的緯度/經度/高度/精度陣列
+
+        Raises:
+            ValueError: 輸入形狀不符或轉換失敗
         """
-        # 使用 Skyfield 的高精度時間處理
-        # 自動處理閏秒和時間標準轉換
-        # Skyfield 內部已包含 IERS 數據，這個調用不會因 IERS 問題失敗
-        skyfield_time = self.ts.from_datetime(datetime_utc)
+        start_time = time.time()
+
+        positions = np.asarray(positions_teme_km, dtype=np.float64)
+        velocities = np.asarray(velocities_teme_km_s, dtype=np.float64)
+
+        # ✅ Fail-Fast: 形狀檢查
+        if positions.ndim < 2 or positions.shape[-1] != 3:
+            raise ValueError(f"TEME 位置陣列形狀必須為 (..., T, 3)，實際: {positions.shape}")
+        if velocities.shape != positions.shape:
+            raise ValueError(
+                f"TEME 速度陣列形狀 {velocities.shape} 與位置陣列 {positions.shape} 不一致"
+            )
+
+        n_points = int(np.isfinite(positions).all(axis=-1).sum())
 
-        # 嘗試獲取真實的地球定向參數用於日誌記錄
-        # 這是非關鍵操作，僅用於提供額外的調試信息
         try:
-            eop_data = self.iers_manager.get_earth_orientation_parameters(datetime_utc)
+            self.conversion_stats['total_conversions'] += n_points
 
-            # 記錄 UT1-UTC 修正值（僅用於調試）
-            if abs(eop_data.ut1_utc_sec) < 1.0:  # 合理範圍檢查
-                self.logger.debug(
-                    f"IERS EOP 數據: UT1-UTC={eop_data.ut1_utc_sec:.6f}s, "
-                    f"極移 X={eop_data.x_arcsec:.6f}\", Y={eop_data.y_arcsec:.6f}\""
+            # 1. 時間軸 (datetime 序列，或已建立的向量 Skyfield Time)
+            if hasattr(times, 'tt'):
+                skyfield_time = times
+                datetimes_utc = list(np.atleast_1d(skyfield_time.utc_datetime()))
+            else:
+                skyfield_time = None
+                datetimes_utc = list(times)
+                if not datetimes_utc:
+                    raise ValueError("時間序列不可為空")
+
+            n_times = len(datetimes_utc)
+            if positions.shape[-2] != n_times:
+                raise ValueError(
+                    f"時間點數量 {n_times} 與位置陣列時間軸 {positions.shape[-2]} 不一致"
                 )
+
+            # 2. GCRS → ITRS 旋轉矩陣 (3, 3, T)
+            if skyfield_time is None:
+                # 每個唯一 UTC 時刻只計算一次，跨呼叫重用
+                rotation = self.rotation_cache.rotation_matrices(datetimes_utc)
+            else:
+                rotation = self.itrs_frame.rotation_at(skyfield_time)
+                if rotation.ndim == 2:
+                    rotation = rotation[:, :, np.newaxis]
+
+            # 3. 套用旋轉: r_itrs[..., t, :] = R[:, :, t] @ r[..., t, :]
+            itrs_km = np.einsum('ijt,...tj->...ti', rotation, positions)
+
+            # 4. ITRS → WGS84 (向量化 Bowring 疊代)
+            latitude_deg, longitude_deg, altitude_m = self.wgs84_manager.convert_cartesian_to_geodetic_batch(
+                itrs_km[..., 0] * 1000.0,  # km → m
+                itrs_km[..., 1] * 1000.0,
+                itrs_km[..., 2] * 1000.0,
+                version="latest"
+            )
+
+            # 5. 精度估計 (僅與時間相關，每個唯一時間點計算一次後廣播)
+            unique_times = list(dict.fromkeys(datetimes_utc))
+            accuracy_by_time = dict(zip(unique_times, self._estimate_conversion_accuracy_batch(unique_times)))
+            accuracy_per_time = np.array([accuracy_by_time[dt] for dt in datetimes_utc])
+            accuracy_estimate_m = np.broadcast_to(accuracy_per_time, latitude_deg.shape).copy()
+
+            processing_time_ms = (time.time() - start_time) * 1000.0
+
+            result = BatchCoordinateTransformResult(
+                latitude_deg=latitude_deg,
+                longitude_deg=longitude_deg,
+                altitude_m=altitude_m,
+                transformation_metadata={
+                    'conversion_chain': ['TEME', 'ICRS', 'ITRS', 'WGS84'],
+                    'iau_standard': 'IAU_2000_2006',
+                    'skyfield_version': getattr(__import__('skyfield'), '__version__', 'unknown'),
+                    'ephemeris': 'JPL_DE421',
+                    'iers_data_used': True,
+                    'wgs84_version': 'WGS84_G1150_2004',
+                    'coordinate_epoch_start': datetimes_utc[0].isoformat(),
+                    'coordinate_epoch_end': datetimes_utc[-1].isoformat(),
+                    'accuracy_class': 'Professional_Grade_A',
+                    'vectorized': True,
+                    'points_converted': n_points
+                },
+                accuracy_estimate_m=accuracy_estimate_m,
+                conversion_time_ms=processing_time_ms
+            )
+
+            # 更新統計 (與逐點轉換等效的加權平均)
+            previous_success = self.conversion_stats['successful_conversions']
+            self.conversion_stats['successful_conversions'] += n_points
+            self.conversion_stats['total_processing_time_ms'] += processing_time_ms
+            if n_points > 0:
+                total_success = self.conversion_stats['successful_conversions']
+                self.conversion_stats['average_accuracy_m'] = (
+                    self.conversion_stats['average_accuracy_m'] * previous_success
+                    + float(np.sum(accuracy_estimate_m))
+                ) / total_success
+
+            return result
+
         except Exception as e:
-            # ⚠️ IERS 數據獲取失敗僅影響日誌記錄
-            # Skyfield 內部仍會使用內置的 IERS 數據模型
-            self.logger.debug(f"無法獲取 IERS EOP 數據用於日誌: {e}")
-            self.logger.debug("Skyfield 將使用內置 IERS 數據模型")
+            self.conversion_stats['failed_conversions'] += n_points
+            self.logger.error(f"❌ TEME→WGS84 批次轉換失敗: {e}")
+            raise ValueError(f"批次座標轉換錯誤: {str(e)}")
 
-        return skyfield_time
+    def _create_precise_time(self, datetime_utc: datetime):
+        """
+        創建高精度 Skyfield 時間對象
+
+        ✅ Fail-Fast 策略：Skyfield 時間對象創建必須成功
+        ✅ 不在此逐點查詢 IERS EOP (Skyfield 內部已包含 IERS 數據)；
+           精度估計以 IERSDataManager.get_eop_arrays() 批次取得 EOP
+        """
+        # 使用 Skyfield 的高精度時間處理
+        # 自動處理閏秒和時間標準轉換
+        return self.ts.from_datetime(datetime_utc)
 
     def _convert_teme_to_icrs(self, position_km: List[float],
                             velocity_km_s: List[float],
@@ -340,23 +461,13 @@ class SkyfieldCoordinateEngine:
         try:
             from skyfield.positionlib import build_position
 
-            # 獲取真實的地球定向參數
-            eop_data = self.iers_manager.get_earth_orientation_parameters(
-                skyfield_time.utc_datetime()
-            )
-
             # 使用 Skyfield 的 ITRS 轉換
-            # Skyfield 會自動應用極移和章動修正
+            # Skyfield 會自動應用極移和章動修正 (內置 IERS 數據)
             itrs_xyz, itrs_vel = icrs_position.frame_xyz_and_velocity(self.itrs_frame)
 
             # 重建 ITRS 位置對象
             itrs_position = build_position(itrs_xyz.au, itrs_vel.au_per_d, skyfield_time)
 
-            # 記錄使用的 IERS 參數
-            self.logger.debug(f"使用 IERS 數據: X={eop_data.x_arcsec:.6f}\", "
-                            f"Y={eop_data.y_arcsec:.6f}\", "
-                            f"UT1-UTC={eop_data.ut1_utc_sec:.6f}s")
-
             self.logger.debug("✅ ICRS → ITRS 轉換完成")
             return itrs_position
 
@@ -409,42 +520,51 @@ class SkyfieldCoordinateEngine:
 
     def _estimate_conversion_accuracy(self, datetime_utc: datetime) -> float:
         """基於真實參數計算轉換精度"""
+        return float(self._estimate_conversion_accuracy_batch([datetime_utc])[0])
+
+    def _estimate_conversion_accuracy_batch(self, datetimes_utc: List[datetime]) -> np.ndarray:
+        """
+        基於真實參數計算轉換精度 (整個時間軸一次 EOP 陣列查詢)
+
+        Returns:
+            與 datetimes_utc 等長的精度估計陣列 (m)
+        """
         try:
             # 基於真實數據源質量計算精度，不使用硬編碼值
+            now = datetime.now(timezone.utc)
+            age_days = np.array([abs((now - dt).days) for dt in datetimes_utc], dtype=np.float64)
 
-            # 基於 IERS 數據質量計算精度
-            try:
-                eop_data = self.iers_manager.get_earth_orientation_parameters(datetime_utc)
+            # 基於 IERS 數據質量計算精度 (單次 searchsorted 查詢全部時刻)
+            mjds = self.iers_manager.datetimes_to_mjd(datetimes_utc)
+            eop = self.iers_manager.get_eop_arrays(mjds)
 
-                # 基於實際 IERS 誤差計算精度影響
-                # X, Y 極移誤差 (角秒) → 位置誤差 (米)
-                # ✅ 從 WGS84 參數計算角秒到米的轉換係數，禁止硬編碼
-                wgs84_params = self.wgs84_manager.get_wgs84_parameters()
-                R_earth_m = wgs84_params.semi_major_axis_m
-                # 1 角秒 = (π / (180 × 3600)) 弧度，弧長 = R × 弧度
-                arcsec_to_m = R_earth_m * (np.pi / (180.0 * 3600.0))  # ~30.88 m/arcsec
+            # 基於實際 IERS 誤差計算精度影響
+            # X, Y 極移誤差 (角秒) → 位置誤差 (米)
+            # ✅ 從 WGS84 參數計算角秒到米的轉換係數，禁止硬編碼
+            wgs84_params = self.wgs84_manager.get_wgs84_parameters()
+            R_earth_m = wgs84_params.semi_major_axis_m
+            # 1 角秒 = (π / (180 × 3600)) 弧度，弧長 = R × 弧度
+            arcsec_to_m = R_earth_m * (np.pi / (180.0 * 3600.0))  # ~30.88 m/arcsec
 
-                x_error_m = eop_data.x_error * arcsec_to_m
-                y_error_m = eop_data.y_error * arcsec_to_m
+            x_error_m = eop['x_error'] * arcsec_to_m
+            y_error_m = eop['y_error'] * arcsec_to_m
 
-                # UT1-UTC 誤差影響 - 基於地球自轉速度計算
-                # UT1-UTC 誤差 (秒) → 地表位置偏移 (米)
-                # 地球赤道自轉線速度 = 2πR / (86400 秒) ≈ 464 m/s
-                earth_rotation_speed_m_per_s = 2.0 * np.pi * R_earth_m / 86400.0  # ✅ 從 WGS84 計算
-                ut1_error_m = abs(eop_data.ut1_utc_error) * earth_rotation_speed_m_per_s
+            # UT1-UTC 誤差影響 - 基於地球自轉速度計算
+            # UT1-UTC 誤差 (秒) → 地表位置偏移 (米)
+            # 地球赤道自轉線速度 = 2πR / (86400 秒) ≈ 464 m/s
+            earth_rotation_speed_m_per_s = 2.0 * np.pi * R_earth_m / 86400.0  # ✅ 從 WGS84 計算
+            ut1_error_m = np.abs(eop['ut1_utc_error']) * earth_rotation_speed_m_per_s
 
-                # 組合 IERS 誤差
-                iers_accuracy_m = (x_error_m**2 + y_error_m**2 + ut1_error_m**2)**0.5
+            # 組合 IERS 誤差
+            iers_accuracy_m = np.sqrt(x_error_m**2 + y_error_m**2 + ut1_error_m**2)
 
-            except Exception as e:
+            missing = ~eop['available']
+            if missing.any():
                 # 無 IERS 數據時，基於 Skyfield 內部模型的保守估計
-                self.logger.warning(f"無法獲取 IERS 數據質量: {e}")
-                # 先計算年齡以用於誤差估計
-                now = datetime.now(timezone.utc)
-                age_days = abs((now - datetime_utc).days)
+                self.logger.warning(f"無法獲取 IERS 數據質量: {int(missing.sum())} 個時間點無 EOP 數據")
 
                 # 基於 Skyfield 內部 EOP 模型的典型誤差
-                iers_accuracy_m = 0.3 + age_days * 0.01
+                iers_accuracy_m[missing] = 0.3 + age_days[missing] * 0.01
                 # SOURCE: IERS Bulletin A Accuracy Specifications
                 # Base EOP accuracy without bulletin data: ±0.3m
                 # (IERS Technical Note No. 36, Section 3.2.1)
@@ -453,11 +573,6 @@ class SkyfieldCoordinateEngine:
                 # Reference: Luzum, B., & Petit, G. (2012). IERS Conventions (2010)
                 # IERS Technical Note No. 36, Chapter 5
 
-            # 基於數據年齡計算時間相關誤差
-            if 'age_days' not in locals():
-                now = datetime.now(timezone.utc)
-                age_days = abs((now - datetime_utc).days)
-
             # 星歷預測誤差隨時間增長
             prediction_error_m = age_days * 0.001
             # SOURCE: JPL DE421 Ephemeris Long-term Accuracy
@@ -477,7 +592,7 @@ class SkyfieldCoordinateEngine:
             # https://naif.jpl.nasa.gov/pub/naif/generic_kernels/spk/planets/de421.bsp
 
             # 組合所有誤差源
-            total_accuracy_m = (iers_accuracy_m**2 + prediction_error_m**2 + ephemeris_accuracy_m**2)**0.5
+            total_accuracy_m = np.sqrt(iers_accuracy_m**2 + prediction_error_m**2 + ephemeris_accuracy_m**2)
 
             # 考慮數據源質量評級
             data_quality = self.iers_manager.get_data_quality_report()
@@ -699,66 +814,59 @@ class SkyfieldCoordinateEngine:
         return results
 
     def _batch_convert_parallel(self, teme_data: List[Dict[str, Any]], max_workers: int) -> List[CoordinateTransformResult]:
-        """多核並行批次轉換 (v2.0 優化批次大小)"""
+        """
+        多核並行批次轉換 (v3.0 常駐進程池 + 共享記憶體)
+
+        - 工作進程只初始化一次引擎 (DE421 / IERS 不再每批次重新載入)
+        - 座標數據寫入 shared_memory 陣列，工作進程只接收索引範圍
+        """
         start_time = time.time()
         total_points = len(teme_data)
 
         # ✅ 優化：設定最小批次大小，避免過度切割
-        MIN_CHUNK_SIZE = 100  # 最小批次，平衡啟動開銷和並行度
+        MIN_CHUNK_SIZE = 100  # 最小批次，平衡調度開銷和並行度
         chunk_size = max(MIN_CHUNK_SIZE, total_points // (max_workers * 2))  # 減少批次數量
-        chunks = [teme_data[i:i + chunk_size] for i in range(0, total_points, chunk_size)]
+        num_chunks = (total_points + chunk_size - 1) // chunk_size
 
-        self.logger.info(f"📊 數據分割: {len(chunks)} 個批次, 每批次 ~{chunk_size} 點 "
+        self.logger.info(f"📊 數據分割: {num_chunks} 個批次, 每批次 ~{chunk_size} 點 "
                        f"(優化: 最小批次={MIN_CHUNK_SIZE})")
 
-        results = [None] * total_points  # 預分配結果列表
-        processed_count = 0
-
-        # 使用 ProcessPoolExecutor 進行多核處理
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有批次任務
-            future_to_chunk = {
-                executor.submit(_process_chunk_wrapper, chunk, i * chunk_size): (i, chunk)
-                for i, chunk in enumerate(chunks)
-            }
-
-            # 收集結果
-            completed_batches = 0
-            num_chunks = len(chunks)
-            report_interval = max(1, num_chunks // 10)  # 每完成 10% 批次報告一次
-
-            for future in as_completed(future_to_chunk):
-                chunk_idx, _ = future_to_chunk[future]
-                try:
-                    chunk_results, start_idx = future.result()
-
-                    # 將結果放回正確位置
-                    for j, result in enumerate(chunk_results):
-                        results[start_idx + j] = result
-
-                    processed_count += len(chunk_results)
-                    completed_batches += 1
-
-                    # 進度報告：每完成 10% 批次或最後一批才報告
-                    if completed_batches % report_interval == 0 or completed_batches == num_chunks:
-                        elapsed_time = time.time() - start_time
-                        rate = processed_count / elapsed_time
-                        progress_pct = (processed_count / total_points) * 100
-                        self.logger.info(
-                            f"🔄 多核轉換進度: 批次 {completed_batches}/{num_chunks}, "
-                            f"座標點 {processed_count}/{total_points} "
-                            f"({progress_pct:.1f}%, {rate:.0f} 點/秒)"
-                        )
-
-                except Exception as e:
-                    self.logger.error(f"批次 {chunk_idx} 處理失敗: {e}")
-
-        # 過濾 None 值（失敗的轉換）
-        results = [r for r in results if r is not None]
+        # 打包為連續陣列 (唯一一次逐點遍歷)
+        positions = np.array([point['position_teme_km'] for point in teme_data], dtype=np.float64)
+        velocities = np.array([point['velocity_teme_km_s'] for point in teme_data], dtype=np.float64)
+        datetimes_utc = [point['datetime_utc'] for point in teme_data]
+        epochs_us = datetimes_to_epoch_us(datetimes_utc)
+
+        pool = get_transform_pool(max_workers)
+        outputs = pool.convert(positions, velocities, epochs_us, chunk_size)
+
+        # 重建結果對象 (失敗的點被跳過，與序列路徑一致)
+        base_metadata = {
+            'conversion_chain': ['TEME', 'ICRS', 'ITRS', 'WGS84'],
+            'iau_standard': 'IAU_2000_2006',
+            'skyfield_version': getattr(__import__('skyfield'), '__version__', 'unknown'),
+            'ephemeris': 'JPL_DE421',
+            'iers_data_used': True,
+            'wgs84_version': 'WGS84_G1150_2004',
+            'accuracy_class': 'Professional_Grade_A'
+        }
+        results = []
+        for index in np.flatnonzero(outputs['success']).tolist():
+            results.append(CoordinateTransformResult(
+                latitude_deg=float(outputs['latitude_deg'][index]),
+                longitude_deg=float(outputs['longitude_deg'][index]),
+                altitude_m=float(outputs['altitude_m'][index]),
+                transformation_metadata={
+                    **base_metadata,
+                    'coordinate_epoch': datetimes_utc[index].isoformat()
+                },
+                accuracy_estimate_m=float(outputs['accuracy_m'][index]),
+                conversion_time_ms=float(outputs['conversion_time_ms'][index])
+            ))
 
         total_time = time.time() - start_time
         success_rate = len(results) / total_points * 100
-        avg_rate = len(results) / total_time
+        avg_rate = len(results) / max(total_time, 1e-9)
 
         self.logger.info(
             f"✅ 多核批次轉換完成: {len(results)}/{total_points} "
@@ -883,6 +991,7 @@ class SkyfieldCoordinateEngine:
                 'iers_manager_status': self.iers_manager.get_data_quality_report(),
                 'wgs84_manager_status': self.wgs84_manager.get_parameter_summary(),
                 'conversion_statistics': self.conversion_stats.copy(),
+                'rotation_cache_statistics': self.rotation_cache.get_statistics(),
                 'performance_metrics': {
                     'average_conversion_time_ms': (
                         self.conversion_stats['total_processing_time_ms'] /
@@ -905,38 +1014,6 @@ class SkyfieldCoordinateEngine:
             ) from e
 
 
-# ========== 多核處理支持函數 ==========
-
-def _process_chunk_wrapper(chunk: List[Dict[str, Any]], start_idx: int) -> Tuple[List, int]:
-    """
-    多核處理工作函數包裝器
-
-    這個函數必須在模組級別定義，以便 multiprocessing 可以序列化
-    """
-    try:
-        # 在子進程中創建新的引擎實例
-        engine = SkyfieldCoordinateEngine()
-        results = []
-
-        for data_point in chunk:
-            try:
-                result = engine.convert_teme_to_wgs84(
-                    data_point['position_teme_km'],
-                    data_point['velocity_teme_km_s'],
-                    data_point['datetime_utc']
-                )
-                results.append(result)
-            except Exception as e:
-                # 跳過失敗的點，繼續處理
-                results.append(None)
-
-        return results, start_idx
-
-    except Exception as e:
-        # 返回空結果，讓主進程處理錯誤
-        return [], start_idx
-
-
 # 全局單例
 _coordinate_engine_instance: Optional[SkyfieldCoordinateEngine] = None
 
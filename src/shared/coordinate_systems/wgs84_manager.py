@@ -366,6 +366,83 @@ class WGS84Manager:
             self.logger.error(f"座標轉換失敗: {e}")
             raise ValueError(f"Cartesian→Geodetic轉換錯誤: {str(e)}")
 
+    def convert_cartesian_to_geodetic_batch(self, x_m: np.ndarray, y_m: np.ndarray, z_m: np.ndarray,
+                                            version: str = "latest") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        向量化 Cartesian → Geodetic 座標轉換 (任意形狀陣列)
+
+        與 convert_cartesian_to_geodetic() 使用相同的 Bowring 初值與疊代公式，
+        疊代直到全部元素收斂 (最多 20 次)。
+
+        Args:
+            x_m, y_m, z_m: ITRS Cartesian座標陣列 (米)，形狀相同
+            version: WGS84版本
+
+        Returns:
+            (latitude_deg, longitude_deg, height_m): 與輸入同形狀的陣列
+        """
+        try:
+            wgs84 = self.get_wgs84_parameters(version)
+            a = wgs84.semi_major_axis_m
+            b = wgs84.semi_minor_axis_m
+            e2 = wgs84.first_eccentricity_squared
+            ep2 = wgs84.second_eccentricity_squared
+
+            x_m = np.asarray(x_m, dtype=np.float64)
+            y_m = np.asarray(y_m, dtype=np.float64)
+            z_m = np.asarray(z_m, dtype=np.float64)
+
+            # 經度 (atan2 已在 [-180, 180] 範圍內)
+            longitude_deg = np.degrees(np.arctan2(y_m, x_m))
+
+            p = np.hypot(x_m, y_m)  # 極徑
+            polar = p < 1e-10
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Bowring方法初始估計
+                theta = np.arctan2(z_m * a, p * b)
+                sin_theta = np.sin(theta)
+                cos_theta = np.cos(theta)
+                numerator = z_m + ep2 * b * sin_theta**3
+                denominator = p - e2 * a * cos_theta**3
+                latitude_rad = np.where(
+                    np.abs(denominator) < 1e-10,
+                    np.arctan2(z_m, p),
+                    np.arctan2(numerator, denominator)
+                )
+
+                # 高精度疊代
+                max_iterations = 20
+                tolerance = 1e-15
+                for _ in range(max_iterations):
+                    sin_lat = np.sin(latitude_rad)
+                    cos_lat = np.cos(latitude_rad)
+                    N = a / np.sqrt(1.0 - e2 * sin_lat * sin_lat)
+                    height_m = np.where(np.abs(cos_lat) > 1e-10, p / cos_lat - N, np.abs(z_m) - b)
+                    latitude_rad_new = np.arctan2(z_m, p * (1.0 - e2 * N / (N + height_m)))
+                    # NaN (無效點) 不阻擋收斂判斷
+                    converged = not np.any(np.abs(latitude_rad_new - latitude_rad) >= tolerance)
+                    latitude_rad = latitude_rad_new
+                    if converged:
+                        break
+
+            # 極地位置 (p ≈ 0): 緯度 = ±90°
+            if np.any(polar):
+                latitude_rad = np.where(polar, np.where(z_m >= 0, np.pi / 2, -np.pi / 2), latitude_rad)
+                height_m = np.where(polar, np.abs(z_m) - b, height_m)
+
+            latitude_deg = np.degrees(latitude_rad)
+
+            # 驗證結果合理性
+            if np.any(np.abs(latitude_deg) > 90.0):
+                raise ValueError(f"緯度超出有效範圍: {latitude_deg[np.abs(latitude_deg) > 90.0][:5]}")
+
+            return latitude_deg, longitude_deg, height_m
+
+        except Exception as e:
+            self.logger.error(f"批次座標轉換失敗: {e}")
+            raise ValueError(f"Cartesian→Geodetic批次轉換錯誤: {str(e)}")
+
     def _bowring_method(self, p: float, z: float, wgs84: WGS84Parameters) -> Tuple[float, float]:
         """
         Bowring方法進行高精度緯度/高度計算
@@ -0,0 +1,13 @@
+"""
+共用數據結構模組
+
+包含：
+- OrbitalStateBlock: 列式軌道狀態容器 (Stage 2 → 3 → 4 傳遞)
+
+⚠️ 各階段一律以 `src.shared.data_structures` 導入，
+確保同進程內只有一個 OrbitalStateBlock 類別 (isinstance 判斷才有效)。
+"""
+
+from .orbital_state_block import OrbitalStateBlock
+
+__all__ = ['OrbitalStateBlock']
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+軌道狀態列式容器 - OrbitalStateBlock
+
+以 NumPy 陣列承載整批衛星的軌道狀態，取代逐點 TEMEPosition / dict：
+✅ positions / velocities: (N_sat, N_t, 3) float64
+✅ 共用時間軸: 單一起點 + 固定間隔 (unified_window 模式)
+✅ epoch 偏移: 每顆衛星一個數值 (時間軸起點相對 TLE epoch 的分鐘數)
+✅ valid_mask: (N_sat, N_t)，處理不同星座點數差異 (190 vs 220) 與 SGP4 失敗點
+✅ Stage 3 可附加 WGS84 大地座標欄位，供 Stage 4 直接讀取
+
+舊版 JSON 格式 (orbital_states / time_series 列表) 僅在輸出時由
+to_orbital_states() / to_geodetic_time_series() 產生。
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_utc(timestamp: str) -> datetime:
+    """解析 ISO 8601 時間戳 (無時區視為 UTC)"""
+    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@dataclass
+class OrbitalStateBlock:
+    """
+    整批衛星軌道狀態 (列式存儲)
+
+    第 i 列對應 satellite_ids[i]；第 j 欄對應時間
+    time_start_utc + j * interval_seconds。
+    """
+    satellite_ids: List[str]
+    constellations: List[str]
+    epoch_datetimes: List[str]
+    time_start_utc: datetime
+    interval_seconds: float
+    positions_km: np.ndarray          # (N, T, 3)
+    velocities_km_s: np.ndarray       # (N, T, 3)
+    epoch_offsets_minutes: np.ndarray  # (N,) 時間軸起點 - epoch (分鐘)
+    valid_mask: np.ndarray            # (N, T) bool
+    coordinate_system: str = 'TEME'
+    algorithm_used: str = 'SGP4'
+
+    # Stage 3 附加的 WGS84 大地座標 (N, T)
+    latitude_deg: Optional[np.ndarray] = None
+    longitude_deg: Optional[np.ndarray] = None
+    altitude_m: Optional[np.ndarray] = None
+
+    _index: Dict[str, int] = field(default=None, init=False, repr=False, compare=False)
+    _timestamps: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # ✅ Fail-Fast: 形狀必須一致
+        n_sat = len(self.satellite_ids)
+        if len(self.constellations) != n_sat or len(self.epoch_datetimes) != n_sat:
+            raise ValueError(
+                f"OrbitalStateBlock 欄位長度不一致: satellite_ids={n_sat}, "
+                f"constellations={len(self.constellations)}, epoch_datetimes={len(self.epoch_datetimes)}"
+            )
+        if self.positions_km.ndim != 3 or self.positions_km.shape[0] != n_sat or self.positions_km.shape[2] != 3:
+            raise ValueError(f"positions_km 形狀錯誤: {self.positions_km.shape}，需為 ({n_sat}, T, 3)")
+        if self.velocities_km_s.shape != self.positions_km.shape:
+            raise ValueError(
+                f"velocities_km_s 形狀 {self.velocities_km_s.shape} 與 positions_km {self.positions_km.shape} 不符"
+            )
+        if self.valid_mask.shape != self.positions_km.shape[:2]:
+            raise ValueError(f"valid_mask 形狀 {self.valid_mask.shape} 需為 {self.positions_km.shape[:2]}")
+        if self.epoch_offsets_minutes.shape != (n_sat,):
+            raise ValueError(f"epoch_offsets_minutes 形狀 {self.epoch_offsets_minutes.shape} 需為 ({n_sat},)")
+        if self.interval_seconds <= 0:
+            raise ValueError(f"interval_seconds 必須為正數: {self.interval_seconds}")
+        for name in ('latitude_deg', 'longitude_deg', 'altitude_m'):
+            column = getattr(self, name)
+            if column is not None and column.shape != self.valid_mask.shape:
+                raise ValueError(f"{name} 形狀 {column.shape} 需為 {self.valid_mask.shape}")
+
+        if self.time_start_utc.tzinfo is None:
+            self.time_start_utc = self.time_start_utc.replace(tzinfo=timezone.utc)
+        self.valid_mask = self.valid_mask.astype(bool, copy=False)
+        self._index = {sat_id: i for i, sat_id in enumerate(self.satellite_ids)}
+
+    # ==================== 基本屬性 ====================
+
+    @property
+    def n_satellites(self) -> int:
+        return len(self.satellite_ids)
+
+    @property
+    def n_times(self) -> int:
+        return self.positions_km.shape[1]
+
+    @property
+    def has_geodetic(self) -> bool:
+        """是否已附加 Stage 3 WGS84 座標"""
+        return self.latitude_deg is not None
+
+    @property
+    def time_offsets_seconds(self) -> np.ndarray:
+        """時間軸相對起點的秒數 (T,)"""
+        return np.arange(self.n_times, dtype=np.float64) * self.interval_seconds
+
+    @property
+    def time_points(self) -> List[datetime]:
+        """時間軸 UTC datetime 列表"""
+        return [self.time_start_utc + timedelta(seconds=float(s)) for s in self.time_offsets_seconds]
+
+    @property
+    def timestamps(self) -> List[str]:
+        """時間軸 ISO 8601 字串 (整個區塊只產生一次)"""
+        if self._timestamps is None:
+            self._timestamps = [tp.isoformat() for tp in self.time_points]
+        return self._timestamps
+
+    @property
+    def point_counts(self) -> np.ndarray:
+        """每顆衛星的有效點數 (N,)"""
+        return self.valid_mask.sum(axis=1)
+
+    @property
+    def total_valid_points(self) -> int:
+        return int(self.valid_mask.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """陣列總記憶體 (bytes)"""
+        arrays = [self.positions_km, self.velocities_km_s, self.valid_mask, self.epoch_offsets_minutes,
+                  self.latitude_deg, self.longitude_deg, self.altitude_m]
+        return int(sum(a.nbytes for a in arrays if a is not None))
+
+    # ==================== 存取 ====================
+
+    def __contains__(self, satellite_id: str) -> bool:
+        return satellite_id in self._index
+
+    def index_of(self, satellite_id: str) -> int:
+        """衛星 ID → 列索引 (不存在時拋出 KeyError)"""
+        return self._index[satellite_id]
+
+    def valid_indices(self, row: int) -> np.ndarray:
+        """第 row 顆衛星的有效時間索引"""
+        return np.flatnonzero(self.valid_mask[row])
+
+    def time_since_epoch_minutes(self, row: int) -> np.ndarray:
+        """第 row 顆衛星各時間點相對 epoch 的分鐘數 (T,)"""
+        return self.epoch_offsets_minutes[row] + self.time_offsets_seconds / 60.0
+
+    def row_fingerprints(self) -> List[str]:
+        """
+        每顆衛星的內容雜湊 (增量處理的逐衛星輸入指紋)
+
+        涵蓋時間軸、epoch、星座與有效點的狀態數值 (含已附加的 WGS84 欄位)；
+        無效點的填充值不影響結果，因此同一衛星從記憶體或磁碟重建的區塊雜湊相同。
+        """
+        axis = f"{self.time_start_utc.isoformat()}|{float(self.interval_seconds)!r}".encode('utf-8')
+        columns = [self.positions_km, self.velocities_km_s,
+                   self.latitude_deg, self.longitude_deg, self.altitude_m]
+        fingerprints = []
+        for row in range(self.n_satellites):
+            indices = self.valid_indices(row)
+            hasher = hashlib.sha256(axis)
+            hasher.update(f"|{self.epoch_datetimes[row]}|{self.constellations[row]}|".encode('utf-8'))
+            hasher.update(indices.astype(np.int64).tobytes())
+            for column in columns:
+                if column is not None:
+                    hasher.update(np.ascontiguousarray(column[row, indices]).tobytes())
+            fingerprints.append(hasher.hexdigest())
+        return fingerprints
+
+    def select(self, rows: Sequence[int]) -> 'OrbitalStateBlock':
+        """依列索引取子集 (陣列為新副本)"""
+        rows = np.asarray(rows, dtype=np.intp)
+        pick = lambda a: a[rows] if a is not None else None
+        return replace(
+            self,
+            satellite_ids=[self.satellite_ids[i] for i in rows],
+            constellations=[self.constellations[i] for i in rows],
+            epoch_datetimes=[self.epoch_datetimes[i] for i in rows],
+            positions_km=self.positions_km[rows],
+            velocities_km_s=self.velocities_km_s[rows],
+            epoch_offsets_minutes=self.epoch_offsets_minutes[rows],
+            valid_mask=self.valid_mask[rows],
+            latitude_deg=pick(self.latitude_deg),
+            longitude_deg=pick(self.longitude_deg),
+            altitude_m=pick(self.altitude_m)
+        )
+
+    def with_geodetic(self, latitude_deg: np.ndarray, longitude_deg: np.ndarray,
+                      altitude_m: np.ndarray, valid_mask: Optional[np.ndarray] = None) -> 'OrbitalStateBlock':
+        """附加 WGS84 大地座標欄位 (共用 TEME 陣列，不複製)"""
+        block = replace(
+            self,
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            altitude_m=altitude_m,
+            valid_mask=self.valid_mask if valid_mask is None else valid_mask
+        )
+        block._timestamps = self._timestamps
+        return block
+
+    # ==================== 舊版格式輸出 ====================
+
+    def to_orbital_states(self, row: int) -> List[Dict[str, Any]]:
+        """Stage 2 JSON `orbital_states` 格式 (僅輸出時使用)"""
+        satellite_id = self.satellite_ids[row]
+        indices = self.valid_indices(row)
+        timestamps = self.timestamps
+        positions = self.positions_km[row, indices].tolist()
+        velocities = self.velocities_km_s[row, indices].tolist()
+        return [
+            {
+                'timestamp': timestamps[j],
+                'position_teme': positions[k],
+                'velocity_teme': velocities[k],
+                'satellite_id': satellite_id
+            }
+            for k, j in enumerate(indices.tolist())
+        ]
+
+    def to_geodetic_time_series(self, row: int) -> List[Dict[str, Any]]:
+        """Stage 3 JSON `time_series` 格式 (僅輸出時使用)"""
+        if not self.has_geodetic:
+            raise ValueError("OrbitalStateBlock 尚未附加 WGS84 座標 (需先經 Stage 3 轉換)")
+        indices = self.valid_indices(row)
+        timestamps = self.timestamps
+        latitudes = self.latitude_deg[row, indices].tolist()
+        longitudes = self.longitude_deg[row, indices].tolist()
+        altitudes = self.altitude_m[row, indices].tolist()
+        return [
+            {
+                'timestamp': timestamps[j],
+                'latitude_deg': latitudes[k],
+                'longitude_deg': longitudes[k],
+                'altitude_m': altitudes[k],
+                'altitude_km': altitudes[k] / 1000.0
+            }
+            for k, j in enumerate(indices.tolist())
+        ]
+
+    # ==================== 建構 ====================
+
+    @classmethod
+    def concatenate(cls, blocks: Iterable['OrbitalStateBlock']) -> 'OrbitalStateBlock':
+        """
+        合併多個區塊 (時間軸起點與間隔必須相同，點數不同時以 valid_mask 補齊)
+
+        Raises:
+            ValueError: 區塊為空或時間軸不相容
+        """
+        blocks = [b for b in blocks if b is not None]
+        if not blocks:
+            raise ValueError("無可合併的 OrbitalStateBlock")
+        if len(blocks) == 1:
+            return blocks[0]
+
+        first = blocks[0]
+        for block in blocks[1:]:
+            if block.time_start_utc != first.time_start_utc or block.interval_seconds != first.interval_seconds:
+                raise ValueError(
+                    f"時間軸不相容: {block.time_start_utc}/{block.interval_seconds}s vs "
+                    f"{first.time_start_utc}/{first.interval_seconds}s"
+                )
+            if block.has_geodetic != first.has_geodetic:
+                raise ValueError("部分區塊缺少 WGS84 座標欄位，無法合併")
+
+        n_times = max(b.n_times for b in blocks)
+
+        def stack(name: str, fill) -> Optional[np.ndarray]:
+            arrays = [getattr(b, name) for b in blocks]
+            if arrays[0] is None:
+                return None
+            padded = []
+            for a in arrays:
+                pad = n_times - a.shape[1]
+                if pad:
+                    widths = [(0, 0), (0, pad)] + [(0, 0)] * (a.ndim - 2)
+                    a = np.pad(a, widths, constant_values=fill)
+                padded.append(a)
+            return np.concatenate(padded, axis=0)
+
+        return cls(
+            satellite_ids=[s for b in blocks for s in b.satellite_ids],
+            constellations=[c for b in blocks for c in b.constellations],
+            epoch_datetimes=[e for b in blocks for e in b.epoch_datetimes],
+            time_start_utc=first.time_start_utc,
+            interval_seconds=first.interval_seconds,
+            positions_km=stack('positions_km', np.nan),
+            velocities_km_s=stack('velocities_km_s', np.nan),
+            epoch_offsets_minutes=np.concatenate([b.epoch_offsets_minutes for b in blocks]),
+            valid_mask=stack('valid_mask', False),
+            coordinate_system=first.coordinate_system,
+            algorithm_used=first.algorithm_used,
+            latitude_deg=stack('latitude_deg', np.nan),
+            longitude_deg=stack('longitude_deg', np.nan),
+            altitude_m=stack('altitude_m', np.nan)
+        )
+
+    @classmethod
+    def from_stage2_satellites(cls, satellites: Dict[str, Any],
+                               interval_seconds: Optional[float] = None) -> Optional['OrbitalStateBlock']:
+        """
+        從 Stage 2 JSON `satellites` 結構 (星座 → 衛星 → orbital_states) 建立區塊
+
+        僅在所有衛星共用時間軸起點 (unified_window 模式) 時可建立；
+        independent_epoch 模式各衛星起點不同，返回 None 由呼叫端走逐點路徑。
+        """
+        entries = []
+        for constellation, constellation_sats in satellites.items():
+            if not isinstance(constellation_sats, dict):
+                continue
+            for sat_id, sat_data in constellation_sats.items():
+                states = sat_data.get('orbital_states') if isinstance(sat_data, dict) else None
+                if states:
+                    entries.append((str(sat_id), sat_data.get('constellation', constellation), sat_data, states))
+        if not entries:
+            return None
+
+        time_start = _parse_utc(entries[0][3][0]['timestamp'])
+        if interval_seconds is None:
+            states = next((e[3] for e in entries if len(e[3]) > 1), None)
+            if states is None:
+                return None
+            interval_seconds = (_parse_utc(states[1]['timestamp']) - time_start).total_seconds()
+            if interval_seconds <= 0:
+                return None
+
+        # 驗證共用時間軸 (僅檢查首尾點，避免逐點解析時間戳)
+        n_times = 0
+        for sat_id, _, _, states in entries:
+            if _parse_utc(states[0]['timestamp']) != time_start:
+                logger.info(f"衛星 {sat_id} 時間軸起點不同，無法建立 OrbitalStateBlock")
+                return None
+            span = (_parse_utc(states[-1]['timestamp']) - time_start).total_seconds()
+            if abs(span - (len(states) - 1) * interval_seconds) > 1e-6:
+                logger.info(f"衛星 {sat_id} 時間軸不連續，無法建立 OrbitalStateBlock")
+                return None
+            n_times = max(n_times, len(states))
+
+        n_sat = len(entries)
+        positions = np.full((n_sat, n_times, 3), np.nan)
+        velocities = np.full((n_sat, n_times, 3), np.nan)
+        valid = np.zeros((n_sat, n_times), dtype=bool)
+        epoch_offsets = np.zeros(n_sat)
+        for i, (_, _, sat_data, states) in enumerate(entries):
+            n = len(states)
+            positions[i, :n] = [s['position_teme'] for s in states]
+            velocities[i, :n] = [s['velocity_teme'] for s in states]
+            valid[i, :n] = True
+            epoch_offsets[i] = (time_start - _parse_utc(sat_data['epoch_datetime'])).total_seconds() / 60.0
+
+        first = entries[0][2]
+        return cls(
+            satellite_ids=[e[0] for e in entries],
+            constellations=[e[1] for e in entries],
+            epoch_datetimes=[e[2]['epoch_datetime'] for e in entries],
+            time_start_utc=time_start,
+            interval_seconds=float(interval_seconds),
+            positions_km=positions,
+            velocities_km_s=velocities,
+            epoch_offsets_minutes=epoch_offsets,
+            valid_mask=valid,
+            coordinate_system=first.get('coordinate_system', 'TEME'),
+            algorithm_used=first.get('algorithm_used', 'SGP4')
+        )
@@ -38,14 +38,35 @@ from .file_utils import (
     create_timestamped_filename
 )
 
+from .stage_handoff import (
+    HANDOFF_SUFFIX,
+    save_stage_handoff,
+    load_stage_handoff,
+    save_stage_output,
+    load_stage_output,
+    is_json_export_enabled
+)
+
+from .background_writer import (
+    BackgroundResultWriter,
+    get_active_writer,
+    run_or_submit
+)
+
+from .hdf5_dataset_view import SatelliteDatasetView
+
+from .satellite_result_spool import SPOOL_SUFFIX, SatelliteResultSpool
+
 from .ground_distance_calculator import (
     GroundDistanceCalculator,
     haversine_distance,
+    haversine_distance_batch,
     vincenty_distance
 )
 
 from .coordinate_converter import (
     ecef_to_geodetic,
+    ecef_to_geodetic_batch,
     geodetic_to_ecef,
     CoordinateConverter
 )
@@ -78,13 +99,35 @@ __all__ = [
     'get_file_size',
     'create_timestamped_filename',
 
+    # 階段交接格式
+    'HANDOFF_SUFFIX',
+    'save_stage_handoff',
+    'load_stage_handoff',
+    'save_stage_output',
+    'load_stage_output',
+    'is_json_export_enabled',
+
+    # 背景結果寫入
+    'BackgroundResultWriter',
+    'get_active_writer',
+    'run_or_submit',
+
+    # HDF5 惰性視圖
+    'SatelliteDatasetView',
+
+    # 串流管線逐衛星結果
+    'SPOOL_SUFFIX',
+    'SatelliteResultSpool',
+
     # 地面距离计算工具
     'GroundDistanceCalculator',
     'haversine_distance',
+    'haversine_distance_batch',
     'vincenty_distance',
 
     # 坐标转换工具
     'ecef_to_geodetic',
+    'ecef_to_geodetic_batch',
     'geodetic_to_ecef',
     'CoordinateConverter'
 ]
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+背景結果寫入器 - 記憶體內管線的非同步落盤
+
+記憶體內管線模式下，階段 N 的 ProcessingResult.data 直接交給階段 N+1，
+輸出文件 (HDF5 交接文件 / JSON / Stage 2 分組 HDF5) 改由單一背景執行緒依序寫入，
+階段 N 的序列化與其驗證快照/驗證器重疊進行。
+
+使用方式:
+    with BackgroundResultWriter() as writer:
+        ...  # 期間所有 run_or_submit() / save_stage_output() 皆在背景寫入
+    errors = writer.errors  # 離開 with 時已等待所有寫入完成
+
+注意:
+- 下一階段取得記憶體內結果 (頂層淺拷貝) 前先 flush()，背景序列化與下一階段的修改不會同時存取巢狀物件
+- 寫入失敗不會中斷管線，錯誤集中於 writer.errors 供呼叫端報告
+"""
+
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_active_writer: Optional['BackgroundResultWriter'] = None
+_active_lock = threading.Lock()
+
+# 專案同時使用 src.shared.* 與 shared.* 兩種導入路徑，本模組可能被載入兩次；
+# 啟用狀態需跨兩份模組可見
+_MODULE_ALIASES = ('shared.utils.background_writer', 'src.shared.utils.background_writer')
+
+
+class BackgroundResultWriter:
+    """
+    單執行緒背景寫入器
+
+    單一工作執行緒保證寫入順序與提交順序一致 (h5py 亦不需跨執行緒並行)。
+    """
+
+    def __init__(self, logger_instance: Optional[logging.Logger] = None):
+        self.logger = logger_instance or logger
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self.errors: List[str] = []
+        self.completed = 0
+        self.write_seconds = 0.0
+
+    # ==================== 生命週期 ====================
+
+    def __enter__(self) -> 'BackgroundResultWriter':
+        global _active_writer
+        with _active_lock:
+            if get_active_writer() is not None:
+                raise RuntimeError("已有啟用中的 BackgroundResultWriter，不支援巢狀使用")
+            _active_writer = self
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='result-writer')
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        global _active_writer
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            with _active_lock:
+                _active_writer = None
+
+    # ==================== 寫入 ====================
+
+    def submit(self, label: str, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        提交背景寫入工作
+
+        Args:
+            label: 工作描述 (記錄與錯誤訊息用)
+            fn: 寫入函數
+            *args, **kwargs: 傳給 fn 的參數
+
+        Returns:
+            Future: 寫入結果
+        """
+        if self._executor is None:
+            raise RuntimeError("BackgroundResultWriter 尚未啟用 (請使用 with 語句)")
+
+        future = self._executor.submit(self._run, label, fn, args, kwargs)
+        with self._lock:
+            self._pending.append(future)
+        return future
+
+    def _run(self, label: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            message = f"{label}: {e}"
+            self.logger.error(f"❌ 背景寫入失敗 - {message}", exc_info=True)
+            with self._lock:
+                self.errors.append(message)
+            return None
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.completed += 1
+            self.write_seconds += elapsed
+        self.logger.info(f"💾 背景寫入完成 - {label} ({elapsed:.2f}秒)")
+        return result
+
+    def flush(self) -> List[str]:
+        """
+        等待所有已提交的寫入完成
+
+        Returns:
+            List[str]: 至今累積的寫入錯誤
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+        return list(self.errors)
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._pending if not future.done())
+
+
+def get_active_writer() -> Optional[BackgroundResultWriter]:
+    """目前啟用中的背景寫入器 (沒有則為 None)"""
+    if _active_writer is not None:
+        return _active_writer
+    for name in _MODULE_ALIASES:
+        writer = getattr(sys.modules.get(name), '_active_writer', None)
+        if writer is not None:
+            return writer
+    return None
+
+
+def run_or_submit(label: str, fn: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+    """
+    有啟用中的背景寫入器時提交背景寫入，否則同步執行
+
+    Returns:
+        Optional[Future]: 背景寫入時為 Future；同步執行時為 None
+    """
+    writer = get_active_writer()
+    if writer is None:
+        fn(*args, **kwargs)
+        return None
+    return writer.submit(label, fn, *args, **kwargs)
@@ -17,6 +17,8 @@ ECEF → WGS84 Geodetic 坐标转换模块
 import math
 from typing import Tuple
 
+import numpy as np
+
 
 class CoordinateConverter:
     """
@@ -123,6 +125,63 @@ class CoordinateConverter:
 
         return lat_deg, lon_deg, h_m
 
+    def ecef_to_geodetic_batch(self, x_m, y_m, z_m) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        ECEF → WGS84 Geodetic 批次转换 (向量化)
+
+        与 ecef_to_geodetic() 使用相同的 Bowring 迭代 (最多 5 次，1e-9 弧度收敛)，
+        每个点独立判断收敛，已收敛的点不再更新。
+
+        Args:
+            x_m, y_m, z_m: 相同形状的 ECEF 坐标数组 (米)
+
+        Returns:
+            (latitude_deg, longitude_deg, altitude_m): 与输入相同形状的数组
+            NaN 输入对应 NaN 输出
+
+        Raises:
+            ValueError: 如果任一有限输入坐标过小（如全为零）
+        """
+        x_m, y_m, z_m = np.broadcast_arrays(
+            np.asarray(x_m, dtype=np.float64),
+            np.asarray(y_m, dtype=np.float64),
+            np.asarray(z_m, dtype=np.float64)
+        )
+
+        r = np.sqrt(x_m**2 + y_m**2 + z_m**2)
+        if np.any(r < 1.0):
+            raise ValueError(
+                f"ECEF 坐标过小 (r_min={np.nanmin(r):.3f}m)，可能是无效输入\n"
+                f"请检查坐标单位是否为米"
+            )
+
+        lon_deg = np.degrees(np.arctan2(y_m, x_m))
+        p = np.sqrt(x_m**2 + y_m**2)
+
+        lat_rad = np.arctan2(z_m, p * (1 - self.e_sq))
+        active = np.ones(lat_rad.shape, dtype=bool)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(5):
+                sin_lat = np.sin(lat_rad)
+                cos_lat = np.cos(lat_rad)
+                N = self.a / np.sqrt(1 - self.e_sq * sin_lat**2)
+                h_m = p / cos_lat - N
+                lat_rad_new = np.arctan2(z_m, p * (1 - self.e_sq * N / (N + h_m)))
+
+                converged = np.abs(lat_rad_new - lat_rad) < 1e-9
+                lat_rad = np.where(active, lat_rad_new, lat_rad)
+                active &= ~converged
+                if not active.any():
+                    break
+
+            sin_lat = np.sin(lat_rad)
+            cos_lat = np.cos(lat_rad)
+            N = self.a / np.sqrt(1 - self.e_sq * sin_lat**2)
+            h_m = np.where(np.abs(cos_lat) > 1e-10, p / cos_lat - N, np.abs(z_m) - self.b)
+
+        return np.degrees(lat_rad), lon_deg, h_m
+
     def geodetic_to_ecef(self, lat_deg: float, lon_deg: float, alt_m: float) -> Tuple[float, float, float]:
         """
         WGS84 Geodetic → ECEF 坐标转换（反向转换）
@@ -173,6 +232,19 @@ def ecef_to_geodetic(x_m: float, y_m: float, z_m: float) -> Tuple[float, float,
     return _converter.ecef_to_geodetic(x_m, y_m, z_m)
 
 
+def ecef_to_geodetic_batch(x_m, y_m, z_m) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ECEF → WGS84 Geodetic 批次转换（便捷函数）
+
+    Args:
+        x_m, y_m, z_m: ECEF 坐标数组 (米)
+
+    Returns:
+        (lat_deg, lon_deg, alt_m): 大地坐标数组 (度, 度, 米)
+    """
+    return _converter.ecef_to_geodetic_batch(x_m, y_m, z_m)
+
+
 def geodetic_to_ecef(lat_deg: float, lon_deg: float, alt_m: float) -> Tuple[float, float, float]:
     """
     WGS84 Geodetic → ECEF 坐标转换（便捷函数）
@@ -18,6 +18,8 @@
 import math
 from typing import Tuple
 
+import numpy as np
+
 
 class GroundDistanceCalculator:
     """
@@ -100,6 +102,31 @@ class GroundDistanceCalculator:
 
         return distance_m
 
+    def haversine_distance_batch(self, lat1_deg, lon1_deg, lat2_deg, lon2_deg) -> np.ndarray:
+        """
+        Haversine 大圆距离批次计算 (向量化，支持广播)
+
+        公式与 haversine_distance() 相同
+
+        Returns:
+            distance_m: 地面大圆距离数组 (米)
+        """
+        lat1_rad = np.radians(lat1_deg)
+        lon1_rad = np.radians(lon1_deg)
+        lat2_rad = np.radians(lat2_deg)
+        lon2_rad = np.radians(lon2_deg)
+
+        dlat = lat2_rad - lat1_rad
+        dlon = lon2_rad - lon1_rad
+
+        a = (
+            np.sin(dlat / 2) ** 2
+            + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+        )
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        return self.R_mean * c
+
     def vincenty_distance(
         self,
         lat1_deg: float,
@@ -240,6 +267,20 @@ def haversine_distance(
     return _calculator.haversine_distance(lat1_deg, lon1_deg, lat2_deg, lon2_deg)
 
 
+def haversine_distance_batch(lat1_deg, lon1_deg, lat2_deg, lon2_deg) -> np.ndarray:
+    """
+    Haversine 大圆距离批次计算（便捷函数）
+
+    Args:
+        lat1_deg, lon1_deg: 第一点 (度，可为数组)
+        lat2_deg, lon2_deg: 第二点 (度，可为数组)
+
+    Returns:
+        distance_m: 距离数组 (米)
+    """
+    return _calculator.haversine_distance_batch(lat1_deg, lon1_deg, lat2_deg, lon2_deg)
+
+
 def vincenty_distance(
     lat1_deg: float, lon1_deg: float, lat2_deg: float, lon2_deg: float
 ) -> float:
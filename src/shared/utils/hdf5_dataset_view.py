@@ -0,0 +1,270 @@
+"""
+HDF5 衛星數據集惰性視圖 - Stage 2/3 HDF5 輸出的列式讀取
+
+Stage 2 分組 HDF5 (星座 → 衛星 → 數據集) 與 Stage 3 座標緩存 (衛星 → 數據集)
+皆為「每顆衛星一個群組、每個欄位一個數據集」的布局。此視圖開啟文件時只建立
+衛星 → 群組索引，不讀取任何數據；欄位在被請求時才以 NumPy 陣列返回:
+
+✅ column(): 單顆衛星單一欄位 (可指定時間切片)
+✅ stack(): 多顆衛星同一欄位 → (S, T, ...) 陣列 (不足長度以 fill 補齊)
+✅ at_time(): 多顆衛星在同一時間索引的值 → (S, ...) 陣列
+✅ 連續存儲且未壓縮的數值數據集以 np.memmap 直接映射，其餘經 h5py 按需讀取
+
+只需仰角或位置欄位的下游不必為其他欄位付出解壓與建立 dict 的成本。
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import h5py
+    HDF5_AVAILABLE = True
+except ImportError:
+    HDF5_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+IndexLike = Union[int, slice, Sequence[int], np.ndarray]
+
+
+def _attr_value(value: Any) -> Any:
+    """HDF5 屬性 → Python 值 (bytes 解碼、NumPy 標量轉原生型別)"""
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class SatelliteDatasetView:
+    """
+    Stage 2/3 HDF5 輸出的惰性衛星數據集視圖
+
+    使用方式:
+        with SatelliteDatasetView(path) as view:
+            elevation = view.column('STARLINK-1', 'latitudes', slice(0, 100))
+            latitudes, lengths = view.stack('latitudes')
+    """
+
+    def __init__(self, path: Union[str, Path], use_mmap: bool = True):
+        """
+        Args:
+            path: HDF5 文件路徑
+            use_mmap: 是否對連續存儲且未壓縮的數值數據集使用 np.memmap
+        """
+        if not HDF5_AVAILABLE:
+            raise ImportError("h5py 未安裝，無法讀取 HDF5 格式")
+
+        self.path = Path(path)
+        self.use_mmap = use_mmap
+        self._file = h5py.File(self.path, 'r')
+        self._groups: Dict[str, str] = {}
+        self._constellations: Dict[str, Optional[str]] = {}
+        self._mmaps: Dict[str, np.ndarray] = {}
+        self._index_groups()
+
+    # ==================== 生命週期 ====================
+
+    def __enter__(self) -> 'SatelliteDatasetView':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """關閉文件 (已返回的 memmap 陣列仍可使用)"""
+        self._mmaps.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _index_groups(self) -> None:
+        """建立衛星 → 群組路徑索引 (僅讀取結構，不讀取數據)"""
+        for name, group in self._file.items():
+            if not isinstance(group, h5py.Group):
+                continue
+            members = list(group.values())
+            if any(isinstance(member, h5py.Dataset) for member in members):
+                # Stage 3 布局: 根群組即衛星
+                self._add_satellite(name, group.name, None)
+                continue
+            # Stage 2 布局: 星座 → 衛星
+            for sat_group in members:
+                if isinstance(sat_group, h5py.Group) and len(sat_group):
+                    self._add_satellite(sat_group.name.rsplit('/', 1)[-1], sat_group.name, name)
+
+    def _add_satellite(self, satellite_id: str, group_path: str, constellation: Optional[str]) -> None:
+        # ✅ Fail-Fast: 衛星 ID 必須唯一
+        if satellite_id in self._groups:
+            raise ValueError(f"HDF5 文件中衛星 ID 重複: {satellite_id} ({self.path})")
+        self._groups[satellite_id] = group_path
+        self._constellations[satellite_id] = constellation
+
+    # ==================== 結構資訊 ====================
+
+    @property
+    def satellite_ids(self) -> List[str]:
+        return list(self._groups)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, satellite_id: str) -> bool:
+        return satellite_id in self._groups
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._groups)
+
+    @property
+    def file_attrs(self) -> Dict[str, Any]:
+        """文件層級屬性"""
+        return {key: _attr_value(value) for key, value in self._file.attrs.items()}
+
+    def attrs(self, satellite_id: str) -> Dict[str, Any]:
+        """衛星群組屬性"""
+        return {key: _attr_value(value) for key, value in self._group(satellite_id).attrs.items()}
+
+    def constellation(self, satellite_id: str) -> Optional[str]:
+        """衛星所屬星座 (群組屬性優先，其次為 Stage 2 的星座群組名稱)"""
+        value = self._group(satellite_id).attrs.get('constellation')
+        return _attr_value(value) if value is not None else self._constellations[satellite_id]
+
+    def fields(self, satellite_id: str) -> List[str]:
+        """衛星群組內的欄位 (數據集) 名稱"""
+        return [name for name, obj in self._group(satellite_id).items() if isinstance(obj, h5py.Dataset)]
+
+    def length(self, satellite_id: str, field: str) -> int:
+        """欄位時間點數 (僅讀取形狀)"""
+        return int(self._dataset(satellite_id, field).shape[0])
+
+    def is_memory_mapped(self, satellite_id: str, field: str) -> bool:
+        """欄位是否以 np.memmap 直接映射"""
+        return self._memmap(satellite_id, field) is not None
+
+    # ==================== 數據存取 ====================
+
+    def column(self, satellite_id: str, field: str, index: IndexLike = slice(None)) -> np.ndarray:
+        """
+        單顆衛星單一欄位 (沿時間軸索引)
+
+        Args:
+            satellite_id: 衛星 ID
+            field: 數據集名稱 (如 'latitudes', 'position_teme_km')
+            index: 時間索引 (整數、切片或遞增整數陣列)
+
+        Returns:
+            np.ndarray: 欄位值；字串欄位解碼為 str 陣列
+        """
+        mapped = self._memmap(satellite_id, field)
+        if mapped is not None:
+            return mapped[index]
+
+        dataset = self._dataset(satellite_id, field)
+        if isinstance(index, (list, tuple, np.ndarray)):
+            index = np.asarray(index, dtype=np.intp)
+        if h5py.check_string_dtype(dataset.dtype) is not None:
+            values = dataset.asstr()[index]
+            return np.asarray(values, dtype=str) if isinstance(values, np.ndarray) else values
+        values = dataset[index]
+        if isinstance(values, np.ndarray) and values.dtype.kind == 'S':
+            return values.astype(str)
+        if isinstance(values, bytes):
+            return values.decode('utf-8')
+        return values
+
+    def timestamps(self, satellite_id: str, field: Optional[str] = None,
+                   index: IndexLike = slice(None)) -> np.ndarray:
+        """衛星時間戳 (自動辨識 Stage 2 'timestamps_utc' / Stage 3 'timestamps')"""
+        if field is None:
+            group = self._group(satellite_id)
+            field = next((name for name in ('timestamps_utc', 'timestamps') if name in group), None)
+            if field is None:
+                raise KeyError(f"衛星 {satellite_id} 沒有時間戳欄位")
+        return self.column(satellite_id, field, index)
+
+    def stack(self, field: str, satellite_ids: Optional[Sequence[str]] = None,
+              fill: Any = np.nan) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        多顆衛星同一欄位 → (S, T_max, ...) 陣列
+
+        Args:
+            field: 數據集名稱
+            satellite_ids: 衛星子集 (預設全部，依文件順序)
+            fill: 長度不足處的填補值
+
+        Returns:
+            (values, lengths): values 為 (S, T_max, ...) 陣列；lengths 為各衛星實際點數 (S,)
+        """
+        satellite_ids = self.satellite_ids if satellite_ids is None else list(satellite_ids)
+        datasets = [self._dataset(sat_id, field) for sat_id in satellite_ids]
+        lengths = np.array([ds.shape[0] for ds in datasets], dtype=np.intp)
+
+        if not datasets:
+            return np.empty((0, 0)), lengths
+
+        trailing = datasets[0].shape[1:]
+        dtype = datasets[0].dtype
+        if np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.bool_):
+            dtype = np.result_type(dtype, np.asarray(fill).dtype)
+        elif h5py.check_string_dtype(dtype) is not None or dtype.kind == 'S':
+            dtype = object
+
+        values = np.full((len(datasets), int(lengths.max(initial=0))) + trailing, fill, dtype=dtype)
+        for row, (sat_id, n) in enumerate(zip(satellite_ids, lengths)):
+            if n:
+                values[row, :n] = self.column(sat_id, field)
+        return values, lengths
+
+    def at_time(self, field: str, time_index: int, satellite_ids: Optional[Sequence[str]] = None,
+                fill: Any = np.nan) -> np.ndarray:
+        """
+        多顆衛星在同一時間索引的欄位值 → (S, ...) 陣列
+
+        點數不足 time_index + 1 的衛星以 fill 填補。
+        """
+        satellite_ids = self.satellite_ids if satellite_ids is None else list(satellite_ids)
+        if not satellite_ids:
+            return np.empty((0,))
+
+        first = self._dataset(satellite_ids[0], field)
+        values = np.full((len(satellite_ids),) + first.shape[1:], fill,
+                         dtype=np.result_type(first.dtype, np.asarray(fill).dtype))
+        for row, sat_id in enumerate(satellite_ids):
+            if self.length(sat_id, field) > time_index:
+                values[row] = self.column(sat_id, field, time_index)
+        return values
+
+    # ==================== 內部 ====================
+
+    def _group(self, satellite_id: str):
+        try:
+            return self._file[self._groups[satellite_id]]
+        except KeyError:
+            raise KeyError(f"HDF5 文件中沒有衛星 {satellite_id}: {self.path}") from None
+
+    def _dataset(self, satellite_id: str, field: str):
+        group = self._group(satellite_id)
+        if field not in group:
+            raise KeyError(f"衛星 {satellite_id} 沒有欄位 '{field}': {self.path}")
+        return group[field]
+
+    def _memmap(self, satellite_id: str, field: str) -> Optional[np.ndarray]:
+        """連續存儲、未壓縮的數值數據集 → 唯讀 np.memmap (不符合條件返回 None)"""
+        if not self.use_mmap:
+            return None
+
+        key = f"{self._groups[satellite_id]}/{field}"
+        if key in self._mmaps:
+            return self._mmaps[key]
+
+        dataset = self._dataset(satellite_id, field)
+        offset = dataset.id.get_offset()
+        mapped = None
+        if (dataset.chunks is None and offset is not None and dataset.size > 0
+                and dataset.dtype.kind in 'biuf'):
+            mapped = np.memmap(self.path, dtype=dataset.dtype, mode='r', offset=offset, shape=dataset.shape)
+        self._mmaps[key] = mapped
+        return mapped
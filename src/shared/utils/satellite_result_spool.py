@@ -0,0 +1,193 @@
+"""
+逐衛星結果追加寫入器 (Satellite Result Spool) - 串流管線的 append-only HDF5 容器
+
+串流模式下衛星以有界批次流經 Stage 2 → 5，每批次的逐衛星結果 (Stage 4 可連線時間序列、
+Stage 5 信號分析) 追加寫入單一 HDF5 文件，記憶體只保留當前批次:
+
+✅ append(): 每批次寫入一個新群組 ('<類別>/<批次序號>')，既有群組永不修改
+✅ 每顆衛星一個子群組，沿用階段交接格式 (stage_handoff) 的列式編碼
+✅ load(): 依衛星 ID 讀回指定衛星，只解碼所需子群組
+✅ 有啟用中的 BackgroundResultWriter 時於背景寫入，最多一個批次等待落盤 (背壓)
+
+佈局:
+    /<類別>/<批次序號 000000>/<衛星ID>  → 衛星結果 (交接格式 dict)
+    文件屬性 format = 'orbit_engine_satellite_spool'
+
+使用方式:
+    with SatelliteResultSpool(path) as spool:
+        spool.append('stage4', {sat_id: entry, ...})
+        entries = spool.load('stage4', ['44713', '44714'])
+"""
+
+import json
+import logging
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .background_writer import run_or_submit
+from .stage_handoff import read_handoff_group, write_handoff_group
+
+try:
+    import h5py
+    HDF5_AVAILABLE = True
+except ImportError:
+    HDF5_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.spool.h5'
+SPOOL_FORMAT = 'orbit_engine_satellite_spool'
+SPOOL_FORMAT_VERSION = 1
+
+
+class SatelliteResultSpool:
+    """
+    逐衛星結果的 append-only HDF5 容器
+
+    索引 (類別 → 衛星ID → 批次群組) 保存在記憶體；以 mode='r' 重新開啟時由各批次群組的鍵順序重建。
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = 'w'):
+        """
+        Args:
+            path: 文件路徑 (建議以 SPOOL_SUFFIX 結尾)
+            mode: 'w' 建立新文件 (覆蓋既有文件) / 'r' 唯讀開啟既有文件
+        """
+        if not HDF5_AVAILABLE:
+            raise ImportError("h5py 未安裝，無法使用逐衛星結果追加寫入器")
+        if mode not in ('w', 'r'):
+            raise ValueError(f"不支援的開啟模式: {mode} (可用: w, r)")
+
+        self.path = Path(path)
+        self.mode = mode
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._chunks: Dict[str, int] = {}
+        self._pending: Optional[Future] = None
+
+        if mode == 'w':
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # libver='latest' 允許超過 64 KB 的屬性 (批次內大量衛星鍵)
+            self._file = h5py.File(self.path, 'w', libver='latest')
+            self._file.attrs['format'] = SPOOL_FORMAT
+            self._file.attrs['format_version'] = SPOOL_FORMAT_VERSION
+        else:
+            self._file = h5py.File(self.path, 'r')
+            file_format = self._file.attrs.get('format')
+            if file_format != SPOOL_FORMAT:
+                self._file.close()
+                raise ValueError(
+                    f"{self.path} 不是逐衛星結果文件\n"
+                    f"期望 format='{SPOOL_FORMAT}'，實際: {file_format}"
+                )
+            self._rebuild_index()
+
+    # ==================== 生命週期 ====================
+
+    def __enter__(self) -> 'SatelliteResultSpool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """等待背景寫入完成並關閉文件"""
+        if self._file is None:
+            return
+        self._wait_pending()
+        self._file.close()
+        self._file = None
+
+    def _rebuild_index(self) -> None:
+        for category, group in self._file.items():
+            self._chunks[category] = len(group)
+            for chunk_name, chunk in group.items():
+                # 批次群組為交接格式 dict，attrs['keys'] 即衛星 ID 順序
+                for satellite_id in json.loads(chunk.attrs['keys']):
+                    self._index.setdefault(category, {})[satellite_id] = f"{category}/{chunk_name}"
+
+    # ==================== 寫入 ====================
+
+    def append(self, category: str, records: Dict[str, Dict[str, Any]]) -> None:
+        """
+        追加一個批次的逐衛星結果
+
+        Args:
+            category: 結果類別 (如 'stage4'、'stage5')
+            records: {衛星ID: 結果字典}
+
+        Raises:
+            ValueError: 衛星 ID 已存在於此類別 (append-only，不允許覆蓋)
+        """
+        if self.mode != 'w':
+            raise ValueError(f"{self.path} 以唯讀模式開啟，無法追加")
+        if not records:
+            return
+
+        index = self._index.setdefault(category, {})
+        duplicates = [satellite_id for satellite_id in records if str(satellite_id) in index]
+        if duplicates:
+            raise ValueError(f"❌ Fail-Fast: 衛星結果重複追加 ({category}): {duplicates[:5]}")
+
+        chunk_number = self._chunks.get(category, 0)
+        self._chunks[category] = chunk_number + 1
+        chunk_path = f"{category}/{chunk_number:06d}"
+        for satellite_id in records:
+            index[str(satellite_id)] = chunk_path
+
+        # 背壓: 上一批次落盤前不再提交，待寫入的批次最多一個
+        self._wait_pending()
+        self._pending = run_or_submit(
+            f"{self.path.name}:{chunk_path}", self._write_chunk, chunk_path, records
+        )
+
+    def _write_chunk(self, chunk_path: str, records: Dict[str, Dict[str, Any]]) -> None:
+        write_handoff_group(self._file.create_group(chunk_path), records)
+        self._file.flush()
+
+    def _wait_pending(self) -> None:
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    # ==================== 讀取 ====================
+
+    def satellite_ids(self, category: str) -> List[str]:
+        """類別內所有衛星 ID (追加順序)"""
+        return list(self._index.get(category, {}))
+
+    def count(self, category: str) -> int:
+        return len(self._index.get(category, {}))
+
+    def load(self, category: str, satellite_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        讀回指定衛星的結果 (依 satellite_ids 順序)
+
+        Raises:
+            KeyError: 衛星不在此類別 (或其批次寫入失敗)
+        """
+        self._wait_pending()
+        index = self._index.get(category, {})
+        satellite_ids = [str(satellite_id) for satellite_id in satellite_ids]
+        missing = [satellite_id for satellite_id in satellite_ids if satellite_id not in index]
+        if missing:
+            raise KeyError(f"❌ Fail-Fast: {category} 缺少衛星結果: {missing[:5]}")
+
+        by_chunk: Dict[str, List[str]] = {}
+        for satellite_id in satellite_ids:
+            by_chunk.setdefault(index[satellite_id], []).append(satellite_id)
+
+        loaded: Dict[str, Dict[str, Any]] = {}
+        for chunk_path, chunk_ids in by_chunk.items():
+            if chunk_path not in self._file:
+                raise KeyError(f"❌ Fail-Fast: 批次群組 {chunk_path} 不存在 (背景寫入失敗?)")
+            loaded.update(read_handoff_group(self._file[chunk_path], keys=chunk_ids))
+        return {satellite_id: loaded[satellite_id] for satellite_id in satellite_ids}
+
+    def summary(self) -> Dict[str, Any]:
+        """metadata 用摘要"""
+        return {
+            'spool_file': str(self.path),
+            'satellites': {category: len(index) for category, index in self._index.items()},
+            'chunks': dict(self._chunks)
+        }
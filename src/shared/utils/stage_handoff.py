@@ -0,0 +1,456 @@
+"""
+階段間交接格式 (Stage Handoff) - 列式 HDF5 儲存
+
+取代 Stage 2-5 之間以 json.dump(indent=2) 交接的多 GB 文字檔:
+- 記錄列表 (如 time_series) 以「每個欄位一個 dataset」的列式佈局儲存
+- 數值欄位為 float64 / int64 / bool 陣列，字串欄位為 UTF-8 變長字串
+- 巢狀字典維持 HDF5 群組結構，鍵順序完整保留
+- 讀回結果與 json.load(json.dump(..., default=str)) 的結構與數值一致
+
+JSON 僅作為選用輸出 (ORBIT_ENGINE_JSON_EXPORT=1 或 output_format='json'/'both')。
+
+佈局 (每個節點以 attrs['kind'] 標註):
+- dict:     群組；attrs['keys'] 為鍵順序，純量值集中於 attrs['scalars']
+- table:    值皆為同構字典的字典 (如 衛星ID → 衛星數據) → 'index' + 'rows' (records)，
+            所有衛星的同一欄位 (含攤平後的 time_series) 合併為單一 dataset
+- column:   同質純量列表 (或等長數值子列表) → 單一 dataset
+- records:  字典列表 → 群組，每個欄位遞迴編碼為一個列
+- nullable: 含 None 的列表 → 'mask' + 'values'
+- sparse:   記錄中部分缺失的欄位 → 'present' + 'values'
+- ragged:   不等長子列表 → 'offsets' + 'values'
+- ndarray:  NumPy 陣列原樣儲存
+- json:     異質列表的 JSON 文字 (與原 JSON 輸出語義相同)
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import quote
+
+import numpy as np
+
+from .background_writer import run_or_submit
+
+try:
+    import h5py
+    HDF5_AVAILABLE = True
+except ImportError:
+    HDF5_AVAILABLE = False
+    logging.warning("⚠️ h5py 未安裝，階段交接將退回 JSON 格式")
+
+logger = logging.getLogger(__name__)
+
+HANDOFF_SUFFIX = '.handoff.h5'
+HANDOFF_FORMAT = 'orbit_engine_stage_handoff'
+HANDOFF_FORMAT_VERSION = 1
+JSON_EXPORT_ENV = 'ORBIT_ENGINE_JSON_EXPORT'
+
+# 字典視為表格的欄位數上限 (記錄型字典欄位少；依星座分組等字典鍵數龐大)
+MAX_TABLE_FIELDS = 256
+
+_MISSING = object()
+
+
+# ==================== 公開介面 ====================
+
+def is_json_export_enabled() -> bool:
+    """是否額外輸出 JSON (環境變數 ORBIT_ENGINE_JSON_EXPORT=1)"""
+    return os.getenv(JSON_EXPORT_ENV, '0') == '1'
+
+
+def save_stage_handoff(data: Dict[str, Any], file_path: Union[str, Path]) -> Path:
+    """
+    將階段結果寫入列式 HDF5 交接文件
+
+    先寫入暫存檔再以 os.replace 原子替換，讀取端不會看到寫到一半的文件。
+
+    Args:
+        data: 階段結果字典
+        file_path: 目標路徑 (建議以 HANDOFF_SUFFIX 結尾)
+
+    Returns:
+        Path: 寫入的文件路徑
+
+    Raises:
+        ImportError: h5py 未安裝
+        TypeError: data 不是字典
+    """
+    if not HDF5_AVAILABLE:
+        raise ImportError("h5py 未安裝，無法寫入 HDF5 階段交接文件")
+    if not isinstance(data, dict):
+        raise TypeError(f"階段交接數據必須是字典，當前類型: {type(data).__name__}")
+
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(file_path.name + '.tmp')
+    try:
+        # libver='latest' 允許超過 64 KB 的屬性 (大量衛星鍵)
+        with h5py.File(tmp_path, 'w', libver='latest') as f:
+            f.attrs['format'] = HANDOFF_FORMAT
+            f.attrs['format_version'] = HANDOFF_FORMAT_VERSION
+            _write_dict(f, data)
+        os.replace(tmp_path, file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return file_path
+
+
+def load_stage_handoff(file_path: Union[str, Path],
+                       keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    讀取列式 HDF5 交接文件
+
+    Args:
+        file_path: 交接文件路徑
+        keys: (可選) 只解碼指定的頂層鍵，其餘欄位不從磁碟讀取
+
+    Returns:
+        Dict[str, Any]: 與原 JSON 輸出相同結構的字典
+
+    Raises:
+        ImportError: h5py 未安裝
+        ValueError: 文件不是階段交接格式
+    """
+    if not HDF5_AVAILABLE:
+        raise ImportError("h5py 未安裝，無法讀取 HDF5 階段交接文件")
+
+    with h5py.File(file_path, 'r') as f:
+        if f.attrs.get('format') != HANDOFF_FORMAT:
+            raise ValueError(
+                f"{file_path} 不是階段交接文件\n"
+                f"期望 format='{HANDOFF_FORMAT}'，實際: {f.attrs.get('format')}"
+            )
+        return _read_dict(f, keys=None if keys is None else set(keys))
+
+
+def write_handoff_group(group, data: Dict[str, Any]) -> None:
+    """將字典以交接格式寫入已開啟的 HDF5 群組 (供追加寫入的容器文件使用)"""
+    _write_dict(group, data)
+
+
+def read_handoff_group(group, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """讀取 write_handoff_group() 寫入的群組 (keys: 只解碼指定的頂層鍵)"""
+    return _read_dict(group, keys=None if keys is None else set(keys))
+
+
+def load_stage_output(file_path: Union[str, Path]) -> Dict[str, Any]:
+    """依副檔名載入階段輸出 (HDF5 交接文件或舊版 JSON)"""
+    if str(file_path).endswith(HANDOFF_SUFFIX):
+        return load_stage_handoff(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_stage_output(
+    data: Dict[str, Any],
+    output_dir: Union[str, Path],
+    stem: str,
+    output_format: str = 'handoff',
+    logger_instance: Optional[logging.Logger] = None
+) -> Path:
+    """
+    保存階段輸出: HDF5 交接文件 + 選用 JSON 匯出
+
+    Args:
+        data: 階段結果字典
+        output_dir: 輸出目錄
+        stem: 文件名 (不含副檔名)
+        output_format: 'handoff' (預設) / 'json' / 'both'
+            'handoff' 時若 ORBIT_ENGINE_JSON_EXPORT=1 亦額外輸出 JSON
+        logger_instance: (可選) 記錄用 logger
+
+    Returns:
+        Path: 主要輸出文件 (HDF5 交接文件；僅輸出 JSON 或 h5py 不可用時為 JSON)
+
+    Note:
+        有啟用中的 BackgroundResultWriter 時 (記憶體內管線模式)，
+        文件於背景寫入，返回的路徑在寫入完成前可能尚不存在。
+    """
+    if output_format not in ('handoff', 'json', 'both'):
+        raise ValueError(f"不支援的輸出格式: {output_format} (可用: handoff, json, both)")
+
+    log = logger_instance or logger
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    write_handoff = output_format != 'json' and HDF5_AVAILABLE
+    write_json = not write_handoff or output_format == 'both' or is_json_export_enabled()
+    if output_format != 'json' and not HDF5_AVAILABLE:
+        log.warning("⚠️ h5py 未安裝，改以 JSON 輸出階段結果")
+
+    handoff_file = output_dir / f"{stem}{HANDOFF_SUFFIX}" if write_handoff else None
+    json_file = output_dir / f"{stem}.json" if write_json else None
+
+    # 記憶體內管線模式: 由背景寫入器落盤，立即返回預定路徑
+    run_or_submit(stem, _write_stage_output, data, handoff_file, json_file, log)
+    return handoff_file or json_file
+
+
+def _write_stage_output(data: Dict[str, Any], handoff_file: Optional[Path],
+                        json_file: Optional[Path], log: logging.Logger) -> None:
+    if handoff_file is not None:
+        save_stage_handoff(data, handoff_file)
+        size_mb = handoff_file.stat().st_size / (1024 * 1024)
+        log.info(f"📦 階段交接文件已保存: {handoff_file} ({size_mb:.1f} MB)")
+
+    if json_file is not None:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        log.info(f"📁 JSON 格式已保存: {json_file}")
+
+
+# ==================== 編碼 ====================
+
+def _encode_key(key: str) -> str:
+    """字典鍵 → HDF5 名稱 ('/' 等字元以百分比編碼，避免 '.' 開頭)"""
+    name = quote(key, safe='')
+    if name.startswith('.'):
+        name = '%2E' + name[1:]
+    return name
+
+
+def _json_key(key: Any) -> str:
+    """與 json.dump 相同的鍵轉換規則"""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    return str(key)
+
+
+def _normalize(value: Any) -> Any:
+    """NumPy 純量 → Python 純量，tuple → list"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _is_container(value: Any) -> bool:
+    return isinstance(value, (dict, list, np.ndarray))
+
+
+def _is_table(data: Dict[str, Any]) -> bool:
+    """值皆為字典，且各值的鍵集合大致相同 (每個值至少擁有聯集的一半鍵)"""
+    if len(data) < 2 or not all(isinstance(v, dict) for v in data.values()):
+        return False
+    union = set()
+    for value in data.values():
+        union.update(value)
+        if len(union) > MAX_TABLE_FIELDS:
+            return False
+    return 2 * min(len(v) for v in data.values()) >= len(union)
+
+
+def _write_dict(group, data: Dict[str, Any]) -> None:
+    group.attrs['kind'] = 'dict'
+    keys = []
+    scalars = {}
+    for key, value in data.items():
+        key = _json_key(key)
+        value = _normalize(value)
+        keys.append(key)
+        if _is_container(value):
+            _write_value(group, _encode_key(key), value)
+        else:
+            scalars[key] = value
+    group.attrs['keys'] = json.dumps(keys, ensure_ascii=False)
+    group.attrs['scalars'] = json.dumps(scalars, ensure_ascii=False, default=str)
+
+
+def _write_table(group, data: Dict[str, Dict[str, Any]]) -> None:
+    group.attrs['kind'] = 'table'
+    _write_list(group, 'index', [_json_key(k) for k in data])
+    _write_records(group, 'rows', list(data.values()))
+
+
+def _write_value(parent, name: str, value: Any) -> None:
+    if isinstance(value, dict) and _is_table(value):
+        _write_table(parent.create_group(name), value)
+    elif isinstance(value, dict):
+        _write_dict(parent.create_group(name), value)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        if value.dtype.kind == 'U':
+            dataset = parent.create_dataset(name, data=value.astype(object), dtype=h5py.string_dtype())
+        else:
+            dataset = parent.create_dataset(name, data=value)
+        dataset.attrs['kind'] = 'ndarray'
+    elif isinstance(value, np.ndarray):
+        _write_list(parent, name, value.tolist())
+    else:
+        _write_list(parent, name, value)
+
+
+def _write_json(parent, name: str, items: List[Any]) -> None:
+    text = json.dumps(items, ensure_ascii=False, default=str)
+    dataset = parent.create_dataset(name, data=text, dtype=h5py.string_dtype())
+    dataset.attrs['kind'] = 'json'
+
+
+def _write_list(parent, name: str, items: List[Any]) -> None:
+    items = [_normalize(v) for v in items]
+    if not items:
+        _write_json(parent, name, items)
+        return
+
+    # 含 None: 遮罩 + 非空值
+    if any(v is None for v in items):
+        if all(v is None for v in items):
+            _write_json(parent, name, items)
+            return
+        group = parent.create_group(name)
+        group.attrs['kind'] = 'nullable'
+        group.create_dataset('mask', data=np.array([v is None for v in items], dtype=bool))
+        _write_list(group, 'values', [v for v in items if v is not None])
+        return
+
+    item_types = {type(v) for v in items}
+    if len(item_types) == 1:
+        item_type = item_types.pop()
+        if item_type in (float, bool, str) or (item_type is int and _fits_int64(items)):
+            _write_column(parent, name, items, item_type)
+            return
+        if item_type is dict:
+            _write_records(parent, name, items)
+            return
+        if item_type is list:
+            _write_nested(parent, name, items)
+            return
+
+    # 異質列表: 與原 JSON 輸出語義相同
+    _write_json(parent, name, items)
+
+
+def _fits_int64(items: List[int]) -> bool:
+    return min(items) >= np.iinfo(np.int64).min and max(items) <= np.iinfo(np.int64).max
+
+
+def _write_column(parent, name: str, items: List[Any], item_type: type) -> None:
+    if item_type is str:
+        dataset = parent.create_dataset(name, data=np.array(items, dtype=object), dtype=h5py.string_dtype())
+    else:
+        dtype = {float: np.float64, int: np.int64, bool: bool}[item_type]
+        dataset = parent.create_dataset(name, data=np.array(items, dtype=dtype))
+    dataset.attrs['kind'] = 'column'
+
+
+def _write_records(parent, name: str, records: List[Dict[str, Any]]) -> None:
+    group = parent.create_group(name)
+    group.attrs['kind'] = 'records'
+    group.attrs['length'] = len(records)
+
+    keys = {}
+    for record in records:
+        for key in record:
+            keys.setdefault(key, None)
+    keys = list(keys)
+    group.attrs['keys'] = json.dumps([_json_key(k) for k in keys], ensure_ascii=False)
+
+    for key in keys:
+        column = [record.get(key, _MISSING) for record in records]
+        child = _encode_key(_json_key(key))
+        if any(v is _MISSING for v in column):
+            sparse = group.create_group(child)
+            sparse.attrs['kind'] = 'sparse'
+            sparse.create_dataset('present', data=np.array([v is not _MISSING for v in column], dtype=bool))
+            _write_list(sparse, 'values', [v for v in column if v is not _MISSING])
+        else:
+            _write_list(group, child, column)
+
+
+def _write_nested(parent, name: str, items: List[List[Any]]) -> None:
+    lengths = [len(v) for v in items]
+    flat = [_normalize(x) for v in items for x in v]
+    flat_types = {type(x) for x in flat}
+
+    # 等長數值子列表 (如 ECEF 位置) → 2D dataset
+    if (
+        lengths[0] > 0
+        and len(set(lengths)) == 1
+        and len(flat_types) == 1
+        and flat_types <= {float, bool, int}
+        and (float in flat_types or bool in flat_types or _fits_int64(flat))
+    ):
+        dtype = {float: np.float64, int: np.int64, bool: bool}[flat_types.pop()]
+        dataset = parent.create_dataset(name, data=np.array(flat, dtype=dtype).reshape(len(items), lengths[0]))
+        dataset.attrs['kind'] = 'column'
+        return
+
+    group = parent.create_group(name)
+    group.attrs['kind'] = 'ragged'
+    group.create_dataset('offsets', data=np.concatenate(([0], np.cumsum(lengths))).astype(np.int64))
+    _write_list(group, 'values', flat)
+
+
+# ==================== 解碼 ====================
+
+def _read_node(node) -> Any:
+    kind = node.attrs['kind']
+    if kind == 'dict':
+        return _read_dict(node)
+    if kind == 'table':
+        return dict(zip(_read_node(node['index']), _read_node(node['rows'])))
+    if kind == 'column':
+        if h5py.check_string_dtype(node.dtype) is not None:
+            return node.asstr()[()].tolist()
+        return node[()].tolist()
+    if kind == 'ndarray':
+        if h5py.check_string_dtype(node.dtype) is not None:
+            return node.asstr()[()]
+        return node[()]
+    if kind == 'json':
+        return json.loads(node.asstr()[()])
+    if kind == 'records':
+        return _read_records(node)
+    if kind == 'nullable':
+        return _scatter(node['mask'][()], _read_node(node['values']), fill=None, fill_where=True)
+    if kind == 'sparse':
+        return _scatter(node['present'][()], _read_node(node['values']), fill=_MISSING, fill_where=False)
+    if kind == 'ragged':
+        offsets = node['offsets'][()].tolist()
+        values = _read_node(node['values'])
+        return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    raise ValueError(f"未知的階段交接節點類型: {kind} ({node.name})")
+
+
+def _read_dict(group, keys: Optional[set] = None) -> Dict[str, Any]:
+    scalars = json.loads(group.attrs['scalars'])
+    result = {}
+    for key in json.loads(group.attrs['keys']):
+        if keys is not None and key not in keys:
+            continue
+        if key in scalars:
+            result[key] = scalars[key]
+        else:
+            result[key] = _read_node(group[_encode_key(key)])
+    return result
+
+
+def _read_records(group) -> List[Dict[str, Any]]:
+    keys = json.loads(group.attrs['keys'])
+    length = int(group.attrs['length'])
+    if not keys:
+        return [{} for _ in range(length)]
+
+    nodes = [group[_encode_key(key)] for key in keys]
+    columns = [_read_node(node) for node in nodes]
+    records = [dict(zip(keys, row)) for row in zip(*columns)]
+
+    # 部分缺失的欄位: 從對應記錄中移除
+    for key, node in zip(keys, nodes):
+        if node.attrs['kind'] == 'sparse':
+            for index in np.flatnonzero(~node['present'][()]).tolist():
+                del records[index][key]
+    return records
+
+
+def _scatter(mask: np.ndarray, values: List[Any], fill: Any, fill_where: bool) -> List[Any]:
+    """依遮罩將 values 放回原位置，其餘位置填入 fill"""
+    result = []
+    it = iter(values)
+    for flag in mask.tolist():
+        result.append(fill if flag == fill_where else next(it))
+    return result
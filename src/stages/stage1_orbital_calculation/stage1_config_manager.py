@@ -107,6 +107,14 @@ class Stage1ConfigManager(BaseConfigManager):
                 'file_patterns': ['*.tle', '*.txt']
             },
 
+            # ==================== TLE 歷史存檔配置 ====================
+            'tle_archive': {
+                'enabled': False,
+                'reference_time': None,  # ISO 8601 UTC (啟用時必填)
+                'selection_mode': 'nearest',  # nearest | latest_before
+                'index_directory': 'data/cache/tle_archive_index'
+            },
+
             # ==================== 驗證配置 ====================
             'validation': {
                 'tle_format_check': True,
@@ -124,6 +132,7 @@ class Stage1ConfigManager(BaseConfigManager):
             # ==================== 性能配置 ====================
             'performance': {
                 'show_progress': True,
+                'max_workers': None,  # None = 自動 (CPU 核心數)
                 'log_level': 'INFO'
             }
         }
@@ -217,5 +226,22 @@ class Stage1ConfigManager(BaseConfigManager):
                         f"⚠️ TLE 數據目錄不存在: {data_dir}（將在執行時檢查）"
                     )
 
+        # Validate TLE archive configuration
+        tle_archive = config.get('tle_archive', {})
+        if tle_archive.get('enabled', False):
+            if not tle_archive.get('reference_time'):
+                return False, "tle_archive.enabled=true 時必須提供 tle_archive.reference_time"
+            valid_modes = ['nearest', 'latest_before']
+            if tle_archive.get('selection_mode', 'nearest') not in valid_modes:
+                return False, (
+                    f"tle_archive.selection_mode 必須是 {valid_modes} 之一，"
+                    f"實際: {tle_archive['selection_mode']}"
+                )
+
+        # Validate performance configuration
+        max_workers = config.get('performance', {}).get('max_workers')
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            return False, f"performance.max_workers 必須是正整數或 null，實際: {max_workers}"
+
         # All validations passed
         return True, None
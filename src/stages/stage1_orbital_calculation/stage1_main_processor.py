@@ -26,6 +26,7 @@ import json
 
 # 導入v2.0模組化組件
 from .tle_data_loader import TLEDataLoader
+from .tle_archive_index import DEFAULT_ARCHIVE_INDEX_DIR
 from .data_validator import DataValidator
 from .time_reference_manager import TimeReferenceManager
 
@@ -38,9 +39,11 @@ from .validators.checksum_validator import ChecksumValidator
 # 導入標準接口
 from shared.base import ProcessingResult, ProcessingStatus, ProcessingMetrics
 from shared.base import BaseStageProcessor
+from shared.base.stage_cache import fingerprint_data, fingerprint_files
 
 # 導入地面站常數 (2025-10-11)
 from shared.constants.ground_station_constants import get_observation_location
+from shared.constants.constellation_constants import ConstellationRegistry
 
 
 logger = logging.getLogger(__name__)
@@ -87,11 +90,14 @@ class Stage1MainProcessor(BaseStageProcessor):
     - 性能監控
     """
 
+    # 緩存命中時還原 (驗證與快照使用)
+    stage_cache_state_attrs = ('scan_result', 'epoch_analysis')
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(stage_number=1, stage_name="tle_data_loading", config=config or {})
 
         # 初始化v2.0模組化組件
-        self.tle_loader = TLEDataLoader()
+        self.tle_loader = TLEDataLoader(max_workers=self.config.get('performance', {}).get('max_workers'))
         self.data_validator = DataValidator()
         self.time_manager = TimeReferenceManager()
 
@@ -140,7 +146,6 @@ class Stage1MainProcessor(BaseStageProcessor):
 
         # === Phase 1: 執行TLE數據載入 ===
         logger.info("📁 Phase 1: 執行TLE數據載入...")
-        scan_result = self.tle_loader.scan_tle_data()
 
         # ✅ Grade A 標準: sample_mode=True時必須提供sample_size
         sample_mode = self.config.get('sample_mode', False)
@@ -154,11 +159,23 @@ class Stage1MainProcessor(BaseStageProcessor):
         else:
             sample_size = 0  # 完整模式不使用採樣
 
-        satellites_data = self.tle_loader.load_satellite_data(
-            scan_result,
-            sample_mode=sample_mode,
-            sample_size=sample_size
-        )
+        archive_config = self.config.get('tle_archive', {})
+        if archive_config.get('enabled', False):
+            # 🗂️ 歷史回放: 由存檔索引選出每顆衛星最接近參考時刻的 TLE
+            scan_result, satellites_data = self.tle_loader.load_archive_satellites(
+                self._archive_reference_time(archive_config),
+                index_dir=archive_config.get('index_directory', DEFAULT_ARCHIVE_INDEX_DIR),
+                selection_mode=archive_config.get('selection_mode', 'nearest'),
+                sample_mode=sample_mode,
+                sample_size=sample_size
+            )
+        else:
+            scan_result = self.tle_loader.scan_tle_data()
+            satellites_data = self.tle_loader.load_satellite_data(
+                scan_result,
+                sample_mode=sample_mode,
+                sample_size=sample_size
+            )
         logger.info(f"✅ Phase 1 完成: 載入 {len(satellites_data)} 顆衛星數據")
 
         # 🆕 === Phase 1.5: 執行 Epoch 分析 === (2025-10-03)
@@ -236,6 +253,49 @@ class Stage1MainProcessor(BaseStageProcessor):
 
         return processing_result
 
+    @staticmethod
+    def _archive_reference_time(archive_config: Dict[str, Any]) -> datetime:
+        """tle_archive.reference_time (ISO 8601) → UTC datetime"""
+        reference_time = archive_config.get('reference_time')
+        # ✅ Grade A 標準: 歷史回放必須明確指定參考時刻，不使用預設值
+        if not reference_time:
+            raise ValueError(
+                "tle_archive.enabled=true 時必須提供 tle_archive.reference_time (ISO 8601 UTC)\n"
+                "Grade A 標準禁止使用預設值"
+            )
+        if isinstance(reference_time, datetime):
+            parsed = reference_time
+        else:
+            parsed = datetime.fromisoformat(str(reference_time).replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    def cache_input_fingerprint(self, input_data: Optional[Dict[str, Any]]) -> str:
+        """
+        Stage 1 無上游輸入: 以影響輸出的全部輸入作為指紋
+
+        - TLE 目錄路徑 (輸出記錄 source_file)
+        - 各註冊星座的 TLE 文件 ({星座}/tle/{星座}_*.tle，含存檔回放) 內容與修改時間
+        - 處理日期 (UTC): 驗證器以當前時間檢查 TLE epoch 與來源文件的新鮮度
+        """
+        tle_data_dir = self.tle_loader.tle_data_dir
+        tle_files = [
+            path
+            for constellation in ConstellationRegistry.get_all_names()
+            for path in sorted((tle_data_dir / constellation / 'tle').glob(f"{constellation}_*.tle"))
+        ]
+        return "stage1_inputs:" + fingerprint_data({
+            'tle_data_dir': str(tle_data_dir.resolve()),
+            'tle_files': fingerprint_files(tle_files),
+            'tle_mtimes_ns': [path.stat().st_mtime_ns for path in tle_files],
+            'processing_date': datetime.now(timezone.utc).date().isoformat()
+        })
+
+    def save_cached_outputs(self, result: ProcessingResult) -> None:
+        """緩存命中時重建 Stage 2 所需的 epoch 分析報告與 Stage 1 輸出文件"""
+        if self.epoch_analysis is not None:
+            self._save_epoch_analysis()
+        self._save_output_file(result)
+
     def _integrate_results(self, satellites_data: List[Dict], validation_result: Dict, time_metadata: Dict, start_time: datetime) -> Dict[str, Any]:
         """
         整合處理結果
@@ -267,6 +327,13 @@ class Stage1MainProcessor(BaseStageProcessor):
         metadata['time_base_source'] = 'individual_tle_epochs'
         metadata['tle_epoch_compliance'] = True
 
+        # 🗂️ 歷史回放的 TLE 選擇條件
+        if 'reference_time' in self.scan_result:
+            metadata['tle_archive'] = {
+                'reference_time': self.scan_result['reference_time'],
+                'selection_mode': self.scan_result['selection_mode']
+            }
+
         # 🆕 整合 Epoch 分析結果 (2025-10-03)
         if self.epoch_analysis is not None:
             metadata['epoch_analysis'] = self.epoch_analysis
@@ -0,0 +1,251 @@
+"""
+TLE 歷史存檔索引 - 依 (星座, NORAD ID, epoch) 排序的磁碟索引
+
+歷史回放需要「參考時刻 X 時每顆衛星最接近的 TLE」。直接掃描所有
+{星座}_{YYYYMMDD}.tle 文件的成本隨存檔天數線性成長，因此索引只建立一次:
+
+✅ 每筆 TLE 記錄一列: 星座、NORAD ID、epoch、文件編號、3 行組的位元組偏移
+✅ 依 (星座, NORAD ID, epoch) 排序，查詢為單次向量化計數 (毫秒級)
+✅ 只讀回被選中記錄的 3 行組 (seek 到偏移)，再以串流解析器完整驗證
+✅ 增量更新: 以文件大小 + mtime 判斷，只重新索引新增或改變的文件
+
+目錄佈局 (預設 data/cache/tle_archive_index):
+- manifest.json: {'format_version', 'files': {相對路徑: {'file_id', 'constellation', 'size', 'mtime_ns'}}}
+- index.npy: 結構化陣列 (constellation, norad_id, epoch, file_id, offset)
+
+寫入順序為「新索引 → 原子替換索引 → 原子替換清單」，清單不符時整個文件重新索引。
+
+Author: Orbit Engine Team
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .tle_stream_parser import (
+    TLECatalog,
+    build_catalog,
+    iter_tle_groups,
+    parse_tle_epoch,
+    parse_tle_lines,
+    read_tle_groups,
+    validate_tle_lines
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_INDEX_DIR = 'data/cache/tle_archive_index'
+
+MANIFEST_NAME = 'manifest.json'
+INDEX_NAME = 'index.npy'
+ARCHIVE_INDEX_FORMAT_VERSION = 1
+
+# 選擇模式: nearest = |epoch - X| 最小；latest_before = epoch <= X 中最新 (不使用未來數據)
+SELECTION_MODES = ('nearest', 'latest_before')
+
+INDEX_DTYPE = np.dtype([
+    ('constellation', 'U16'),
+    ('norad_id', 'U5'),
+    ('epoch', 'datetime64[us]'),
+    ('file_id', 'i4'),
+    ('offset', 'i8'),
+])
+
+
+class TLEArchiveIndex:
+    """
+    TLE 歷史存檔索引
+
+    使用方式:
+        index = TLEArchiveIndex('data/tle_data')
+        index.update()                                   # 只索引新增/改變的文件
+        selection = index.closest(datetime(2025, 10, 1, tzinfo=timezone.utc))
+        catalogs = index.load_catalogs(selection)        # 逐文件 TLECatalog
+    """
+
+    def __init__(self, tle_data_dir: Union[str, Path],
+                 index_dir: Union[str, Path] = DEFAULT_ARCHIVE_INDEX_DIR):
+        self.tle_data_dir = Path(tle_data_dir)
+        self.index_dir = Path(index_dir)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.entries = np.empty(0, dtype=INDEX_DTYPE)
+        self._group_starts: Optional[np.ndarray] = None
+        self._load()
+
+    # ==================== 建立 / 更新 ====================
+
+    def update(self, constellations: Iterable[str]) -> Dict[str, int]:
+        """
+        同步索引與存檔目錄 ({tle_data_dir}/{星座}/tle/{星座}_*.tle)
+
+        Returns:
+            {'indexed_files', 'reused_files', 'removed_files', 'total_records'}
+        """
+        current = {}
+        for constellation in constellations:
+            for path in sorted((self.tle_data_dir / constellation / 'tle').glob(f"{constellation}_*.tle")):
+                stat = path.stat()
+                current[path.relative_to(self.tle_data_dir).as_posix()] = {
+                    'constellation': constellation, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns
+                }
+
+        reused = {
+            rel: self.files[rel] for rel, info in current.items()
+            if rel in self.files and self.files[rel]['size'] == info['size']
+            and self.files[rel]['mtime_ns'] == info['mtime_ns']
+        }
+        stale = [rel for rel in current if rel not in reused]
+        removed = [rel for rel in self.files if rel not in current]
+
+        if not stale and not removed:
+            return {'indexed_files': 0, 'reused_files': len(reused), 'removed_files': 0,
+                    'total_records': len(self.entries)}
+
+        keep_ids = np.array([info['file_id'] for info in reused.values()], dtype=np.int32)
+        parts = [self.entries[np.isin(self.entries['file_id'], keep_ids)]]
+        next_id = max((info['file_id'] for info in self.files.values()), default=-1) + 1
+        files = dict(reused)
+        for rel in stale:
+            files[rel] = dict(current[rel], file_id=next_id)
+            parts.append(self._index_file(self.tle_data_dir / rel, current[rel]['constellation'], next_id))
+            next_id += 1
+
+        entries = np.concatenate(parts)
+        entries.sort(order=['constellation', 'norad_id', 'epoch'], kind='stable')
+        self._save(files, entries)
+
+        logger.info(
+            f"🗂️ TLE 存檔索引已更新: {len(stale)} 個文件重新索引, {len(reused)} 個沿用, "
+            f"{len(removed)} 個移除, 共 {len(entries)} 筆記錄"
+        )
+        return {'indexed_files': len(stale), 'reused_files': len(reused), 'removed_files': len(removed),
+                'total_records': len(entries)}
+
+    def _index_file(self, path: Path, constellation: str, file_id: int) -> np.ndarray:
+        rows = []
+        for offset, name, line1, line2 in iter_tle_groups(str(path)):
+            # 建立索引時只做格式檢查；載入時由 parse_tle_lines() 完整驗證
+            if validate_tle_lines(line1, line2, cross_check=False):
+                epoch = parse_tle_epoch(line1).replace(tzinfo=None)
+                rows.append((constellation, line1[2:7].strip(), np.datetime64(epoch, 'us'), file_id, offset))
+        return np.array(rows, dtype=INDEX_DTYPE)
+
+    # ==================== 查詢 ====================
+
+    def closest(self, reference_time: datetime, constellations: Optional[Iterable[str]] = None,
+                mode: str = 'nearest') -> np.ndarray:
+        """
+        每顆衛星 (星座, NORAD ID) 最接近參考時刻的 TLE
+
+        Args:
+            reference_time: 參考時刻 (UTC)
+            constellations: 限定星座 (None = 全部)
+            mode: 'nearest' 或 'latest_before' (只考慮 epoch <= 參考時刻)
+
+        Returns:
+            INDEX_DTYPE 結構化陣列 (依星座, NORAD ID 排序)
+        """
+        if mode not in SELECTION_MODES:
+            raise ValueError(f"❌ 未知的 TLE 選擇模式: {mode}，可用: {SELECTION_MODES}")
+        if len(self.entries) == 0:
+            return self.entries
+
+        t = np.datetime64(_as_naive_utc(reference_time), 'us')
+        starts = self._groups()
+        ends = np.append(starts[1:], len(self.entries))
+
+        # 每組內 epoch 已排序: epoch <= t 的數量即為 t 之後第一筆的組內位置
+        not_after = np.add.reduceat((self.entries['epoch'] <= t).astype(np.int64), starts)
+        after = starts + not_after
+        before = after - 1
+        has_before = not_after > 0
+        has_after = after < ends
+
+        if mode == 'latest_before':
+            chosen = before[has_before]
+        else:
+            before_gap = t - self.entries['epoch'][np.where(has_before, before, starts)]
+            after_gap = self.entries['epoch'][np.where(has_after, after, starts)] - t
+            use_after = has_after & (~has_before | (after_gap < before_gap))
+            chosen = np.where(use_after, after, before)
+
+        selection = self.entries[chosen]
+        if constellations is not None:
+            selection = selection[np.isin(selection['constellation'], list(constellations))]
+        return selection
+
+    def load_catalogs(self, selection: np.ndarray) -> List[TLECatalog]:
+        """
+        讀回選中記錄並完整驗證 (checksum 修復、epoch / mean_motion 解析)
+
+        Returns:
+            逐 (星座, 文件) 的 TLECatalog 列表，記錄依 NORAD ID 排序
+        """
+        paths = {info['file_id']: rel for rel, info in self.files.items()}
+        catalogs = []
+        for constellation in dict.fromkeys(selection['constellation'].tolist()):
+            rows = selection[selection['constellation'] == constellation]
+            for file_id in np.unique(rows['file_id']):
+                file_rows = rows[rows['file_id'] == file_id]
+                path = str(self.tle_data_dir / paths[int(file_id)])
+                records = [
+                    parse_tle_lines(name, line1, line2)
+                    for name, line1, line2 in read_tle_groups(path, file_rows['offset'])
+                    if validate_tle_lines(line1, line2)
+                ]
+                catalogs.append(build_catalog(constellation, path, records))
+        return catalogs
+
+    # ==================== 持久化 ====================
+
+    def _groups(self) -> np.ndarray:
+        if self._group_starts is None:
+            keys = self.entries[['constellation', 'norad_id']]
+            changed = np.ones(len(keys), dtype=bool)
+            changed[1:] = keys[1:] != keys[:-1]
+            self._group_starts = np.flatnonzero(changed)
+        return self._group_starts
+
+    def _load(self) -> None:
+        manifest_path = self.index_dir / MANIFEST_NAME
+        index_path = self.index_dir / INDEX_NAME
+        if not manifest_path.exists() or not index_path.exists():
+            return
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != ARCHIVE_INDEX_FORMAT_VERSION:
+            logger.info("🗂️ TLE 存檔索引格式版本不同，將重新建立")
+            return
+        entries = np.load(index_path, allow_pickle=False)
+        if entries.dtype != INDEX_DTYPE:
+            logger.info("🗂️ TLE 存檔索引欄位不同，將重新建立")
+            return
+        self.files = manifest['files']
+        self.entries = entries
+
+    def _save(self, files: Dict[str, Dict[str, Any]], entries: np.ndarray) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_index = self.index_dir / f".{INDEX_NAME}.tmp"
+        with open(tmp_index, 'wb') as f:
+            np.save(f, entries, allow_pickle=False)
+        os.replace(tmp_index, self.index_dir / INDEX_NAME)
+
+        tmp_manifest = self.index_dir / f".{MANIFEST_NAME}.tmp"
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump({'format_version': ARCHIVE_INDEX_FORMAT_VERSION, 'files': files}, f, indent=2)
+        os.replace(tmp_manifest, self.index_dir / MANIFEST_NAME)
+
+        self.files = files
+        self.entries = entries
+        self._group_starts = None
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
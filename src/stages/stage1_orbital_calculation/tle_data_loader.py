@@ -16,42 +16,23 @@ TLE數據載入器 - Stage 1模組化組件
 import os
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
 
-from shared.constants.tle_constants import TLEConstants
-from shared.constants.constellation_constants import ConstellationRegistry
+import numpy as np
 
-# ✅ P1-2: 導入 ChecksumValidator (統一 Checksum 驗證實現)
-from .validators.checksum_validator import ChecksumValidator
+from shared.constants.constellation_constants import ConstellationRegistry
 
-# 🎓 學術級驗證：引入 NASA 官方 sgp4 庫
-try:
-    from sgp4.io import twoline2rv, verify_checksum
-    from sgp4 import earth_gravity
-    SGP4_AVAILABLE = True
-except ImportError:
-    SGP4_AVAILABLE = False
-    logging.warning("sgp4 庫未安裝，將使用內建驗證（仍符合 NORAD 標準）")
+from .tle_archive_index import DEFAULT_ARCHIVE_INDEX_DIR, TLEArchiveIndex
+from .tle_stream_parser import TLECatalog, parse_tle_files
 
 logger = logging.getLogger(__name__)
 
 
-# ============================================================
-# ASCII 字符範圍常數定義
-# ============================================================
-
-# ASCII 可打印字符範圍
-# SOURCE: ASCII Standard (ANSI X3.4-1986)
-# 可打印字符範圍：空格(32)到波浪號(126)
-ASCII_PRINTABLE_MIN = 32   # 空格字符
-ASCII_PRINTABLE_MAX = 126  # 波浪號字符 (~)
-
-
 class TLEDataLoader:
     """TLE數據載入器"""
     
-    def __init__(self, tle_data_dir: str = None):
+    def __init__(self, tle_data_dir: str = None, max_workers: Optional[int] = None):
         # 自動檢測環境並設置TLE數據目錄
         if tle_data_dir is None:
             if os.path.exists("/orbit-engine") or Path(".").exists():
@@ -62,8 +43,11 @@ class TLEDataLoader:
         self.tle_data_dir = Path(tle_data_dir)
         self.logger = logging.getLogger(f"{__name__}.TLEDataLoader")
 
-        # ✅ P1-2: 初始化 ChecksumValidator (統一 Checksum 驗證實現)
-        self.checksum_validator = ChecksumValidator()
+        # 多星座文件並行解析的進程數 (None = CPU 核心數，1 = 順序解析)
+        self.max_workers = max_workers
+
+        # 最近一次載入的列式 TLE 目錄
+        self.catalogs: List[TLECatalog] = []
 
         # 載入統計
         self.load_statistics = {
@@ -172,37 +156,89 @@ class TLEDataLoader:
         else:
             self.logger.info(f"📥 開始載入衛星數據 (學術級完整數據)")
         
-        all_satellites = []
-        
+        # 每個星座最新文件一個解析任務 (多文件並行解析)
+        jobs = []
         for constellation, info in scan_result['constellations'].items():
             if not info['latest_file']:
                 continue
-                
+
             # ⚡ 效能優化：sample_mode下只載入部分數據
+            limit = self._sample_limit(constellation, sample_size) if sample_mode else None
+            jobs.append((info['latest_file'], constellation, limit))
+
+        # ✅ Fail-Fast: 載入失敗讓異常自然傳播，不使用 continue
+        return self._collect_satellites(self._parse_files(jobs), sample_mode)
+
+    def load_archive_satellites(self, reference_time: datetime, index_dir: str = DEFAULT_ARCHIVE_INDEX_DIR,
+                                selection_mode: str = 'nearest', sample_mode: bool = False,
+                                sample_size: int = 500) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        從 TLE 歷史存檔索引載入參考時刻的衛星數據 (每顆衛星最接近參考時刻的 TLE)
+
+        只索引新增或改變的存檔文件，並只讀回被選中的 TLE 記錄，
+        不需要掃描或載入整個存檔。
+
+        Args:
+            reference_time: 參考時刻 (UTC)
+            index_dir: 索引目錄
+            selection_mode: 'nearest' 或 'latest_before' (不使用參考時刻之後的 TLE)
+            sample_mode / sample_size: 與 load_satellite_data 相同
+
+        Returns:
+            (scan_result, 衛星數據列表)
+        """
+        self.logger.info(f"🗂️ 從 TLE 存檔索引載入參考時刻 {reference_time.isoformat()} 的衛星數據 ({selection_mode})")
+        index = TLEArchiveIndex(self.tle_data_dir, index_dir)
+        constellations = ConstellationRegistry.get_all_names()
+        index.update(constellations)
+        selection = index.closest(reference_time, constellations, mode=selection_mode)
+
+        scan_result = {
+            'constellations': {},
+            'total_constellations': 0,
+            'total_files': len(index.files),
+            'total_satellites': 0,
+            'reference_time': reference_time.isoformat(),
+            'selection_mode': selection_mode
+        }
+        selected = []
+        for constellation in constellations:
+            rows = selection[selection['constellation'] == constellation]
+            if len(rows) == 0:
+                continue
             if sample_mode:
-                # ✅ Fail-Fast: 不支援的星座立即失敗，不使用預設值
-                try:
-                    constellation_config = ConstellationRegistry.get_constellation(constellation)
-                except ValueError as e:
-                    raise ValueError(
-                        f"❌ 不支援的星座: {constellation}\n"
-                        f"支援的星座: {[c.name for c in ConstellationRegistry.SUPPORTED_CONSTELLATIONS]}\n"
-                        f"Fail-Fast 原則: 不使用預設配置"
-                    ) from e
-
-                constellation_sample_size = min(
-                    int(sample_size * constellation_config.sample_ratio),
-                    constellation_config.sample_max
-                )
-                satellites = self._load_tle_file(info['latest_file'], constellation, limit=constellation_sample_size)
-                self.logger.info(f"🧪 {constellation} 採樣載入: {len(satellites)} 顆衛星 (樣本模式)")
-            else:
-                satellites = self._load_tle_file(info['latest_file'], constellation)
-                self.logger.info(f"✅ {constellation} 載入完成: {len(satellites)} 顆衛星")
+                rows = rows[:self._sample_limit(constellation, sample_size)]
+            selected.append(rows)
+            epochs = rows['epoch']
+            scan_result['constellations'][constellation] = {
+                'files_count': len(np.unique(rows['file_id'])),
+                'earliest_epoch': str(epochs.min()),
+                'latest_epoch': str(epochs.max()),
+                'satellite_count': len(rows)
+            }
+            scan_result['total_satellites'] += len(rows)
+        scan_result['total_constellations'] = len(scan_result['constellations'])
+        self.load_statistics["files_scanned"] = scan_result['total_files']
+        self.load_statistics["constellations_found"] = scan_result['total_constellations']
+
+        catalogs = index.load_catalogs(np.concatenate(selected) if selected else selection)
+        self.catalogs = catalogs
+        return scan_result, self._collect_satellites(catalogs, sample_mode)
 
+    def _collect_satellites(self, catalogs: List[TLECatalog], sample_mode: bool) -> List[Dict[str, Any]]:
+        """TLE 目錄 → 衛星數據列表 (完整性檢查與載入統計)"""
+        all_satellites = []
+        loaded_counts: Dict[str, int] = {}
+        for catalog in catalogs:
+            satellites = self._catalog_satellites(catalog)
+            loaded_counts[catalog.constellation] = loaded_counts.get(catalog.constellation, 0) + len(satellites)
             all_satellites.extend(satellites)
-            # ✅ Fail-Fast: 載入失敗讓異常自然傳播，不使用 continue
-        
+        for constellation, count in loaded_counts.items():
+            if sample_mode:
+                self.logger.info(f"🧪 {constellation} 採樣載入: {count} 顆衛星 (樣本模式)")
+            else:
+                self.logger.info(f"✅ {constellation} 載入完成: {count} 顆衛星")
+
         # 🔥 數據完整性檢查
         if len(all_satellites) == 0:
             self.logger.error("🚨 未載入任何衛星數據")
@@ -225,305 +261,49 @@ class TLEDataLoader:
             self.logger.info(f"🔧 Checksum 修復統計: {self.checksum_fixes}/{total_lines} ({fix_percentage:.1f}%) 行已修復為官方標準")
 
         return all_satellites
-    
-    def _load_tle_file(self, file_path: str, constellation: str, limit: int = None) -> List[Dict[str, Any]]:
-        """載入單個TLE文件
-        
-        Args:
-            file_path: TLE文件路徑
-            constellation: 星座名稱
-            limit: 限制載入的衛星數量 (用於sample_mode)
-        """
-        satellites = []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f if line.strip()]
-            
-            # ⚡ 效能優化：sample_mode下限制處理的行數
-            if limit:
-                max_lines = min(len(lines), limit * 3)  # 每3行為一組
-                lines = lines[:max_lines]
-                self.logger.debug(
-                    f"🧪 採樣模式：限制處理 {max_lines} 行 "
-                    f"(預期 ~{limit} 顆衛星，實際數量取決於文件格式)"
-                )
-            
-            # 每3行為一組：衛星名稱、TLE Line 1、TLE Line 2
-            for i in range(0, len(lines), 3):
-                if i + 2 >= len(lines):
-                    break
-                
-                # ⚡ 效能優化：sample_mode下提前退出
-                if limit and len(satellites) >= limit:
-                    self.logger.debug(f"🧪 已達到採樣限制 {limit} 顆衛星，停止載入")
-                    break
-                
-                satellite_name = lines[i]
-                tle_line1 = lines[i + 1]
-                tle_line2 = lines[i + 2]
-                
-                # 基本TLE格式驗證
-                if not self._validate_tle_format(tle_line1, tle_line2):
-                    self.logger.debug(f"跳過無效TLE: {satellite_name}")
-                    continue
-                
-                # 修復 TLE checksum（使用官方標準重新計算）
-                fixed_line1 = self._fix_tle_checksum(tle_line1)
-                fixed_line2 = self._fix_tle_checksum(tle_line2)
-
-                # 解析 TLE epoch 時間
-                epoch_datetime = self._parse_tle_epoch(fixed_line1)
-
-                # 🔑 提取 mean_motion (每天繞地球圈數)
-                # SOURCE: TLE Format Specification - Line 2, columns 53-63
-                # mean_motion單位: revs/day (每天繞地球圈數)
-                mean_motion = self._extract_mean_motion(fixed_line2)
-
-                satellite_data = {
-                    "name": satellite_name,
-                    "constellation": constellation,
-                    "tle_line1": fixed_line1,
-                    "tle_line2": fixed_line2,
-                    "line1": fixed_line1,  # 兼容性別名
-                    "line2": fixed_line2,  # 兼容性別名
-                    "norad_id": self._extract_norad_id(fixed_line1),
-                    "satellite_id": self._extract_norad_id(fixed_line1),  # 兼容性別名
-                    "epoch_datetime": epoch_datetime.isoformat() if epoch_datetime else None,
-                    "mean_motion": mean_motion,  # 🔑 新增字段
-                    "source_file": file_path
-                }
-                
-                satellites.append(satellite_data)
-                
-        except Exception as e:
-            raise RuntimeError(f"載入TLE文件失敗 {file_path}: {e}")
-        
-        return satellites
-    
-    def _validate_tle_format(self, line1: str, line2: str) -> bool:
-        """
-        嚴格 TLE 格式驗證 - 符合 NORAD 官方標準
-
-        🎓 學術級雙重驗證策略：
-        1. 內建驗證（基礎層）：69字符格式、ASCII、結構完整性
-        2. NASA sgp4 驗證（增強層）：官方解析器驗證（若可用）
-
-        Academic Compliance:
-        - 實現基於 NORAD/NASA 官方 TLE 格式規範
-        - 參考：CelesTrak TLE Format (https://celestrak.org/NORAD/documentation/tle-fmt.php)
-        - 與 python-sgp4 (Rhodes, 2020) 標準一致
-        - Checksum 在後續 _fix_tle_checksum() 中修復（容錯處理）
 
-        Note: Checksum 驗證移至修復後，因為源數據可能有錯誤 checksum，
-              但我們會使用官方算法修復它，確保學術合規性。
-        """
+    def _sample_limit(self, constellation: str, sample_size: int) -> int:
+        """sample_mode 下單一星座的載入上限"""
+        # ✅ Fail-Fast: 不支援的星座立即失敗，不使用預設值
         try:
-            # ✅ Layer 1: 基礎格式驗證（內建實現）
-
-            # 1.1 嚴格長度檢查: 必須恰好 69 字符
-            if len(line1) != TLEConstants.TLE_LINE_LENGTH or len(line2) != TLEConstants.TLE_LINE_LENGTH:
-                return False
-
-            # 1.2 檢查行首標識
-            if line1[0] != '1' or line2[0] != '2':
-                return False
-
-            # 1.3 檢查 NORAD ID 一致性
-            norad_id1 = line1[2:7].strip()
-            norad_id2 = line2[2:7].strip()
-            if norad_id1 != norad_id2:
-                return False
-
-            # 1.4 ASCII 字符檢查（使用定義的常數）
-            if not all(ASCII_PRINTABLE_MIN <= ord(c) <= ASCII_PRINTABLE_MAX for c in line1):
-                return False
-            if not all(ASCII_PRINTABLE_MIN <= ord(c) <= ASCII_PRINTABLE_MAX for c in line2):
-                return False
-
-            # 1.5 檢查關鍵字段可解析性
-            if len(line1) < 32:
-                return False
-            epoch_str = line1[18:32].strip()
-            if not epoch_str or len(epoch_str) < 5:
-                return False
-
-            # ✅ Layer 2: NASA sgp4 官方驗證（增強檢查）
-            if SGP4_AVAILABLE:
-                try:
-                    # 使用 NASA 官方解析器驗證 TLE
-                    # 若 TLE 格式錯誤，twoline2rv 會拋出 ValueError
-                    satellite = twoline2rv(line1, line2, earth_gravity.wgs72)
-
-                    # 驗證成功：可提取官方解析的 epoch（用於交叉驗證）
-                    # satellite.epochyr, satellite.epochdays 等已驗證可用
-                    self.logger.debug(f"✅ NASA sgp4 驗證通過: NORAD {norad_id1}")
-
-                except ValueError as e:
-                    # sgp4 官方解析失敗，記錄警告但不阻止（容錯）
-                    self.logger.warning(f"⚠️ NASA sgp4 驗證失敗 (NORAD {norad_id1}): {e}")
-                    # 注意：此處不返回 False，因為內建驗證已通過
-                    # 僅記錄警告供後續檢查
-                except Exception as e:
-                    self.logger.debug(f"sgp4 驗證異常: {e}")
-
-            return True
-
-        except Exception:
-            return False
-    
-    def _extract_norad_id(self, tle_line1: str) -> str:
-        """
-        提取NORAD衛星ID
-
-        Args:
-            tle_line1: TLE Line 1
-
-        Returns:
-            str: NORAD ID
-
-        Raises:
-            ValueError: 當 TLE Line1 格式無效時
-        """
-        # ✅ Fail-Fast: 格式錯誤立即拋出異常
-        if not tle_line1 or len(tle_line1) < 7:
+            constellation_config = ConstellationRegistry.get_constellation(constellation)
+        except ValueError as e:
             raise ValueError(
-                f"❌ TLE Line1 格式無效，無法提取 NORAD ID\n"
-                f"Line1: {tle_line1[:20] if tle_line1 else 'None'}...\n"
-                f"Fail-Fast 原則: 立即失敗，不返回 UNKNOWN"
-            )
-
-        try:
-            norad_id = tle_line1[2:7].strip()
-            if not norad_id:
-                raise ValueError("NORAD ID 為空")
-            return norad_id
-        except Exception as e:
-            raise ValueError(
-                f"❌ 無法提取 NORAD ID\n"
-                f"錯誤: {e}"
+                f"❌ 不支援的星座: {constellation}\n"
+                f"支援的星座: {[c.name for c in ConstellationRegistry.SUPPORTED_CONSTELLATIONS]}\n"
+                f"Fail-Fast 原則: 不使用預設配置"
             ) from e
 
-    def _extract_mean_motion(self, tle_line2: str) -> float:
-        """
-        從 TLE Line 2 提取平均運動速率 (mean motion)
-
-        SOURCE: TLE Format Specification - Line 2, columns 53-63
-        mean_motion: 每天繞地球圈數 (revolutions per day)
+        return min(
+            int(sample_size * constellation_config.sample_ratio),
+            constellation_config.sample_max
+        )
+    
+    def _load_tle_file(self, file_path: str, constellation: str, limit: int = None) -> List[Dict[str, Any]]:
+        """載入單個TLE文件
 
         Args:
-            tle_line2: TLE Line 2
-
-        Returns:
-            float: mean_motion (revs/day)
-
-        Raises:
-            ValueError: 當 TLE Line2 格式無效或無法解析時
-        """
-        if not tle_line2 or len(tle_line2) < 63:
-            raise ValueError(
-                f"❌ TLE Line2 格式無效，無法提取 mean_motion\n"
-                f"Line2: {tle_line2[:20] if tle_line2 else 'None'}..."
-            )
-
-        try:
-            # TLE Line 2 格式: columns 53-63 = mean motion (revs/day)
-            mean_motion_str = tle_line2[52:63].strip()
-            mean_motion = float(mean_motion_str)
-
-            if mean_motion <= 0:
-                raise ValueError(f"mean_motion 必須 > 0，實際值: {mean_motion}")
-
-            return mean_motion
-
-        except Exception as e:
-            raise ValueError(
-                f"❌ 無法提取 mean_motion\n"
-                f"Line2: {tle_line2}\n"
-                f"錯誤: {e}"
-            ) from e
-
-    def _parse_tle_epoch(self, tle_line1: str) -> Optional['datetime']:
+            file_path: TLE文件路徑
+            constellation: 星座名稱
+            limit: 限制載入的衛星數量 (用於sample_mode)
         """
-        解析 TLE Line 1 中的 epoch 時間
+        return self._catalog_satellites(self._parse_files([(file_path, constellation, limit)])[0])
 
-        TLE 格式: epoch = YYDDD.DDDDDDDD
-        YY: 年份 (00-57 = 2000-2057, 58-99 = 1958-1999)
-        DDD.DDDDDDDD: 一年中的天數 (含小數部分)
-        """
+    def _parse_files(self, jobs: List[Tuple[str, str, Optional[int]]]) -> List[TLECatalog]:
+        """串流解析 TLE 文件 (多文件並行)，保留列式目錄供後續查詢"""
         try:
-            from datetime import datetime, timezone, timedelta
-
-            # 從 TLE Line 1 第 18-32 位提取 epoch
-            epoch_str = tle_line1[18:32].strip()
-
-            # 解析年份 (YY format)
-            year_str = epoch_str[:2]
-            year = int(year_str)
-            if year <= 57:
-                year += 2000
-            else:
-                year += 1900
-
-            # 解析年中天數
-            day_of_year = float(epoch_str[2:])
-
-            # 建立基準時間 (該年 1 月 1 日)
-            base_date = datetime(year, 1, 1, tzinfo=timezone.utc)
-
-            # 計算實際日期 (天數 - 1 因為 1 月 1 日是第 1 天)
-            epoch_date = base_date + timedelta(days=day_of_year - 1)
-
-            return epoch_date
-
+            catalogs = parse_tle_files(jobs, max_workers=self.max_workers)
         except Exception as e:
-            # ✅ Fail-Fast: Epoch 解析失敗立即拋出異常
-            raise ValueError(
-                f"❌ 無法解析 TLE epoch 時間\n"
-                f"Line1 前40字符: {tle_line1[:40] if tle_line1 else 'None'}...\n"
-                f"錯誤: {e}\n"
-                f"Fail-Fast 原則: 立即失敗，不返回 None"
-            ) from e
-
-    def _fix_tle_checksum(self, tle_line: str) -> str:
-        """
-        修復 TLE 行的 checksum（使用 ChecksumValidator 統一實現）
-
-        ✅ P1-2 重構：使用 ChecksumValidator 作為 Single Source of Truth
-        移除重複的 checksum 計算邏輯，統一使用官方標準化實現
+            raise RuntimeError(f"載入TLE文件失敗 {[job[0] for job in jobs]}: {e}") from e
 
-        Args:
-            tle_line: TLE 行字符串（69字符）
-
-        Returns:
-            str: 修復後的 TLE 行（69字符）
-        """
-        if len(tle_line) != 69:
-            return tle_line  # 如果長度不對，返回原行
+        self.catalogs = catalogs
+        return catalogs
 
-        try:
-            # ✅ 使用 ChecksumValidator 統一實現
-            fixed_line = self.checksum_validator.fix_checksum(tle_line)
-
-            # 如果 checksum 被修復了，記錄統計
-            if fixed_line != tle_line:
-                if not hasattr(self, 'checksum_fixes'):
-                    self.checksum_fixes = 0
-                self.checksum_fixes += 1
-                original_checksum = tle_line[68]
-                correct_checksum = fixed_line[68]
-                self.logger.debug(f"🔧 修復 checksum: {original_checksum} → {correct_checksum}")
-
-            return fixed_line
-
-        except Exception as e:
-            # ✅ Fail-Fast: Checksum 修復失敗立即拋出異常
-            raise ValueError(
-                f"❌ 無法修復 TLE checksum\n"
-                f"原始行: {tle_line}\n"
-                f"錯誤: {e}\n"
-                f"Fail-Fast 原則: Checksum 無效時應拒絕數據"
-            ) from e
+    def _catalog_satellites(self, catalog: TLECatalog) -> List[Dict[str, Any]]:
+        """目錄 → 衛星字典列表，並累計 checksum 修復統計"""
+        if catalog.checksum_fixes:
+            self.checksum_fixes = getattr(self, 'checksum_fixes', 0) + catalog.checksum_fixes
+        return catalog.to_satellites()
 
     def get_load_statistics(self) -> Dict[str, Any]:
         """獲取載入統計信息"""
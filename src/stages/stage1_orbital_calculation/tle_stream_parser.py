@@ -0,0 +1,343 @@
+"""
+TLE 串流解析器 - Stage 1 單次遍歷 TLE 解析
+
+職責：
+1. 逐行串流讀取 3-line TLE 文件 (不先讀入整個文件)，記錄每組的位元組偏移
+2. 同一遍完成格式驗證、checksum 修復、epoch 與 mean_motion 解析
+3. 將驗證後的記錄收集為 NumPy 結構化陣列 (TLECatalog)
+4. 多個星座文件可於獨立進程中並行解析
+
+與 TLEDataLoader 既有行為一致：
+- 非空行 (strip 後) 每 3 行一組：名稱、Line 1、Line 2，不完整的尾組丟棄
+- 格式無效的記錄跳過；epoch / mean_motion 無法解析時 Fail-Fast
+- checksum 以官方 Modulo 10 算法重新計算並寫回第 69 字符
+
+🎓 學術級實現：
+- 參考文獻：CelesTrak TLE Format Documentation
+- python-sgp4 (Brandon Rhodes) 官方解析器交叉驗證 (sgp4.api C 加速版，若可用，僅記錄警告)
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared.constants.tle_constants import TLEConstants
+
+from .validators.checksum_validator import ChecksumValidator
+
+try:
+    from sgp4.api import Satrec, WGS72
+    SGP4_AVAILABLE = True
+except ImportError:
+    SGP4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class TLERecord(NamedTuple):
+    """單筆已驗證的 TLE 記錄 (checksum 已修復)"""
+    name: str
+    norad_id: str
+    line1: str
+    line2: str
+    epoch: datetime
+    mean_motion: float
+    checksum_fixes: int
+
+
+@dataclass
+class TLECatalog:
+    """
+    單一 TLE 文件的列式目錄
+
+    records 為 NumPy 結構化陣列，欄位:
+        name, norad_id, line1, line2 (固定寬度字串)
+        epoch (datetime64[us], UTC), mean_motion (revs/day), checksum_fixes (修復行數)
+    """
+    constellation: str
+    source_file: str
+    records: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def checksum_fixes(self) -> int:
+        return int(self.records['checksum_fixes'].sum())
+
+    def to_satellites(self) -> List[Dict[str, Any]]:
+        """轉為 Stage 1 輸出的衛星字典列表 (欄位與 TLEDataLoader 既有格式相同)"""
+        epochs = self.records['epoch'].astype(datetime)
+        satellites = []
+        for row, epoch in zip(self.records, epochs):
+            line1 = str(row['line1'])
+            line2 = str(row['line2'])
+            norad_id = str(row['norad_id'])
+            satellites.append({
+                "name": str(row['name']),
+                "constellation": self.constellation,
+                "tle_line1": line1,
+                "tle_line2": line2,
+                "line1": line1,  # 兼容性別名
+                "line2": line2,  # 兼容性別名
+                "norad_id": norad_id,
+                "satellite_id": norad_id,  # 兼容性別名
+                "epoch_datetime": epoch.replace(tzinfo=timezone.utc).isoformat(),
+                "mean_motion": float(row['mean_motion']),
+                "source_file": self.source_file
+            })
+        return satellites
+
+
+def catalog_dtype(name_length: int) -> np.dtype:
+    """TLE 目錄結構化陣列 dtype (名稱寬度依文件內最長名稱)"""
+    return np.dtype([
+        ('name', f'U{max(name_length, 1)}'),
+        ('norad_id', 'U5'),
+        ('line1', f'U{TLEConstants.TLE_LINE_LENGTH}'),
+        ('line2', f'U{TLEConstants.TLE_LINE_LENGTH}'),
+        ('epoch', 'datetime64[us]'),
+        ('mean_motion', 'f8'),
+        ('checksum_fixes', 'u1'),
+    ])
+
+
+def iter_tle_groups(file_path: str, limit: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+    """
+    串流讀取 TLE 文件的 3 行組 (不做驗證)
+
+    Args:
+        file_path: TLE 文件路徑
+        limit: 最多讀取的 3 行組數 (sample_mode 用)
+
+    Yields:
+        (名稱行的位元組偏移, 名稱, Line 1, Line 2)
+    """
+    group: List[str] = []
+    group_offset = 0
+    groups_read = 0
+    offset = 0
+    with open(file_path, 'rb') as f:
+        for raw_line in f:
+            line_offset = offset
+            offset += len(raw_line)
+            line = raw_line.decode('utf-8').strip()
+            if not line:
+                continue
+            if not group:
+                group_offset = line_offset
+            group.append(line)
+            if len(group) < 3:
+                continue
+
+            name, line1, line2 = group
+            group = []
+            groups_read += 1
+            yield group_offset, name, line1, line2
+
+            # ⚡ sample_mode: 達到組數限制即停止讀取
+            if limit and groups_read >= limit:
+                logger.debug(f"🧪 已達到採樣限制 {limit} 組 TLE，停止讀取")
+                return
+
+
+def read_tle_groups(file_path: str, offsets: Sequence[int]) -> List[Tuple[str, str, str]]:
+    """依 iter_tle_groups() 記錄的位元組偏移讀回 3 行組 (不掃描整個文件)"""
+    groups = []
+    with open(file_path, 'rb') as f:
+        for offset in offsets:
+            f.seek(int(offset))
+            group: List[str] = []
+            while len(group) < 3:
+                raw_line = f.readline()
+                if not raw_line:
+                    raise ValueError(f"❌ TLE 文件在偏移 {offset} 之後不完整: {file_path}")
+                line = raw_line.decode('utf-8').strip()
+                if line:
+                    group.append(line)
+            groups.append(tuple(group))
+    return groups
+
+
+def iter_tle_records(file_path: str, limit: Optional[int] = None) -> Iterator[TLERecord]:
+    """
+    串流解析 TLE 文件，逐筆產生已驗證的記錄
+
+    Args:
+        file_path: TLE 文件路徑
+        limit: 最多讀取的 3 行組數 (sample_mode 用)
+
+    Yields:
+        TLERecord
+
+    Raises:
+        ValueError: epoch / mean_motion 無法解析 (Fail-Fast)
+    """
+    for _, name, line1, line2 in iter_tle_groups(file_path, limit=limit):
+        if validate_tle_lines(line1, line2):
+            yield parse_tle_lines(name, line1, line2)
+        else:
+            logger.debug(f"跳過無效TLE: {name}")
+
+
+def validate_tle_lines(line1: str, line2: str, cross_check: bool = True) -> bool:
+    """
+    嚴格 TLE 格式驗證 - 符合 NORAD 官方標準
+
+    1. 恰好 69 字符、行首標識、NORAD ID 一致
+    2. 只包含 ASCII 可打印字符 (32-126)
+    3. epoch 欄位存在
+    4. NASA sgp4 官方解析器交叉驗證 (cross_check 且 sgp4 可用時，失敗只記錄警告)
+
+    Checksum 不在此檢查，由 parse_tle_lines() 以官方算法修復。
+    """
+    if len(line1) != TLEConstants.TLE_LINE_LENGTH or len(line2) != TLEConstants.TLE_LINE_LENGTH:
+        return False
+    if line1[0] != '1' or line2[0] != '2':
+        return False
+    norad_id = line1[2:7].strip()
+    if norad_id != line2[2:7].strip():
+        return False
+    # ASCII 可打印字符範圍：空格(32)到波浪號(126)
+    if not (line1.isascii() and line1.isprintable() and line2.isascii() and line2.isprintable()):
+        return False
+    if len(line1[18:32].strip()) < 5:
+        return False
+
+    if cross_check and SGP4_AVAILABLE:
+        # sgp4 官方解析 + 初始化 (C 加速)，失敗記錄警告但不阻止（容錯，內建驗證已通過）
+        try:
+            error = Satrec.twoline2rv(line1, line2, WGS72).error
+            if error:
+                logger.warning(f"⚠️ NASA sgp4 驗證失敗 (NORAD {norad_id}): 初始化錯誤碼 {error}")
+        except ValueError as e:
+            logger.warning(f"⚠️ NASA sgp4 驗證失敗 (NORAD {norad_id}): {e}")
+        except Exception as e:
+            logger.debug(f"sgp4 驗證異常: {e}")
+
+    return True
+
+
+def parse_tle_lines(name: str, line1: str, line2: str) -> TLERecord:
+    """
+    解析已通過格式驗證的 TLE：修復 checksum、解析 epoch 與 mean_motion
+
+    Raises:
+        ValueError: epoch 或 mean_motion 無法解析
+    """
+    fixed_line1 = _fix_checksum(line1)
+    fixed_line2 = _fix_checksum(line2)
+    fixes = (fixed_line1 != line1) + (fixed_line2 != line2)
+    return TLERecord(
+        name=name,
+        norad_id=_extract_norad_id(fixed_line1),
+        line1=fixed_line1,
+        line2=fixed_line2,
+        epoch=parse_tle_epoch(fixed_line1),
+        mean_motion=_extract_mean_motion(fixed_line2),
+        checksum_fixes=fixes
+    )
+
+
+def parse_tle_epoch(tle_line1: str) -> datetime:
+    """
+    解析 TLE Line 1 中的 epoch 時間
+
+    TLE 格式: epoch = YYDDD.DDDDDDDD
+    YY: 年份 (00-57 = 2000-2057, 58-99 = 1958-1999)
+    DDD.DDDDDDDD: 一年中的天數 (含小數部分)
+    """
+    try:
+        epoch_str = tle_line1[18:32].strip()
+        year = int(epoch_str[:2])
+        year += 2000 if year <= 57 else 1900
+        day_of_year = float(epoch_str[2:])
+        # 天數 - 1 因為 1 月 1 日是第 1 天
+        return datetime(year, 1, 1, tzinfo=timezone.utc) + timedelta(days=day_of_year - 1)
+    except Exception as e:
+        # ✅ Fail-Fast: Epoch 解析失敗立即拋出異常
+        raise ValueError(
+            f"❌ 無法解析 TLE epoch 時間\n"
+            f"Line1 前40字符: {tle_line1[:40]}...\n"
+            f"錯誤: {e}\n"
+            f"Fail-Fast 原則: 立即失敗，不返回 None"
+        ) from e
+
+
+def parse_tle_file(file_path: str, constellation: str, limit: Optional[int] = None) -> TLECatalog:
+    """串流解析單一 TLE 文件為 TLECatalog"""
+    return build_catalog(constellation, file_path, list(iter_tle_records(file_path, limit=limit)))
+
+
+def build_catalog(constellation: str, source_file: str, records: Sequence[TLERecord]) -> TLECatalog:
+    """TLERecord 列表 → TLECatalog"""
+    name_length = max((len(record.name) for record in records), default=1)
+    array = np.empty(len(records), dtype=catalog_dtype(name_length))
+    for i, record in enumerate(records):
+        array[i] = (
+            record.name, record.norad_id, record.line1, record.line2,
+            np.datetime64(record.epoch.replace(tzinfo=None), 'us'),
+            record.mean_motion, record.checksum_fixes
+        )
+    return TLECatalog(constellation=constellation, source_file=source_file, records=array)
+
+
+def _parse_tle_job(job: Tuple[str, str, Optional[int]]) -> TLECatalog:
+    return parse_tle_file(*job)
+
+
+def parse_tle_files(jobs: Sequence[Tuple[str, str, Optional[int]]],
+                    max_workers: Optional[int] = None) -> List[TLECatalog]:
+    """
+    解析多個 TLE 文件 (每個文件一個進程，結果順序與輸入相同)
+
+    Args:
+        jobs: [(file_path, constellation, limit), ...]
+        max_workers: 最大進程數 (None = CPU 核心數，1 = 主進程順序解析)
+    """
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [_parse_tle_job(job) for job in jobs]
+
+    logger.info(f"🚀 並行解析 {len(jobs)} 個 TLE 文件 ({workers} 個進程)")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_tle_job, jobs))
+
+
+_checksum_validator = ChecksumValidator()
+
+
+def _fix_checksum(tle_line: str) -> str:
+    checksum = _checksum_validator.calculate_checksum(tle_line)
+    return tle_line[:TLEConstants.TLE_CHECKSUM_POSITION] + str(checksum)
+
+
+def _extract_norad_id(tle_line1: str) -> str:
+    norad_id = tle_line1[2:7].strip()
+    if not norad_id:
+        raise ValueError(f"❌ 無法提取 NORAD ID\nLine1: {tle_line1[:20]}...")
+    return norad_id
+
+
+def _extract_mean_motion(tle_line2: str) -> float:
+    # SOURCE: TLE Format Specification - Line 2, columns 53-63 (revs/day)
+    try:
+        mean_motion = float(tle_line2[52:63].strip())
+    except ValueError as e:
+        raise ValueError(
+            f"❌ 無法提取 mean_motion\n"
+            f"Line2: {tle_line2}\n"
+            f"錯誤: {e}"
+        ) from e
+    if mean_motion <= 0:
+        raise ValueError(
+            f"❌ 無法提取 mean_motion\n"
+            f"Line2: {tle_line2}\n"
+            f"錯誤: mean_motion 必須 > 0，實際值: {mean_motion}"
+        )
+    return mean_motion
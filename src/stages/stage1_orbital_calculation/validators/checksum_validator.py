@@ -15,6 +15,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Checksum 字元轉換表 (bytes.translate，於 C 層完成逐字元掃描)
+_CHECKSUM_TABLE = bytes.maketrans(b'-', b'1')
+_CHECKSUM_IGNORED = bytes(c for c in range(256) if not (ord('0') <= c <= ord('9') or c == ord('-')))
+
 
 class ChecksumValidator:
     """TLE Checksum 驗證器（NORAD 官方標準）"""
@@ -124,15 +128,9 @@ class ChecksumValidator:
                 f"實際長度: {len(tle_line) if tle_line else 0}"
             )
 
-        checksum = 0
-        for char in tle_line[:68]:
-            if char.isdigit():
-                checksum += int(char)
-            elif char == '-':
-                checksum += 1
-            # 其他字符（字母、空格、句點、正號+）被忽略
-
-        return checksum % 10
+        # 減號映射為 '1'，其他字符（字母、空格、句點、正號+）被刪除，剩下的數字直接加總
+        digits = tle_line[:68].encode('ascii', 'replace').translate(_CHECKSUM_TABLE, _CHECKSUM_IGNORED)
+        return (sum(digits) - ord('0') * len(digits)) % 10
 
     def fix_checksum(self, tle_line: str) -> str:
         """
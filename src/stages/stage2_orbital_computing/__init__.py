@@ -16,12 +16,16 @@ v3.0 架構變更：
 
 核心組件：
 - SGP4Calculator: 標準軌道傳播計算
+- AdaptiveTimeSampler: 可見窗口導向的自適應時間取樣
+- PassPredictor / PassIndex: 地面站過境預測與時間區間索引
 - Stage2OrbitalPropagationProcessor: 軌道狀態傳播流程
 - TEMEPosition: TEME 座標系統數據結構
 - OrbitalStateResult: 軌道狀態結果
 """
 
-from .sgp4_calculator import SGP4Calculator, SGP4Position, SGP4OrbitResult
+from .sgp4_calculator import SGP4Calculator, SGP4Position, SGP4OrbitResult, SGP4BatchResult
+from .adaptive_time_sampling import AdaptiveTimeSampler
+from .pass_predictor import PassIndex, PassPredictor, PassRecord
 from .stage2_orbital_computing_processor import (
     Stage2OrbitalPropagationProcessor,
     create_stage2_processor,
@@ -35,12 +39,17 @@ __all__ = [
     'SGP4Calculator',
     'Stage2OrbitalPropagationProcessor',
     'create_stage2_processor',
+    'AdaptiveTimeSampler',
+    'PassPredictor',
+    'PassIndex',
 
     # 數據結構
     'SGP4Position',
     'SGP4OrbitResult',
+    'SGP4BatchResult',
     'TEMEPosition',
-    'OrbitalStateResult'
+    'OrbitalStateResult',
+    'PassRecord'
 ]
 
 # 版本信息
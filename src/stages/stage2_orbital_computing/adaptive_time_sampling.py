@@ -0,0 +1,404 @@
+"""
+🛰️ 自適應時間取樣 - 可見窗口導向的 SGP4 傳播
+
+固定 interval_seconds (30 秒) 網格中大部分時間點衛星位於地平線以下，
+Stage 4 會全部捨棄。自適應模式只在可能可見的區段以標準網格傳播:
+
+✅ 粗網格 (預設 300 秒) 一次 SatrecArray 傳播全部衛星，計算與地面站的地心夾角 θ
+✅ 地平線半角 λ(r) = arccos(R_gs · cos ε / r) - ε 與角速率上界判斷每個粗區間
+   是否可能出現 θ <= λ (保守界限，不漏掉任何可見時間點)
+✅ 只對可能區間在標準網格上細化傳播 (sgp4_array 逐衛星)
+✅ 升起 / 最高點 / 落下時刻以 SGP4 直接求根 (二分法 / 黃金分割搜尋)
+✅ 輸出仍為標準網格 OrbitalStateBlock，僅可見窗口 (仰角 >= elevation_mask_deg) 內 valid
+
+⚠️ 本模組僅決定「傳播哪些時間點」: elevation_mask_deg 預設 0° (低於所有星座門檻)，
+   星座門檻、距離約束與鏈路可行性仍由 Stage 4 判斷。
+
+SOURCE:
+- Vallado, D. A. (2013). Fundamentals of Astrodynamics and Applications, 4th Ed.
+  Section 11.3 (Site-track / rise-set prediction)
+- Wertz, J. R. (2011). Space Mission Engineering, Section 8.3 (地平線幾何)
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+from skyfield.api import wgs84
+from skyfield.framelib import itrs
+from skyfield.sgp4lib import TEME
+
+from shared.constants.ground_station_constants import get_observation_location
+from shared.constants.physics_constants import PhysicsConstants
+
+logger = logging.getLogger(__name__)
+
+# 預設粗網格步長 (秒)
+DEFAULT_COARSE_STEP_SECONDS = 300.0
+
+# 地心天頂與大地天頂夾角 (< 0.2°) 及區間內高度變化的保守緩衝 (度)
+HORIZON_MARGIN_DEG = 1.0
+
+# 平均運動推導的角速率上界安全係數 (SGP4 攝動)
+RATE_MARGIN = 1.05
+
+# 升起 / 落下 / 最高點求根精度 (秒)
+ROOT_TOLERANCE_SECONDS = 0.01
+
+EARTH_ROTATION_RATE_RAD_S = PhysicsConstants.EARTH_ROTATION_RATE
+
+GOLDEN_RATIO_CONJUGATE = (math.sqrt(5.0) - 1.0) / 2.0
+
+# Skyfield rotation_at() 每次計算的時刻數上限
+# IAU 2000A 章動級數中間陣列約 22 KB/時刻 (一週 30 秒網格一次計算約 450 MB)
+ROTATION_CHUNK_TIMES = 2048
+
+
+def resolve_station(station: Any) -> Dict[str, Any]:
+    """
+    地面站配置 → {'name', 'latitude_deg', 'longitude_deg', 'altitude_m'}
+
+    名稱字串 (或只有 name 的字典) 從 ground_station_constants 讀取實測座標 (Single Source of Truth)
+    """
+    if isinstance(station, str):
+        station = {'name': station}
+    if 'latitude_deg' not in station and 'longitude_deg' not in station:
+        station = {**get_observation_location(station['name']), **station}
+    missing = [key for key in ('latitude_deg', 'longitude_deg', 'altitude_m') if station.get(key) is None]
+    if missing:
+        raise ValueError(
+            f"❌ Fail-Fast: 地面站 {station.get('name', '')} 座標不完整，缺少: {missing}\n"
+            f"依據: ACADEMIC_STANDARDS.md - 地面站座標必須為實測值，禁止預設值"
+        )
+    return station
+
+
+def split_julian_dates(t: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """與 Skyfield EarthSatellite._position_and_velocity_TEME_km() 相同的 UTC 儒略日拆分"""
+    return t.whole, t.tai_fraction - t._leap_seconds() / 86400.0
+
+
+def frame_rotation(frame: Any, t: Any) -> np.ndarray:
+    """frame.rotation_at(t) 依時間分塊計算 (3, 3, N_t)，矩陣與一次計算完全相同"""
+    n_times = len(t)
+    if n_times <= ROTATION_CHUNK_TIMES:
+        return frame.rotation_at(t)
+    return np.concatenate([
+        frame.rotation_at(t[start:start + ROTATION_CHUNK_TIMES])
+        for start in range(0, n_times, ROTATION_CHUNK_TIMES)
+    ], axis=-1)
+
+
+class AdaptiveTimeSampler:
+    """
+    自適應時間取樣器
+
+    使用方式 (由 SGP4Calculator.propagate_adaptive 呼叫):
+        sample_mask = sampler.plan_samples(satrecs, time_points)
+        elevation = sampler.elevation_deg(positions_gcrs_km, time_points)
+        events = sampler.find_pass_events(satrecs, satellite_ids, time_points, elevation >= mask)
+    """
+
+    def __init__(self, timescale: Any, station: Dict[str, Any], interval_seconds: float,
+                 coarse_step_seconds: float = DEFAULT_COARSE_STEP_SECONDS,
+                 elevation_mask_deg: float = 0.0):
+        """
+        Args:
+            timescale: Skyfield Timescale
+            station: {'name', 'latitude_deg', 'longitude_deg', 'altitude_m'}
+            interval_seconds: 標準輸出網格間隔 (秒)
+            coarse_step_seconds: 粗網格步長 (秒)，須 >= interval_seconds
+            elevation_mask_deg: 可見窗口仰角下限 (度)
+        """
+        if interval_seconds <= 0:
+            raise ValueError(f"❌ interval_seconds 必須為正數: {interval_seconds}")
+        if coarse_step_seconds < interval_seconds:
+            raise ValueError(
+                f"❌ coarse_step_seconds ({coarse_step_seconds}) 必須 >= interval_seconds ({interval_seconds})"
+            )
+
+        self.ts = timescale
+        self.station_name = station.get('name', 'custom')
+        self.interval_seconds = float(interval_seconds)
+        self.coarse_step_seconds = float(coarse_step_seconds)
+        self.elevation_mask_deg = float(elevation_mask_deg)
+
+        lat_rad = math.radians(station['latitude_deg'])
+        lon_rad = math.radians(station['longitude_deg'])
+        self.station_latitude_deg = float(station['latitude_deg'])
+        self.station_longitude_deg = float(station['longitude_deg'])
+        self.station_altitude_m = float(station['altitude_m'])
+        self.station_itrs_km = np.asarray(wgs84.latlon(
+            station['latitude_deg'], station['longitude_deg'], elevation_m=station['altitude_m']
+        ).itrs_xyz.km, dtype=np.float64)
+        # 大地天頂 (仰角計算) 與地心方向 (地平線半角界限)
+        self.station_up = np.array([
+            math.cos(lat_rad) * math.cos(lon_rad),
+            math.cos(lat_rad) * math.sin(lon_rad),
+            math.sin(lat_rad)
+        ])
+        self.station_radius_km = float(np.linalg.norm(self.station_itrs_km))
+        self.station_direction = self.station_itrs_km / self.station_radius_km
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], timescale: Any,
+                    interval_seconds: float) -> Optional['AdaptiveTimeSampler']:
+        """
+        adaptive_sampling 配置 → AdaptiveTimeSampler (未啟用時返回 None)
+
+        ground_station 可為名稱 (從 ground_station_constants 讀取實測座標) 或座標字典
+        """
+        if not config.get('enabled', False):
+            return None
+
+        return cls(
+            timescale=timescale,
+            station=resolve_station(config.get('ground_station', 'NTPU')),
+            interval_seconds=interval_seconds,
+            coarse_step_seconds=config.get('coarse_step_seconds', DEFAULT_COARSE_STEP_SECONDS),
+            elevation_mask_deg=config.get('elevation_mask_deg', 0.0)
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """metadata 用的取樣設定摘要"""
+        return {
+            'ground_station': {
+                'name': self.station_name,
+                'latitude_deg': self.station_latitude_deg,
+                'longitude_deg': self.station_longitude_deg,
+                'altitude_m': self.station_altitude_m
+            },
+            'interval_seconds': self.interval_seconds,
+            'coarse_step_seconds': self.coarse_step_seconds,
+            'elevation_mask_deg': self.elevation_mask_deg
+        }
+
+    # ==================== 幾何 ====================
+
+    def horizon_half_angle_rad(self, radius_km: np.ndarray) -> np.ndarray:
+        """
+        地平線半角: 衛星地心距離 r 時，地心仰角 >= (mask - HORIZON_MARGIN_DEG) 的最大地心夾角
+
+        λ = arccos(R_gs · cos ε / r) - ε，λ 隨 r 單調遞增
+        """
+        epsilon_rad = math.radians(self.elevation_mask_deg - HORIZON_MARGIN_DEG)
+        ratio = self.station_radius_km * math.cos(epsilon_rad) / np.asarray(radius_km, dtype=np.float64)
+        return np.arccos(np.clip(ratio, -1.0, 1.0)) - epsilon_rad
+
+    def _teme_to_itrs(self, t: Any) -> np.ndarray:
+        """TEME → ITRS 旋轉矩陣 (3, 3, N_t) = ITRS←GCRS · (TEME←GCRS)ᵀ"""
+        return np.einsum('ijt,kjt->ikt', frame_rotation(itrs, t), frame_rotation(TEME, t))
+
+    def _elevation_from_itrs(self, itrs_km: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            difference_km = itrs_km - self.station_itrs_km
+            sin_elevation = (difference_km @ self.station_up) / np.linalg.norm(difference_km, axis=-1)
+            return np.degrees(np.arcsin(np.clip(sin_elevation, -1.0, 1.0)))
+
+    def elevation_deg(self, positions_gcrs_km: np.ndarray, time_points: Sequence[datetime]) -> np.ndarray:
+        """
+        標準網格仰角 (N, T)
+
+        Args:
+            positions_gcrs_km: SGP4Calculator 輸出框架 (Skyfield GCRS) 的位置，未傳播點為 NaN
+        """
+        t = self.ts.from_datetimes(list(time_points))
+        rows, columns = np.nonzero(np.isfinite(positions_gcrs_km[..., 0]))
+        elevation = np.full(positions_gcrs_km.shape[:2], np.nan)
+        elevation[rows, columns] = self.elevation_at(
+            positions_gcrs_km[rows, columns], frame_rotation(itrs, t)[:, :, columns]
+        )
+        return elevation
+
+    def elevation_at(self, positions_gcrs_km: np.ndarray, itrs_rotation: np.ndarray) -> np.ndarray:
+        """
+        個別網格點仰角 (k,)
+
+        Args:
+            positions_gcrs_km: (k, 3) SGP4Calculator 輸出框架的位置
+            itrs_rotation: (3, 3, k) 各點時刻的 ITRS 旋轉 (frame_rotation(itrs, t))
+        """
+        itrs_km = np.einsum('ijk,kj->ki', itrs_rotation, positions_gcrs_km)
+        return self._elevation_from_itrs(itrs_km)
+
+    # ==================== 取樣規劃 ====================
+
+    def plan_samples(self, satrecs: Sequence[Satrec], time_points: Sequence[datetime]) -> Tuple[np.ndarray, int]:
+        """
+        決定標準網格上需要傳播的時間點
+
+        Returns:
+            (sample_mask (N, T) bool, coarse_points)
+        """
+        n_sat, n_times = len(satrecs), len(time_points)
+        stride = max(1, int(round(self.coarse_step_seconds / self.interval_seconds)))
+        coarse = np.unique(np.append(np.arange(0, n_times, stride), n_times - 1))
+
+        t = self.ts.from_datetimes([time_points[i] for i in coarse])
+        jd, fr = split_julian_dates(t)
+        errors, r_teme, _ = SatrecArray(list(satrecs)).sgp4(jd, fr)
+        ok = errors == 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            itrs_km = np.einsum('ikt,ntk->nti', self._teme_to_itrs(t), r_teme)
+            radius_km = np.linalg.norm(r_teme, axis=-1)
+            central_angle = np.arccos(np.clip((itrs_km @ self.station_direction) / radius_km, -1.0, 1.0))
+        half_angle = self.horizon_half_angle_rad(np.where(ok, radius_km, -np.inf).max(axis=1))
+
+        # 地心夾角變化率上界: 近地點角速率 n (1+e)² / (1-e²)^1.5 + 地球自轉
+        mean_motion = np.array([satrec.no_kozai for satrec in satrecs]) / 60.0  # rad/s
+        eccentricity = np.clip([satrec.ecco for satrec in satrecs], 0.0, 0.99)
+        rate = (mean_motion * (1 + eccentricity) ** 2 / (1 - eccentricity ** 2) ** 1.5 * RATE_MARGIN
+                + EARTH_ROTATION_RATE_RAD_S)
+
+        # 區間 [a, b] 內 θ(t) >= max(θ_a - ω(t-a), θ_b - ω(b-t))，最小值 (θ_a + θ_b - ωΔ) / 2
+        span_s = np.diff(coarse) * self.interval_seconds
+        lower_bound = (central_angle[:, :-1] + central_angle[:, 1:] - rate[:, None] * span_s) / 2.0
+        possible = ~(lower_bound > half_angle[:, None]) | ~ok[:, :-1] | ~ok[:, 1:]
+
+        sample_mask = np.zeros((n_sat, n_times), dtype=bool)
+        for j in range(len(coarse) - 1):
+            sample_mask[:, coarse[j]:coarse[j + 1] + 1] |= possible[:, j:j + 1]
+        if len(coarse) == 1:
+            sample_mask[:, 0] = True
+        return sample_mask, n_sat * len(coarse)
+
+    # ==================== 過境事件求根 ====================
+
+    def _elevation_at(self, satrecs: Sequence[Satrec], rows: np.ndarray, seconds: np.ndarray,
+                      jd: np.ndarray, fr: np.ndarray, teme_to_itrs: np.ndarray) -> np.ndarray:
+        """
+        任意時刻 (相對網格起點秒數) 的仰角，直接以 SGP4 計算
+
+        TEME → ITRS 取最近前一網格點的旋轉矩陣，再補上 Δt 內的地球自轉 (Δt < interval_seconds)
+        """
+        n_times = len(jd)
+        k = np.clip(np.floor(seconds / self.interval_seconds).astype(np.int64), 0, n_times - 1)
+        delta_s = seconds - k * self.interval_seconds
+
+        r_teme = np.full((len(rows), 3), np.nan)
+        for e, (row, kk, dd) in enumerate(zip(rows.tolist(), k.tolist(), delta_s.tolist())):
+            error, position, _ = satrecs[row].sgp4(jd[kk], fr[kk] + dd / 86400.0)
+            if error == 0:
+                r_teme[e] = position
+
+        itrs_k = np.einsum('ije,ej->ei', teme_to_itrs[:, :, k], r_teme)
+        angle = EARTH_ROTATION_RATE_RAD_S * delta_s
+        cos_a, sin_a = np.cos(angle), np.sin(angle)
+        itrs_km = np.stack([
+            cos_a * itrs_k[:, 0] + sin_a * itrs_k[:, 1],
+            -sin_a * itrs_k[:, 0] + cos_a * itrs_k[:, 1],
+            itrs_k[:, 2]
+        ], axis=1)
+        return self._elevation_from_itrs(itrs_km)
+
+    def _bisect_crossing(self, evaluate, rows: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                         rising: np.ndarray) -> np.ndarray:
+        """仰角穿越 mask 的時刻 (二分法，升起與落下一起向量化處理)"""
+        iterations = max(1, math.ceil(math.log2(self.interval_seconds / ROOT_TOLERANCE_SECONDS)))
+        for _ in range(iterations):
+            middle = (lower + upper) / 2.0
+            above = evaluate(rows, middle) >= self.elevation_mask_deg
+            # 升起: 下界在 mask 以下；落下: 下界在 mask 以上
+            move_upper = np.where(rising, above, ~above)
+            upper = np.where(move_upper, middle, upper)
+            lower = np.where(move_upper, lower, middle)
+        return (lower + upper) / 2.0
+
+    def _golden_maximum(self, evaluate, rows: np.ndarray, lower: np.ndarray,
+                        upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """最高仰角時刻 (黃金分割搜尋，向量化處理所有事件)"""
+        span = float(np.max(upper - lower)) if len(rows) else 0.0
+        iterations = max(1, math.ceil(math.log(ROOT_TOLERANCE_SECONDS / max(span, ROOT_TOLERANCE_SECONDS))
+                                      / math.log(GOLDEN_RATIO_CONJUGATE)))
+        left = upper - GOLDEN_RATIO_CONJUGATE * (upper - lower)
+        right = lower + GOLDEN_RATIO_CONJUGATE * (upper - lower)
+        left_value, right_value = evaluate(rows, left), evaluate(rows, right)
+        for _ in range(iterations):
+            keep_left = left_value >= right_value
+            upper = np.where(keep_left, right, upper)
+            lower = np.where(keep_left, lower, left)
+            new_left = upper - GOLDEN_RATIO_CONJUGATE * (upper - lower)
+            new_right = lower + GOLDEN_RATIO_CONJUGATE * (upper - lower)
+            # 保留的內點沿用上一輪的函數值，每輪只新增一次 SGP4 計算
+            probe = np.where(keep_left, new_left, new_right)
+            probe_value = evaluate(rows, probe)
+            right, right_value, left, left_value = (
+                np.where(keep_left, left, new_right), np.where(keep_left, left_value, probe_value),
+                np.where(keep_left, new_left, right), np.where(keep_left, probe_value, right_value)
+            )
+        best = np.where(left_value >= right_value, left, right)
+        return best, np.maximum(left_value, right_value)
+
+    def find_pass_events(self, satrecs: Sequence[Satrec], satellite_ids: Sequence[str],
+                         time_points: Sequence[datetime], elevation_deg: np.ndarray,
+                         window_mask: np.ndarray) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        每個可見窗口的升起 / 最高點 / 落下時刻
+
+        窗口起點 (終點) 位於網格邊界時，升起 (落下) 發生在時間範圍外，記為 None。
+
+        Returns:
+            {satellite_id: [{'rise_utc', 'culmination_utc', 'max_elevation_deg', 'set_utc',
+                             'duration_seconds', 'window_start_utc', 'window_end_utc',
+                             'window_points'}]}
+            window_start_utc / window_end_utc 為窗口內第一個 / 最後一個網格點
+        """
+        n_times = window_mask.shape[1]
+        padded = np.pad(window_mask.astype(np.int8), ((0, 0), (1, 1)))
+        rows, starts = np.nonzero(np.diff(padded, axis=1) == 1)
+        _, ends = np.nonzero(np.diff(padded, axis=1) == -1)   # 不含終點
+        if rows.size == 0:
+            return {}
+
+        t = self.ts.from_datetimes(list(time_points))
+        jd, fr = split_julian_dates(t)
+        teme_to_itrs = self._teme_to_itrs(t)
+        evaluate = lambda event_rows, seconds: self._elevation_at(
+            satrecs, event_rows, seconds, jd, fr, teme_to_itrs
+        )
+        step = self.interval_seconds
+
+        # 升起: [start-1, start]；落下: [end-1, end]。位於網格邊界的窗口不求根
+        has_rise = starts > 0
+        has_set = ends < n_times
+        crossings = self._bisect_crossing(
+            evaluate,
+            np.concatenate([rows[has_rise], rows[has_set]]),
+            np.concatenate([starts[has_rise] - 1, ends[has_set] - 1]) * step,
+            np.concatenate([starts[has_rise], ends[has_set]]) * step,
+            rising=np.repeat([True, False], [int(has_rise.sum()), int(has_set.sum())])
+        )
+        rise_s = np.full(rows.size, np.nan)
+        rise_s[has_rise] = crossings[:int(has_rise.sum())]
+        set_s = np.full(rows.size, np.nan)
+        set_s[has_set] = crossings[int(has_rise.sum()):]
+
+        peaks = np.array([
+            start + int(np.argmax(elevation_deg[row, start:end]))
+            for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist())
+        ])
+        culmination_s, max_elevation = self._golden_maximum(
+            evaluate, rows, np.maximum(peaks - 1, 0) * step, np.minimum(peaks + 1, n_times - 1) * step
+        )
+
+        start_time = time_points[0]
+        to_utc = lambda seconds: (start_time + timedelta(seconds=float(seconds))).isoformat()
+        events: Dict[str, List[Dict[str, Any]]] = {}
+        for e, row in enumerate(rows.tolist()):
+            rise = None if np.isnan(rise_s[e]) else rise_s[e]
+            set_ = None if np.isnan(set_s[e]) else set_s[e]
+            events.setdefault(satellite_ids[row], []).append({
+                'rise_utc': None if rise is None else to_utc(rise),
+                'culmination_utc': to_utc(culmination_s[e]),
+                'max_elevation_deg': float(max_elevation[e]),
+                'set_utc': None if set_ is None else to_utc(set_),
+                'duration_seconds': None if rise is None or set_ is None else float(set_ - rise),
+                'window_start_utc': to_utc(starts[e] * step),
+                'window_end_utc': to_utc((ends[e] - 1) * step),
+                'window_points': int(ends[e] - starts[e])
+            })
+        return events
@@ -0,0 +1,152 @@
+"""
+🔁 Stage 2 增量傳播 - TLE 指紋與逐衛星軌道狀態列
+
+增量模式下 Stage 2 只重新傳播新增、TLE 改變或時間網格改變的衛星。每顆衛星以
+(TLE 指紋, epoch, 時間網格起點/點數/間隔) 的雜湊作為輸入指紋，
+全域參考時刻不另外納入設定指紋 (只影響網格實際改變的衛星)；未改變衛星的軌道狀態
+以「區塊列」(共用時間軸上的 positions / velocities / valid_mask) 保存於
+IncrementalSatelliteStore，下次運行時直接還原為 OrbitalStateBlock，
+與新傳播的衛星合併後輸出。
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.shared.data_structures import OrbitalStateBlock
+
+
+def tle_fingerprint(satellite_data: Dict[str, Any]) -> str:
+    """衛星 TLE 指紋 = SHA-256(NORAD ID, line1, line2)"""
+    norad_id = satellite_data.get('norad_id') or satellite_data.get('satellite_id') or ''
+    line1 = satellite_data.get('tle_line1') or satellite_data.get('line1') or ''
+    line2 = satellite_data.get('tle_line2') or satellite_data.get('line2') or ''
+    return hashlib.sha256(f"{norad_id}\n{line1}\n{line2}".encode('utf-8')).hexdigest()
+
+
+def propagation_fingerprint(satellite_data: Dict[str, Any], time_grid: Tuple[datetime, int],
+                            interval_seconds: float) -> str:
+    """
+    衛星傳播指紋 = SHA-256(TLE 指紋, epoch, 時間網格)
+
+    Args:
+        satellite_data: Stage 1 衛星數據
+        time_grid: (網格起點, 點數)，UnifiedTimeWindowManager.get_time_grid() 的結果
+        interval_seconds: 時間間隔 (秒)
+    """
+    grid_start, num_points = time_grid
+    if grid_start.tzinfo is None:
+        grid_start = grid_start.replace(tzinfo=timezone.utc)
+    text = "\n".join([
+        tle_fingerprint(satellite_data),
+        str(satellite_data.get('epoch_datetime', '')),
+        grid_start.isoformat(),
+        str(int(num_points)),
+        repr(float(interval_seconds))
+    ])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def state_entry_from_block(block: OrbitalStateBlock, row: int) -> Dict[str, Any]:
+    """OrbitalStateBlock 第 row 列 → 增量狀態庫條目"""
+    return {
+        'constellation': block.constellations[row],
+        'epoch_datetime': block.epoch_datetimes[row],
+        'time_start_utc': block.time_start_utc.isoformat(),
+        'interval_seconds': float(block.interval_seconds),
+        'epoch_offset_minutes': float(block.epoch_offsets_minutes[row]),
+        'coordinate_system': block.coordinate_system,
+        'algorithm_used': block.algorithm_used,
+        'positions_km': block.positions_km[row],
+        'velocities_km_s': block.velocities_km_s[row],
+        'valid_mask': block.valid_mask[row]
+    }
+
+
+def state_entry_from_positions(constellation: str, epoch_datetime: str, teme_positions: Sequence[Any],
+                               interval_seconds: float, coordinate_system: str = 'TEME',
+                               algorithm_used: str = 'SGP4') -> Optional[Dict[str, Any]]:
+    """
+    逐點 TEMEPosition 列表 → 增量狀態庫條目
+
+    時間軸起點取第一個點；時間點不在固定間隔網格上時返回 None (該衛星下次重新傳播)。
+    """
+    if not teme_positions:
+        return None
+
+    times = [_parse_utc(position.timestamp) for position in teme_positions]
+    offsets = np.array([(t - times[0]).total_seconds() for t in times]) / interval_seconds
+    indices = np.rint(offsets).astype(np.intp)
+    if np.any(np.abs(offsets - indices) > 1e-6) or np.any(np.diff(indices) <= 0):
+        return None
+
+    n_times = int(indices[-1]) + 1
+    positions = np.full((n_times, 3), np.nan)
+    velocities = np.full((n_times, 3), np.nan)
+    valid = np.zeros(n_times, dtype=bool)
+    positions[indices] = [[p.x, p.y, p.z] for p in teme_positions]
+    velocities[indices] = [[p.vx, p.vy, p.vz] for p in teme_positions]
+    valid[indices] = True
+
+    return {
+        'constellation': constellation,
+        'epoch_datetime': epoch_datetime,
+        'time_start_utc': times[0].isoformat(),
+        'interval_seconds': float(interval_seconds),
+        'epoch_offset_minutes': float(teme_positions[0].time_since_epoch_minutes),
+        'coordinate_system': coordinate_system,
+        'algorithm_used': algorithm_used,
+        'positions_km': positions,
+        'velocities_km_s': velocities,
+        'valid_mask': valid
+    }
+
+
+def blocks_from_state_entries(entries: Dict[str, Dict[str, Any]]) -> List[OrbitalStateBlock]:
+    """
+    增量狀態庫條目 → OrbitalStateBlock 列表
+
+    依時間軸 (起點, 間隔) 分組，每組一個區塊；組內點數不同時以 valid_mask 補齊。
+    unified_window 模式下全部衛星共用時間軸，只產生一個區塊。
+    """
+    groups: Dict[tuple, List[str]] = {}
+    for satellite_id, entry in entries.items():
+        axis = (entry['time_start_utc'], float(entry['interval_seconds']))
+        groups.setdefault(axis, []).append(satellite_id)
+
+    blocks = []
+    for (time_start, interval_seconds), satellite_ids in groups.items():
+        group = [entries[sat_id] for sat_id in satellite_ids]
+        n_times = max(len(entry['valid_mask']) for entry in group)
+        positions = np.full((len(group), n_times, 3), np.nan)
+        velocities = np.full((len(group), n_times, 3), np.nan)
+        valid = np.zeros((len(group), n_times), dtype=bool)
+        for row, entry in enumerate(group):
+            n = len(entry['valid_mask'])
+            positions[row, :n] = entry['positions_km']
+            velocities[row, :n] = entry['velocities_km_s']
+            valid[row, :n] = entry['valid_mask']
+
+        blocks.append(OrbitalStateBlock(
+            satellite_ids=list(satellite_ids),
+            constellations=[entry['constellation'] for entry in group],
+            epoch_datetimes=[entry['epoch_datetime'] for entry in group],
+            time_start_utc=_parse_utc(time_start),
+            interval_seconds=interval_seconds,
+            positions_km=positions,
+            velocities_km_s=velocities,
+            epoch_offsets_minutes=np.array([entry['epoch_offset_minutes'] for entry in group], dtype=np.float64),
+            valid_mask=valid,
+            coordinate_system=group[0].get('coordinate_system', 'TEME'),
+            algorithm_used=group[0].get('algorithm_used', 'SGP4')
+        ))
+    return blocks
+
+
+def _parse_utc(timestamp: str) -> datetime:
+    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
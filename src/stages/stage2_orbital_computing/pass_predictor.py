@@ -0,0 +1,262 @@
+"""
+🛰️ 過境預測 - 地面站過境記錄 (升起 / 最高點 / 落下) 與時間區間索引
+
+直接回答「t0 ~ t1 之間哪些衛星經過 NTPU」，不需物化 Stage 4 完整時間序列:
+
+✅ PassPredictor: 以 Stage 2 自適應取樣 (SGP4Calculator.predict_pass_events，只計算過境事件、
+   不建立狀態陣列) 預測每個地面站的過境，升起 / 最高點 / 落下時刻由 SGP4 直接求根
+✅ PassIndex: 每個地面站一份排序陣列區間索引，時間範圍查詢 O(log n + k)
+✅ PassIndex.from_pass_events(): 直接使用 Stage 2 metadata.adaptive_sampling.pass_events，不需重新傳播
+
+使用方式:
+    predictor = PassPredictor(stations=['NTPU'], elevation_mask_deg=10.0)
+    indexes = predictor.predict(tle_data_list, start, end)
+    for record in indexes['NTPU'].query(t0, t1):
+        print(record.satellite_id, record.rise_utc, record.max_elevation_deg, record.set_utc)
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .adaptive_time_sampling import DEFAULT_COARSE_STEP_SECONDS, AdaptiveTimeSampler, resolve_station
+from .sgp4_calculator import SGP4Calculator
+
+logger = logging.getLogger(__name__)
+
+# 每次過境預測的衛星數上限 (控制 (N_sat, N_t) 遮罩與仰角陣列記憶體，一週 30 秒網格峰值約 250 MB)
+PREDICTION_BATCH_SATELLITES = 1000
+
+
+def _to_seconds(value: Any) -> float:
+    """datetime / ISO 8601 字串 → Unix 秒 (無時區視為 UTC)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _to_datetime(seconds: float) -> datetime:
+    return datetime.fromtimestamp(float(seconds), tz=timezone.utc)
+
+
+@dataclass(frozen=True)
+class PassRecord:
+    """
+    單一過境記錄
+
+    rise_truncated / set_truncated: 升起 (落下) 發生在預測時間範圍外，
+    rise_utc (set_utc) 為範圍內第一個 (最後一個) 可見網格點
+    """
+    satellite_id: str
+    station: str
+    rise_utc: datetime
+    culmination_utc: datetime
+    set_utc: datetime
+    max_elevation_deg: float
+    rise_truncated: bool = False
+    set_truncated: bool = False
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.set_utc - self.rise_utc).total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'satellite_id': self.satellite_id,
+            'station': self.station,
+            'rise_utc': self.rise_utc.isoformat(),
+            'culmination_utc': self.culmination_utc.isoformat(),
+            'set_utc': self.set_utc.isoformat(),
+            'max_elevation_deg': self.max_elevation_deg,
+            'duration_seconds': self.duration_seconds,
+            'rise_truncated': self.rise_truncated,
+            'set_truncated': self.set_truncated
+        }
+
+
+class PassIndex:
+    """
+    單一地面站的過境區間索引 (排序陣列)
+
+    過境依升起時刻排序；另存落下時刻的前綴最大值 (單調遞增)，
+    與查詢區間 [t0, t1] 重疊的過境必在 [searchsorted(前綴最大落下, t0), searchsorted(升起, t1)) 之內，
+    兩次二分搜尋後只需過濾該範圍。
+    """
+
+    def __init__(self, station: str, records: Sequence[PassRecord]):
+        self.station = station
+        records = sorted(records, key=lambda record: (record.rise_utc, record.satellite_id))
+
+        self.satellite_ids: List[str] = sorted({record.satellite_id for record in records})
+        row_of = {satellite_id: row for row, satellite_id in enumerate(self.satellite_ids)}
+        self.satellite_rows = np.array([row_of[record.satellite_id] for record in records], dtype=np.int32)
+        self.rise_s = np.array([record.rise_utc.timestamp() for record in records], dtype=np.float64)
+        self.culmination_s = np.array([record.culmination_utc.timestamp() for record in records], dtype=np.float64)
+        self.set_s = np.array([record.set_utc.timestamp() for record in records], dtype=np.float64)
+        self.max_elevation_deg = np.array([record.max_elevation_deg for record in records], dtype=np.float64)
+        self.rise_truncated = np.array([record.rise_truncated for record in records], dtype=bool)
+        self.set_truncated = np.array([record.set_truncated for record in records], dtype=bool)
+        self._max_set_s = np.maximum.accumulate(self.set_s) if records else self.set_s
+
+    @classmethod
+    def from_pass_events(cls, station: str, pass_events: Dict[str, List[Dict[str, Any]]]) -> 'PassIndex':
+        """
+        Stage 2 自適應取樣過境事件 ({satellite_id: [event, ...]}) → PassIndex
+
+        升起 / 落下為 None (網格邊界截斷) 時以窗口第一個 / 最後一個網格點代替
+        """
+        records = []
+        for satellite_id, events in pass_events.items():
+            for event in events:
+                rise = event.get('rise_utc') or event['window_start_utc']
+                set_ = event.get('set_utc') or event['window_end_utc']
+                records.append(PassRecord(
+                    satellite_id=str(satellite_id),
+                    station=station,
+                    rise_utc=_to_datetime(_to_seconds(rise)),
+                    culmination_utc=_to_datetime(_to_seconds(event['culmination_utc'])),
+                    set_utc=_to_datetime(_to_seconds(set_)),
+                    max_elevation_deg=float(event['max_elevation_deg']),
+                    rise_truncated=event.get('rise_utc') is None,
+                    set_truncated=event.get('set_utc') is None
+                ))
+        return cls(station, records)
+
+    def __len__(self) -> int:
+        return len(self.rise_s)
+
+    def _overlapping(self, start_s: float, end_s: float) -> np.ndarray:
+        """與 [start_s, end_s] 重疊的過境索引 (依升起時刻排序)"""
+        upper = int(np.searchsorted(self.rise_s, end_s, side='right'))
+        lower = int(np.searchsorted(self._max_set_s, start_s, side='left'))
+        candidates = np.arange(lower, max(lower, upper))
+        return candidates[self.set_s[candidates] >= start_s]
+
+    def record(self, index: int) -> PassRecord:
+        return PassRecord(
+            satellite_id=self.satellite_ids[self.satellite_rows[index]],
+            station=self.station,
+            rise_utc=_to_datetime(self.rise_s[index]),
+            culmination_utc=_to_datetime(self.culmination_s[index]),
+            set_utc=_to_datetime(self.set_s[index]),
+            max_elevation_deg=float(self.max_elevation_deg[index]),
+            rise_truncated=bool(self.rise_truncated[index]),
+            set_truncated=bool(self.set_truncated[index])
+        )
+
+    def records(self) -> List[PassRecord]:
+        return [self.record(i) for i in range(len(self))]
+
+    def query(self, start: Any, end: Any, min_elevation_deg: Optional[float] = None) -> List[PassRecord]:
+        """
+        與 [start, end] 重疊的過境 (依升起時刻排序)
+
+        Args:
+            start / end: datetime 或 ISO 8601 字串
+            min_elevation_deg: 只返回最高仰角 >= 此值的過境
+        """
+        start_s, end_s = _to_seconds(start), _to_seconds(end)
+        if end_s < start_s:
+            raise ValueError(f"❌ 查詢區間無效: end ({end}) 早於 start ({start})")
+        indices = self._overlapping(start_s, end_s)
+        if min_elevation_deg is not None:
+            indices = indices[self.max_elevation_deg[indices] >= min_elevation_deg]
+        return [self.record(i) for i in indices]
+
+    def visible_at(self, time: Any) -> List[PassRecord]:
+        """time 時刻位於過境中 (升起 <= time <= 落下) 的衛星"""
+        return self.query(time, time)
+
+    def satellites_between(self, start: Any, end: Any, min_elevation_deg: Optional[float] = None) -> List[str]:
+        """[start, end] 內有過境的衛星 ID (排序、不重複)"""
+        return sorted({record.satellite_id for record in self.query(start, end, min_elevation_deg)})
+
+
+class PassPredictor:
+    """
+    多地面站過境預測 (Stage 2 SGP4 自適應傳播)
+
+    每個地面站以自己的 AdaptiveTimeSampler 規劃取樣，只在可能可見的區段細化傳播；
+    只保留過境事件，記憶體與網格點數呈線性 (每點數 bytes)。
+    """
+
+    def __init__(self, stations: Sequence[Any] = ('NTPU',), elevation_mask_deg: float = 0.0,
+                 interval_seconds: float = 30.0,
+                 coarse_step_seconds: float = DEFAULT_COARSE_STEP_SECONDS,
+                 calculator: Optional[SGP4Calculator] = None,
+                 batch_satellites: int = PREDICTION_BATCH_SATELLITES):
+        """
+        Args:
+            stations: 地面站名稱或 {'name', 'latitude_deg', 'longitude_deg', 'altitude_m'} 配置
+            elevation_mask_deg: 過境仰角下限 (度)
+            interval_seconds: 網格間隔 (秒)，升起/落下在相鄰網格點之間求根
+            coarse_step_seconds: 粗網格步長 (秒)
+            calculator: 共用的 SGP4Calculator (未提供時自行建立)
+            batch_satellites: 每次傳播的衛星數上限
+        """
+        self.calculator = calculator or SGP4Calculator()
+        self.interval_seconds = float(interval_seconds)
+        self.batch_satellites = max(1, int(batch_satellites))
+
+        self.samplers: Dict[str, AdaptiveTimeSampler] = {}
+        for station in stations:
+            station = resolve_station(station)
+            name = station['name']
+            if name in self.samplers:
+                raise ValueError(f"❌ Fail-Fast: 地面站名稱重複: {name}")
+            self.samplers[name] = AdaptiveTimeSampler(
+                timescale=self.calculator.ts,
+                station=station,
+                interval_seconds=interval_seconds,
+                coarse_step_seconds=coarse_step_seconds,
+                elevation_mask_deg=elevation_mask_deg
+            )
+
+    def predict(self, tle_data_list: List[Dict[str, Any]], start: datetime, end: datetime) -> Dict[str, PassIndex]:
+        """
+        預測 [start, end] 內所有衛星對每個地面站的過境
+
+        Args:
+            tle_data_list: Stage 1 TLE 數據 (line1/line2 + epoch_datetime)
+            start / end: 預測時間範圍 (UTC)
+
+        Returns:
+            {地面站名稱: PassIndex}
+
+        Raises:
+            ValueError: 時間範圍無效，或 tle_data_list 含重複衛星 ID
+        """
+        id_counts = Counter(str(tle.get('satellite_id') or tle.get('norad_id')) for tle in tle_data_list)
+        duplicate_ids = sorted(sat_id for sat_id, count in id_counts.items() if count > 1)
+        if duplicate_ids:
+            # ❌ Fail-Fast: 同一衛星多筆 TLE 的過境記錄會互相覆蓋
+            raise ValueError(
+                f"❌ Fail-Fast: 過境預測輸入含 {len(duplicate_ids)} 個重複衛星 ID: {duplicate_ids[:5]}\n"
+                f"請先為每顆衛星選定一筆 TLE"
+            )
+
+        start = _to_datetime(_to_seconds(start))
+        end = _to_datetime(_to_seconds(end))
+        if end <= start:
+            raise ValueError(f"❌ 預測時間範圍無效: end ({end}) 必須晚於 start ({start})")
+        num_points = int((end - start).total_seconds() // self.interval_seconds) + 1
+        time_points = [start + timedelta(seconds=i * self.interval_seconds) for i in range(num_points)]
+
+        indexes = {}
+        for name, sampler in self.samplers.items():
+            pass_events: Dict[str, List[Dict[str, Any]]] = {}
+            for batch_start in range(0, len(tle_data_list), self.batch_satellites):
+                batch = tle_data_list[batch_start:batch_start + self.batch_satellites]
+                pass_events.update(self.calculator.predict_pass_events(batch, time_points, sampler))
+            indexes[name] = PassIndex.from_pass_events(name, pass_events)
+            logger.info(
+                f"🛰️ 過境預測 {name}: {len(tle_data_list)} 顆衛星，{len(indexes[name])} 次過境 "
+                f"({start.isoformat()} ~ {end.isoformat()})"
+            )
+        return indexes
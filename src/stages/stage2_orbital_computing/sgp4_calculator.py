@@ -12,14 +12,26 @@ import logging
 import math
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 # 直接使用 Skyfield - NASA JPL 標準
 from skyfield.api import load, EarthSatellite
 from skyfield.timelib import Time
+from skyfield.sgp4lib import TEME
+from skyfield.framelib import itrs
+
+# Vallado SGP4 C++ 實現的向量化介面（Skyfield 內部使用的同一套件）
+from sgp4.api import Satrec, SatrecArray
+
+from .adaptive_time_sampling import frame_rotation
 
 logger = logging.getLogger(__name__)
 
+# 自適應傳播: 可見窗口外 (未傳播或仰角低於遮罩) 的網格點錯誤碼 (SGP4 錯誤碼為 0-6)
+OUTSIDE_PASS_WINDOW = 255
+
 @dataclass
 class SGP4Position:
     """SGP4計算結果位置和速度"""
@@ -41,6 +53,31 @@ class SGP4OrbitResult:
     algorithm_used: str = "SGP4"
     precision_grade: str = "A"
 
+@dataclass
+class SGP4BatchResult:
+    """
+    SGP4 批次傳播結果（多衛星 × 共用時間網格）
+
+    states[i, j] 為 satellite_ids[i] 在 time_points[j] 的
+    [x, y, z, vx, vy, vz] (km, km/s)；error_codes 非零的點為 SGP4 傳播失敗，
+    對應 states 為 NaN。
+    """
+    satellite_ids: List[str]
+    time_points: List[datetime]
+    states: np.ndarray                     # (N_sat, N_t, 6)
+    error_codes: np.ndarray                # (N_sat, N_t) uint8, 0 = 成功
+    time_since_epoch_minutes: np.ndarray   # (N_sat, N_t)
+    failed_satellites: List[str]
+    # 自適應傳播 (propagate_adaptive) 才有: 過境事件與取樣統計
+    pass_events: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    sampling_stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """成功傳播的點 (N_sat, N_t)"""
+        return self.error_codes == 0
+
+
 class SGP4Calculator:
     """
     標準SGP4軌道傳播計算器
@@ -156,6 +193,289 @@ class SGP4Calculator:
             return None  # 標記失敗，由上層決定如何處理
 
 
+    def propagate_batch(self, tle_data_list: List[Dict[str, Any]],
+                        time_points: List[datetime]) -> SGP4BatchResult:
+        """
+        向量化批次傳播 - 所有衛星 × 整個時間網格一次 SatrecArray 呼叫
+
+        與 calculate_position() 使用相同的 SGP4 實現 (sgp4 套件) 與相同的
+        輸出框架：Skyfield EarthSatellite.at() 會將 SGP4 原生 TEME 向量以
+        TEME.rotation_at(t) 旋轉後輸出，此處對共用時間網格每個時刻只計算
+        一次旋轉矩陣並套用於全部衛星，結果與逐點路徑一致（位置差約 1e-12 km，僅浮點捨入）。
+
+        Args:
+            tle_data_list: TLE數據列表（需含 line1/line2 與 Stage 1 epoch_datetime）
+            time_points: 共用時間網格（UTC datetime，需含時區）
+
+        Returns:
+            SGP4BatchResult: (N_sat, N_t, 6) 狀態陣列與錯誤碼
+        """
+        if not time_points:
+            raise ValueError("時間網格為空，無法執行批次傳播")
+
+        satellite_ids, satrecs, epoch_offsets_minutes, failed_satellites = \
+            self._initialize_satrecs(tle_data_list, time_points)
+        if not satrecs:
+            return self._empty_batch_result(time_points, failed_satellites)
+
+        error_codes, states = self._propagate_satrecs(satrecs, time_points)
+        self._record_batch_statistics(error_codes)
+
+        self.logger.debug(
+            f"✅ 批次傳播完成: {len(satellite_ids)} 顆衛星 × {len(time_points)} 時間點 "
+            f"({int(np.count_nonzero(error_codes == 0))}/{error_codes.size} 點成功)"
+        )
+
+        return SGP4BatchResult(
+            satellite_ids=satellite_ids,
+            time_points=list(time_points),
+            states=states,
+            error_codes=error_codes,
+            time_since_epoch_minutes=self._time_since_epoch(epoch_offsets_minutes, time_points),
+            failed_satellites=failed_satellites
+        )
+
+    def propagate_adaptive(self, tle_data_list: List[Dict[str, Any]],
+                           time_points: List[datetime], sampler: Any) -> SGP4BatchResult:
+        """
+        自適應批次傳播 - 只在可見窗口內輸出標準網格狀態
+
+        1. sampler.plan_samples(): 粗網格傳播 + 地平線幾何界限，決定需細化的網格點
+        2. 只對需細化的網格點執行 SGP4 (與 propagate_batch 相同的數值與輸出框架)
+        3. 仰角 < elevation_mask_deg 或未傳播的點標記為 OUTSIDE_PASS_WINDOW (states 為 NaN)
+        4. 每個可見窗口的升起 / 最高點 / 落下時刻以 SGP4 直接求根
+
+        Args:
+            tle_data_list: TLE數據列表
+            time_points: 標準時間網格
+            sampler: AdaptiveTimeSampler
+
+        Returns:
+            SGP4BatchResult: 含 pass_events 與 sampling_stats
+        """
+        if not time_points:
+            raise ValueError("時間網格為空，無法執行批次傳播")
+
+        satellite_ids, satrecs, epoch_offsets_minutes, failed_satellites = \
+            self._initialize_satrecs(tle_data_list, time_points)
+        if not satrecs:
+            return self._empty_batch_result(time_points, failed_satellites)
+
+        sample_mask, coarse_points = sampler.plan_samples(satrecs, time_points)
+        error_codes, states = self._propagate_satrecs(satrecs, time_points, sample_mask)
+        self._record_batch_statistics(error_codes[sample_mask])
+        sgp4_errors = np.count_nonzero(sample_mask & (error_codes != 0), axis=1)
+
+        elevation = sampler.elevation_deg(states[..., :3], time_points)
+        window_mask = (error_codes == 0) & (elevation >= sampler.elevation_mask_deg)
+        pass_events = sampler.find_pass_events(satrecs, satellite_ids, time_points, elevation, window_mask)
+
+        error_codes[(error_codes == 0) & ~window_mask] = OUTSIDE_PASS_WINDOW
+        states[~window_mask] = np.nan
+
+        grid_points = error_codes.size
+        refined_points = int(sample_mask.sum())
+        sampling_stats = {
+            **sampler.describe(),
+            'grid_points': grid_points,
+            'coarse_points': coarse_points,
+            'refined_points': refined_points,
+            'window_points': int(window_mask.sum()),
+            'pass_events': sum(len(events) for events in pass_events.values()),
+            'propagation_reduction_ratio': 1.0 - (coarse_points + refined_points) / grid_points,
+            'satellites_with_sgp4_errors': [
+                satellite_ids[row] for row in np.flatnonzero(sgp4_errors)
+            ]
+        }
+
+        self.logger.info(
+            f"🎯 自適應傳播完成: {len(satellite_ids)} 顆衛星 × {len(time_points)} 時間點，"
+            f"SGP4 {coarse_points + refined_points}/{grid_points} 點 "
+            f"(減少 {sampling_stats['propagation_reduction_ratio']:.1%})，"
+            f"{sampling_stats['pass_events']} 個過境窗口"
+        )
+
+        return SGP4BatchResult(
+            satellite_ids=satellite_ids,
+            time_points=list(time_points),
+            states=states,
+            error_codes=error_codes,
+            time_since_epoch_minutes=self._time_since_epoch(epoch_offsets_minutes, time_points),
+            failed_satellites=failed_satellites,
+            pass_events=pass_events,
+            sampling_stats=sampling_stats
+        )
+
+    def predict_pass_events(self, tle_data_list: List[Dict[str, Any]],
+                            time_points: List[datetime], sampler: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        只預測過境事件的自適應傳播 (不建立狀態陣列)
+
+        取樣規劃、仰角與升起/最高點/落下求根皆與 propagate_adaptive 相同，
+        但取樣點的位置只用於計算仰角: 不建立 (N_sat, N_t, 6) 狀態與 epoch 時間偏移陣列，
+        逐衛星計算仰角後即丟棄位置，逐網格點只保留取樣/窗口遮罩與 float32 仰角
+        (約 6 bytes/點，propagate_adaptive 約 70 bytes/點)；框架旋轉依時間分塊計算 (frame_rotation)。
+
+        Args:
+            tle_data_list: TLE數據列表
+            time_points: 標準時間網格
+            sampler: AdaptiveTimeSampler
+
+        Returns:
+            {satellite_id: [event, ...]} (格式同 SGP4BatchResult.pass_events)
+        """
+        if not time_points:
+            raise ValueError("時間網格為空，無法預測過境")
+
+        satellite_ids, satrecs, _, _ = self._initialize_satrecs(tle_data_list, time_points)
+        if not satrecs:
+            return {}
+
+        sample_mask, _ = sampler.plan_samples(satrecs, time_points)
+        t = self.ts.from_datetimes(list(time_points))
+        jd = t.whole
+        fr = t.tai_fraction - t._leap_seconds() / 86400.0
+        teme_rotation = frame_rotation(TEME, t)
+        itrs_rotation = frame_rotation(itrs, t)
+
+        shape = (len(satrecs), len(time_points))
+        elevation = np.full(shape, np.nan, dtype=np.float32)
+        window_mask = np.zeros(shape, dtype=bool)
+        for row, satrec in enumerate(satrecs):
+            columns = np.flatnonzero(sample_mask[row])
+            if columns.size == 0:
+                continue
+            point_errors, r_teme, _ = satrec.sgp4_array(jd[columns], fr[columns])
+            self._record_batch_statistics(point_errors)
+
+            # 與 propagate_adaptive 相同: TEME → Skyfield 輸出框架 → 地面站仰角 (位置用後即丟)
+            ok = point_errors == 0
+            columns = columns[ok]
+            positions_km = np.einsum('ijk,ki->kj', teme_rotation[:, :, columns], r_teme[ok])
+            point_elevation = sampler.elevation_at(positions_km, itrs_rotation[:, :, columns])
+            elevation[row, columns] = point_elevation
+            window_mask[row, columns] = point_elevation >= sampler.elevation_mask_deg
+
+        return sampler.find_pass_events(satrecs, satellite_ids, time_points, elevation, window_mask)
+
+    def _initialize_satrecs(self, tle_data_list: List[Dict[str, Any]], time_points: List[datetime]
+                            ) -> Tuple[List[str], List[Satrec], List[float], List[str]]:
+        """TLE → Satrec 與相對 epoch 時間偏移，返回 (satellite_ids, satrecs, epoch_offsets_minutes, failed)"""
+        satellite_ids = []
+        satrecs = []
+        epoch_offsets_minutes = []
+        failed_satellites = []
+
+        for tle_data in tle_data_list:
+            # ❌ Fail-Fast: 衛星 ID 必須存在
+            satellite_id = tle_data.get('satellite_id') or tle_data.get('norad_id')
+            if not satellite_id:
+                raise ValueError("TLE數據缺少必要的 satellite_id 或 norad_id 欄位")
+            satellite_id = str(satellite_id)
+
+            try:
+                tle_line1 = tle_data.get('line1') or tle_data.get('tle_line1')
+                tle_line2 = tle_data.get('line2') or tle_data.get('tle_line2')
+                if not tle_line1 or not tle_line2:
+                    raise ValueError("TLE數據不完整: 缺少 line1/line2")
+
+                epoch_datetime_str = tle_data.get('epoch_datetime')
+                if not epoch_datetime_str:
+                    raise ValueError("v3.0架構要求：必須提供Stage 1的epoch_datetime，禁止TLE重新解析")
+                epoch_time = datetime.fromisoformat(epoch_datetime_str.replace('Z', '+00:00'))
+                if epoch_time.tzinfo is None:
+                    epoch_time = epoch_time.replace(tzinfo=timezone.utc)
+
+                satrecs.append(Satrec.twoline2rv(tle_line1, tle_line2))
+                satellite_ids.append(satellite_id)
+                epoch_offsets_minutes.append(
+                    (time_points[0] - epoch_time).total_seconds() / 60.0
+                )
+
+            except Exception as e:
+                # ⚠️ 批次處理容錯：與 batch_calculate() 相同，單顆衛星失敗不中斷整個批次
+                self.logger.error(f"衛星 {satellite_id} TLE 初始化失敗: {e}")
+                failed_satellites.append(satellite_id)
+
+        return satellite_ids, satrecs, epoch_offsets_minutes, failed_satellites
+
+    def _propagate_satrecs(self, satrecs: List[Satrec], time_points: List[datetime],
+                           sample_mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        SGP4 傳播並旋轉至 Skyfield 輸出框架
+
+        Args:
+            sample_mask: (N_sat, N_t) 需傳播的網格點；None 表示全部 (單次 SatrecArray 呼叫)
+
+        Returns:
+            (error_codes (N_sat, N_t) uint8, states (N_sat, N_t, 6))；
+            未傳播的點錯誤碼為 OUTSIDE_PASS_WINDOW，states 為 NaN
+        """
+        # 與 Skyfield EarthSatellite._position_and_velocity_TEME_km() 相同的 UTC 儒略日拆分
+        t = self.ts.from_datetimes(list(time_points))
+        jd = t.whole
+        fr = t.tai_fraction - t._leap_seconds() / 86400.0
+
+        # TEME → Skyfield 輸出框架（每個時刻一個矩陣，全部衛星共用）
+        rotation = frame_rotation(TEME, t)  # (3, 3, N_t)，長時間網格分塊計算
+
+        if sample_mask is None:
+            # 🚀 單次 C 層呼叫：(N_sat, N_t) 錯誤碼、(N_sat, N_t, 3) 位置與速度
+            error_codes, r_teme, v_teme = SatrecArray(satrecs).sgp4(jd, fr)
+            position_km = np.einsum('ijt,nti->ntj', rotation, r_teme)
+            velocity_km_s = np.einsum('ijt,nti->ntj', rotation, v_teme)
+            states = np.concatenate([position_km, velocity_km_s], axis=2)
+            states[error_codes != 0] = np.nan
+            return error_codes, states
+
+        # 🎯 逐衛星只傳播取樣點 (sgp4_array，同一 C 實現)，旋轉也只作用於取樣點
+        rows, columns = np.nonzero(sample_mask)
+        bounds = np.concatenate([[0], np.cumsum(sample_mask.sum(axis=1))])
+        point_errors = np.empty(rows.size, dtype=np.uint8)
+        r_teme = np.empty((rows.size, 3))
+        v_teme = np.empty((rows.size, 3))
+        for row, satrec in enumerate(satrecs):
+            points = slice(bounds[row], bounds[row + 1])
+            if bounds[row] < bounds[row + 1]:
+                point_errors[points], r_teme[points], v_teme[points] = \
+                    satrec.sgp4_array(jd[columns[points]], fr[columns[points]])
+
+        shape = (len(satrecs), len(time_points))
+        error_codes = np.full(shape, OUTSIDE_PASS_WINDOW, dtype=np.uint8)
+        error_codes[rows, columns] = point_errors
+        states = np.full(shape + (6,), np.nan)
+        point_rotation = rotation[:, :, columns]
+        states[rows, columns, :3] = np.einsum('ijk,ki->kj', point_rotation, r_teme)
+        states[rows, columns, 3:] = np.einsum('ijk,ki->kj', point_rotation, v_teme)
+        states[error_codes != 0] = np.nan
+        return error_codes, states
+
+    def _record_batch_statistics(self, error_codes: np.ndarray) -> None:
+        total_points = error_codes.size
+        successful_points = int(np.count_nonzero(error_codes == 0))
+        self.calculation_stats["total_calculations"] += total_points
+        self.calculation_stats["successful_calculations"] += successful_points
+        self.calculation_stats["failed_calculations"] += total_points - successful_points
+
+    @staticmethod
+    def _time_since_epoch(epoch_offsets_minutes: List[float], time_points: List[datetime]) -> np.ndarray:
+        offsets_minutes = np.array(
+            [(tp - time_points[0]).total_seconds() / 60.0 for tp in time_points]
+        )
+        return np.asarray(epoch_offsets_minutes)[:, None] + offsets_minutes[None, :]
+
+    @staticmethod
+    def _empty_batch_result(time_points: List[datetime], failed_satellites: List[str]) -> SGP4BatchResult:
+        num_times = len(time_points)
+        return SGP4BatchResult(
+            satellite_ids=[],
+            time_points=list(time_points),
+            states=np.empty((0, num_times, 6)),
+            error_codes=np.empty((0, num_times), dtype=np.uint8),
+            time_since_epoch_minutes=np.empty((0, num_times)),
+            failed_satellites=failed_satellites
+        )
+
     def batch_calculate(self, tle_data_list: List[Dict[str, Any]], time_series: List[float]) -> Dict[str, SGP4OrbitResult]:
         """
         批次計算多顆衛星的軌道
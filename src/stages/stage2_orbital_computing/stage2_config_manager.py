@@ -105,6 +105,21 @@ class Stage2ConfigManager(BaseConfigManager):
                 # SOURCE: TEME (True Equator Mean Equinox) coordinate system
                 # PURPOSE: Stage 2 專職輸出 TEME 座標，Stage 3 負責轉換
                 'output_coordinate_system': 'TEME',
+
+                # 向量化批次傳播
+                # SOURCE: sgp4 套件 SatrecArray (Vallado C++ SGP4 實現)
+                # PURPOSE: 共用時間網格的衛星一次傳播，消除逐點 Python 開銷
+                'batch_propagation': True,
+            },
+
+            # ==================== 自適應時間取樣 ====================
+            # SOURCE: Vallado (2013) Section 11.3 - 過境預測 (粗網格 + 升起/落下求根)
+            # PURPOSE: 只在可見窗口內以 interval_seconds 輸出，窗口外不傳播
+            'adaptive_sampling': {
+                'enabled': False,             # 預設完整網格傳播
+                'coarse_step_seconds': 300,   # 粗網格步長 (秒)
+                'elevation_mask_deg': 0.0,    # 低於所有星座門檻，星座門檻仍由 Stage 4 判斷
+                'ground_station': 'NTPU',     # ground_station_constants 實測座標
             },
 
             # ==================== 軌道計算配置 ====================
@@ -323,6 +338,31 @@ class Stage2ConfigManager(BaseConfigManager):
                     f"sgp4_propagation.method 必須是 'SGP4'，當前值: {method}"
                 )
 
+        # ========== 自適應時間取樣驗證 ==========
+        adaptive_config = config.get('adaptive_sampling', {})
+
+        if adaptive_config.get('enabled', False):
+            coarse_step = adaptive_config.get('coarse_step_seconds')
+            interval = config.get('time_series', {}).get('interval_seconds')
+            if not isinstance(coarse_step, (int, float)) or coarse_step <= 0:
+                errors.append(
+                    f"adaptive_sampling.coarse_step_seconds 必須是正數，當前值: {coarse_step}"
+                )
+            elif isinstance(interval, (int, float)) and coarse_step < interval:
+                errors.append(
+                    f"adaptive_sampling.coarse_step_seconds ({coarse_step}) 必須 >= "
+                    f"time_series.interval_seconds ({interval})"
+                )
+
+            mask = adaptive_config.get('elevation_mask_deg')
+            if not isinstance(mask, (int, float)) or not -5.0 <= mask < 90.0:
+                errors.append(
+                    f"adaptive_sampling.elevation_mask_deg 必須介於 -5 與 90 度之間，當前值: {mask}"
+                )
+
+            if not adaptive_config.get('ground_station'):
+                errors.append("adaptive_sampling 啟用時必須設定 ground_station")
+
         # ========== 性能配置驗證 ==========
         performance_config = config.get('performance', {})
 
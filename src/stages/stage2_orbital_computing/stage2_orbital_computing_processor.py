@@ -24,24 +24,36 @@ import psutil
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Sequence
 from dataclasses import dataclass, asdict
 
+import numpy as np
+
 try:
-    from shared.base import BaseStageProcessor
+    from shared.base import BaseStageProcessor, IncrementalPlan, IncrementalSatelliteStore
     from shared.base import ProcessingResult, ProcessingStatus, create_processing_result
 except ImportError:
     import sys
     from pathlib import Path
     sys.path.append(str(Path(__file__).parent.parent.parent))
-    from shared.base import BaseStageProcessor
+    from shared.base import BaseStageProcessor, IncrementalPlan, IncrementalSatelliteStore
     from shared.base import ProcessingResult, ProcessingStatus, create_processing_result
 
-from .sgp4_calculator import SGP4Calculator, SGP4Position, SGP4OrbitResult
+# 📦 與 Stage 3/4 相同的導入路徑，確保 isinstance(block, OrbitalStateBlock) 跨階段成立
+from src.shared.data_structures import OrbitalStateBlock
+
+from .sgp4_calculator import SGP4Calculator, SGP4Position, SGP4OrbitResult, SGP4BatchResult
+from .adaptive_time_sampling import AdaptiveTimeSampler
 from .stage2_validator import Stage2Validator
 from .stage2_result_manager import Stage2ResultManager
 # 🆕 統一時間窗口管理器 (v3.1)
 from .unified_time_window_manager import UnifiedTimeWindowManager
+from .incremental_propagation import (
+    blocks_from_state_entries,
+    propagation_fingerprint,
+    state_entry_from_block,
+    state_entry_from_positions
+)
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +69,37 @@ class TEMEPosition:
     timestamp: str  # ISO 8601 格式
     time_since_epoch_minutes: float
 
+class TEMEPositionView(Sequence):
+    """
+    OrbitalStateBlock 單顆衛星的唯讀視圖
+
+    行為等同 List[TEMEPosition]，但僅在存取時才建立 TEMEPosition，
+    批次傳播路徑因此不會逐點產生 Python 物件。
+    """
+
+    def __init__(self, block: OrbitalStateBlock, row: int):
+        self.block = block
+        self.row = row
+        self._indices = block.valid_indices(row)
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        j = int(self._indices[index])
+        position = self.block.positions_km[self.row, j]
+        velocity = self.block.velocities_km_s[self.row, j]
+        return TEMEPosition(
+            x=float(position[0]), y=float(position[1]), z=float(position[2]),
+            vx=float(velocity[0]), vy=float(velocity[1]), vz=float(velocity[2]),
+            timestamp=self.block.timestamps[j],
+            time_since_epoch_minutes=float(
+                self.block.epoch_offsets_minutes[self.row] + j * self.block.interval_seconds / 60.0
+            )
+        )
+
 @dataclass
 class OrbitalStateResult:
     """軌道狀態傳播結果"""
@@ -99,6 +142,12 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
         # 初始化 SGP4 計算器
         self.sgp4_calculator = SGP4Calculator()
 
+        # 🎯 自適應時間取樣: 只在可見窗口內輸出標準網格狀態 (adaptive_sampling.enabled)
+        self.adaptive_sampler = AdaptiveTimeSampler.from_config(
+            self.adaptive_sampling_config, self.sgp4_calculator.ts, self.time_interval_seconds
+        )
+        self.adaptive_sampling_summary: Optional[Dict[str, Any]] = None
+
         # 初始化驗證器和結果管理器
         self.validator = Stage2Validator()
         self.result_manager = Stage2ResultManager(logger_instance=self.logger)
@@ -112,6 +161,18 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
         # 🆕 載入參考時刻（如果是統一時間窗口模式）
         self.reference_time = self.time_window_manager.load_reference_time()
 
+        # 📦 批次傳播產生的列式區塊 (unified_window 模式)
+        self.orbital_state_block: Optional[OrbitalStateBlock] = None
+
+        # 🔁 增量傳播: 只重新傳播新增、TLE 或時間網格改變的衛星 (incremental.enabled 或 ORBIT_ENGINE_INCREMENTAL=1)
+        # 時間網格 (含參考時刻) 納入逐衛星指紋，不放入設定指紋；自適應取樣改變輸出的有效點
+        incremental_settings = None
+        if self.adaptive_sampler is not None:
+            incremental_settings = {'adaptive_sampling': self.adaptive_sampler.describe()}
+        self.incremental_store = IncrementalSatelliteStore.for_processor(
+            self, settings=incremental_settings
+        )
+
         # 🚀 動態 CPU 並行配置
         self.max_workers = self._get_optimal_workers()
         self.enable_parallel = self.max_workers > 1
@@ -184,6 +245,14 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
             # 這些是 v3.0 架構的固定值，允許作為預設配置
             self.coordinate_system = sgp4_config.get('output_coordinate_system', 'TEME')
             self.propagation_method = sgp4_config.get('method', 'SGP4')
+            # 🚀 向量化批次傳播（SatrecArray）：關閉時使用逐點 Skyfield 路徑
+            self.batch_propagation = sgp4_config.get('batch_propagation', True)
+
+            # 🎯 自適應時間取樣 (預設關閉)：需要共用時間網格，因此強制使用批次傳播
+            self.adaptive_sampling_config = self.config.get('adaptive_sampling', {})
+            if self.adaptive_sampling_config.get('enabled', False) and not self.batch_propagation:
+                logger.info("ℹ️ adaptive_sampling 啟用，改用向量化批次傳播")
+                self.batch_propagation = True
 
             logger.info(f"✅ Stage 2 配置加載完成:")
             logger.info(f"   時間間隔: {self.time_interval_seconds}秒")
@@ -191,6 +260,8 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
             logger.info(f"   覆蓋週期: {self.coverage_cycles}x 軌道週期")
             logger.info(f"   最小點數: {self.min_positions}")
             logger.info(f"   座標系統: {self.coordinate_system}")
+            logger.info(f"   批次傳播: {'啟用' if self.batch_propagation else '禁用'}")
+            logger.info(f"   自適應取樣: {'啟用' if self.adaptive_sampling_config.get('enabled', False) else '禁用'}")
 
         except Exception as e:
             logger.error(f"❌ 配置文件加載失敗: {e}")
@@ -338,8 +409,24 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
             else:
                 logger.info(f"✅ 參考時刻驗證通過: {validation_result['compliance_rate']:.1f}% 衛星符合")
 
+            # 🔁 增量模式: 僅傳播新增、TLE 或時間網格改變的衛星，其餘沿用上次的軌道狀態
+            incremental_plan = None
+            reused_entries = {}
+            satellites_to_propagate = satellites_data
+            if self.incremental_store is not None:
+                incremental_plan, satellites_to_propagate = self._plan_incremental_propagation(satellites_data)
+                reused_entries = self.incremental_store.load(incremental_plan.reused_ids)
+
             # 🛰️ 核心步驟：軌道狀態傳播
-            orbital_results = self._perform_orbital_propagation(satellites_data)
+            orbital_results = (
+                self._perform_orbital_propagation(satellites_to_propagate) if satellites_to_propagate else {}
+            )
+            if self.adaptive_sampler is not None:
+                # 全部衛星沿用時沒有新批次，摘要仍須輸出 (驗證器依此判斷自適應取樣模式)
+                self._adaptive_summary()
+            if incremental_plan is not None:
+                self._merge_reused_states(orbital_results, reused_entries, incremental_plan)
+                self.processing_stats['total_satellites_processed'] = len(satellites_data)
 
             if not orbital_results:
                 return create_processing_result(
@@ -360,8 +447,13 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
                 propagation_method=self.propagation_method,
                 time_interval_seconds=self.time_interval_seconds,
                 dynamic_calculation=self.dynamic_calculation,
-                coverage_cycles=self.coverage_cycles
+                coverage_cycles=self.coverage_cycles,
+                orbital_state_block=self.orbital_state_block
             )
+            if incremental_plan is not None:
+                result_data['metadata']['incremental'] = incremental_plan.summary()
+            if self.adaptive_sampling_summary is not None:
+                result_data['metadata']['adaptive_sampling'] = self.adaptive_sampling_summary
 
             logger.info(
                 f"✅ Stage 2 軌道狀態傳播完成："
@@ -378,6 +470,9 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
             output_file = self.result_manager.save_results(result_data)
             logger.info(f"✅ Stage 2 結果已保存至: {output_file}")
 
+            if incremental_plan is not None:
+                self._save_incremental_states(orbital_results, reused_entries, incremental_plan)
+
             # 📋 註：驗證快照保存已委託給基類 execute() 通過 save_validation_snapshot() 調用
 
             return create_processing_result(
@@ -395,6 +490,10 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
                 message=f"軌道傳播錯誤: {str(e)}"
             )
 
+    def save_cached_outputs(self, result: ProcessingResult) -> None:
+        """緩存命中時重建 Stage 2 輸出文件 (Stage 2 於 process() 內保存，無 save_results())"""
+        result.metadata['output_file'] = self.result_manager.save_results(result.data)
+
     def _validate_stage1_output(self, input_data: Any) -> bool:
         """驗證 Stage 1 的輸出數據"""
         if not isinstance(input_data, dict):
@@ -481,6 +580,110 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
         logger.info(f"✅ 取樣完成: {len(sampled)} 顆衛星")
         return sampled
 
+    # ==================== 增量傳播 ====================
+
+    def _plan_incremental_propagation(self, satellites_data: List[Dict]) -> tuple:
+        """
+        比對逐衛星傳播指紋 (TLE + epoch + 時間網格) 與上次運行清單
+
+        時間網格無法建立的衛星不記錄指紋，直接交由傳播流程處理 (並記錄失敗)。
+
+        Returns:
+            (plan, satellites_to_propagate): 增量計劃與需要重新傳播的衛星數據
+        """
+        fingerprints = {}
+        for satellite_data in satellites_data:
+            satellite_id = satellite_data.get('satellite_id') or satellite_data.get('name')
+            if not satellite_id or 'epoch_datetime' not in satellite_data:
+                continue
+            try:
+                time_grid = self._satellite_time_grid(satellite_data, str(satellite_id))
+            except Exception:
+                continue
+            fingerprints[str(satellite_id)] = propagation_fingerprint(
+                satellite_data, time_grid, self.time_interval_seconds
+            )
+
+        plan = self.incremental_store.plan(fingerprints)
+        reused = set(plan.reused_ids)
+        satellites_to_propagate = [
+            sat for sat in satellites_data
+            if str(sat.get('satellite_id') or sat.get('name')) not in reused
+        ]
+        return plan, satellites_to_propagate
+
+    def _merge_reused_states(self, orbital_results: Dict[str, OrbitalStateResult],
+                             reused_entries: Dict[str, Dict[str, Any]], plan: IncrementalPlan) -> None:
+        """將上次運行的軌道狀態還原為區塊並併入本次結果 (就地更新 orbital_results)"""
+        reused_blocks = blocks_from_state_entries(reused_entries)
+        for block in reused_blocks:
+            for row, satellite_id in enumerate(block.satellite_ids):
+                teme_positions = TEMEPositionView(block, row)
+                orbital_results[satellite_id] = OrbitalStateResult(
+                    satellite_id=satellite_id,
+                    constellation=block.constellations[row],
+                    teme_positions=teme_positions,
+                    epoch_datetime=block.epoch_datetimes[row],
+                    propagation_successful=True,
+                    algorithm_used=block.algorithm_used,
+                    coordinate_system=block.coordinate_system
+                )
+                self.processing_stats['successful_propagations'] += 1
+                self.processing_stats['total_teme_positions'] += len(teme_positions)
+        self.processing_stats['reused_satellites'] = len(reused_entries)
+
+        # 自適應取樣: 沿用衛星的過境事件隨狀態列保存，併回摘要
+        if self.adaptive_sampler is not None:
+            summary = self._adaptive_summary()
+            for satellite_id, entry in reused_entries.items():
+                events = entry['pass_events']
+                summary['window_points'] += int(np.count_nonzero(entry['valid_mask']))
+                summary['pass_event_count'] += len(events)
+                if events:
+                    summary['pass_events'][satellite_id] = events
+            summary['reused_satellites'] = len(reused_entries)
+
+        # 批次模式: 沿用的區塊與新傳播的區塊合併為單一列式區塊 (時間軸相同時)
+        if not self.batch_propagation or not reused_blocks:
+            return
+        if plan.dirty_ids and self.orbital_state_block is None:
+            return
+        blocks = ([self.orbital_state_block] if self.orbital_state_block is not None else []) + reused_blocks
+        try:
+            self.orbital_state_block = OrbitalStateBlock.concatenate(blocks)
+        except ValueError as e:
+            # 區塊只涵蓋部分衛星時不可交給 Stage 3，改由逐衛星結構重建
+            logger.info(f"ℹ️ 沿用的軌道狀態時間軸不同，不輸出列式區塊: {e}")
+            self.orbital_state_block = None
+
+    def _save_incremental_states(self, orbital_results: Dict[str, OrbitalStateResult],
+                                 reused_entries: Dict[str, Dict[str, Any]], plan: IncrementalPlan) -> None:
+        """記錄本次全部成功衛星的軌道狀態列 (自適應取樣時含過境事件)，供下次增量運行沿用"""
+        pass_events = self.adaptive_sampling_summary['pass_events'] if self.adaptive_sampler is not None else None
+        entries = {}
+        for satellite_id, result in orbital_results.items():
+            satellite_id = str(satellite_id)
+            if satellite_id in reused_entries:
+                entries[satellite_id] = reused_entries[satellite_id]
+                continue
+            if satellite_id not in plan.fingerprints:
+                continue
+
+            teme_positions = result.teme_positions
+            if isinstance(teme_positions, TEMEPositionView):
+                entry = state_entry_from_block(teme_positions.block, teme_positions.row)
+            else:
+                entry = state_entry_from_positions(
+                    result.constellation, result.epoch_datetime, teme_positions,
+                    self.time_interval_seconds, result.coordinate_system, result.algorithm_used
+                )
+            if entry is not None:
+                if pass_events is not None:
+                    entry['pass_events'] = pass_events.get(satellite_id, [])
+                entries[satellite_id] = entry
+
+        self.incremental_store.save(plan.fingerprints, entries)
+
     def _perform_orbital_propagation(self, satellites_data: List[Dict]) -> Dict[str, OrbitalStateResult]:
         """
         執行軌道狀態傳播計算 - 自動選擇並行或串行模式
@@ -494,7 +697,10 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
         logger.info("🛰️ 開始軌道狀態傳播計算...")
         self.processing_stats['total_satellites_processed'] = len(satellites_data)
 
-        if self.enable_parallel:
+        if self.batch_propagation:
+            # 向量化批次模式（單次 NumPy 呼叫處理整個時間網格）
+            orbital_results = self._perform_batch_propagation(satellites_data)
+        elif self.enable_parallel:
             # 並行處理模式
             orbital_results = self._perform_parallel_propagation(satellites_data)
         else:
@@ -506,7 +712,8 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
                        max(1, self.processing_stats['total_satellites_processed'])) * 100
 
         logger.info(f"🛰️ 軌道傳播完成:")
-        logger.info(f"   模式: {'並行處理' if self.enable_parallel else '單線程處理'}")
+        mode_label = '向量化批次' if self.batch_propagation else ('並行處理' if self.enable_parallel else '單線程處理')
+        logger.info(f"   模式: {mode_label}")
         logger.info(f"   成功: {self.processing_stats['successful_propagations']} 顆")
         logger.info(f"   失敗: {self.processing_stats['failed_propagations']} 顆")
         logger.info(f"   成功率: {success_rate:.1f}%")
@@ -598,6 +805,217 @@ class Stage2OrbitalPropagationProcessor(BaseStageProcessor):
 
         return orbital_results
 
+    def _perform_batch_propagation(self, satellites_data: List[Dict]) -> Dict[str, OrbitalStateResult]:
+        """
+        向量化批次軌道傳播 - 依共用時間網格分組，每組一次 SatrecArray 呼叫
+
+        unified_window 模式下同一星座的衛星共用同一時間網格，
+        因此整個星座只需少數幾次 (N_sat, N_t) 的陣列運算。
+
+        Args:
+            satellites_data: 衛星數據列表
+
+        Returns:
+            Dict[str, OrbitalStateResult]: 軌道傳播結果
+        """
+        logger.info("🚀 啟用向量化批次傳播 (SatrecArray)")
+        start_time = datetime.now(timezone.utc)
+
+        blocks = list(self.iter_orbital_state_blocks(satellites_data))
+
+        # 共用時間軸起點時合併為單一區塊 (unified_window)，供後續階段列式讀取
+        if blocks:
+            try:
+                merged = OrbitalStateBlock.concatenate(blocks)
+                self.orbital_state_block = merged
+                blocks = [merged]
+                logger.info(
+                    f"📦 OrbitalStateBlock: {merged.n_satellites} 顆衛星 × {merged.n_times} 時間點，"
+                    f"{merged.nbytes / 1024 / 1024:.1f} MB"
+                )
+            except ValueError as e:
+                logger.info(f"ℹ️ 各衛星時間軸不同，保留分組區塊: {e}")
+
+        orbital_results = {}
+        for block in blocks:
+            for row, satellite_id in enumerate(block.satellite_ids):
+                teme_positions = TEMEPositionView(block, row)
+                orbital_results[satellite_id] = OrbitalStateResult(
+                    satellite_id=satellite_id,
+                    constellation=block.constellations[row],
+                    teme_positions=teme_positions,
+                    epoch_datetime=block.epoch_datetimes[row],
+                    propagation_successful=True,
+                    algorithm_used=self.propagation_method,
+                    coordinate_system=self.coordinate_system
+                )
+                self.processing_stats['successful_propagations'] += 1
+                self.processing_stats['total_teme_positions'] += len(teme_positions)
+
+        elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
+        rate = len(satellites_data) / max(elapsed, 0.1)
+        logger.info(
+            f"⏱️ 批次傳播完成: {len(blocks)} 個區塊，{elapsed:.1f}秒，"
+            f"處理速度 {rate:.1f} 顆/秒"
+        )
+
+        return orbital_results
+
+    def iter_orbital_state_blocks(self, satellites_data: List[Dict],
+                                  max_batch: Optional[int] = None) -> Iterator[OrbitalStateBlock]:
+        """
+        惰性批次傳播 - 每次產生一個 OrbitalStateBlock (至多 max_batch 顆衛星)
+
+        批次傳播與串流管線共用: 呼叫端消費完一個區塊才傳播下一批，
+        (N_sat, N_t, 6) 狀態陣列的記憶體以批次大小為上限。
+
+        Args:
+            satellites_data: 衛星數據列表
+            max_batch: 每批衛星數上限 (預設 performance.memory_limits.max_satellites_batch)
+
+        Yields:
+            OrbitalStateBlock: 至少有一個有效時間點的衛星 (TEME)
+
+        Raises:
+            ValueError: 輸入含重複的衛星 ID (區塊列與結果字典皆以衛星 ID 索引)
+        """
+        # 依 (網格起點, 點數) 分組
+        grid_groups: Dict[tuple, List[Dict]] = {}
+        seen_ids = set()
+        duplicate_ids = []
+        for satellite_data in satellites_data:
+            # ✅ Fail-Fast: 衛星 ID 必須存在，禁止使用 'unknown' 回退
+            satellite_id = satellite_data.get('satellite_id') or satellite_data.get('name')
+            if not satellite_id:
+                logger.error("衛星數據缺少 satellite_id 和 name 欄位，無法處理")
+                self.processing_stats['failed_propagations'] += 1
+                continue
+            satellite_id = str(satellite_id)
+            if satellite_id in seen_ids:
+                duplicate_ids.append(satellite_id)
+                continue
+            seen_ids.add(satellite_id)
+
+            if 'epoch_datetime' not in satellite_data:
+                logger.warning(f"衛星 {satellite_id} 缺少 epoch_datetime，跳過")
+                self.processing_stats['failed_propagations'] += 1
+                continue
+
+            try:
+                grid_key = self._satellite_time_grid(satellite_data, satellite_id)
+            except Exception as e:
+                logger.error(f"❌ 衛星 {satellite_id} 時間網格生成失敗: {e}")
+                self.processing_stats['failed_propagations'] += 1
+                continue
+
+            if 'satellite_id' not in satellite_data:
+                satellite_data = {**satellite_data, 'satellite_id': satellite_id}
+            grid_groups.setdefault(grid_key, []).append(satellite_data)
+
+        # ✅ Fail-Fast: 重複 ID 會使後者靜默覆蓋前者
+        if duplicate_ids:
+            raise ValueError(
+                f"❌ Fail-Fast: 批次傳播輸入含 {len(duplicate_ids)} 個重複衛星 ID: {duplicate_ids[:5]}\n"
+                f"請檢查 Stage 1 輸出 (同一衛星不應出現多筆 TLE)"
+            )
+
+        # 批次大小上限（控制 (N_sat, N_t, 6) 陣列記憶體）
+        if max_batch is None:
+            max_batch = self.config.get('performance', {}).get('memory_limits', {}).get('max_satellites_batch') or 10000
+        logger.info(f"📐 {len(grid_groups)} 個時間網格，每批至多 {max_batch} 顆衛星")
+
+        for (grid_start, num_points), group in grid_groups.items():
+            if grid_start.tzinfo is None:
+                grid_start = grid_start.replace(tzinfo=timezone.utc)
+            time_points = [
+                grid_start + timedelta(seconds=i * self.time_interval_seconds)
+                for i in range(num_points)
+            ]
+
+            for batch_start in range(0, len(group), max_batch):
+                batch = group[batch_start:batch_start + max_batch]
+                if self.adaptive_sampler is not None:
+                    batch_result = self.sgp4_calculator.propagate_adaptive(batch, time_points, self.adaptive_sampler)
+                    self._accumulate_adaptive_sampling(batch_result)
+                else:
+                    batch_result = self.sgp4_calculator.propagate_batch(batch, time_points)
+                self.processing_stats['failed_propagations'] += len(batch_result.failed_satellites)
+                if not batch_result.satellite_ids:
+                    continue
+
+                # 全部時間點皆失敗的衛星不納入區塊 (自適應模式: 時間範圍內無過境且無 SGP4 錯誤者不算失敗)
+                has_valid = batch_result.valid_mask.any(axis=1)
+                sgp4_failed = set(batch_result.sampling_stats.get('satellites_with_sgp4_errors', []))
+                for row in np.flatnonzero(~has_valid):
+                    satellite_id = batch_result.satellite_ids[row]
+                    if self.adaptive_sampler is not None and satellite_id not in sgp4_failed:
+                        self.processing_stats['satellites_without_pass'] = \
+                            self.processing_stats.get('satellites_without_pass', 0) + 1
+                        continue
+                    logger.warning(f"衛星 {satellite_id} 軌道傳播失敗")
+                    self.processing_stats['failed_propagations'] += 1
+                rows = np.flatnonzero(has_valid)
+                if rows.size == 0:
+                    continue
+
+                satellites_by_id = {str(sat['satellite_id']): sat for sat in batch}
+                satellite_ids = [batch_result.satellite_ids[i] for i in rows]
+                yield OrbitalStateBlock(
+                    satellite_ids=satellite_ids,
+                    constellations=[self._identify_constellation(satellites_by_id[sid]) for sid in satellite_ids],
+                    epoch_datetimes=[satellites_by_id[sid]['epoch_datetime'] for sid in satellite_ids],
+                    time_start_utc=grid_start,
+                    interval_seconds=float(self.time_interval_seconds),
+                    positions_km=batch_result.states[rows, :, :3],
+                    velocities_km_s=batch_result.states[rows, :, 3:],
+                    epoch_offsets_minutes=batch_result.time_since_epoch_minutes[rows, 0],
+                    valid_mask=batch_result.valid_mask[rows],
+                    coordinate_system=self.coordinate_system,
+                    algorithm_used=self.propagation_method
+                )
+
+    def _satellite_time_grid(self, satellite_data: Dict, satellite_id: str) -> tuple:
+        """衛星的時間網格定義 (網格起點, 點數)，供批次分組與增量指紋共用"""
+        epoch_time = datetime.fromisoformat(satellite_data['epoch_datetime'].replace('Z', '+00:00'))
+        if epoch_time.tzinfo is None:
+            epoch_time = epoch_time.replace(tzinfo=timezone.utc)
+        return self.time_window_manager.get_time_grid(
+            satellite_name=satellite_data.get('name', satellite_id),
+            satellite_epoch=epoch_time
+        )
+
+    def _accumulate_adaptive_sampling(self, batch_result: SGP4BatchResult) -> None:
+        """彙總各批次的自適應取樣統計與過境事件 (輸出至 metadata.adaptive_sampling)"""
+        stats = batch_result.sampling_stats
+        summary = self._adaptive_summary()
+        for key in ('grid_points', 'coarse_points', 'refined_points', 'window_points'):
+            summary[key] += stats.get(key, 0)
+        summary['pass_event_count'] += stats.get('pass_events', 0)
+        summary['pass_events'].update(batch_result.pass_events)
+        summary['propagation_reduction_ratio'] = (
+            1.0 - (summary['coarse_points'] + summary['refined_points']) / max(1, summary['grid_points'])
+        )
+
+    def _adaptive_summary(self) -> Dict[str, Any]:
+        """
+        自適應取樣摘要 (首次呼叫時建立)
+
+        grid / coarse / refined 點數只統計本次實際傳播的批次；
+        window_points 與過境事件涵蓋全部輸出衛星 (含增量模式沿用者)。
+        """
+        if self.adaptive_sampling_summary is None:
+            self.adaptive_sampling_summary = {
+                **self.adaptive_sampler.describe(),
+                'grid_points': 0,
+                'coarse_points': 0,
+                'refined_points': 0,
+                'window_points': 0,
+                'pass_event_count': 0,
+                'pass_events': {},
+                'propagation_reduction_ratio': 0.0
+            }
+        return self.adaptive_sampling_summary
+
     def _process_single_satellite(self, satellite_data: Dict) -> Optional[OrbitalStateResult]:
         """
         處理單顆衛星的軌道傳播（可被並行調用）
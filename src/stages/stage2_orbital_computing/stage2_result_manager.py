@@ -22,6 +22,7 @@ from typing import Dict, List, Any, Optional
 
 # Phase 3 Refactoring: Import base class
 from shared.base import BaseResultManager
+from shared.utils.background_writer import run_or_submit
 
 try:
     import h5py
@@ -85,6 +86,7 @@ class Stage2ResultManager(BaseResultManager):
                 - time_interval_seconds: 時間間隔
                 - dynamic_calculation: 是否動態計算
                 - coverage_cycles: 覆蓋週期
+                - orbital_state_block: (可選) 批次傳播的 OrbitalStateBlock
 
         Returns:
             Stage 2 完整輸出數據結構
@@ -100,6 +102,7 @@ class Stage2ResultManager(BaseResultManager):
         time_interval_seconds = kwargs.get('time_interval_seconds', 60.0)
         dynamic_calculation = kwargs.get('dynamic_calculation', True)
         coverage_cycles = kwargs.get('coverage_cycles', 1.0)
+        orbital_state_block = kwargs.get('orbital_state_block')
 
         # 按星座分組統計
         constellation_stats = {}
@@ -113,18 +116,23 @@ class Stage2ResultManager(BaseResultManager):
 
             constellation_stats[constellation] += 1
             # 轉換為規格格式
-            orbital_states = []
-            for pos in result.teme_positions:
-                orbital_state = {
-                    'timestamp': pos.timestamp,
-                    'position_teme': [pos.x, pos.y, pos.z],  # TEME 座標 (km)
-                    'velocity_teme': [pos.vx, pos.vy, pos.vz],  # TEME 速度 (km/s)
-                    'satellite_id': satellite_id,
-                    # ✅ Grade A 標準: 移除估計誤差值
-                    # SGP4 誤差應從算法實際計算獲取，不使用硬編碼估算值
-                    # 參考: Vallado 2013, Table 3.2 - SGP4 精度範圍 0.5-5 km (視 TLE 新舊而定)
-                }
-                orbital_states.append(orbital_state)
+            block_view = result.teme_positions
+            if hasattr(block_view, 'block'):
+                # 列式區塊: 直接由陣列產生，不經過 TEMEPosition
+                orbital_states = block_view.block.to_orbital_states(block_view.row)
+            else:
+                orbital_states = []
+                for pos in result.teme_positions:
+                    orbital_state = {
+                        'timestamp': pos.timestamp,
+                        'position_teme': [pos.x, pos.y, pos.z],  # TEME 座標 (km)
+                        'velocity_teme': [pos.vx, pos.vy, pos.vz],  # TEME 速度 (km/s)
+                        'satellite_id': satellite_id,
+                        # ✅ Grade A 標準: 移除估計誤差值
+                        # SGP4 誤差應從算法實際計算獲取，不使用硬編碼估算值
+                        # 參考: Vallado 2013, Table 3.2 - SGP4 精度範圍 0.5-5 km (視 TLE 新舊而定)
+                    }
+                    orbital_states.append(orbital_state)
 
             satellites_by_constellation[constellation][satellite_id] = {
                 'satellite_id': satellite_id,
@@ -169,13 +177,17 @@ class Stage2ResultManager(BaseResultManager):
         # 使用基類的 metadata 合併方法 (上游優先，補充 Stage 2 特定字段)
         merged_metadata = self._merge_upstream_metadata(upstream_metadata, stage2_metadata)
 
-        return {
+        stage_results = {
             'stage': 'stage2_orbital_computing',
             'satellites': satellites_by_constellation,
             'metadata': merged_metadata,
             'processing_stats': processing_stats,
             'next_stage_ready': True
         }
+        # 列式區塊僅在記憶體中傳遞 (不寫入 JSON)
+        if orbital_state_block is not None:
+            stage_results['orbital_state_block'] = orbital_state_block
+        return stage_results
 
     def build_snapshot_data(
         self,
@@ -253,19 +265,23 @@ class Stage2ResultManager(BaseResultManager):
     def save_results(
         self,
         results: Dict[str, Any],
-        output_format: str = 'both',
+        output_format: str = 'hdf5',
         custom_filename: Optional[str] = None
     ) -> str:
         """
         保存 Stage 2 處理結果 (覆寫基類方法以支援 HDF5)
 
+        階段交接文件 (列式 HDF5，供 Stage 3 載入) 一律輸出；
+        按星座/衛星分組的 HDF5 與 JSON 為額外格式。
+
         Args:
             results: 處理結果數據
-            output_format: 輸出格式 ('json', 'hdf5', 'both')
+            output_format: 額外輸出格式 ('json', 'hdf5', 'both')
+                ORBIT_ENGINE_JSON_EXPORT=1 時亦輸出 JSON
             custom_filename: 自訂文件名 (不含副檔名)
 
         Returns:
-            str: 主要輸出文件路徑
+            str: 主要輸出文件路徑 (階段交接文件)
 
         Raises:
             IOError: 保存失敗
@@ -281,31 +297,30 @@ class Stage2ResultManager(BaseResultManager):
             else:
                 base_filename = f"orbital_propagation_output_{timestamp}"
 
-            output_files = []
+            # 記憶體內列式區塊不序列化至交接文件/JSON
+            orbital_state_block = results.get('orbital_state_block')
+            json_results = {k: v for k, v in results.items() if k != 'orbital_state_block'}
 
-            # JSON 格式（向後兼容）
-            if output_format in ('json', 'both'):
-                json_file = output_dir / f"{base_filename}.json"
-                # 使用基類的 JSON 保存方法
-                self._save_json(results, json_file)
-                self.logger.info(f"📁 JSON 格式已保存: {json_file}")
-                output_files.append(str(json_file))
+            # 階段交接文件 (+ 選用 JSON 匯出)
+            handoff_format = 'both' if output_format in ('json', 'both') else 'handoff'
+            output_file = self._save_stage_output(json_results, output_dir, base_filename, handoff_format)
 
-            # HDF5 格式（Stage 2 專用擴展）
+            # 分組 HDF5 格式（Stage 2 專用擴展）
             if output_format in ('hdf5', 'both') and HDF5_AVAILABLE:
                 hdf5_file = output_dir / f"{base_filename}.h5"
-                self._save_results_hdf5(results, str(hdf5_file))
-                self.logger.info(f"📦 HDF5 格式已保存: {hdf5_file}")
-                output_files.append(str(hdf5_file))
+                run_or_submit(
+                    hdf5_file.name, self._save_results_hdf5,
+                    json_results, str(hdf5_file), orbital_state_block
+                )
 
-            # 返回主要格式路徑（HDF5 優先，否則 JSON）
-            return output_files[-1] if output_files else ""
+            return str(output_file)
 
         except Exception as e:
             self.logger.error(f"❌ 保存 Stage 2 結果失敗: {e}")
             raise IOError(f"無法保存 Stage 2 結果: {e}")
 
-    def _save_results_hdf5(self, results: Dict[str, Any], output_file: str):
+    def _save_results_hdf5(self, results: Dict[str, Any], output_file: str,
+                           orbital_state_block: Optional[Any] = None):
         """
         保存結果為 HDF5 格式 (Stage 2 專用擴展)
 
@@ -314,6 +329,7 @@ class Stage2ResultManager(BaseResultManager):
         Args:
             results: 處理結果數據
             output_file: HDF5 輸出文件路徑
+            orbital_state_block: (可選) OrbitalStateBlock，存在時直接以陣列切片寫入
         """
         if not HDF5_AVAILABLE:
             self.logger.warning("⚠️ h5py 未安裝，跳過 HDF5 保存")
@@ -347,20 +363,28 @@ class Stage2ResultManager(BaseResultManager):
                     if not orbital_states:
                         continue
 
-                    # TEME 位置 (N x 3)
-                    positions = np.array([
-                        state['position_teme'] for state in orbital_states
-                    ], dtype=np.float64)
-
-                    # TEME 速度 (N x 3)
-                    velocities = np.array([
-                        state['velocity_teme'] for state in orbital_states
-                    ], dtype=np.float64)
-
-                    # 時間戳 (N,)
-                    timestamps = np.array([
-                        state['timestamp'] for state in orbital_states
-                    ], dtype='S32')
+                    if orbital_state_block is not None and sat_id in orbital_state_block:
+                        # 列式區塊: 直接切片
+                        row = orbital_state_block.index_of(sat_id)
+                        indices = orbital_state_block.valid_indices(row)
+                        positions = orbital_state_block.positions_km[row, indices]
+                        velocities = orbital_state_block.velocities_km_s[row, indices]
+                        timestamps = np.array(orbital_state_block.timestamps, dtype='S32')[indices]
+                    else:
+                        # TEME 位置 (N x 3)
+                        positions = np.array([
+                            state['position_teme'] for state in orbital_states
+                        ], dtype=np.float64)
+
+                        # TEME 速度 (N x 3)
+                        velocities = np.array([
+                            state['velocity_teme'] for state in orbital_states
+                        ], dtype=np.float64)
+
+                        # 時間戳 (N,)
+                        timestamps = np.array([
+                            state['timestamp'] for state in orbital_states
+                        ], dtype='S32')
 
                     # 保存數據集（使用 gzip 壓縮）
                     sat_group.create_dataset(
@@ -388,7 +412,7 @@ class Stage2ResultManager(BaseResultManager):
 
         # 記錄壓縮效果
         file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-        self.logger.info(f"📦 HDF5 文件大小: {file_size_mb:.1f} MB")
+        self.logger.info(f"📦 HDF5 格式已保存: {output_file} ({file_size_mb:.1f} MB)")
 
     # ==================== Backward Compatibility Interface ====================
 
@@ -403,7 +427,8 @@ class Stage2ResultManager(BaseResultManager):
         propagation_method: str,
         time_interval_seconds: float,
         dynamic_calculation: bool,
-        coverage_cycles: float
+        coverage_cycles: float,
+        orbital_state_block: Optional[Any] = None
     ) -> Dict[str, Any]:
         """
         向後兼容接口: 原 build_final_result() 方法
@@ -420,7 +445,8 @@ class Stage2ResultManager(BaseResultManager):
             propagation_method=propagation_method,
             time_interval_seconds=time_interval_seconds,
             dynamic_calculation=dynamic_calculation,
-            coverage_cycles=coverage_cycles
+            coverage_cycles=coverage_cycles,
+            orbital_state_block=orbital_state_block
         )
 
 
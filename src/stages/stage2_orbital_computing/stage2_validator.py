@@ -68,7 +68,8 @@ class Stage2Validator:
             validation_results['overall_status'] = False
 
         # 3. time_series_completeness - 時間序列完整性
-        check3 = self._check_time_series_completeness(orbital_results)
+        adaptive_sampling = result_data.get('metadata', {}).get('adaptive_sampling')
+        check3 = self._check_time_series_completeness(orbital_results, adaptive_sampling)
         validation_results['check_details']['time_series_completeness'] = check3
         if check3['passed']:
             validation_results['checks_passed'] += 1
@@ -215,9 +216,18 @@ class Stage2Validator:
             # ❌ Fail-Fast: 驗證過程異常不應回退，直接拋出
             raise RuntimeError(f"SGP4 軌道傳播精度驗證失敗 (Fail-Fast): {e}") from e
 
-    def _check_time_series_completeness(self, orbital_results: Dict[str, Any]) -> Dict[str, Any]:
-        """3. time_series_completeness - 時間序列完整性"""
+    def _check_time_series_completeness(self, orbital_results: Dict[str, Any],
+                                        adaptive_sampling: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        3. time_series_completeness - 時間序列完整性
+
+        自適應取樣模式只輸出可見窗口內的網格點，完整性改為檢查每個過境窗口
+        的點數都已輸出 (window_points 總和 = 輸出點數)，不套用連續 60 點門檻。
+        """
         try:
+            if adaptive_sampling is not None:
+                return self._check_pass_window_completeness(orbital_results, adaptive_sampling)
+
             issues = []
             complete_series_count = 0
             total_satellites = len(orbital_results)
@@ -259,6 +269,38 @@ class Stage2Validator:
             # ❌ Fail-Fast: 驗證過程異常不應回退，直接拋出
             raise RuntimeError(f"時間序列完整性驗證失敗 (Fail-Fast): {e}") from e
 
+    def _check_pass_window_completeness(self, orbital_results: Dict[str, Any],
+                                        adaptive_sampling: Dict[str, Any]) -> Dict[str, Any]:
+        """自適應取樣: 每顆輸出衛星的點數須等於其過境窗口點數總和"""
+        issues = []
+        pass_events = adaptive_sampling.get('pass_events', {})
+        complete_series_count = 0
+        checked = 0
+        for satellite_id, result in orbital_results.items():
+            events = pass_events.get(str(satellite_id))
+            if events is None or not hasattr(result, 'teme_positions'):
+                continue  # 無過境窗口的衛星不在過境事件中 (增量沿用的衛星事件已併回)
+            checked += 1
+            expected = sum(event['window_points'] for event in events)
+            if len(result.teme_positions) == expected:
+                complete_series_count += 1
+            else:
+                issues.append(
+                    f"衛星 {satellite_id} 過境窗口點數不符: {len(result.teme_positions)} 點 != {expected} 點"
+                )
+
+        return {
+            'passed': len(issues) == 0 and complete_series_count == checked,
+            'description': '時間序列完整性驗證 (自適應取樣: 過境窗口)',
+            'details': {
+                'total_satellites': len(orbital_results),
+                'checked_satellites': checked,
+                'complete_series_count': complete_series_count,
+                'pass_event_count': adaptive_sampling.get('pass_event_count', 0)
+            },
+            'issues': issues
+        }
+
     def _check_teme_coordinate_validation(self, orbital_results: Dict[str, Any]) -> Dict[str, Any]:
         """4. teme_coordinate_validation - TEME 座標驗證"""
         try:
@@ -389,8 +431,9 @@ class Stage2Validator:
                 )
 
             # 檢查數據結構效率 (metadata 已在上方驗證)
+            # 自適應取樣只輸出過境窗口內的點，點數由時間序列完整性檢查 (過境窗口) 驗證
             total_positions = metadata['total_teme_positions']
-            if total_satellites > 0:
+            if total_satellites > 0 and not metadata.get('adaptive_sampling'):
                 avg_positions_per_satellite = total_positions / total_satellites
                 if avg_positions_per_satellite < 60:  # 少於1小時數據
                     issues.append(f"平均位置點數過少: {avg_positions_per_satellite:.1f}")
@@ -462,7 +505,10 @@ class Stage2Validator:
                     'total_teme_positions': processing_stats['total_teme_positions'],
                     'tle_reparse_prohibited': True,
                     'epoch_datetime_source': 'stage1_provided',
-                    'propagation_config': metadata.get('propagation_config', {})
+                    'propagation_config': metadata.get('propagation_config', {}),
+                    'adaptive_sampling': {
+                        key: value for key, value in metadata['adaptive_sampling'].items() if key != 'pass_events'
+                    } if 'adaptive_sampling' in metadata else None
                 },
                 'data_summary': {
                     'has_data': True,
@@ -26,7 +26,7 @@ Stage 2 統一時間窗口管理器 - 動態時間序列生成
 import logging
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -180,6 +180,29 @@ class UnifiedTimeWindowManager:
         Returns:
             時間序列（UTC datetime 列表）
         """
+        start_time, num_points = self.get_time_grid(satellite_name, satellite_epoch)
+
+        time_series = []
+        for i in range(num_points):
+            time_point = start_time + timedelta(seconds=i * self.interval_seconds)
+            time_series.append(time_point)
+
+        return time_series
+
+    def get_time_grid(self, satellite_name: str, satellite_epoch: Optional[datetime] = None) -> Tuple[datetime, int]:
+        """
+        計算時間網格定義（起點 + 點數），不展開 datetime 列表
+
+        批次傳播模式以 (起點, 點數) 為鍵將共用同一時間網格的衛星分組，
+        避免逐顆衛星生成 datetime 列表。
+
+        Args:
+            satellite_name: 衛星名稱
+            satellite_epoch: 衛星 epoch（僅在 independent_epoch 模式使用）
+
+        Returns:
+            (start_time, num_points): 時間網格起點與時間點數，間隔為 interval_seconds
+        """
         if self.mode == 'unified_window':
             # 統一時間窗口模式：共享參考時刻，但各星座使用其軌道週期生成時間序列
             if self.reference_time is None:
@@ -226,15 +249,10 @@ class UnifiedTimeWindowManager:
         total_duration_seconds = int(orbital_period_seconds * coverage_cycles)
         num_points = total_duration_seconds // self.interval_seconds
 
-        time_series = []
-        for i in range(num_points):
-            time_point = start_time + timedelta(seconds=i * self.interval_seconds)
-            time_series.append(time_point)
-
-        logger.debug(f"   {satellite_name}: 生成 {len(time_series)} 時間點 "
+        logger.debug(f"   {satellite_name}: 生成 {num_points} 時間點 "
                     f"({total_duration_seconds/60:.1f}min = {orbital_period_seconds/60:.0f}min × {coverage_cycles})")
 
-        return time_series
+        return start_time, num_points
 
     def validate_reference_time(self, satellites: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -17,6 +17,12 @@ Stage 3 幾何預篩選器 - 快速可見性初步判斷
 2. 地平線檢查：衛星是否在地球背面（粗略幾何角度）
 3. 高度檢查：排除明顯過低/過高的軌道異常
 
+⚡ 陣列化執行 (N 顆衛星 × T 個時間點):
+- dense: 依時間分塊一次評估所有衛星，已確認可見的衛星不再參與後續區塊
+- pass_window: 由衛星高度推導地平線半角 λ，地心夾角 θ > λ 時依角速率上界
+  跳過整段不可見軌道 (保守界限，保留衛星集合與 dense 相同)
+- 支援逐點 TEME dict 與列式 OrbitalStateBlock 輸入
+
 ⚠️ 【禁止用途 - Grade A 標準】
 ==========================================
 本模組僅用於性能優化，**禁止用於學術發表的結果計算**
@@ -75,8 +81,10 @@ Stage 3 幾何預篩選器 - 快速可見性初步判斷
 
 import logging
 import math
-from typing import Dict, Any, List, Tuple
-from datetime import datetime
+from typing import Dict, Any, List, Sequence, Tuple
+from datetime import datetime, timezone
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +109,25 @@ except Exception as e:
         f"詳細錯誤: {e}"
     )
 
+# 預篩選模式: dense = 全部時間點 (分塊評估)；pass_window = 以地平線半角跳過不可見軌道段
+PREFILTER_MODES = ('dense', 'pass_window')
+
+# dense 模式每次評估的時間欄數 (已確認可見的衛星不再參與後續區塊)
+PREFILTER_TIME_CHUNK = 32
+
+# pass_window 模式角速率安全係數 (取樣點之間的 |v|/|r| 可能略高於取樣最大值)
+SKIP_RATE_MARGIN = 1.05
+
+# Meeus 簡化 GMST 的自轉速率 (rad/s)，與 _teme_to_rough_ecef 使用同一常數
+GMST_RATE_RAD_S = math.radians(360.98564736629) / 86400.0
+
+# 點判定代碼: 0 = 可能可見；1..4 = REJECTION_REASONS 索引 + 1；-1 = 未評估
+CANDIDATE = 0
+NOT_EVALUATED = -1
+REJECTION_REASONS = ('altitude_too_low', 'altitude_too_high', 'distance_too_far', 'always_below_horizon')
+
+J2000_DATETIME64 = np.datetime64('2000-01-01T12:00:00', 'us')
+
 
 class GeometricPrefilter:
     """
@@ -111,7 +138,7 @@ class GeometricPrefilter:
     """
 
     def __init__(self, ground_station_lat_deg: float, ground_station_lon_deg: float,
-                 ground_station_alt_m: float = 0.0):
+                 ground_station_alt_m: float = 0.0, mode: str = 'dense'):
         """
         初始化幾何預篩選器
 
@@ -119,7 +146,12 @@ class GeometricPrefilter:
             ground_station_lat_deg: 地面站緯度 (度)
             ground_station_lon_deg: 地面站經度 (度)
             ground_station_alt_m: 地面站海拔高度 (米)
+            mode: 'dense' 或 'pass_window' (以地平線半角跳過不可見軌道段)
         """
+        if mode not in PREFILTER_MODES:
+            raise ValueError(f"❌ 未知的幾何預篩選模式: {mode}，可用: {PREFILTER_MODES}")
+        self.mode = mode
+        self.last_statistics: Dict[str, Any] = {}
         self.ground_station_lat_deg = ground_station_lat_deg
         self.ground_station_lon_deg = ground_station_lon_deg
         self.ground_station_alt_m = ground_station_alt_m
@@ -159,6 +191,7 @@ class GeometricPrefilter:
         logger.info(f"   粗略仰角閾值: {self.min_rough_elevation_deg}° (安全緩衝)")
         logger.info(f"   最大斜距: {self.max_slant_range_km} km")
         logger.info(f"   高度範圍: {self.min_altitude_km}-{self.max_altitude_km} km")
+        logger.info(f"   模式: {self.mode}")
 
     def _wgs84_to_ecef(self, lat_deg: float, lon_deg: float, alt_m: float) -> Tuple[float, float, float]:
         """
@@ -284,6 +317,237 @@ class GeometricPrefilter:
 
         return jdn + jd_frac
 
+    # ==================== 陣列化計算 (N 顆衛星 × T 個時間點) ====================
+
+    def _teme_to_rough_ecef_array(self, positions_teme_km: np.ndarray, jd: np.ndarray) -> np.ndarray:
+        """
+        _teme_to_rough_ecef 的陣列版本 (相同 Meeus 簡化 GMST)
+
+        Args:
+            positions_teme_km: (..., 3) TEME 位置 (公里)
+            jd: (...) 儒略日
+
+        Returns:
+            (..., 3) 粗略 ECEF 座標 (公里)
+        """
+        days = jd - 2451545.0
+        T = days / 36525.0
+        gmst_rad = np.radians(
+            (280.46061837 + 360.98564736629 * days + 0.000387933 * T**2 - T**3 / 38710000.0) % 360.0
+        )
+        cos_gmst = np.cos(gmst_rad)
+        sin_gmst = np.sin(gmst_rad)
+
+        x = positions_teme_km[..., 0]
+        y = positions_teme_km[..., 1]
+        return np.stack([
+            x * cos_gmst + y * sin_gmst,
+            -x * sin_gmst + y * cos_gmst,
+            positions_teme_km[..., 2]
+        ], axis=-1)
+
+    def _classify_points(self, positions_teme_km: np.ndarray, jd: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        逐點判定 (與 filter_satellite_candidates 原逐點檢查順序相同)
+
+        Returns:
+            (codes, central_angle_rad)
+            codes: CANDIDATE 或 REJECTION_REASONS 中的原因索引 + 1
+            central_angle_rad: 衛星與地面站天頂方向的地心夾角
+        """
+        gs_ecef_km = np.asarray(self.ground_station_ecef_km)
+        zenith = gs_ecef_km / np.linalg.norm(gs_ecef_km)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            radius_km = np.linalg.norm(positions_teme_km, axis=-1)
+            altitude_km = radius_km - WGS84_SEMI_MAJOR_AXIS_M / 1000.0
+
+            sat_ecef_km = self._teme_to_rough_ecef_array(positions_teme_km, jd)
+            difference_km = sat_ecef_km - gs_ecef_km
+            slant_range_km = np.linalg.norm(difference_km, axis=-1)
+
+            # 仰角 = 90° - 天頂角
+            cos_zenith_angle = np.clip((difference_km @ zenith) / slant_range_km, -1.0, 1.0)
+            rough_elevation_deg = 90.0 - np.degrees(np.arccos(cos_zenith_angle))
+            central_angle_rad = np.arccos(np.clip((sat_ecef_km @ zenith) / radius_km, -1.0, 1.0))
+
+        # 由低優先序往高優先序覆寫 → 每點保留第一個失敗的檢查
+        codes = np.full(altitude_km.shape, CANDIDATE, dtype=np.int8)
+        codes[~(rough_elevation_deg >= self.min_rough_elevation_deg)] = 4   # always_below_horizon
+        codes[~(slant_range_km <= self.max_slant_range_km)] = 3             # distance_too_far
+        codes[altitude_km > self.max_altitude_km] = 2                       # altitude_too_high
+        codes[altitude_km < self.min_altitude_km] = 1                       # altitude_too_low
+        return codes, central_angle_rad
+
+    def horizon_half_angle_rad(self, radius_km: np.ndarray) -> np.ndarray:
+        """
+        地平線半角: 衛星地心距離 r 時，粗略仰角 >= min_rough_elevation_deg 的最大地心夾角
+
+        SOURCE: 球面幾何 (Wertz 2011, Space Mission Engineering, Section 8.3)
+        λ = arccos(R_gs · cos ε / r) - ε，λ 隨 r 單調遞增
+        """
+        gs_radius_km = float(np.linalg.norm(self.ground_station_ecef_km))
+        epsilon_rad = math.radians(self.min_rough_elevation_deg)
+        ratio = np.clip(gs_radius_km * math.cos(epsilon_rad) / np.asarray(radius_km, dtype=np.float64), -1.0, 1.0)
+        return np.arccos(ratio) - epsilon_rad
+
+    def _evaluate_candidates(self, positions_km: np.ndarray, jd: np.ndarray,
+                             valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        判斷每顆衛星是否有任何可能可見的時刻
+
+        Args:
+            positions_km: (N, T, 3) TEME 位置
+            jd: (N, T) 儒略日 (每列遞增)
+            valid: (N, T) 有效點遮罩
+
+        Returns:
+            (visible (N,), last_codes (N,), points_evaluated)
+        """
+        if self.mode == 'pass_window':
+            return self._evaluate_pass_window(positions_km, jd, valid)
+
+        n_sat, n_times = valid.shape
+        visible = np.zeros(n_sat, dtype=bool)
+        last_codes = np.full(n_sat, NOT_EVALUATED, dtype=np.int8)
+        evaluated = 0
+
+        # 逐時間區塊評估；已確認可見的衛星不再參與後續區塊 (等同原逐點迴圈的 break)
+        for start in range(0, n_times, PREFILTER_TIME_CHUNK):
+            stop = min(start + PREFILTER_TIME_CHUNK, n_times)
+            rows = np.flatnonzero(~visible & valid[:, start:stop].any(axis=1))
+            if rows.size == 0:
+                continue
+
+            chunk_valid = valid[rows, start:stop]
+            codes, _ = self._classify_points(positions_km[rows, start:stop], jd[rows, start:stop])
+            codes = np.where(chunk_valid, codes, NOT_EVALUATED)
+            evaluated += int(chunk_valid.sum())
+
+            visible[rows] = (codes == CANDIDATE).any(axis=1)
+            last_valid = chunk_valid.shape[1] - 1 - np.argmax(chunk_valid[:, ::-1], axis=1)
+            last_codes[rows] = codes[np.arange(rows.size), last_valid]
+
+        return visible, last_codes, evaluated
+
+    def _evaluate_pass_window(self, positions_km: np.ndarray, jd: np.ndarray,
+                              valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        解析跳躍模式: 以地平線半角界定最早可能進入可見範圍的時刻，跳過整段不可見軌道
+
+        保守界限 (不會漏掉 dense 模式判定可見的衛星):
+        - 半角使用該衛星窗口內最大地心距離 (上限 a + max_altitude_km)，λ 隨 r 遞增
+        - 地心夾角變化率 <= 相鄰取樣點慣性角速率最大值 × SKIP_RATE_MARGIN + GMST 自轉速率
+        - 夾角 θ > λ 時，接下來 (θ - λ) / 變化率 秒內的時間點均不可能通過仰角檢查
+        """
+        n_sat, n_times = valid.shape
+        visible = np.zeros(n_sat, dtype=bool)
+        last_codes = np.full(n_sat, NOT_EVALUATED, dtype=np.int8)
+        evaluated = 0
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            radius_km = np.sqrt(np.einsum('ntk,ntk->nt', positions_km, positions_km))
+            max_radius_km = np.where(valid, radius_km, -np.inf).max(axis=1)
+
+            # 相鄰有效取樣點之間的最大 TEME 方向夾角 / 最小取樣間隔 → 慣性角速率上界 (rad/s)
+            steps_s = np.diff(jd, axis=1) * 86400.0
+            pair_valid = valid[:, 1:] & valid[:, :-1] & (steps_s > 0)
+            pair_cos = np.einsum('ntk,ntk->nt', positions_km[:, 1:], positions_km[:, :-1]) / (
+                radius_km[:, 1:] * radius_km[:, :-1]
+            )
+            min_cos = np.where(pair_valid, pair_cos, 1.0).min(axis=1, initial=1.0)
+            min_step_s = np.where(pair_valid, steps_s, np.inf).min(axis=1, initial=np.inf)
+            max_rate = np.arccos(np.clip(min_cos, -1.0, 1.0)) / min_step_s
+        max_step_s = np.where(np.isfinite(steps_s), steps_s, -np.inf).max(axis=1, initial=-np.inf)
+        max_step_s = np.where(max_step_s > 0, max_step_s, np.inf)
+
+        radius_bound_km = np.minimum(max_radius_km, WGS84_SEMI_MAJOR_AXIS_M / 1000.0 + self.max_altitude_km)
+        half_angle_rad = self.horizon_half_angle_rad(radius_bound_km)
+        rate_bound = max_rate * SKIP_RATE_MARGIN + GMST_RATE_RAD_S
+
+        cursor = np.zeros(n_sat, dtype=np.int64)
+        pending = valid.any(axis=1)
+        while True:
+            rows = np.flatnonzero(pending & ~visible & (cursor < n_times))
+            if rows.size == 0:
+                break
+            cols = cursor[rows]
+            point_valid = valid[rows, cols]
+
+            codes, central_angle_rad = self._classify_points(positions_km[rows, cols], jd[rows, cols])
+            codes = np.where(point_valid, codes, NOT_EVALUATED)
+            evaluated += int(point_valid.sum())
+            visible[rows] = codes == CANDIDATE
+            last_codes[rows] = np.where(point_valid, codes, last_codes[rows])
+
+            # 可跳過的時間點數 (向下取整，落點本身仍會評估)
+            gap_s = (central_angle_rad - half_angle_rad[rows]) / rate_bound[rows]
+            skip = np.floor(np.where(point_valid & (gap_s > 0), gap_s, 0.0) / max_step_s[rows])
+            cursor[rows] += np.maximum(np.minimum(skip, n_times), 1).astype(np.int64)
+
+        return visible, last_codes, evaluated
+
+    # ==================== 輸入轉換 ====================
+
+    def _stack_time_series(self, teme_data: Dict[str, Any]) -> Tuple[
+            np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        逐點 TEME dict → 補齊的 (N, T_max) 陣列
+
+        Returns:
+            (point_counts, positions_km, jd, valid)
+            無時間戳的點略過 (與原逐點迴圈相同)；每列依時間排序
+        """
+        n_sat = len(teme_data)
+        point_counts = np.zeros(n_sat, dtype=np.int64)
+        rows = []
+        jd_lookup: Dict[str, float] = {}  # 各衛星共用時間軸 → 每個時間戳只解析一次
+
+        for i, (satellite_id, satellite_data) in enumerate(teme_data.items()):
+            time_series = satellite_data.get('time_series', [])
+            point_counts[i] = len(time_series)
+            try:
+                positions = [point['position_teme_km'] for point in time_series]
+            except KeyError:
+                # 🚨 Fail-Fast: 驗證必須存在的欄位
+                raise ValueError(
+                    f"❌ Fail-Fast Violation: Missing 'position_teme_km' for satellite {satellite_id}\n"
+                    f"This indicates corrupted TEME data in geometric prefilter input.\n"
+                    f"Cannot proceed with geometric filtering without position data."
+                )
+            timestamps = [point.get('datetime_utc') or point.get('timestamp') for point in time_series]
+            keep = [j for j, timestamp in enumerate(timestamps) if timestamp]
+            if not keep:
+                rows.append(None)
+                continue
+
+            timestamps = [timestamps[j] for j in keep]
+            new_timestamps = [timestamp for timestamp in set(timestamps) if timestamp not in jd_lookup]
+            if new_timestamps:
+                jd_lookup.update(zip(new_timestamps, _timestamps_to_jd(new_timestamps).tolist()))
+            rows.append((
+                np.array([jd_lookup[timestamp] for timestamp in timestamps]),
+                np.asarray([positions[j] for j in keep], dtype=np.float64)
+            ))
+
+        n_times = max((len(row[0]) for row in rows if row is not None), default=0)
+        positions_km = np.full((n_sat, n_times, 3), np.nan)
+        jd = np.full((n_sat, n_times), np.nan)
+
+        for i, row in enumerate(rows):
+            if row is None:
+                continue
+            row_jd, row_positions = row
+            order = np.argsort(row_jd, kind='stable')
+            n = len(row_jd)
+            jd[i, :n] = row_jd[order]
+            positions_km[i, :n] = row_positions[order]
+
+        valid = np.isfinite(positions_km).all(axis=2)
+        return point_counts, positions_km, jd, valid
+
+    # ==================== 公開介面 ====================
+
     def filter_satellite_candidates(self, teme_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         幾何預篩選：快速排除明顯不可見的衛星
@@ -294,98 +558,55 @@ class GeometricPrefilter:
         Returns:
             篩選後的 TEME 數據（保留可能可見的衛星）
         """
-        logger.info(f"🔍 開始幾何預篩選: {len(teme_data)} 顆衛星")
+        logger.info(f"🔍 開始幾何預篩選: {len(teme_data)} 顆衛星 (模式: {self.mode})")
 
-        filtered_data = {}
-        stats = {
-            'total_satellites': len(teme_data),
-            'filtered_out': 0,
-            'retained': 0,
-            'rejection_reasons': {
-                'altitude_too_low': 0,
-                'altitude_too_high': 0,
-                'distance_too_far': 0,
-                'always_below_horizon': 0,
-                'no_valid_points': 0
-            }
+        point_counts, positions, jd, valid = self._stack_time_series(teme_data)
+        visible, last_codes, evaluated = self._evaluate_candidates(positions, jd, valid)
+
+        self._record_statistics(visible, last_codes, point_counts == 0, evaluated, int(valid.sum()))
+        return {
+            satellite_id: satellite_data
+            for keep, (satellite_id, satellite_data) in zip(visible, teme_data.items()) if keep
         }
 
-        for satellite_id, satellite_data in teme_data.items():
-            time_series = satellite_data.get('time_series', [])
+    def filter_orbital_state_block(self, block: Any) -> Any:
+        """
+        幾何預篩選 (列式 OrbitalStateBlock 輸入)
 
-            if not time_series:
-                stats['rejection_reasons']['no_valid_points'] += 1
-                stats['filtered_out'] += 1
-                continue
+        Args:
+            block: Stage 2 OrbitalStateBlock (TEME)
+
+        Returns:
+            只保留可能可見衛星的 OrbitalStateBlock
+        """
+        logger.info(f"🔍 開始幾何預篩選: {block.n_satellites} 顆衛星 (列式區塊, 模式: {self.mode})")
 
-            # 檢查衛星在整個時間窗口內是否有任何可能可見的時刻
-            has_potential_visibility = False
-            rejection_reason = None
+        start_jd = self._datetime_to_jd(block.time_start_utc.astimezone(timezone.utc))
+        jd = np.broadcast_to(start_jd + block.time_offsets_seconds / 86400.0, block.valid_mask.shape)
+        visible, last_codes, evaluated = self._evaluate_candidates(block.positions_km, jd, block.valid_mask)
 
-            for teme_point in time_series:
-                # 🚨 Fail-Fast: 驗證必須存在的欄位
-                if 'position_teme_km' not in teme_point:
-                    raise ValueError(
-                        f"❌ Fail-Fast Violation: Missing 'position_teme_km' for satellite {satellite_id}\n"
-                        f"This indicates corrupted TEME data in geometric prefilter input.\n"
-                        f"Cannot proceed with geometric filtering without position data."
-                    )
-
-                position_teme_km = teme_point['position_teme_km']
-                timestamp_str = teme_point.get('datetime_utc') or teme_point.get('timestamp')
-
-                if not timestamp_str:
-                    continue
-
-                try:
-                    dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-
-                    # 1. 高度檢查（快速排除異常軌道）
-                    altitude_km = math.sqrt(sum(x**2 for x in position_teme_km)) - WGS84_SEMI_MAJOR_AXIS_M / 1000.0
-
-                    if altitude_km < self.min_altitude_km:
-                        rejection_reason = 'altitude_too_low'
-                        continue
-                    if altitude_km > self.max_altitude_km:
-                        rejection_reason = 'altitude_too_high'
-                        continue
-
-                    # 2. 轉換為粗略 ECEF
-                    sat_ecef_km = self._teme_to_rough_ecef(position_teme_km, dt)
-
-                    # 3. 距離檢查
-                    dx = sat_ecef_km[0] - self.ground_station_ecef_km[0]
-                    dy = sat_ecef_km[1] - self.ground_station_ecef_km[1]
-                    dz = sat_ecef_km[2] - self.ground_station_ecef_km[2]
-                    slant_range_km = math.sqrt(dx**2 + dy**2 + dz**2)
-
-                    if slant_range_km > self.max_slant_range_km:
-                        rejection_reason = 'distance_too_far'
-                        continue
-
-                    # 4. 粗略仰角檢查
-                    rough_elevation_deg = self._calculate_rough_elevation(sat_ecef_km)
-
-                    if rough_elevation_deg < self.min_rough_elevation_deg:
-                        rejection_reason = 'always_below_horizon'
-                        continue
-
-                    # ✅ 通過所有檢查，此時刻可能可見
-                    has_potential_visibility = True
-                    break  # 只要有一個時刻可能可見，就保留這顆衛星
-
-                except Exception as e:
-                    logger.debug(f"預篩選計算錯誤 {satellite_id}: {e}")
-                    continue
-
-            # 決定是否保留此衛星
-            if has_potential_visibility:
-                filtered_data[satellite_id] = satellite_data
-                stats['retained'] += 1
-            else:
-                stats['filtered_out'] += 1
-                if rejection_reason:
-                    stats['rejection_reasons'][rejection_reason] += 1
+        self._record_statistics(visible, last_codes, ~block.valid_mask.any(axis=1), evaluated,
+                                block.total_valid_points)
+        return block.select(np.flatnonzero(visible))
+
+    def _record_statistics(self, visible: np.ndarray, last_codes: np.ndarray, empty: np.ndarray,
+                           points_evaluated: int, total_points: int) -> Dict[str, Any]:
+        """統計與日誌 (排除原因取最後一個評估點的判定)"""
+        rejected = ~visible & ~empty
+        stats = {
+            'total_satellites': int(visible.size),
+            'filtered_out': int((~visible).sum()),
+            'retained': int(visible.sum()),
+            'rejection_reasons': {
+                reason: int((rejected & (last_codes == code)).sum())
+                for code, reason in enumerate(REJECTION_REASONS, start=1)
+            },
+            'mode': self.mode,
+            'total_points': total_points,
+            'points_evaluated': points_evaluated
+        }
+        stats['rejection_reasons']['no_valid_points'] = int(empty.sum())
+        self.last_statistics = stats
 
         # 統計報告
         retention_rate = stats['retained'] / stats['total_satellites'] * 100 if stats['total_satellites'] > 0 else 0
@@ -394,16 +615,34 @@ class GeometricPrefilter:
         logger.info(f"   輸入: {stats['total_satellites']} 顆衛星")
         logger.info(f"   保留: {stats['retained']} 顆 ({retention_rate:.1f}%)")
         logger.info(f"   排除: {stats['filtered_out']} 顆 ({100-retention_rate:.1f}%)")
+        logger.info(f"   評估點數: {points_evaluated:,} / {total_points:,}")
         logger.info(f"   排除原因:")
         for reason, count in stats['rejection_reasons'].items():
             if count > 0:
                 logger.info(f"      {reason}: {count} 顆")
-
-        return filtered_data
+        return stats
+
+
+def _timestamps_to_jd(timestamps: Sequence[str]) -> np.ndarray:
+    """ISO 8601 UTC 時間戳 → 儒略日陣列 (與 GeometricPrefilter._datetime_to_jd 相同)"""
+    naive = []
+    for timestamp in timestamps:
+        if timestamp.endswith('Z'):
+            naive.append(timestamp[:-1])
+        elif timestamp.endswith('+00:00'):
+            naive.append(timestamp[:-6])
+        elif len(timestamp) > 19 and timestamp[-6] in '+-' and timestamp[-3] == ':':
+            dt = datetime.fromisoformat(timestamp).astimezone(timezone.utc)
+            naive.append(dt.replace(tzinfo=None).isoformat())
+        else:
+            naive.append(timestamp)
+    offsets = np.array(naive, dtype='datetime64[us]') - J2000_DATETIME64
+    return 2451545.0 + offsets / np.timedelta64(1, 'D')
 
 
 def create_geometric_prefilter(ground_station_lat_deg: float,
                                 ground_station_lon_deg: float,
-                                ground_station_alt_m: float = 0.0) -> GeometricPrefilter:
+                                ground_station_alt_m: float = 0.0,
+                                mode: str = 'dense') -> GeometricPrefilter:
     """創建幾何預篩選器實例"""
-    return GeometricPrefilter(ground_station_lat_deg, ground_station_lon_deg, ground_station_alt_m)
+    return GeometricPrefilter(ground_station_lat_deg, ground_station_lon_deg, ground_station_alt_m, mode)
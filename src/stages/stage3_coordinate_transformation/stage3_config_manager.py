@@ -64,7 +64,8 @@ class Stage3ConfigManager(BaseConfigManager):
         return {
             # ==================== 幾何預篩選配置 ====================
             'geometric_prefilter': {
-                'enabled': False  # v3.1: 已禁用預篩選
+                'enabled': False,  # v3.1: 已禁用預篩選
+                'mode': 'dense'  # dense | pass_window (地平線半角跳過不可見軌道段)
             },
 
             # ==================== 座標轉換配置 ====================
@@ -161,6 +162,15 @@ class Stage3ConfigManager(BaseConfigManager):
         Returns:
             Tuple[bool, Optional[str]]: (is_valid, error_message)
         """
+        # Validate geometric prefilter configuration
+        prefilter_mode = config.get('geometric_prefilter', {}).get('mode', 'dense')
+        valid_prefilter_modes = ['dense', 'pass_window']
+        if prefilter_mode not in valid_prefilter_modes:
+            return False, (
+                f"geometric_prefilter.mode 必須是 {valid_prefilter_modes} 之一，"
+                f"實際: {prefilter_mode}"
+            )
+
         # Validate coordinate configuration
         if 'coordinate_config' in config:
             coord_config = config['coordinate_config']
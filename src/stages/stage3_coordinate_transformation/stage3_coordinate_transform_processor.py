@@ -36,9 +36,11 @@ Stage 3: 座標系統轉換層處理器 - v3.1 模組化架構
 
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 # 真實座標轉換引擎
 try:
     from src.shared.coordinate_systems.iers_data_manager import get_iers_manager
@@ -58,8 +60,9 @@ from src.stages.stage3_coordinate_transformation.stage3_compliance_validator imp
 from src.stages.stage3_coordinate_transformation.stage3_results_manager import create_results_manager
 
 # 共享模組導入
-from src.shared.base import BaseStageProcessor
+from src.shared.base import BaseStageProcessor, IncrementalPlan, IncrementalSatelliteStore
 from src.shared.base import ProcessingStatus, ProcessingResult, create_processing_result
+from src.shared.base.stage_cache import fingerprint_data
 
 logger = logging.getLogger(__name__)
 
@@ -130,11 +133,19 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
         # NOTE: v3.1 預設禁用幾何預篩選以確保 100% Grade A 學術合規
         # SOURCE: CRITICAL DEVELOPMENT PRINCIPLE - NO SIMPLIFIED ALGORITHMS
         self.prefilter_enabled = self.config.get('enable_geometric_prefilter', False)
+        self.prefilter_mode = self.config.get('geometric_prefilter_mode', 'dense')
         self.ground_station_config = self.config.get('ground_station', {
             'latitude_deg': 24.9438888888889,
             'longitude_deg': 121.370833333333,
             'altitude_m': 36.0
         })
+        # 預篩選只對此地面站判斷可見性 → 記錄於 metadata.geometric_prefilter，Stage 4 地面站網路據此 Fail-Fast
+        self.prefilter_ground_station = {
+            'name': self.ground_station_config.get('name', 'NTPU'),
+            'latitude_deg': self.ground_station_config['latitude_deg'],
+            'longitude_deg': self.ground_station_config['longitude_deg'],
+            'altitude_m': self.ground_station_config.get('altitude_m', 0.0)
+        } if self.prefilter_enabled else None
 
         # 初始化真實座標系統管理器
         try:
@@ -148,9 +159,10 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                 self.geometric_prefilter = create_geometric_prefilter(
                     ground_station_lat_deg=self.ground_station_config['latitude_deg'],
                     ground_station_lon_deg=self.ground_station_config['longitude_deg'],
-                    ground_station_alt_m=self.ground_station_config.get('altitude_m', 0.0)
+                    ground_station_alt_m=self.ground_station_config.get('altitude_m', 0.0),
+                    mode=self.prefilter_mode
                 )
-                self.logger.info("✅ 幾何預篩選器已啟用 (優化模式)")
+                self.logger.info(f"✅ 幾何預篩選器已啟用 (優化模式: {self.prefilter_mode})")
             else:
                 self.geometric_prefilter = None
                 self.logger.info("ℹ️ 幾何預篩選器已禁用 (全量計算模式)")
@@ -177,6 +189,9 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
             config=self.config
         )
 
+        # 🔁 增量模式: 只轉換輸入內容改變的衛星 (incremental.enabled 或 ORBIT_ENGINE_INCREMENTAL=1)
+        self.incremental_store = IncrementalSatelliteStore.for_processor(self)
+
         # 處理統計
         self.processing_stats = {
             'total_satellites_processed': 0,
@@ -188,6 +203,7 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
             'official_wgs84_used': 0,
             # 🚀 預篩選統計
             'prefilter_enabled': self.prefilter_enabled,
+            'prefilter_ground_station': self.prefilter_ground_station,
             'satellites_before_prefilter': 0,
             'satellites_after_prefilter': 0,
             'prefilter_retention_rate': 0.0
@@ -300,6 +316,15 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                         'metadata': merged_metadata
                     }
 
+                    # 📦 列式路徑: 僅讀取緩存的經緯度/高度欄位附加至 Stage 2 區塊，供 Stage 4 直接使用
+                    teme_block = self.data_extractor.extract_orbital_state_block(input_data)
+                    if teme_block is not None:
+                        if self.prefilter_enabled and self.geometric_prefilter is not None:
+                            teme_block = self.geometric_prefilter.filter_orbital_state_block(teme_block)
+                        geodetic_block = self.results_manager.load_geodetic_block(cache_file, teme_block)
+                        if geodetic_block is not None:
+                            result_data['orbital_state_block'] = geodetic_block
+
                     self.logger.info(
                         f"✅ 緩存載入完成: {self.processing_stats['total_satellites_processed']} 顆衛星, "
                         f"{self.processing_stats['total_coordinate_points']:,} 座標點, "
@@ -316,6 +341,14 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
 
             # ✅ 步驟 2: 提取 TEME 座標數據（緩存未命中或失效）
             self.logger.info("🔄 緩存未命中，執行完整座標轉換")
+
+            # 📦 列式路徑: 共用時間軸時直接處理 OrbitalStateBlock (預篩選亦以陣列執行)
+            orbital_state_block = self.data_extractor.extract_orbital_state_block(input_data)
+            if orbital_state_block is not None:
+                return self._process_orbital_state_block(
+                    orbital_state_block, input_data, cache_key, start_time
+                )
+
             teme_data = self.data_extractor.extract_teme_coordinates(input_data)
             if not teme_data:
                 return create_processing_result(
@@ -351,8 +384,22 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                 self.processing_stats['satellites_after_prefilter'] = len(teme_data)
                 self.processing_stats['prefilter_retention_rate'] = 100.0
 
-            # ✅ 步驟 4: 執行批量座標轉換
-            geographic_coordinates = self.transformation_engine.perform_batch_transformation(teme_data)
+            # ✅ 步驟 4: 執行批量座標轉換 (增量模式僅轉換 dirty 衛星)
+            incremental_plan, reused = self._plan_incremental(
+                lambda: {sat_id: fingerprint_data(sat_data) for sat_id, sat_data in teme_data.items()}
+            )
+            dirty_data = teme_data if incremental_plan is None else {
+                sat_id: teme_data[sat_id] for sat_id in incremental_plan.dirty_ids
+            }
+            geographic_coordinates = (
+                self.transformation_engine.perform_batch_transformation(dirty_data) if dirty_data else {}
+            )
+            if reused:
+                geographic_coordinates = {
+                    sat_id: geographic_coordinates[sat_id] if sat_id in geographic_coordinates else reused[sat_id]
+                    for sat_id in teme_data
+                    if sat_id in geographic_coordinates or sat_id in reused
+                }
 
             # ✅ 步驟 5: 更新處理統計
             transformation_stats = self.transformation_engine.get_transformation_statistics()
@@ -365,6 +412,9 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                 'real_iers_data_used': transformation_stats['real_iers_data_used'],
                 'official_wgs84_used': transformation_stats['official_wgs84_used']
             })
+            self._add_reused_point_stats(
+                sum(len(entry.get('time_series', [])) for entry in reused.values()), len(reused)
+            )
 
             # ✅ 步驟 6: 建立輸出數據
             processing_time = datetime.now(timezone.utc) - start_time
@@ -396,6 +446,10 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                 'metadata': merged_metadata
             }
 
+            if incremental_plan is not None:
+                merged_metadata['incremental'] = incremental_plan.summary()
+                self.incremental_store.save(incremental_plan.fingerprints, geographic_coordinates)
+
             # 🚀 步驟 7: 保存到 HDF5 緩存（異步，不影響主流程）
             try:
                 cache_saved = self.results_manager.save_to_cache(
@@ -426,6 +480,199 @@ class Stage3CoordinateTransformProcessor(BaseStageProcessor):
                 message=f"真實座標轉換錯誤: {str(e)}"
             )
 
+    def _process_orbital_state_block(
+        self,
+        block: Any,
+        input_data: Dict[str, Any],
+        cache_key: str,
+        start_time: datetime
+    ) -> ProcessingResult:
+        """
+        列式座標轉換流程 (OrbitalStateBlock)
+
+        轉換後的區塊附加於輸出 `orbital_state_block`，Stage 4 可直接讀取陣列；
+        `geographic_coordinates` 仍以舊版結構輸出供 JSON 與驗證器使用。
+        """
+        satellites_before = block.n_satellites
+        if self.prefilter_enabled and self.geometric_prefilter is not None:
+            self.logger.info("🔍 執行幾何預篩選優化 (列式區塊)...")
+            block = self.geometric_prefilter.filter_orbital_state_block(block)
+        self.processing_stats['satellites_before_prefilter'] = satellites_before
+        self.processing_stats['satellites_after_prefilter'] = block.n_satellites
+        self.processing_stats['prefilter_retention_rate'] = (
+            block.n_satellites / satellites_before * 100 if satellites_before > 0 else 100.0
+        )
+
+        incremental_plan, reused = self._plan_incremental(
+            lambda: dict(zip(block.satellite_ids, block.row_fingerprints()))
+        )
+        if reused:
+            geodetic_block, accuracy_m = self._transform_block_incremental(block, incremental_plan, reused)
+        else:
+            geodetic_block, accuracy_m = self.transformation_engine.transform_orbital_state_block(block)
+        geographic_coordinates = self.transformation_engine.build_geographic_coordinates(
+            geodetic_block, accuracy_m
+        )
+
+        transformation_stats = self.transformation_engine.get_transformation_statistics()
+        self.processing_stats.update({
+            'total_satellites_processed': len(geographic_coordinates),
+            'total_coordinate_points': transformation_stats['total_coordinate_points'],
+            'successful_transformations': transformation_stats['successful_transformations'],
+            'transformation_errors': transformation_stats['transformation_errors'],
+            'average_accuracy_m': transformation_stats['average_accuracy_m'],
+            'real_iers_data_used': transformation_stats['real_iers_data_used'],
+            'official_wgs84_used': transformation_stats['official_wgs84_used']
+        })
+        self._add_reused_point_stats(
+            sum(int(entry['valid_mask'].sum()) for entry in reused.values()), len(reused)
+        )
+
+        processing_time = datetime.now(timezone.utc) - start_time
+        merged_metadata = self.results_manager.create_processing_metadata(
+            processing_stats=self.processing_stats,
+            upstream_metadata=input_data.get('metadata', {}),
+            coordinate_config=self.coordinate_config,
+            precision_config=self.precision_config,
+            engine_status=self.coordinate_engine.get_engine_status(),
+            iers_quality=self.iers_manager.get_data_quality_report(),
+            wgs84_summary=self.wgs84_manager.get_parameter_summary(),
+            processing_time_seconds=processing_time.total_seconds()
+        )
+
+        result_data = {
+            'stage': 3,
+            'stage_name': 'coordinate_system_transformation',
+            'geographic_coordinates': geographic_coordinates,
+            'metadata': merged_metadata,
+            'orbital_state_block': geodetic_block
+        }
+
+        if incremental_plan is not None:
+            merged_metadata['incremental'] = incremental_plan.summary()
+            self.incremental_store.save(incremental_plan.fingerprints, {
+                sat_id: {
+                    'latitude_deg': geodetic_block.latitude_deg[row],
+                    'longitude_deg': geodetic_block.longitude_deg[row],
+                    'altitude_m': geodetic_block.altitude_m[row],
+                    'accuracy_m': accuracy_m[row],
+                    'valid_mask': geodetic_block.valid_mask[row]
+                }
+                for row, sat_id in enumerate(geodetic_block.satellite_ids)
+            })
+
+        try:
+            if self.results_manager.save_to_cache(
+                cache_key=cache_key,
+                geographic_coordinates=geographic_coordinates,
+                metadata=merged_metadata
+            ):
+                self.logger.info("💾 座標數據已保存到緩存，下次執行將直接使用緩存")
+        except Exception as cache_error:
+            self.logger.warning(f"⚠️ 緩存保存失敗（不影響結果）: {cache_error}")
+
+        return create_processing_result(
+            status=ProcessingStatus.SUCCESS,
+            data=result_data,
+            message=f"成功轉換 {self.processing_stats['total_satellites_processed']} 顆衛星的座標"
+        )
+
+    # ==================== 增量處理 ====================
+
+    def transform_block(self, block: Any) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        串流模式單批次轉換 - 幾何預篩選 + 列式座標轉換，不建立 geographic_coordinates
+
+        預篩選統計跨批次累計；整批皆被篩除時返回 (None, None)。
+
+        Args:
+            block: Stage 2 OrbitalStateBlock (TEME，一個有界批次)
+
+        Returns:
+            (geodetic_block, accuracy_m): 同 transform_orbital_state_block()
+        """
+        satellites_before = block.n_satellites
+        if self.prefilter_enabled and self.geometric_prefilter is not None:
+            block = self.geometric_prefilter.filter_orbital_state_block(block)
+
+        stats = self.processing_stats
+        stats['satellites_before_prefilter'] += satellites_before
+        stats['satellites_after_prefilter'] += block.n_satellites
+        stats['prefilter_retention_rate'] = (
+            stats['satellites_after_prefilter'] / stats['satellites_before_prefilter'] * 100
+            if stats['satellites_before_prefilter'] > 0 else 100.0
+        )
+        if block.n_satellites == 0:
+            return None, None
+        return self.transformation_engine.transform_orbital_state_block(block)
+
+    def _plan_incremental(
+        self,
+        compute_fingerprints: Callable[[], Dict[str, str]]
+    ) -> Tuple[Optional[IncrementalPlan], Dict[str, Any]]:
+        """
+        比對逐衛星輸入指紋
+
+        Args:
+            compute_fingerprints: 產生 衛星ID → 輸入指紋 (僅在增量模式啟用時呼叫)
+
+        Returns:
+            (計劃, 可沿用的上次結果)；未啟用增量模式時返回 (None, {})
+        """
+        if self.incremental_store is None:
+            return None, {}
+        plan = self.incremental_store.plan(compute_fingerprints())
+        return plan, self.incremental_store.load(plan.reused_ids)
+
+    def _transform_block_incremental(
+        self,
+        block: Any,
+        plan: IncrementalPlan,
+        reused: Dict[str, Any]
+    ) -> Tuple[Any, np.ndarray]:
+        """
+        列式增量轉換: 只轉換 dirty 衛星列，其餘列填入上次的 WGS84 結果
+
+        Returns:
+            (geodetic_block, accuracy_m): 與 transform_orbital_state_block() 相同
+        """
+        shape = block.valid_mask.shape
+        latitude = np.full(shape, np.nan)
+        longitude = np.full(shape, np.nan)
+        altitude = np.full(shape, np.nan)
+        accuracy = np.full(shape, np.nan)
+
+        dirty_rows = [block.index_of(sat_id) for sat_id in plan.dirty_ids]
+        if dirty_rows:
+            dirty_block, dirty_accuracy = self.transformation_engine.transform_orbital_state_block(
+                block.select(dirty_rows)
+            )
+            latitude[dirty_rows] = dirty_block.latitude_deg
+            longitude[dirty_rows] = dirty_block.longitude_deg
+            altitude[dirty_rows] = dirty_block.altitude_m
+            accuracy[dirty_rows] = dirty_accuracy
+
+        # 指紋只涵蓋有效點，區塊補齊長度可能不同: 僅複製共同長度
+        for sat_id, entry in reused.items():
+            row = block.index_of(sat_id)
+            n = min(shape[1], len(entry['valid_mask']))
+            latitude[row, :n] = entry['latitude_deg'][:n]
+            longitude[row, :n] = entry['longitude_deg'][:n]
+            altitude[row, :n] = entry['altitude_m'][:n]
+            accuracy[row, :n] = entry['accuracy_m'][:n]
+
+        self.logger.info(f"🔁 列式增量轉換: {len(dirty_rows)} 顆重新轉換，{len(reused)} 顆沿用上次結果")
+        return block.with_geodetic(latitude, longitude, altitude), accuracy
+
+    def _add_reused_point_stats(self, reused_points: int, reused_satellites: int) -> None:
+        """沿用的座標點於上次運行時同樣以 IERS / WGS84 官方數據轉換，併入統計"""
+        if not reused_satellites:
+            return
+        for key in ('total_coordinate_points', 'successful_transformations',
+                    'real_iers_data_used', 'official_wgs84_used'):
+            self.processing_stats[key] += reused_points
+        self.processing_stats['reused_satellites'] = reused_satellites
+
     def validate_input(self, input_data: Any) -> Dict[str, Any]:
         """驗證輸入數據"""
         return self.data_validator.validate_input(input_data)
@@ -15,8 +15,12 @@ Stage 3: 數據提取器 - TEME 座標提取與預處理模組
 import logging
 import random  # NOTE: 用於統計取樣，非生成模擬數據（符合 Grade A 標準）
 import numpy as np
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 
+from src.shared.data_structures import OrbitalStateBlock
+from src.shared.utils.hdf5_dataset_view import SatelliteDatasetView
+
 try:
     import h5py
     HDF5_AVAILABLE = True
@@ -116,6 +120,45 @@ class Stage3DataExtractor:
 
         return teme_coordinates
 
+    def extract_orbital_state_block(self, input_data: Any) -> Optional[OrbitalStateBlock]:
+        """
+        提取列式 OrbitalStateBlock（共用時間軸時）
+
+        優先使用同進程 Stage 2 傳入的區塊；否則從 JSON `satellites` 結構
+        或 Stage 2 分組 HDF5 (經惰性視圖整列讀取) 建立。
+        independent_epoch 模式 (各衛星時間軸不同) 返回 None，呼叫端改走逐點路徑。
+
+        Args:
+            input_data: Stage 2 的輸出數據（字典或 HDF5 文件路徑）
+
+        Returns:
+            OrbitalStateBlock 或 None
+        """
+        if isinstance(input_data, str) and input_data.endswith(('.h5', '.hdf5')):
+            block = self._extract_block_from_hdf5(input_data)
+        elif not isinstance(input_data, dict):
+            return None
+        elif isinstance(input_data.get('orbital_state_block'), OrbitalStateBlock):
+            block = input_data['orbital_state_block']
+            self.logger.info(f"📦 使用 Stage 2 記憶體內 OrbitalStateBlock: {block.n_satellites} 顆衛星")
+        else:
+            interval = input_data.get('metadata', {}).get('time_interval_seconds')
+            block = OrbitalStateBlock.from_stage2_satellites(input_data.get('satellites', {}), interval)
+            if block is not None:
+                self.logger.info(f"📦 從 Stage 2 JSON 建立 OrbitalStateBlock: {block.n_satellites} 顆衛星")
+
+        if block is None:
+            return None
+
+        # 應用取樣模式（如啟用）
+        if self.sample_mode and block.n_satellites > self.sample_size:
+            # NOTE: random.sample() 用於無偏抽樣，非生成假數據
+            rows = sorted(random.sample(range(block.n_satellites), self.sample_size))
+            self.logger.info(f"🔬 取樣模式: {len(rows)}/{block.n_satellites} 顆衛星")
+            block = block.select(rows)
+
+        return block
+
     def _parse_orbital_states(self, orbital_states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         解析軌道狀態數據
@@ -176,61 +219,121 @@ class Stage3DataExtractor:
 
         self.logger.info(f"📦 開始讀取 HDF5 文件: {hdf5_file}")
 
-        with h5py.File(hdf5_file, 'r') as f:
-            # 驗證格式
-            if f.attrs.get('coordinate_system') != 'TEME':
-                raise ValueError(f"非 TEME 座標格式: {f.attrs.get('coordinate_system')}")
-
-            total_satellites = 0
-
-            # 遍歷所有星座
-            for constellation_name in f.keys():
-                const_group = f[constellation_name]
-
-                # 遍歷星座中的所有衛星
-                for sat_id in const_group.keys():
-                    sat_group = const_group[sat_id]
+        with self._open_stage2_hdf5(hdf5_file) as view:
+            # 應用取樣模式（如啟用）
+            for sat_id in self._sample_satellite_ids(view.satellite_ids):
+                # 讀取壓縮數據（自動解壓）
+                positions = view.column(sat_id, 'position_teme_km').tolist()  # (N, 3)
+                velocities = view.column(sat_id, 'velocity_teme_km_s').tolist()  # (N, 3)
+                timestamps = view.column(sat_id, 'timestamps_utc').tolist()  # (N,)
+
+                # 轉換為階段三所需格式
+                time_series = [
+                    {
+                        'datetime_utc': ts,
+                        'position_teme_km': pos,
+                        'velocity_teme_km_s': vel
+                    }
+                    for ts, pos, vel in zip(timestamps, positions, velocities)
+                ]
+
+                # ✅ Grade A 學術標準: 保留完整的衛星元數據
+                # 確保數據完整性從 Stage 1 → Stage 2 → Stage 3 → Stage 4 傳遞
+                sat_attrs = view.attrs(sat_id)
+                teme_coordinates[sat_id] = {
+                    'satellite_id': sat_id,
+                    'constellation': view.constellation(sat_id),
+                    'time_series': time_series,
+                    # 🔑 保留 Stage 1/2 的元數據，供下游階段使用
+                    'epoch_datetime': sat_attrs.get('epoch_datetime'),  # Stage 1 Epoch 時間
+                    'algorithm_used': sat_attrs.get('algorithm_used'),  # Stage 2 算法（SGP4）
+                    'coordinate_system': 'TEME'  # Stage 2 座標系統
+                }
 
-                    # 讀取壓縮數據（自動解壓）
-                    positions = sat_group['position_teme_km'][:]  # (N, 3) array
-                    velocities = sat_group['velocity_teme_km_s'][:]  # (N, 3) array
-                    timestamps = sat_group['timestamps_utc'][:].astype(str)  # (N,) array
+        self.logger.info(f"✅ HDF5 讀取完成: {len(teme_coordinates)} 顆衛星數據")
 
-                    # 轉換為階段三所需格式
-                    time_series = [
-                        {
-                            'datetime_utc': ts,
-                            'position_teme_km': pos.tolist(),
-                            'velocity_teme_km_s': vel.tolist()
-                        }
-                        for ts, pos, vel in zip(timestamps, positions, velocities)
-                    ]
+        return teme_coordinates
 
-                    # ✅ Grade A 學術標準: 保留完整的衛星元數據
-                    # 確保數據完整性從 Stage 1 → Stage 2 → Stage 3 → Stage 4 傳遞
-                    teme_coordinates[sat_id] = {
-                        'satellite_id': sat_id,
-                        'constellation': sat_group.attrs.get('constellation', constellation_name),
-                        'time_series': time_series,
-                        # 🔑 保留 Stage 1/2 的元數據，供下游階段使用
-                        'epoch_datetime': sat_group.attrs.get('epoch_datetime'),  # Stage 1 Epoch 時間
-                        'algorithm_used': sat_group.attrs.get('algorithm_used'),  # Stage 2 算法（SGP4）
-                        'coordinate_system': 'TEME'  # Stage 2 座標系統
-                    }
+    def _extract_block_from_hdf5(self, hdf5_file: str) -> Optional[OrbitalStateBlock]:
+        """
+        從 Stage 2 HDF5 直接建立 OrbitalStateBlock（不建立逐點 dict）
 
-                    total_satellites += 1
+        以惰性視圖整列讀取位置/速度欄位；各衛星時間軸起點或間隔不同、或中段有缺口時返回 None。
+        """
+        if not HDF5_AVAILABLE:
+            raise ImportError("h5py 未安裝，無法讀取 HDF5 格式")
 
-        self.logger.info(f"✅ HDF5 讀取完成: {total_satellites} 顆衛星數據")
+        with self._open_stage2_hdf5(hdf5_file) as view:
+            satellite_ids = view.satellite_ids
+            if not satellite_ids:
+                return None
+
+            first_timestamps = {sat_id: view.column(sat_id, 'timestamps_utc', slice(0, 2)) for sat_id in satellite_ids}
+            reference = next((ts for ts in first_timestamps.values() if len(ts) == 2), None)
+            if reference is None:
+                return None
+            for sat_id, ts in first_timestamps.items():
+                if len(ts) == 0 or ts[0] != reference[0] or (len(ts) == 2 and ts[1] != reference[1]):
+                    self.logger.info(f"衛星 {sat_id} 時間軸與其他衛星不同，無法建立 OrbitalStateBlock")
+                    return None
+
+            time_start = datetime.fromisoformat(reference[0].replace('Z', '+00:00'))
+            interval = (datetime.fromisoformat(reference[1].replace('Z', '+00:00')) - time_start).total_seconds()
+            if interval <= 0:
+                return None
+
+            # 驗證共用時間軸無缺口 (與 OrbitalStateBlock.from_stage2_satellites 相同的首尾跨度檢查)
+            # SGP4 錯誤略過的點或自適應取樣只保留的可見窗口會使中段缺口，逐點位置無法對齊網格
+            for sat_id in satellite_ids:
+                n_points = view.length(sat_id, 'timestamps_utc')
+                last = datetime.fromisoformat(
+                    str(view.column(sat_id, 'timestamps_utc', n_points - 1)).replace('Z', '+00:00')
+                )
+                if abs((last - time_start).total_seconds() - (n_points - 1) * interval) > 1e-6:
+                    self.logger.info(f"衛星 {sat_id} 時間軸不連續，無法建立 OrbitalStateBlock")
+                    return None
+
+            positions, lengths = view.stack('position_teme_km')
+            velocities, _ = view.stack('velocity_teme_km_s')
+            valid = np.arange(positions.shape[1])[np.newaxis, :] < lengths[:, np.newaxis]
+
+            attrs = [view.attrs(sat_id) for sat_id in satellite_ids]
+            epoch_datetimes = [a.get('epoch_datetime') for a in attrs]
+            if time_start.tzinfo is None:
+                time_start = time_start.replace(tzinfo=timezone.utc)
+            epoch_offsets = np.array([
+                (time_start - datetime.fromisoformat(epoch.replace('Z', '+00:00'))).total_seconds() / 60.0
+                for epoch in epoch_datetimes
+            ])
+
+            block = OrbitalStateBlock(
+                satellite_ids=satellite_ids,
+                constellations=[view.constellation(sat_id) for sat_id in satellite_ids],
+                epoch_datetimes=epoch_datetimes,
+                time_start_utc=time_start,
+                interval_seconds=interval,
+                positions_km=positions,
+                velocities_km_s=velocities,
+                epoch_offsets_minutes=epoch_offsets,
+                valid_mask=valid,
+                algorithm_used=attrs[0].get('algorithm_used') or 'SGP4'
+            )
 
-        # 應用取樣模式（如啟用）
-        if self.sample_mode:
-            teme_coordinates = self._apply_sampling_direct(teme_coordinates)
+        self.logger.info(f"📦 從 Stage 2 HDF5 建立 OrbitalStateBlock: {block.n_satellites} 顆衛星")
+        return block
 
-        return teme_coordinates
+    def _open_stage2_hdf5(self, hdf5_file: str) -> SatelliteDatasetView:
+        """開啟 Stage 2 分組 HDF5 並驗證座標系統"""
+        view = SatelliteDatasetView(hdf5_file)
+        coordinate_system = view.file_attrs.get('coordinate_system')
+        if coordinate_system != 'TEME':
+            view.close()
+            raise ValueError(f"非 TEME 座標格式: {coordinate_system}")
+        return view
 
-    def _apply_sampling_direct(self, teme_coordinates: Dict[str, Any]) -> Dict[str, Any]:
+    def _sample_satellite_ids(self, satellite_ids: List[str]) -> List[str]:
         """
-        直接對 TEME 座標應用取樣（用於 HDF5）
+        在讀取前對衛星 ID 應用取樣（用於 HDF5，未選中的衛星不解壓）
 
         ⚠️ 學術合規說明:
         - random.sample() 用於統計取樣，非生成模擬數據
@@ -239,20 +342,19 @@ class Stage3DataExtractor:
         - 生產環境: 建議禁用取樣模式以使用完整數據
 
         Args:
-            teme_coordinates: TEME 座標數據（真實 SGP4 計算結果）
+            satellite_ids: HDF5 文件中的衛星 ID（真實 SGP4 計算結果）
 
         Returns:
-            取樣後的 TEME 座標數據（仍為真實數據，僅數量減少）
+            取樣後的衛星 ID（仍為真實數據，僅數量減少）
         """
-        if len(teme_coordinates) <= self.sample_size:
-            return teme_coordinates
+        if not self.sample_mode or len(satellite_ids) <= self.sample_size:
+            return satellite_ids
 
         # NOTE: random.sample() 用於無偏抽樣，非生成假數據
-        sampled_ids = random.sample(list(teme_coordinates.keys()), self.sample_size)
-        sampled = {sat_id: teme_coordinates[sat_id] for sat_id in sampled_ids}
+        sampled_ids = random.sample(satellite_ids, self.sample_size)
 
-        self.logger.info(f"🔬 取樣模式: {len(sampled)}/{len(teme_coordinates)} 顆衛星")
-        return sampled
+        self.logger.info(f"🔬 取樣模式: {len(sampled_ids)}/{len(satellite_ids)} 顆衛星")
+        return sampled_ids
 
     def _apply_sampling(
         self,
@@ -262,7 +364,7 @@ class Stage3DataExtractor:
         """
         應用取樣模式（用於 JSON 格式）
 
-        ⚠️ 學術合規說明: 同 _apply_sampling_direct()
+        ⚠️ 學術合規說明: 同 _sample_satellite_ids()
         - random.sample() 用於統計取樣，非生成模擬數據
         - 符合 Grade A 標準
 
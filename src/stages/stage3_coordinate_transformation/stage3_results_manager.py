@@ -20,6 +20,7 @@ Created: 2025-10-12 (Phase 3 Refactoring)
 import json
 import logging
 import hashlib
+import os
 import numpy as np
 from datetime import datetime, timezone
 from pathlib import Path
@@ -27,6 +28,8 @@ from typing import Dict, Any, Optional, Tuple
 
 # Phase 3 Refactoring: Import base class
 from shared.base import BaseResultManager
+from shared.base.stage_cache import LINEAGE_KEY, config_fingerprint, evict_lru, fingerprint_data
+from shared.utils.hdf5_dataset_view import SatelliteDatasetView
 
 # HDF5 支援
 try:
@@ -36,6 +39,9 @@ except ImportError:
     HDF5_AVAILABLE = False
     logging.warning("h5py 未安裝，HDF5 緩存功能將被禁用")
 
+# 緩存格式版本 (1.1: 連續存儲、可 memmap；2: 內容定址緩存鍵)
+STAGE3_CACHE_VERSION = '2'
+
 
 class Stage3ResultsManager(BaseResultManager):
     """
@@ -200,15 +206,15 @@ class Stage3ResultsManager(BaseResultManager):
             輸出文件路徑
         """
         try:
-            # 使用基類方法創建目錄和生成時間戳
+            # 使用基類方法生成時間戳
             timestamp = self._generate_timestamp()
-            self.output_dir.mkdir(parents=True, exist_ok=True)
 
             # Stage 3 特定文件名格式
-            output_file = self.output_dir / f"stage3_coordinate_transformation_real_{timestamp}.json"
+            stem = f"stage3_coordinate_transformation_real_{timestamp}"
 
-            # 使用基類的 JSON 保存方法
-            self._save_json(results, output_file)
+            # 階段交接文件 + 選用 JSON（記憶體內列式區塊不序列化）
+            json_results = {k: v for k, v in results.items() if k != 'orbital_state_block'}
+            output_file = self._save_stage_output(json_results, self.output_dir, stem)
 
             self.logger.info(f"Stage 3 v3.0 結果已保存: {output_file}")
             return str(output_file)
@@ -305,6 +311,7 @@ class Stage3ResultsManager(BaseResultManager):
             # 預篩選優化統計
             'geometric_prefilter': {
                 'enabled': processing_stats['prefilter_enabled'],
+                'ground_station': processing_stats.get('prefilter_ground_station'),
                 'satellites_before': processing_stats['satellites_before_prefilter'],
                 'satellites_after': processing_stats['satellites_after_prefilter'],
                 'retention_rate': processing_stats['prefilter_retention_rate'],
@@ -330,9 +337,10 @@ class Stage3ResultsManager(BaseResultManager):
 
     def generate_cache_key(self, input_data: Dict[str, Any]) -> str:
         """
-        生成緩存鍵（基於輸入數據的哈希）
+        生成緩存鍵（內容定址）
 
-        Stage 3 專用方法 - 完整保留
+        輸入指紋優先使用 Stage 2 記錄的階段緩存鍵 (metadata['stage_cache_keys'])，
+        否則對 Stage 2 `satellites` 完整內容雜湊；另納入 Stage 3 配置。
 
         Args:
             input_data: Stage 2 輸入數據
@@ -341,41 +349,20 @@ class Stage3ResultsManager(BaseResultManager):
             緩存鍵字符串
         """
         try:
-            # 提取關鍵信息生成穩定的哈希
-            key_components = []
-
-            # 1. 衛星數量和 ID 列表
-            orbital_states = input_data.get('orbital_states', {})
-            satellite_ids = sorted(orbital_states.keys())
-            key_components.append(f"sats_{len(satellite_ids)}")
-
-            # 2. 第一個和最後一個衛星的軌道數據摘要
-            if satellite_ids:
-                first_sat = orbital_states[satellite_ids[0]]
-                last_sat = orbital_states[satellite_ids[-1]]
-
-                # 使用時間序列的第一個點和最後一個點
-                first_ts = first_sat.get('time_series', [{}])[0]
-                last_ts = last_sat.get('time_series', [{}])[-1] if last_sat.get('time_series') else {}
-
-                # 提取時間戳和位置向量
-                for label, ts_point in [('first', first_ts), ('last', last_ts)]:
-                    timestamp = ts_point.get('timestamp') or ts_point.get('datetime_utc', '')
-                    position = ts_point.get('position_teme_km', [0, 0, 0])
-                    key_components.append(f"{label}_{timestamp}_{position[0]:.2f}")
-
-            # 3. 元數據中的時間範圍
-            metadata = input_data.get('metadata', {})
-            epoch_range = metadata.get('epoch_time_range', {})
-            if epoch_range:
-                key_components.append(f"epoch_{epoch_range.get('earliest', '')}")
-
-            # 生成 SHA256 哈希
-            key_string = "_".join(key_components)
-            hash_obj = hashlib.sha256(key_string.encode('utf-8'))
-            cache_key = hash_obj.hexdigest()[:16]  # 取前 16 個字符
-
-            self.logger.debug(f"生成緩存鍵: {cache_key} (來自 {len(satellite_ids)} 顆衛星)")
+            lineage = (input_data.get('metadata') or {}).get(LINEAGE_KEY) or {}
+            if lineage.get('stage2'):
+                source = f"stage2:{lineage['stage2']}"
+            else:
+                source = fingerprint_data(input_data.get('satellites', {}))
+
+            key_string = json.dumps({
+                'input': source,
+                'config': config_fingerprint(self.config),
+                'cache_version': STAGE3_CACHE_VERSION
+            }, sort_keys=True)
+            cache_key = hashlib.sha256(key_string.encode('utf-8')).hexdigest()[:16]  # 取前 16 個字符
+
+            self.logger.debug(f"生成緩存鍵: {cache_key} (輸入指紋: {source[:24]})")
             return cache_key
 
         except Exception as e:
@@ -401,16 +388,33 @@ class Stage3ResultsManager(BaseResultManager):
 
         if cache_file.exists():
             self.logger.info(f"✅ 發現緩存: {cache_file}")
+            os.utime(cache_file)  # LRU: 更新最近使用時間
             return True, str(cache_file)
         else:
             self.logger.debug(f"緩存未找到: {cache_file}")
             return False, None
 
+    def open_cache_view(self, cache_file: str) -> SatelliteDatasetView:
+        """
+        以惰性視圖開啟 HDF5 緩存 (不讀取數據、不建立 dict)
+
+        只需經緯度/高度欄位的呼叫端可直接以 view.column() / view.stack() 取得陣列。
+
+        Args:
+            cache_file: 緩存文件路徑
+
+        Returns:
+            SatelliteDatasetView (呼叫端負責關閉，建議使用 with 語句)
+        """
+        if not HDF5_AVAILABLE:
+            raise ImportError("h5py 未安裝，無法讀取 HDF5 緩存")
+        return SatelliteDatasetView(cache_file)
+
     def load_from_cache(self, cache_file: str) -> Optional[Dict[str, Any]]:
         """
         從 HDF5 緩存載入座標數據
 
-        Stage 3 專用方法 - 完整保留
+        Stage 3 專用方法 - 經惰性視圖按欄位整列讀取，再一次性建立舊版 time_series 結構
 
         Args:
             cache_file: 緩存文件路徑
@@ -425,29 +429,27 @@ class Stage3ResultsManager(BaseResultManager):
             self.logger.info(f"📖 從緩存載入座標數據: {cache_file}")
             geographic_coordinates = {}
 
-            with h5py.File(cache_file, 'r') as f:
+            with self.open_cache_view(cache_file) as view:
                 # 讀取元數據
-                metadata = json.loads(f.attrs['metadata'])
-
-                # 讀取每個衛星的座標數據
-                for sat_id in f.keys():
-                    sat_group = f[sat_id]
+                metadata = json.loads(view.file_attrs['metadata'])
 
-                    # 讀取時間序列數組
-                    timestamps = sat_group['timestamps'][:]
-                    latitudes = sat_group['latitudes'][:]
-                    longitudes = sat_group['longitudes'][:]
-                    altitudes_m = sat_group['altitudes_m'][:]
+                # 讀取每個衛星的座標數據 (整列讀取，無逐點 float() 轉換)
+                for sat_id in view:
+                    timestamps = view.column(sat_id, 'timestamps').tolist()
+                    latitudes = view.column(sat_id, 'latitudes').tolist()
+                    longitudes = view.column(sat_id, 'longitudes').tolist()
+                    altitudes_m = np.asarray(view.column(sat_id, 'altitudes_m'), dtype=np.float64)
+                    altitudes_km = (altitudes_m / 1000.0).tolist()
+                    altitudes_m = altitudes_m.tolist()
 
                     # 重建時間序列
-                    time_series = []
-                    for i in range(len(timestamps)):
-                        point = {
-                            'timestamp': timestamps[i].decode('utf-8'),
-                            'latitude_deg': float(latitudes[i]),
-                            'longitude_deg': float(longitudes[i]),
-                            'altitude_m': float(altitudes_m[i]),
-                            'altitude_km': float(altitudes_m[i]) / 1000.0,
+                    time_series = [
+                        {
+                            'timestamp': timestamps[i],
+                            'latitude_deg': latitudes[i],
+                            'longitude_deg': longitudes[i],
+                            'altitude_m': altitudes_m[i],
+                            'altitude_km': altitudes_km[i],
                             'transformation_metadata': {
                                 'coordinate_system': 'WGS84_Official',
                                 'reference_frame': 'ITRS_IERS',
@@ -463,16 +465,18 @@ class Stage3ResultsManager(BaseResultManager):
                             # WGS84 ellipsoid (±0.2m) + Skyfield computation (±0.2m)
                             'conversion_time_ms': 0.0  # 緩存載入無需轉換時間
                         }
-                        time_series.append(point)
+                        for i in range(len(timestamps))
+                    ]
 
+                    sat_attrs = view.attrs(sat_id)
                     geographic_coordinates[sat_id] = {
                         'time_series': time_series,
                         # 保留 Stage 1/2 的衛星元數據（修復 epoch_datetime 遺失問題）
-                        'epoch_datetime': sat_group.attrs.get('epoch_datetime'),
-                        'algorithm_used': sat_group.attrs.get('algorithm_used'),
-                        'coordinate_system_source': sat_group.attrs.get('coordinate_system_source'),
-                        'constellation': sat_group.attrs.get('constellation'),
-                        'transformation_metadata': json.loads(sat_group.attrs['metadata'])
+                        'epoch_datetime': sat_attrs.get('epoch_datetime'),
+                        'algorithm_used': sat_attrs.get('algorithm_used'),
+                        'coordinate_system_source': sat_attrs.get('coordinate_system_source'),
+                        'constellation': sat_attrs.get('constellation'),
+                        'transformation_metadata': json.loads(sat_attrs['metadata'])
                     }
 
             total_points = sum(len(v['time_series']) for v in geographic_coordinates.values())
@@ -491,6 +495,58 @@ class Stage3ResultsManager(BaseResultManager):
             self.logger.error(f"❌ 載入緩存失敗: {e}")
             return None
 
+    def load_geodetic_block(self, cache_file: str, block: Any) -> Optional[Any]:
+        """
+        從 HDF5 緩存直接為 Stage 2 OrbitalStateBlock 附加 WGS84 欄位
+
+        緩存命中時 Stage 4 仍可走列式路徑；僅讀取 latitudes / longitudes / altitudes_m
+        三個欄位，不建立逐點 dict。緩存內容與區塊不一致時返回 None。
+
+        Args:
+            cache_file: 緩存文件路徑
+            block: Stage 2 OrbitalStateBlock (TEME)
+
+        Returns:
+            附加 WGS84 欄位的 OrbitalStateBlock，或 None
+        """
+        if not self.cache_enabled:
+            return None
+
+        try:
+            with self.open_cache_view(cache_file) as view:
+                # ✅ Fail-Fast: 衛星集合與各衛星點數必須一致
+                if set(view.satellite_ids) != set(block.satellite_ids):
+                    self.logger.info("緩存衛星集合與 Stage 2 區塊不同，無法附加 WGS84 欄位")
+                    return None
+
+                timestamps = block.timestamps
+                latitude = np.full(block.valid_mask.shape, np.nan)
+                longitude = np.full(block.valid_mask.shape, np.nan)
+                altitude = np.full(block.valid_mask.shape, np.nan)
+
+                for row, sat_id in enumerate(block.satellite_ids):
+                    indices = block.valid_indices(row)
+                    n_cached = view.length(sat_id, 'timestamps')
+                    if n_cached != len(indices):
+                        self.logger.info(f"衛星 {sat_id} 緩存點數與 Stage 2 區塊不同，無法附加 WGS84 欄位")
+                        return None
+                    if n_cached and (
+                        view.column(sat_id, 'timestamps', 0) != timestamps[indices[0]]
+                        or view.column(sat_id, 'timestamps', n_cached - 1) != timestamps[indices[-1]]
+                    ):
+                        self.logger.info(f"衛星 {sat_id} 緩存時間軸與 Stage 2 區塊不同，無法附加 WGS84 欄位")
+                        return None
+
+                    latitude[row, indices] = view.column(sat_id, 'latitudes')
+                    longitude[row, indices] = view.column(sat_id, 'longitudes')
+                    altitude[row, indices] = view.column(sat_id, 'altitudes_m')
+
+            return block.with_geodetic(latitude, longitude, altitude)
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ 從緩存建立 WGS84 區塊失敗: {e}")
+            return None
+
     def save_to_cache(
         self,
         cache_key: str,
@@ -521,7 +577,7 @@ class Stage3ResultsManager(BaseResultManager):
                 # 保存元數據
                 f.attrs['metadata'] = json.dumps(metadata, default=str)
                 f.attrs['cache_created'] = datetime.now(timezone.utc).isoformat()
-                f.attrs['cache_version'] = '1.0'
+                f.attrs['cache_version'] = STAGE3_CACHE_VERSION
 
                 # 為每個衛星創建數據集
                 for sat_id, sat_data in geographic_coordinates.items():
@@ -536,30 +592,11 @@ class Stage3ResultsManager(BaseResultManager):
                     altitudes_m = np.array([point['altitude_m'] for point in time_series])
 
                     # 保存為 HDF5 數據集
-                    sat_group.create_dataset(
-                        'timestamps',
-                        data=np.array(timestamps, dtype='S64'),
-                        compression='gzip',
-                        compression_opts=9
-                    )
-                    sat_group.create_dataset(
-                        'latitudes',
-                        data=latitudes,
-                        compression='gzip',
-                        compression_opts=9
-                    )
-                    sat_group.create_dataset(
-                        'longitudes',
-                        data=longitudes,
-                        compression='gzip',
-                        compression_opts=9
-                    )
-                    sat_group.create_dataset(
-                        'altitudes_m',
-                        data=altitudes_m,
-                        compression='gzip',
-                        compression_opts=9
-                    )
+                    # 連續存儲、不壓縮: 浮點座標幾乎無法壓縮，且可由 SatelliteDatasetView 直接 memmap
+                    sat_group.create_dataset('timestamps', data=np.array(timestamps, dtype='S64'))
+                    sat_group.create_dataset('latitudes', data=latitudes)
+                    sat_group.create_dataset('longitudes', data=longitudes)
+                    sat_group.create_dataset('altitudes_m', data=altitudes_m)
 
                     # 保存衛星級別的元數據
                     sat_group.attrs['metadata'] = json.dumps(
@@ -585,6 +622,8 @@ class Stage3ResultsManager(BaseResultManager):
                 f"{total_points:,} 座標點, {file_size_mb:.2f} MB"
             )
 
+            self.clear_old_cache()
+
             return True
 
         except Exception as e:
@@ -610,14 +649,16 @@ class Stage3ResultsManager(BaseResultManager):
             self.logger.error(f"列出緩存文件失敗: {e}")
             return []
 
-    def clear_old_cache(self, keep_recent: int = 5) -> int:
+    def clear_old_cache(self, keep_recent: Optional[int] = None,
+                        max_size_gb: Optional[float] = None) -> int:
         """
-        清理舊緩存文件
+        淘汰緩存文件 (LRU，依最近使用時間)
 
-        Stage 3 專用方法 - 完整保留
+        緩存命中時會更新文件時間，因此淘汰的是最久未使用者而非最舊建立者。
 
         Args:
-            keep_recent: 保留最近的幾個緩存
+            keep_recent: 最多保留的緩存數量 (預設 config['cache_max_entries'] 或 5)
+            max_size_gb: 緩存總大小上限 (預設 config['cache_max_size_gb']，未設定則不限)
 
         Returns:
             刪除的文件數量
@@ -625,27 +666,14 @@ class Stage3ResultsManager(BaseResultManager):
         if not self.cache_enabled:
             return 0
 
-        try:
-            cache_files = self.list_cached_files()
-            if len(cache_files) <= keep_recent:
-                return 0
-
-            files_to_delete = cache_files[keep_recent:]
-            deleted_count = 0
-
-            for cache_file in files_to_delete:
-                try:
-                    cache_file.unlink()
-                    deleted_count += 1
-                    self.logger.debug(f"刪除舊緩存: {cache_file}")
-                except Exception as e:
-                    self.logger.warning(f"刪除緩存失敗 {cache_file}: {e}")
-
-            if deleted_count > 0:
-                self.logger.info(f"🗑️ 清理舊緩存: 刪除 {deleted_count} 個文件，保留 {keep_recent} 個最新")
-
-            return deleted_count
+        if keep_recent is None:
+            keep_recent = self.config.get('cache_max_entries', 5)
+        if max_size_gb is None:
+            max_size_gb = self.config.get('cache_max_size_gb')
+        max_bytes = int(max_size_gb * 1024 ** 3) if max_size_gb is not None else None
 
+        try:
+            return evict_lru(self.cache_dir, "stage3_coords_*.h5", max_bytes, keep_recent, self.logger)
         except Exception as e:
             self.logger.error(f"清理緩存失敗: {e}")
             return 0
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """WGS84座標提取器 - Stage 4"""
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, Optional
+
+from src.shared.data_structures import OrbitalStateBlock
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +11,34 @@ logger = logging.getLogger(__name__)
 class CoordinateExtractor:
     """WGS84 座標數據提取器"""
 
+    @staticmethod
+    def apply_upstream_configs(metadata: Dict[str, Any], constellation_filter) -> Optional[Dict[str, Any]]:
+        """
+        讀取上游 metadata.constellation_configs 並更新星座仰角門檻
+
+        Args:
+            metadata: 上游階段 metadata (Stage 1 起逐階段傳遞)
+            constellation_filter: 星座過濾器實例（用於更新門檻）
+
+        Returns:
+            上游 constellation_configs (不存在時為 None)
+        """
+        if 'constellation_configs' not in metadata:
+            return None
+        upstream_configs = metadata['constellation_configs']
+        logger.info("✅ 從 Stage 1 讀取 constellation_configs")
+
+        # 更新 ConstellationFilter 使用上游配置
+        if upstream_configs and constellation_filter:
+            for constellation_name, config in upstream_configs.items():
+                threshold = config.get('service_elevation_threshold_deg')
+                if threshold is not None:
+                    constellation_key = constellation_name.lower()
+                    if constellation_key in constellation_filter.CONSTELLATION_THRESHOLDS:
+                        constellation_filter.CONSTELLATION_THRESHOLDS[constellation_key]['min_elevation_deg'] = threshold
+                        logger.info(f"   {constellation_name}: {threshold}° (從上游配置)")
+        return upstream_configs
+
     @staticmethod
     def extract(input_data: Dict[str, Any], constellation_filter) -> Dict[str, Any]:
         """
@@ -25,21 +55,17 @@ class CoordinateExtractor:
         satellites_data = input_data.get('satellites') or input_data.get('geographic_coordinates', {})
         wgs84_data = {}
 
+        # 📦 同進程 Stage 3 傳入的列式區塊 (含 WGS84 欄位)
+        geodetic_block = input_data.get('orbital_state_block')
+        if not (isinstance(geodetic_block, OrbitalStateBlock) and geodetic_block.has_geodetic):
+            geodetic_block = None
+        else:
+            logger.info(f"📦 使用 Stage 3 OrbitalStateBlock: {geodetic_block.n_satellites} 顆衛星")
+
         # 從上游數據讀取 constellation_configs (Stage 1 傳遞)
-        upstream_configs = None
-        if 'metadata' in input_data and 'constellation_configs' in input_data['metadata']:
-            upstream_configs = input_data['metadata']['constellation_configs']
-            logger.info("✅ 從 Stage 1 讀取 constellation_configs")
-
-            # 更新 ConstellationFilter 使用上游配置
-            if upstream_configs and constellation_filter:
-                for constellation_name, config in upstream_configs.items():
-                    threshold = config.get('service_elevation_threshold_deg')
-                    if threshold is not None:
-                        constellation_key = constellation_name.lower()
-                        if constellation_key in constellation_filter.CONSTELLATION_THRESHOLDS:
-                            constellation_filter.CONSTELLATION_THRESHOLDS[constellation_key]['min_elevation_deg'] = threshold
-                            logger.info(f"   {constellation_name}: {threshold}° (從上游配置)")
+        upstream_configs = CoordinateExtractor.apply_upstream_configs(
+            input_data.get('metadata', {}), constellation_filter
+        )
 
         for satellite_id, satellite_info in satellites_data.items():
             if isinstance(satellite_info, dict):
@@ -61,6 +87,9 @@ class CoordinateExtractor:
                         'constellation': constellation,
                         'total_positions': len(wgs84_coordinates)
                     }
+                    if geodetic_block is not None and satellite_id in geodetic_block:
+                        wgs84_data[satellite_id]['geodetic_block'] = geodetic_block
+                        wgs84_data[satellite_id]['block_row'] = geodetic_block.index_of(satellite_id)
 
         logger.info(f"📊 提取了 {len(wgs84_data)} 顆衛星的 WGS84 座標數據")
         return wgs84_data, upstream_configs
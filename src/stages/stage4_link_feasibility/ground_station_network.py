@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+地面站網路可見性 - Stage 4 多地面站批次計算
+
+單一地面站 (NTPU) 的完整時間序列分析保持不變；配置 ground_stations 列表時，
+另外對所有 (地面站, 衛星, 時間) 組合以單次廣播陣列運算計算仰角/方位角/距離:
+
+✅ 上游 SGP4 傳播與 TEME → WGS84 轉換只做一次，所有地面站共用 Stage 3 座標
+✅ 衛星 ECEF 向量每個衛星區塊計算一次，再對 K 個地面站廣播 (K, n, T)
+✅ 每個地面站輸出獨立的可連線衛星池 (依星座) 與覆蓋統計
+✅ 依 STATION_BATCH_ELEMENTS 分塊，記憶體與衛星總數無關
+
+地面站配置 (config['ground_stations']):
+    - name: NTPU                     # 只有名稱時從 ground_station_constants 讀取實測座標
+    - name: SITE_A
+      latitude_deg: 25.03
+      longitude_deg: 121.56
+      altitude_m: 10.0
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.shared.constants.ground_station_constants import get_observation_location
+
+from .skyfield_visibility_calculator import SkyfieldVisibilityCalculator
+
+logger = logging.getLogger(__name__)
+
+# 每次廣播的 (地面站 × 衛星 × 時間) 元素上限 (ENU 中間陣列約 24 bytes/元素)
+STATION_BATCH_ELEMENTS = 2_000_000
+
+POOL_CONSTELLATIONS = ('starlink', 'oneweb', 'other')
+
+
+@dataclass
+class GroundStationNetwork:
+    """K 個地面站的 ECEF 向量與 ECEF → ENU 旋轉 (批次廣播用)"""
+    names: List[str]
+    latitude_deg: np.ndarray
+    longitude_deg: np.ndarray
+    altitude_m: np.ndarray
+    itrs_km: np.ndarray = field(init=False)        # (K, 3)
+    enu_rotation: np.ndarray = field(init=False)   # (K, 3, 3)
+
+    def __post_init__(self):
+        self.itrs_km = SkyfieldVisibilityCalculator._geodetic_to_itrs_km(
+            self.latitude_deg, self.longitude_deg, self.altitude_m / 1000.0
+        )
+        self.enu_rotation = np.stack([
+            SkyfieldVisibilityCalculator._enu_rotation(lat, lon)
+            for lat, lon in zip(self.latitude_deg, self.longitude_deg)
+        ]) if len(self.names) else np.empty((0, 3, 3))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_config(cls, stations: Sequence[Dict[str, Any]]) -> 'GroundStationNetwork':
+        """
+        ground_stations 配置 → GroundStationNetwork
+
+        Raises:
+            ValueError: 名稱重複、座標缺失或超出範圍
+        """
+        names, lats, lons, alts = [], [], [], []
+        for index, station in enumerate(stations):
+            name = station.get('name')
+            if not name:
+                raise ValueError(f"❌ Fail-Fast: ground_stations[{index}] 缺少 name")
+            if name in names:
+                raise ValueError(f"❌ Fail-Fast: 地面站名稱重複: {name}")
+
+            # 只提供名稱時使用實測座標 (Single Source of Truth)
+            if 'latitude_deg' not in station and 'longitude_deg' not in station:
+                station = {**get_observation_location(name), **station}
+
+            missing = [key for key in ('latitude_deg', 'longitude_deg', 'altitude_m') if station.get(key) is None]
+            if missing:
+                raise ValueError(
+                    f"❌ Fail-Fast: 地面站 {name} 座標不完整，缺少: {missing}\n"
+                    f"依據: ACADEMIC_STANDARDS.md - 地面站座標必須為實測值，禁止預設值"
+                )
+            if not (-90.0 <= station['latitude_deg'] <= 90.0) or not (-180.0 <= station['longitude_deg'] <= 180.0):
+                raise ValueError(
+                    f"❌ Fail-Fast: 地面站 {name} 座標超出範圍: "
+                    f"({station['latitude_deg']}, {station['longitude_deg']})"
+                )
+
+            names.append(name)
+            lats.append(float(station['latitude_deg']))
+            lons.append(float(station['longitude_deg']))
+            alts.append(float(station['altitude_m']))
+
+        return cls(names, np.array(lats), np.array(lons), np.array(alts))
+
+    def topocentric(self, sat_lat_deg: np.ndarray, sat_lon_deg: np.ndarray,
+                    sat_alt_km: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        所有地面站的地平座標 (與 SkyfieldVisibilityCalculator.calculate_topocentric_batch 相同閉式解)
+
+        Args:
+            sat_lat_deg / sat_lon_deg / sat_alt_km: 任意形狀 S 的衛星 WGS84 座標
+
+        Returns:
+            (elevation_deg, azimuth_deg, distance_km)，形狀 (K, *S)
+        """
+        satellite_itrs_km = SkyfieldVisibilityCalculator._geodetic_to_itrs_km(
+            np.asarray(sat_lat_deg, dtype=np.float64),
+            np.asarray(sat_lon_deg, dtype=np.float64),
+            np.asarray(sat_alt_km, dtype=np.float64)
+        )
+        extra_dims = satellite_itrs_km.ndim - 1
+        station_km = self.itrs_km.reshape((len(self),) + (1,) * extra_dims + (3,))
+        rotation = self.enu_rotation.reshape((len(self),) + (1,) * extra_dims + (3, 3))
+
+        # (K, *S, 3): 每個地面站的 ECEF 差向量 → ENU
+        difference_km = satellite_itrs_km[np.newaxis] - station_km
+        enu = np.matmul(rotation, difference_km[..., np.newaxis])[..., 0]
+        east, north, up = enu[..., 0], enu[..., 1], enu[..., 2]
+
+        elevation_deg = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        azimuth_deg = np.degrees(np.arctan2(east, north)) % 360.0
+        distance_km = np.sqrt(east * east + north * north + up * up)
+        return elevation_deg, azimuth_deg, distance_km
+
+
+def pool_constellation(constellation: str) -> str:
+    """星座名稱 → 可連線池分類 (與 SatelliteFilter.filter_by_constellation 相同)"""
+    if 'starlink' in constellation:
+        return 'starlink'
+    if 'oneweb' in constellation:
+        return 'oneweb'
+    return 'other'
+
+
+def stations_outside(network: GroundStationNetwork, station: Dict[str, Any],
+                     tolerance_deg: float = 1e-4) -> List[str]:
+    """地面站網路中與指定地面站座標不符的站點名稱"""
+    return [
+        name for name, lat, lon in zip(network.names, network.latitude_deg, network.longitude_deg)
+        if abs(lat - station['latitude_deg']) > tolerance_deg or abs(lon - station['longitude_deg']) > tolerance_deg
+    ]
+
+
+def check_adaptive_sampling_coverage(network: GroundStationNetwork, adaptive_sampling: Dict[str, Any],
+                                     tolerance_deg: float = 1e-4) -> None:
+    """
+    Stage 2 自適應取樣只保留單一地面站可見窗口內的時間點 (metadata.adaptive_sampling)，
+    其他地面站在窗口外的可見時段沒有座標，可連線池會靜默偏少。
+
+    Raises:
+        ValueError: 地面站網路含自適應取樣地面站以外的站點
+    """
+    planned = adaptive_sampling['ground_station']
+    uncovered = stations_outside(network, planned, tolerance_deg)
+    if uncovered:
+        raise ValueError(
+            f"❌ Fail-Fast: Stage 2 自適應取樣只保留地面站 {planned['name']} 的可見窗口 "
+            f"(仰角 >= {adaptive_sampling.get('elevation_mask_deg', 0.0)}°)，"
+            f"地面站網路中的 {uncovered} 缺少窗口外的座標\n"
+            f"請停用 Stage 2 adaptive_sampling.enabled，或將 Stage 4 ground_stations 限定為 {planned['name']}"
+        )
+
+
+def check_geometric_prefilter_coverage(network: GroundStationNetwork, geometric_prefilter: Dict[str, Any],
+                                       tolerance_deg: float = 1e-4) -> None:
+    """
+    Stage 3 幾何預篩選只對單一地面站判斷可見性 (metadata.geometric_prefilter)，
+    只對其他地面站可見的衛星已被排除，可連線池會靜默偏少。
+
+    Raises:
+        ValueError: 地面站網路含預篩選地面站以外的站點 (未記錄預篩選地面站時全部視為未涵蓋)
+    """
+    station = geometric_prefilter.get('ground_station')
+    uncovered = stations_outside(network, station, tolerance_deg) if station else list(network.names)
+    if uncovered:
+        station_name = station['name'] if station else '未記錄'
+        raise ValueError(
+            f"❌ Fail-Fast: Stage 3 幾何預篩選只保留地面站 {station_name} 可能可見的衛星，"
+            f"地面站網路中的 {uncovered} 缺少已被篩除的衛星\n"
+            f"請停用 Stage 3 geometric_prefilter.enabled，或將 Stage 4 ground_stations 限定為 {station_name}"
+        )
+
+
+def analyze_station_network(network: GroundStationNetwork,
+                            wgs84_data: Dict[str, Dict[str, Any]],
+                            threshold_for: Callable[[str], float],
+                            link_budget_analyzer: Any,
+                            point_arrays: Callable[[str, Dict[str, Any]], Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]],
+                            batch_elements: int = STATION_BATCH_ELEMENTS) -> Dict[str, Any]:
+    """
+    所有地面站的可連線衛星池 (單次遍歷 Stage 3 座標)
+
+    Args:
+        network: 地面站網路
+        wgs84_data: Stage 4 提取的 WGS84 座標 (可含 geodetic_block/block_row)
+        threshold_for: 星座 → 仰角門檻
+        link_budget_analyzer: LinkBudgetAnalyzer (analyze_link_feasibility_batch)
+        point_arrays: 非區塊衛星的 (timestamps, lat, lon, alt_m) 解析函數
+        batch_elements: 每次廣播的元素上限
+
+    Returns:
+        {'stations': [...], 'by_station': {名稱: {...}}, 'metadata': {...}}
+    """
+    pools = {name: {key: [] for key in POOL_CONSTELLATIONS} for name in network.names}
+    coverage = {name: {} for name in network.names}  # 名稱 → {timestamp: 可連線衛星數}
+    triples = 0
+
+    def collect(sat_ids: List[str], constellations: List[str], timestamps: List[str],
+                lats: np.ndarray, lons: np.ndarray, alts_m: np.ndarray, valid: np.ndarray) -> None:
+        nonlocal triples
+        # 無效點 (未傳播/未轉換) 以 0 座標代入後由 valid 遮罩排除
+        lats, lons, alts_m = (np.where(valid, values, 0.0) for values in (lats, lons, alts_m))
+        alts_km = np.where(alts_m > 1000, alts_m / 1000.0, alts_m)
+        elevation, _, distance = network.topocentric(lats, lons, alts_km)       # (K, n, T)
+        thresholds = np.array([threshold_for(c) for c in constellations])[np.newaxis, :, np.newaxis]
+        connectable = link_budget_analyzer.analyze_link_feasibility_batch(elevation, distance, thresholds)
+        connectable &= valid[np.newaxis]
+        triples += len(network) * int(valid.sum())
+
+        counts = connectable.sum(axis=2)                                          # (K, n)
+        visible_per_time = connectable.sum(axis=1)                                # (K, T)
+        masked_elevation = np.where(connectable, elevation, -np.inf)
+        for k, name in enumerate(network.names):
+            for i in np.flatnonzero(counts[k]):
+                hits = np.flatnonzero(connectable[k, i])
+                pools[name][pool_constellation(constellations[i])].append({
+                    'satellite_id': sat_ids[i],
+                    'connectable_points': int(counts[k, i]),
+                    'max_elevation_deg': float(masked_elevation[k, i].max()),
+                    'first_connectable': timestamps[hits[0]],
+                    'last_connectable': timestamps[hits[-1]]
+                })
+            station_coverage = coverage[name]
+            for t in np.flatnonzero(visible_per_time[k]):
+                station_coverage[timestamps[t]] = station_coverage.get(timestamps[t], 0) + int(visible_per_time[k, t])
+
+    # 📦 列式區塊: 同一區塊的衛星共享時間軸，分塊廣播 (K, n, T)
+    blocks: Dict[int, Tuple[Any, List[Tuple[int, str, str]]]] = {}
+    for sat_id, sat_data in wgs84_data.items():
+        constellation = sat_data.get('constellation', 'unknown').lower()
+        block = sat_data.get('geodetic_block')
+        if block is not None:
+            blocks.setdefault(id(block), (block, []))[1].append((sat_data['block_row'], sat_id, constellation))
+        else:
+            timestamps, lats, lons, alts_m = point_arrays(sat_id, sat_data)
+            if timestamps:
+                collect([sat_id], [constellation], timestamps, lats[np.newaxis], lons[np.newaxis],
+                        alts_m[np.newaxis], np.ones((1, len(timestamps)), dtype=bool))
+
+    for block, members in blocks.values():
+        rows_per_batch = max(1, batch_elements // max(1, len(network) * block.n_times))
+        for start in range(0, len(members), rows_per_batch):
+            chunk = members[start:start + rows_per_batch]
+            rows = np.array([row for row, _, _ in chunk])
+            collect([sat_id for _, sat_id, _ in chunk], [c for _, _, c in chunk], block.timestamps,
+                    block.latitude_deg[rows], block.longitude_deg[rows], block.altitude_m[rows],
+                    block.valid_mask[rows])
+
+    by_station = {}
+    for k, name in enumerate(network.names):
+        visible_counts = list(coverage[name].values())
+        by_station[name] = {
+            'location': {
+                'latitude_deg': float(network.latitude_deg[k]),
+                'longitude_deg': float(network.longitude_deg[k]),
+                'altitude_m': float(network.altitude_m[k])
+            },
+            'connectable_satellites': pools[name],
+            'total_connectable': sum(len(sats) for sats in pools[name].values()),
+            'coverage': {
+                'time_points_covered': len(visible_counts),
+                'average_satellites_visible': float(np.mean(visible_counts)) if visible_counts else 0.0,
+                'max_satellites_visible': max(visible_counts, default=0)
+            }
+        }
+
+    logger.info(
+        f"🌐 地面站網路可見性完成: {len(network)} 個地面站 × {len(wgs84_data)} 顆衛星 "
+        f"({triples} 個地面站-衛星-時間組合)"
+    )
+    return {
+        'stations': network.names,
+        'by_station': by_station,
+        'metadata': {
+            'station_count': len(network),
+            'satellites_evaluated': len(wgs84_data),
+            'station_satellite_time_points': triples
+        }
+    }
@@ -17,6 +17,8 @@
 import logging
 from typing import Dict, Any, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -163,6 +165,23 @@ class LinkBudgetAnalyzer:
             # 真實的信號品質 (RSRP/RSRQ/SINR) 由 Stage 5 使用 3GPP TS 38.214 標準計算
         }
 
+    def analyze_link_feasibility_batch(self, elevation_deg: np.ndarray,
+                                       distance_km: np.ndarray,
+                                       elevation_threshold: float) -> np.ndarray:
+        """
+        向量化鏈路可行性判斷 (與 analyze_link_feasibility 的 is_connectable 相同規則)
+
+        Args:
+            elevation_deg: 仰角陣列 (度)
+            distance_km: 距離陣列 (公里)
+            elevation_threshold: 星座特定仰角門檻
+
+        Returns:
+            np.ndarray: is_connectable 布林陣列
+        """
+        elevation_ok = np.asarray(elevation_deg) >= elevation_threshold
+        distance_ok = self.check_distance_constraint(np.asarray(distance_km))
+        return elevation_ok & distance_ok
 
     def batch_analyze(self, time_series: list, constellation: str,
                      elevation_threshold: float) -> Dict[str, Any]:
@@ -82,6 +82,8 @@ class Stage4ResultManager(BaseResultManager):
                 - ntpu_coverage: NTPU 覆蓋分析
                 - upstream_constellation_configs: 上游星座配置 (可選)
                 - dynamic_threshold_analysis: 動態閾值分析 (可選)
+                - total_input_satellites / total_processed_satellites: 輸入/處理衛星數 (可選，
+                  預設為 original_data / time_series_metrics 的長度；串流模式不保留逐衛星數據時傳入)
 
         Returns:
             完整的 Stage 4 輸出數據結構
@@ -95,6 +97,12 @@ class Stage4ResultManager(BaseResultManager):
         ntpu_coverage = kwargs.get('ntpu_coverage', {})
         upstream_constellation_configs = kwargs.get('upstream_constellation_configs')
         dynamic_threshold_analysis = kwargs.get('dynamic_threshold_analysis')
+        total_input_satellites = kwargs.get('total_input_satellites')
+        if total_input_satellites is None:
+            total_input_satellites = len(original_data)
+        total_processed_satellites = kwargs.get('total_processed_satellites')
+        if total_processed_satellites is None:
+            total_processed_satellites = len(time_series_metrics)
 
         # 構建輸出結構
         stage4_output = {
@@ -131,8 +139,8 @@ class Stage4ResultManager(BaseResultManager):
 
             'metadata': {
                 'processing_timestamp': datetime.now(timezone.utc).isoformat(),
-                'total_input_satellites': len(original_data),
-                'total_processed_satellites': len(time_series_metrics),
+                'total_input_satellites': total_input_satellites,
+                'total_processed_satellites': total_processed_satellites,
                 'link_budget_constraints': (
                     self.link_budget_analyzer.get_constraint_info()
                     if self.link_budget_analyzer else {}
@@ -268,7 +276,9 @@ class Stage4ResultManager(BaseResultManager):
         optimization_results: Optional[Dict[str, Any]],
         ntpu_coverage: Dict[str, Any],
         upstream_constellation_configs: Optional[Dict[str, Any]] = None,
-        dynamic_threshold_analysis: Optional[Dict[str, Any]] = None
+        dynamic_threshold_analysis: Optional[Dict[str, Any]] = None,
+        total_input_satellites: Optional[int] = None,
+        total_processed_satellites: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         向後兼容接口: 原 ResultBuilder.build() 方法
@@ -283,7 +293,9 @@ class Stage4ResultManager(BaseResultManager):
             optimization_results=optimization_results,
             ntpu_coverage=ntpu_coverage,
             upstream_constellation_configs=upstream_constellation_configs,
-            dynamic_threshold_analysis=dynamic_threshold_analysis
+            dynamic_threshold_analysis=dynamic_threshold_analysis,
+            total_input_satellites=total_input_satellites,
+            total_processed_satellites=total_processed_satellites
         )
 
     def save(self, processing_results: Dict[str, Any]) -> bool:
@@ -356,7 +368,9 @@ class ResultBuilder:
         optimization_results: Optional[Dict[str, Any]],
         ntpu_coverage: Dict[str, Any],
         upstream_constellation_configs: Optional[Dict[str, Any]] = None,
-        dynamic_threshold_analysis: Optional[Dict[str, Any]] = None
+        dynamic_threshold_analysis: Optional[Dict[str, Any]] = None,
+        total_input_satellites: Optional[int] = None,
+        total_processed_satellites: Optional[int] = None
     ) -> Dict[str, Any]:
         """構建輸出結果 (調用 Stage4ResultManager.build())"""
         return self._manager.build(
@@ -367,7 +381,9 @@ class ResultBuilder:
             optimization_results=optimization_results,
             ntpu_coverage=ntpu_coverage,
             upstream_constellation_configs=upstream_constellation_configs,
-            dynamic_threshold_analysis=dynamic_threshold_analysis
+            dynamic_threshold_analysis=dynamic_threshold_analysis,
+            total_input_satellites=total_input_satellites,
+            total_processed_satellites=total_processed_satellites
         )
 
 
@@ -13,15 +13,168 @@
 - 覆蓋率 ≥ 95%
 
 算法: 貪心算法 (快速，次優解)
+     - 位元集覆蓋引擎 + Lazy Greedy 優先佇列 (CoverageBitsetEngine)
 """
 
+import heapq
 import logging
-from typing import Dict, Any, List, Tuple, Set
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from collections import defaultdict
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# 8-bit popcount 查表 (numpy>=1.24 相容，不依賴 np.bitwise_count)
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint16)
+
+
+class CoverageBitsetEngine:
+    """
+    位元集覆蓋引擎
+
+    - 時間戳映射為整數索引 (僅包含至少一顆候選衛星可連線的時間點)
+    - 每顆候選衛星的可連線時間點存為 np.packbits 位元集列
+    - 每個時間點的可見數 (counts) 與「需覆蓋 / 過度覆蓋」遮罩增量更新
+
+    貢獻度計算 (標準 Set Cover 策略):
+    - 貢獻度 = popcount(row & need_mask): 覆蓋多少「可見數 < target_min」的時間點
+    - 懲罰 = popcount(row & over_mask): 造成多少「可見數 >= target_max」的過度覆蓋
+
+    算法依據:
+    - Chvátal, V. (1979). "A greedy heuristic for the set-covering problem"
+      Mathematical Programming, 4(1), 233-235.
+    - Johnson, D. S. (1974). "Approximation algorithms for combinatorial problems"
+      Journal of Computer and System Sciences, 9(3), 256-278.
+    """
+
+    def __init__(self, satellites: List[Dict[str, Any]], target_min: int, target_max: int):
+        self.target_min = target_min
+        self.target_max = target_max
+
+        # 時間戳 → 整數索引 (保持首次出現順序；僅收錄至少一顆衛星可連線的時間點)
+        self.timestamp_index: Dict[str, int] = {}
+        rows = []
+        for satellite in satellites:
+            columns = []
+            for time_point in satellite['time_series']:
+                if time_point['visibility_metrics']['is_connectable']:
+                    timestamp = time_point['timestamp']
+                    column = self.timestamp_index.get(timestamp)
+                    if column is None:
+                        column = self.timestamp_index[timestamp] = len(self.timestamp_index)
+                    columns.append(column)
+            rows.append(columns)
+
+        self.n_candidates = len(satellites)
+        self.n_timestamps = len(self.timestamp_index)
+
+        visibility = np.zeros((self.n_candidates, self.n_timestamps), dtype=bool)
+        for row, columns in enumerate(rows):
+            visibility[row, columns] = True
+        self.visible_columns = [np.flatnonzero(row) for row in visibility]
+        self.bitsets = np.packbits(visibility, axis=1)
+
+        self.counts = np.zeros(self.n_timestamps, dtype=np.int64)
+        self._refresh_masks()
+
+    @property
+    def timestamps(self) -> List[str]:
+        return list(self.timestamp_index)
+
+    def _refresh_masks(self):
+        self.need_mask = np.packbits(self.counts < self.target_min)
+        self.over_mask = np.packbits(self.counts >= self.target_max)
+
+    def contribution(self, row: int) -> Tuple[int, int]:
+        """(貢獻度, 懲罰) - 單顆候選衛星"""
+        bitset = self.bitsets[row]
+        return (
+            int(_POPCOUNT_TABLE[bitset & self.need_mask].sum()),
+            int(_POPCOUNT_TABLE[bitset & self.over_mask].sum())
+        )
+
+    def all_contributions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(貢獻度, 懲罰) - 所有候選衛星 (向量化)"""
+        return (
+            _POPCOUNT_TABLE[self.bitsets & self.need_mask].sum(axis=1, dtype=np.int64),
+            _POPCOUNT_TABLE[self.bitsets & self.over_mask].sum(axis=1, dtype=np.int64)
+        )
+
+    def add(self, row: int):
+        """將候選衛星加入選擇池 (增量更新可見數與遮罩)"""
+        self.counts[self.visible_columns[row]] += 1
+        self._refresh_masks()
+
+    def evaluate(self, target_coverage_rate: float) -> Dict[str, Any]:
+        """
+        評估當前覆蓋狀態
+
+        Returns:
+            {
+                'coverage_rate': float,  # 覆蓋率 (達標時間點比例)
+                'avg_visible': float,    # 平均可見衛星數
+                'min_visible': int,      # 最小可見衛星數
+                'max_visible': int,      # 最大可見衛星數
+                'target_met': bool       # 是否達成目標
+            }
+        """
+        if self.n_timestamps == 0:
+            return {
+                'coverage_rate': 0.0,
+                'avg_visible': 0.0,
+                'min_visible': 0,
+                'max_visible': 0,
+                'target_met': False
+            }
+
+        in_range = (self.counts >= self.target_min) & (self.counts <= self.target_max)
+        coverage_rate = float(np.count_nonzero(in_range)) / self.n_timestamps
+
+        return {
+            'coverage_rate': coverage_rate,
+            'avg_visible': float(self.counts.mean()),
+            'min_visible': int(self.counts.min()),
+            'max_visible': int(self.counts.max()),
+            'target_met': coverage_rate >= target_coverage_rate
+        }
+
+
+class LazyGreedySelector:
+    """
+    Lazy Greedy 優先佇列
+
+    選擇後「需覆蓋」時間點只減不增、「過度覆蓋」時間點只增不減，
+    因此每顆候選的排序鍵 (-貢獻度, 懲罰, 原始順序) 單調不減，
+    堆頂重新評估後若鍵值不變即為當前最佳 (與完整掃描結果相同，包含平手順序)。
+
+    參考: Minoux, M. (1978). "Accelerated greedy algorithms for maximizing
+    submodular set functions". Optimization Techniques, LNCS 7, 234-243.
+    """
+
+    def __init__(self, engine: CoverageBitsetEngine):
+        self.engine = engine
+        contributions, penalties = engine.all_contributions()
+        self._heap = [
+            (-int(contribution), int(penalty), row)
+            for row, (contribution, penalty) in enumerate(zip(contributions.tolist(), penalties.tolist()))
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def pop_best(self) -> Tuple[Optional[int], int]:
+        """取出最佳候選 (row, contribution)；無候選時回傳 (None, -1)"""
+        while self._heap:
+            negative_contribution, penalty, row = self._heap[0]
+            contribution, current_penalty = self.engine.contribution(row)
+            if (-contribution, current_penalty) == (negative_contribution, penalty):
+                heapq.heappop(self._heap)
+                return row, contribution
+            heapq.heapreplace(self._heap, (-contribution, current_penalty, row))
+        return None, -1
+
 
 class PoolSelector:
     """
@@ -71,13 +224,12 @@ class PoolSelector:
         self.logger.info(f"   候選數量: {len(connectable_satellites)} 顆")
         self.logger.info(f"   目標範圍: {self.target_min}-{self.target_max} 顆可見")
 
-        # Step 1: 構建時間點覆蓋映射
-        timestamp_coverage = self._build_timestamp_coverage(connectable_satellites)
+        # Step 1: 構建位元集覆蓋引擎 (時間戳 → 整數索引)
+        engine = CoverageBitsetEngine(connectable_satellites, self.target_min, self.target_max)
+        selector = LazyGreedySelector(engine)
 
-        # Step 2: 貪心選擇算法
+        # Step 2: 貪心選擇算法 (Lazy Greedy)
         selected_satellites = []
-        remaining_candidates = list(connectable_satellites)
-        current_coverage = defaultdict(set)  # {timestamp: set(satellite_ids)}
 
         iteration = 0
         max_iterations = len(connectable_satellites)
@@ -86,7 +238,7 @@ class PoolSelector:
             iteration += 1
 
             # 計算當前覆蓋狀態
-            coverage_status = self._evaluate_coverage(current_coverage, timestamp_coverage.keys())
+            coverage_status = engine.evaluate(self.target_coverage_rate)
 
             # 檢查是否達成目標
             if coverage_status['target_met']:
@@ -94,28 +246,21 @@ class PoolSelector:
                 break
 
             # 選擇下一顆最佳衛星
-            best_satellite, contribution = self._select_next_best_satellite(
-                remaining_candidates,
-                current_coverage,
-                coverage_status
-            )
+            best_row, contribution = selector.pop_best()
 
-            if best_satellite is None:
+            if best_row is None:
                 self.logger.warning(f"⚠️ 無法繼續優化 (迭代 {iteration} 次)")
                 break
 
-            # 添加到選擇池
-            selected_satellites.append(best_satellite)
-            remaining_candidates.remove(best_satellite)
-
-            # 更新覆蓋狀態
-            self._update_coverage(current_coverage, best_satellite)
+            # 添加到選擇池並增量更新覆蓋狀態
+            selected_satellites.append(connectable_satellites[best_row])
+            engine.add(best_row)
 
             if iteration % 50 == 0:
                 self.logger.info(f"   優化進度: {len(selected_satellites)} 顆已選擇 (貢獻度: {contribution:.2f})")
 
         # Step 3: 生成選擇指標
-        final_coverage = self._evaluate_coverage(current_coverage, timestamp_coverage.keys())
+        final_coverage = engine.evaluate(self.target_coverage_rate)
 
         selection_metrics = {
             'selected_count': len(selected_satellites),
@@ -137,136 +282,6 @@ class PoolSelector:
 
         return selected_satellites, selection_metrics
 
-    def _build_timestamp_coverage(self, satellites: List[Dict[str, Any]]) -> Dict[str, List[str]]:
-        """
-        構建時間點覆蓋映射
-
-        Returns:
-            {timestamp: [satellite_ids that are connectable at this time]}
-        """
-        timestamp_coverage = defaultdict(list)
-
-        for satellite in satellites:
-            sat_id = satellite['satellite_id']
-            for time_point in satellite['time_series']:
-                if time_point['visibility_metrics']['is_connectable']:
-                    timestamp = time_point['timestamp']
-                    timestamp_coverage[timestamp].append(sat_id)
-
-        return dict(timestamp_coverage)
-
-    def _evaluate_coverage(self, current_coverage: Dict[str, Set[str]],
-                          all_timestamps: List[str]) -> Dict[str, Any]:
-        """
-        評估當前覆蓋狀態
-
-        Returns:
-            {
-                'coverage_rate': float,  # 覆蓋率 (達標時間點比例)
-                'avg_visible': float,    # 平均可見衛星數
-                'min_visible': int,      # 最小可見衛星數
-                'max_visible': int,      # 最大可見衛星數
-                'target_met': bool       # 是否達成目標
-            }
-        """
-        if not all_timestamps:
-            return {
-                'coverage_rate': 0.0,
-                'avg_visible': 0.0,
-                'min_visible': 0,
-                'max_visible': 0,
-                'target_met': False
-            }
-
-        visible_counts = []
-        target_met_count = 0
-
-        for timestamp in all_timestamps:
-            visible_count = len(current_coverage.get(timestamp, set()))
-            visible_counts.append(visible_count)
-
-            # 檢查是否達標
-            if self.target_min <= visible_count <= self.target_max:
-                target_met_count += 1
-
-        coverage_rate = target_met_count / len(all_timestamps) if all_timestamps else 0.0
-        avg_visible = sum(visible_counts) / len(visible_counts) if visible_counts else 0.0
-
-        return {
-            'coverage_rate': coverage_rate,
-            'avg_visible': avg_visible,
-            'min_visible': min(visible_counts) if visible_counts else 0,
-            'max_visible': max(visible_counts) if visible_counts else 0,
-            'target_met': coverage_rate >= self.target_coverage_rate
-        }
-
-    def _select_next_best_satellite(self,
-                                    candidates: List[Dict[str, Any]],
-                                    current_coverage: Dict[str, Set[str]],
-                                    coverage_status: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
-        """
-        選擇下一顆最佳衛星 (標準 Set Cover 貪心算法)
-
-        算法依據:
-        - Chvátal, V. (1979). "A greedy heuristic for the set-covering problem"
-          Mathematical Programming, 4(1), 233-235.
-        - Johnson, D. S. (1974). "Approximation algorithms for combinatorial problems"
-          Journal of Computer and System Sciences, 9(3), 256-278.
-
-        貢獻度計算 (標準 Set Cover 策略):
-        - 計算該衛星能覆蓋多少「需要覆蓋的時間點」
-        - 「需要覆蓋的時間點」定義: 當前可見衛星數 < target_min
-        - 選擇覆蓋最多需要覆蓋時間點的衛星
-        - 若覆蓋數相同，則選擇不造成過度覆蓋的衛星
-
-        Returns:
-            (best_satellite, contribution_score)
-        """
-        best_satellite = None
-        best_contribution = -1
-        best_penalty = float('inf')  # 過度覆蓋懲罰（越小越好）
-
-        for satellite in candidates:
-            # 標準 Set Cover 貢獻度: 覆蓋多少需要覆蓋的時間點
-            contribution = 0
-            penalty = 0  # 造成的過度覆蓋次數
-
-            for time_point in satellite['time_series']:
-                if not time_point['visibility_metrics']['is_connectable']:
-                    continue
-
-                timestamp = time_point['timestamp']
-                current_visible = len(current_coverage.get(timestamp, set()))
-
-                # 標準 Set Cover 策略: 只計算需要覆蓋的時間點
-                if current_visible < self.target_min:
-                    contribution += 1  # 這個時間點需要覆蓋
-                elif current_visible >= self.target_max:
-                    penalty += 1  # 會造成過度覆蓋
-
-            # 選擇策略：
-            # 1. 優先選擇貢獻度最高的（覆蓋最多需要覆蓋的時間點）
-            # 2. 若貢獻度相同，選擇懲罰最少的（較少過度覆蓋）
-            if contribution > best_contribution or \
-               (contribution == best_contribution and penalty < best_penalty):
-                best_contribution = contribution
-                best_penalty = penalty
-                best_satellite = satellite
-
-        return best_satellite, best_contribution
-
-    def _update_coverage(self, current_coverage: Dict[str, Set[str]],
-                        satellite: Dict[str, Any]):
-        """更新覆蓋狀態 (添加衛星到時間點)"""
-        sat_id = satellite['satellite_id']
-
-        for time_point in satellite['time_series']:
-            if time_point['visibility_metrics']['is_connectable']:
-                timestamp = time_point['timestamp']
-                if timestamp not in current_coverage:
-                    current_coverage[timestamp] = set()
-                current_coverage[timestamp].add(sat_id)
-
 
 class CoverageOptimizer:
     """
@@ -107,6 +107,11 @@ class Stage4ConfigManager(BaseConfigManager):
                 'altitude_m': 36.0,
             },
 
+            # ==================== 多地面站網路 (選用) ====================
+            # 每項: {name, latitude_deg, longitude_deg, altitude_m}；只有 name 時
+            # 使用 ground_station_constants 的實測座標
+            'ground_stations': [],
+
             # ==================== Epoch 驗證設置 ====================
             # SOURCE: Vallado 2013 - Epoch diversity requirements
             'epoch_validation': {
@@ -315,6 +320,17 @@ class Stage4ConfigManager(BaseConfigManager):
                     f"當前值: {lon}"
                 )
 
+        # ========== 多地面站網路驗證 ==========
+        ground_stations = config.get('ground_stations') or []
+        if not isinstance(ground_stations, list):
+            errors.append(f"ground_stations 必須是列表，當前類型: {type(ground_stations).__name__}")
+        else:
+            names = [station.get('name') if isinstance(station, dict) else None for station in ground_stations]
+            if any(not name for name in names):
+                errors.append("ground_stations 每一項都必須是包含 name 的字典")
+            elif len(set(names)) != len(names):
+                errors.append(f"ground_stations 名稱重複: {names}")
+
         # Return validation result
         if errors:
             error_message = "\n".join(errors)
@@ -25,9 +25,14 @@ from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+import numpy as np
+
 # 導入共享模組
 from src.shared.base import BaseStageProcessor
 from src.shared.base import ProcessingStatus, ProcessingResult, create_processing_result
+from src.shared.base import IncrementalPlan, IncrementalSatelliteStore
+from src.shared.base.stage_cache import fingerprint_data
+from src.shared.utils.stage_handoff import save_stage_output
 
 # 導入 Stage 4 核心模組
 from .constellation_filter import ConstellationFilter
@@ -37,6 +42,12 @@ from .epoch_validator import EpochValidator
 from .pool_optimizer import optimize_satellite_pool
 from .poliastro_validator import PoliastroValidator
 from .dynamic_threshold_analyzer import DynamicThresholdAnalyzer
+from .ground_station_network import (
+    GroundStationNetwork,
+    analyze_station_network,
+    check_adaptive_sampling_coverage,
+    check_geometric_prefilter_coverage
+)
 
 # ✅ 重構後的模組化組件
 from .data_processing import CoordinateExtractor, ServiceWindowCalculator
@@ -49,6 +60,9 @@ logger = logging.getLogger(__name__)
 class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
     """Stage 4 鏈路可行性評估處理器"""
 
+    # 緩存命中時還原 (驗證快照使用)
+    stage_cache_state_attrs = ('upstream_constellation_configs',)
+
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """初始化 Stage 4 處理器"""
         super().__init__(stage_number=4, stage_name="link_feasibility", config=config)
@@ -102,6 +116,16 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
         self.snapshot_manager = SnapshotManager()
         self.threshold_analyzer = DynamicThresholdAnalyzer()  # 動態閾值分析器
 
+        # 🌐 多地面站網路 (選用): 共用 Stage 3 座標，一次廣播計算所有地面站的可連線池
+        ground_stations = (config or {}).get('ground_stations') or []
+        self.station_network = GroundStationNetwork.from_config(ground_stations) if ground_stations else None
+        if self.station_network is not None:
+            self.logger.info(f"🌐 地面站網路: {len(self.station_network)} 個地面站 {self.station_network.names}")
+
+        # 🔁 增量模式: 只重算輸入座標改變的衛星之可見性 (池規劃等全域步驟仍使用全部衛星)
+        self.incremental_store = IncrementalSatelliteStore.for_processor(self)
+        self.incremental_plan: Optional[IncrementalPlan] = None
+
         self.logger.info("🛰️ Stage 4 鏈路可行性評估處理器初始化完成 (模組化)")
         self.logger.info("   職責: 星座感知篩選、NTPU可見性分析、鏈路預算約束、服務窗口計算")
         self.logger.info(f"   學術模式: IAU標準=強制啟用 (WGS84橢球), Epoch驗證={self.validate_epochs}")
@@ -119,6 +143,16 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
             if not self._validate_stage3_output(input_data):
                 raise ValueError("Stage 3 輸出格式驗證失敗")
 
+            # 🌐 地面站網路必須落在 Stage 2 自適應取樣的可見窗口內 (上游 metadata 經 Stage 3 傳遞)
+            #    以及 Stage 3 幾何預篩選的地面站內
+            input_metadata = input_data.get('metadata') or {}
+            adaptive_sampling = input_metadata.get('adaptive_sampling')
+            if self.station_network is not None and adaptive_sampling:
+                check_adaptive_sampling_coverage(self.station_network, adaptive_sampling)
+            geometric_prefilter = input_metadata.get('geometric_prefilter') or {}
+            if self.station_network is not None and geometric_prefilter.get('enabled'):
+                check_geometric_prefilter_coverage(self.station_network, geometric_prefilter)
+
             # 提取 WGS84 座標數據
             wgs84_data = self._extract_wgs84_coordinates(input_data)
 
@@ -207,11 +241,109 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
         optimized_pools, optimization_results = self._optimize_satellite_pools(connectable_satellites)
 
         # Step 4: 構建標準化輸出
-        return self._build_stage4_output(
+        stage4_output = self._build_stage4_output(
             wgs84_data, time_series_metrics, connectable_satellites,
             optimized_pools, optimization_results, dynamic_threshold_analysis
         )
 
+        # Step 5: 多地面站網路可連線池 (選用，與主地面站分析互不影響)
+        if self.station_network is not None:
+            stage4_output['station_network'] = self._analyze_station_network(wgs84_data)
+
+        return stage4_output
+
+    # ==================== 串流模式 (有界批次) ====================
+
+    def evaluate_geodetic_block(self, geodetic_block: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        串流模式單批次階段 4.1 - 可見性時間序列 + 可連線篩選
+
+        Args:
+            geodetic_block: Stage 3 轉換後的 OrbitalStateBlock (一個有界批次)
+
+        Returns:
+            {'starlink': [...], 'oneweb': [...], 'other': [...]} (同 _filter_connectable_satellites)
+        """
+        wgs84_data = {
+            satellite_id: {
+                'wgs84_coordinates': [],
+                'constellation': geodetic_block.constellations[row],
+                'geodetic_block': geodetic_block,
+                'block_row': row
+            }
+            for row, satellite_id in enumerate(geodetic_block.satellite_ids)
+        }
+        return self._filter_connectable_satellites(self._calculate_time_series_metrics(wgs84_data))
+
+    def plan_streaming_pools(
+        self,
+        candidate_satellites: Dict[str, List[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]], Dict[str, Any]]:
+        """
+        串流模式全域步驟 - 動態 D2 閾值分析 + 階段 4.2 池規劃
+
+        Args:
+            candidate_satellites: 全體候選衛星 (可為 CandidatePoolColumns 精簡條目)
+
+        Returns:
+            (dynamic_threshold_analysis, optimized_pools, optimization_results)
+        """
+        dynamic_threshold_analysis = self._analyze_dynamic_thresholds(candidate_satellites)
+        optimized_pools, optimization_results = self._optimize_satellite_pools(candidate_satellites)
+        return dynamic_threshold_analysis, optimized_pools, optimization_results
+
+    def build_streaming_output(
+        self,
+        total_input_satellites: int,
+        total_processed_satellites: int,
+        candidate_satellites: Dict[str, List[Dict[str, Any]]],
+        optimized_pools: Dict[str, List[Dict[str, Any]]],
+        optimization_results: Dict[str, Any],
+        dynamic_threshold_analysis: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        串流模式 Stage 4 輸出 (optimized_pools 應為完整條目，供 Stage 5 使用)
+
+        輸入/處理衛星只需計數；階段 4.1 候選池只輸出衛星資訊與服務窗口，
+        完整可連線時間序列保存在串流追加文件。
+        """
+        optimization_results = {**optimization_results, 'optimized_pools': optimized_pools}
+        stage4_output = self._build_stage4_output(
+            {}, {}, candidate_satellites, optimized_pools, optimization_results, dynamic_threshold_analysis,
+            total_input_satellites=total_input_satellites,
+            total_processed_satellites=total_processed_satellites
+        )
+        stage4_output['connectable_satellites_candidate'] = {
+            constellation: [
+                {key: value for key, value in satellite.items() if key != 'time_series'}
+                for satellite in satellites
+            ]
+            for constellation, satellites in candidate_satellites.items()
+        }
+        return stage4_output
+
+    def _analyze_station_network(self, wgs84_data: Dict[str, Any]) -> Dict[str, Any]:
+        """所有配置地面站的可連線衛星池 (單次廣播計算 地面站 × 衛星 × 時間)"""
+        def point_arrays(sat_id: str, sat_data: Dict[str, Any]):
+            points = [
+                self._unpack_wgs84_point(sat_id, point, index)
+                for index, point in enumerate(sat_data.get('wgs84_coordinates', []))
+            ]
+            return (
+                [point[0] for point in points],
+                np.array([point[1] for point in points], dtype=np.float64),
+                np.array([point[2] for point in points], dtype=np.float64),
+                np.array([point[3] for point in points], dtype=np.float64)
+            )
+
+        return analyze_station_network(
+            self.station_network,
+            wgs84_data,
+            self.constellation_filter.get_constellation_threshold,
+            self.link_budget_analyzer,
+            point_arrays
+        )
+
     def _calculate_time_series_metrics(self, wgs84_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
         為所有衛星計算完整時間序列指標
@@ -251,6 +383,14 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
 
         self.logger.info(f"📐 開始計算 {total} 顆衛星的完整時間序列指標...")
 
+        # 🔁 增量模式: 輸入指紋未變的衛星沿用上次的仰角/方位角/距離/可連線陣列
+        reused: Dict[str, Any] = {}
+        new_entries: Dict[str, Any] = {}
+        self.incremental_plan = None
+        if self.incremental_store is not None:
+            self.incremental_plan = self.incremental_store.plan(self._satellite_input_fingerprints(wgs84_data))
+            reused = self.incremental_store.load(self.incremental_plan.reused_ids)
+
         for sat_id, sat_data in wgs84_data.items():
             processed += 1
             if processed % 1000 == 0:
@@ -262,107 +402,98 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
             # 獲取星座特定門檻
             elevation_threshold = self.constellation_filter.get_constellation_threshold(constellation)
 
-            satellite_time_series = []
-
-            for point in wgs84_coordinates:
+            # 📦 列式區塊: 直接讀取 Stage 3 附加的 WGS84 欄位
+            geodetic_block = sat_data.get('geodetic_block')
+            if geodetic_block is not None:
+                timestamps, timestamp_dts, lats, lons, alts_m = self._block_point_arrays(
+                    geodetic_block, sat_data['block_row']
+                )
+            else:
+                points = [
+                    self._unpack_wgs84_point(sat_id, point, index)
+                    for index, point in enumerate(wgs84_coordinates)
+                ]
+                timestamps = [point[0] for point in points]
+                # ✅ Fail-Fast: 解析時間戳（不捕獲異常，讓錯誤直接拋出）
+                timestamp_dts = [
+                    datetime.fromisoformat(timestamp.replace('Z', '+00:00')) for timestamp in timestamps
+                ]
+                lats = np.array([point[1] for point in points], dtype=np.float64)
+                lons = np.array([point[2] for point in points], dtype=np.float64)
+                alts_m = np.array([point[3] for point in points], dtype=np.float64)
+
+            if not timestamps:
+                continue
+
+            # 處理單位問題 (可能是米或公里)
+            alts_km = np.where(alts_m > 1000, alts_m / 1000.0, alts_m)
+
+            cached = reused.get(sat_id)
+            if cached is not None:
+                elevations = cached['elevation_deg']
+                azimuths = cached['azimuth_deg']
+                distances_km = cached['distance_km']
+                connectable = cached['is_connectable']
+            else:
                 try:
-                    # ✅ Fail-Fast: 提取必需字段（無預設值）
-                    lat = point.get('latitude_deg')
-                    lon = point.get('longitude_deg')
-
-                    # ✅ Fail-Fast #3: 海拔必須存在
-                    if 'altitude_m' not in point:
-                        raise ValueError(
-                            f"❌ Fail-Fast: 衛星海拔數據缺失\n"
-                            f"衛星: {sat_id}\n"
-                            f"點索引: {len(satellite_time_series)}\n"
-                            f"點數據字段: {list(point.keys())}\n"
-                            f"該字段應由 Stage 2/3 提供\n"
-                            f"依據: ACADEMIC_STANDARDS.md - 禁止使用預設值"
-                        )
-                    alt_m = point['altitude_m']
-
-                    # 處理單位問題 (可能是米或公里)
-                    alt_km = alt_m / 1000.0 if alt_m > 1000 else alt_m
-
-                    # ✅ Fail-Fast #2: 時間戳必須存在
-                    if 'timestamp' not in point or not point['timestamp']:
-                        raise ValueError(
-                            f"❌ Fail-Fast: 時間戳記缺失\n"
-                            f"衛星: {sat_id}\n"
-                            f"點索引: {len(satellite_time_series)}\n"
-                            f"點數據字段: {list(point.keys())}\n"
-                            f"學術標準要求: 所有計算必須基於實際時間數據\n"
-                            f"依據: ACADEMIC_STANDARDS.md - 禁止估計值/假設值"
-                        )
-                    timestamp = point['timestamp']
-
-                    if lat is None or lon is None:
-                        raise ValueError(
-                            f"❌ Fail-Fast: 衛星經緯度缺失\n"
-                            f"衛星: {sat_id}\n"
-                            f"點索引: {len(satellite_time_series)}\n"
-                            f"lat: {lat}, lon: {lon}\n"
-                            f"該字段應由 Stage 2/3 提供"
-                        )
-
-                    # ✅ Fail-Fast: 解析時間戳（移除 try-except，讓錯誤直接拋出）
-                    timestamp_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-
-                    # 計算仰角（移除 else 分支，timestamp_dt 必須存在）
-                    elevation = self.visibility_calculator.calculate_satellite_elevation(
-                        lat, lon, alt_km, timestamp_dt
-                    )
-
-                    # 計算距離
-                    distance_km = self.visibility_calculator.calculate_satellite_distance(
-                        lat, lon, alt_km, timestamp_dt
-                    )
-
-                    # 計算方位角
-                    azimuth = self.visibility_calculator.calculate_azimuth(
-                        lat, lon, alt_km, timestamp_dt
+                    # 🚀 向量化地平座標 (仰角、方位角、距離) - 每顆衛星一次計算
+                    elevations, azimuths, distances_km = self.visibility_calculator.calculate_topocentric_batch(
+                        lats, lons, alts_km, timestamp_dts
                     )
 
                     # 使用鏈路預算分析器判斷可連線性 (仰角 + 距離雙重約束)
-                    link_analysis = self.link_budget_analyzer.analyze_link_feasibility(
-                        elevation_deg=elevation,
-                        distance_km=distance_km,
-                        constellation=constellation,
-                        elevation_threshold=elevation_threshold
+                    connectable = self.link_budget_analyzer.analyze_link_feasibility_batch(
+                        elevations, distances_km, elevation_threshold
                     )
-
-                    # 構建時間點數據 (符合文檔標準: visibility_metrics + position 嵌套)
-                    time_point = {
-                        'timestamp': timestamp,
-                        'visibility_metrics': {
-                            'elevation_deg': elevation,
-                            'azimuth_deg': azimuth,
-                            'distance_km': distance_km,
-                            'threshold_applied': elevation_threshold,
-                            'is_connectable': link_analysis['is_connectable']
-                        },
-                        'position': {
-                            'latitude_deg': lat,
-                            'longitude_deg': lon,
-                            'altitude_km': alt_km
-                        }
-                        # 注: Stage 4 僅負責幾何可見性判斷
-                        # 真實信號品質 (RSRP/RSRQ/SINR) 由 Stage 5 使用 3GPP TS 38.214 標準計算
-                    }
-
-                    satellite_time_series.append(time_point)
-
                 except Exception as e:
                     # ✅ Fail-Fast #4: 時間點計算失敗必須拋出異常
                     raise ValueError(
-                        f"❌ Fail-Fast: 衛星時間點計算失敗\n"
+                        f"❌ Fail-Fast: 衛星時間序列計算失敗\n"
                         f"衛星: {sat_id}\n"
-                        f"點索引: {len(satellite_time_series)}\n"
+                        f"時間點數: {len(timestamps)}\n"
                         f"原始錯誤: {e}\n"
                         f"依據: ACADEMIC_STANDARDS.md - 禁止靜默跳過計算錯誤"
                     ) from e
 
+                if self.incremental_plan is not None:
+                    new_entries[sat_id] = {
+                        'elevation_deg': np.asarray(elevations, dtype=np.float64),
+                        'azimuth_deg': np.asarray(azimuths, dtype=np.float64),
+                        'distance_km': np.asarray(distances_km, dtype=np.float64),
+                        'is_connectable': np.asarray(connectable, dtype=bool)
+                    }
+
+            # 構建時間點數據 (符合文檔標準: visibility_metrics + position 嵌套)
+            satellite_time_series = [
+                {
+                    'timestamp': timestamp,
+                    'visibility_metrics': {
+                        'elevation_deg': elevation,
+                        'azimuth_deg': azimuth,
+                        'distance_km': distance_km,
+                        'threshold_applied': elevation_threshold,
+                        'is_connectable': is_connectable
+                    },
+                    'position': {
+                        'latitude_deg': lat,
+                        'longitude_deg': lon,
+                        'altitude_km': alt_km
+                    }
+                    # 注: Stage 4 僅負責幾何可見性判斷
+                    # 真實信號品質 (RSRP/RSRQ/SINR) 由 Stage 5 使用 3GPP TS 38.214 標準計算
+                }
+                for timestamp, elevation, azimuth, distance_km, is_connectable, lat, lon, alt_km in zip(
+                    timestamps,
+                    np.asarray(elevations).tolist(),
+                    np.asarray(azimuths).tolist(),
+                    np.asarray(distances_km).tolist(),
+                    np.asarray(connectable).tolist(),
+                    lats.tolist(),
+                    lons.tolist(),
+                    alts_km.tolist()
+                )
+            ]
+
             # 存儲該衛星的完整時間序列
             if satellite_time_series:
                 time_series_metrics[sat_id] = {
@@ -373,9 +504,89 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
                     'total_time_points': len(satellite_time_series)
                 }
 
+        if self.incremental_plan is not None:
+            self.incremental_store.save(self.incremental_plan.fingerprints, {**reused, **new_entries})
+
         self.logger.info(f"✅ 時間序列計算完成: {len(time_series_metrics)} 顆衛星")
         return time_series_metrics
 
+    @staticmethod
+    def _satellite_input_fingerprints(wgs84_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        逐衛星輸入指紋 (增量模式)
+
+        列式區塊使用 OrbitalStateBlock.row_fingerprints() (每個區塊計算一次)，
+        舊版逐點 dict 使用內容雜湊；星座決定仰角門檻，一併納入指紋。
+        """
+        block_fingerprints: Dict[int, List[str]] = {}
+        fingerprints = {}
+        for sat_id, sat_data in wgs84_data.items():
+            constellation = sat_data.get('constellation', 'unknown').lower()
+            geodetic_block = sat_data.get('geodetic_block')
+            if geodetic_block is not None:
+                if id(geodetic_block) not in block_fingerprints:
+                    block_fingerprints[id(geodetic_block)] = geodetic_block.row_fingerprints()
+                content = block_fingerprints[id(geodetic_block)][sat_data['block_row']]
+            else:
+                content = fingerprint_data(sat_data.get('wgs84_coordinates', []))
+            fingerprints[sat_id] = fingerprint_data([constellation, content])
+        return fingerprints
+
+    @staticmethod
+    def _block_point_arrays(block: Any, row: int):
+        """OrbitalStateBlock 單顆衛星的有效點 (timestamps, datetimes, lat, lon, alt_m)"""
+        indices = block.valid_indices(row)
+        timestamps = block.timestamps
+        time_points = block.time_points
+        index_list = indices.tolist()
+        return (
+            [timestamps[j] for j in index_list],
+            [time_points[j] for j in index_list],
+            block.latitude_deg[row, indices],
+            block.longitude_deg[row, indices],
+            block.altitude_m[row, indices]
+        )
+
+    @staticmethod
+    def _unpack_wgs84_point(sat_id: str, point: Dict[str, Any], index: int) -> Tuple[str, float, float, float]:
+        """解析舊版 WGS84 時間點 dict (Fail-Fast 檢查必需欄位)"""
+        # ✅ Fail-Fast: 提取必需字段（無預設值）
+        lat = point.get('latitude_deg')
+        lon = point.get('longitude_deg')
+
+        # ✅ Fail-Fast #3: 海拔必須存在
+        if 'altitude_m' not in point:
+            raise ValueError(
+                f"❌ Fail-Fast: 衛星海拔數據缺失\n"
+                f"衛星: {sat_id}\n"
+                f"點索引: {index}\n"
+                f"點數據字段: {list(point.keys())}\n"
+                f"該字段應由 Stage 2/3 提供\n"
+                f"依據: ACADEMIC_STANDARDS.md - 禁止使用預設值"
+            )
+
+        # ✅ Fail-Fast #2: 時間戳必須存在
+        if 'timestamp' not in point or not point['timestamp']:
+            raise ValueError(
+                f"❌ Fail-Fast: 時間戳記缺失\n"
+                f"衛星: {sat_id}\n"
+                f"點索引: {index}\n"
+                f"點數據字段: {list(point.keys())}\n"
+                f"學術標準要求: 所有計算必須基於實際時間數據\n"
+                f"依據: ACADEMIC_STANDARDS.md - 禁止估計值/假設值"
+            )
+
+        if lat is None or lon is None:
+            raise ValueError(
+                f"❌ Fail-Fast: 衛星經緯度缺失\n"
+                f"衛星: {sat_id}\n"
+                f"點索引: {index}\n"
+                f"lat: {lat}, lon: {lon}\n"
+                f"該字段應由 Stage 2/3 提供"
+            )
+
+        return point['timestamp'], lat, lon, point['altitude_m']
+
     def _filter_connectable_satellites(self, time_series_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """按星座分類並篩選可連線衛星 - 使用 SatelliteFilter 模組"""
         # ✅ 委託給 SatelliteFilter
@@ -697,8 +908,19 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
                            connectable_satellites: Dict[str, List[Dict[str, Any]]],
                            optimized_pools: Dict[str, List[Dict[str, Any]]],
                            optimization_results: Optional[Dict[str, Any]],
-                           dynamic_threshold_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """構建 Stage 4 標準化輸出 - 使用 ResultBuilder 模組"""
+                           dynamic_threshold_analysis: Optional[Dict[str, Any]] = None,
+                           total_input_satellites: Optional[int] = None,
+                           total_processed_satellites: Optional[int] = None) -> Dict[str, Any]:
+        """
+        構建 Stage 4 標準化輸出 - 使用 ResultBuilder 模組
+
+        total_input_satellites / total_processed_satellites 未提供時取 original_data /
+        time_series_metrics 的長度 (串流模式只有計數，兩者傳入空字典)
+        """
+        if total_input_satellites is None:
+            total_input_satellites = len(original_data)
+        if total_processed_satellites is None:
+            total_processed_satellites = len(time_series_metrics)
 
         # 計算 NTPU 覆蓋率分析 (基於優化池)
         ntpu_coverage = self._analyze_ntpu_coverage(optimized_pools)
@@ -712,16 +934,21 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
             optimization_results=optimization_results,
             ntpu_coverage=ntpu_coverage,
             upstream_constellation_configs=getattr(self, 'upstream_constellation_configs', None),
-            dynamic_threshold_analysis=dynamic_threshold_analysis  # 動態閾值分析結果
+            dynamic_threshold_analysis=dynamic_threshold_analysis,  # 動態閾值分析結果
+            total_input_satellites=total_input_satellites,
+            total_processed_satellites=total_processed_satellites
         )
 
+        if self.incremental_plan is not None:
+            stage4_output.setdefault('metadata', {})['incremental'] = self.incremental_plan.summary()
+
         # 記錄處理結果
         total_candidate = stage4_output['feasibility_summary']['candidate_pool']['total_connectable']
         total_optimized = stage4_output['feasibility_summary']['optimized_pool']['total_optimized']
 
         self.logger.info(f"📊 Stage 4 處理統計:")
-        self.logger.info(f"   輸入衛星: {len(original_data)} 顆")
-        self.logger.info(f"   處理衛星: {len(time_series_metrics)} 顆")
+        self.logger.info(f"   輸入衛星: {total_input_satellites} 顆")
+        self.logger.info(f"   處理衛星: {total_processed_satellites} 顆")
         self.logger.info(f"   候選池 (4.1): {total_candidate} 顆")
         self.logger.info(f"   優化池 (4.2): {total_optimized} 顆")
 
@@ -865,20 +1092,20 @@ class Stage4LinkFeasibilityProcessor(BaseStageProcessor):
         return validation_result
 
 
+    def save_cached_outputs(self, result: ProcessingResult) -> None:
+        """緩存命中時重建 Stage 4 輸出文件 (Stage 4 於 process() 內保存)"""
+        self.save_results(result.data)
+
     def save_results(self, results: Dict[str, Any]) -> str:
-        """保存 Stage 4 處理結果到文件"""
+        """保存 Stage 4 處理結果到文件 (階段交接 HDF5 + 選用 JSON)"""
         try:
             output_dir = Path("data/outputs/stage4")
-            output_dir.mkdir(parents=True, exist_ok=True)
-
             timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-            output_file = output_dir / f"link_feasibility_output_{timestamp}.json"
 
-            # 導入 json
-            import json
-
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+            output_file = save_stage_output(
+                results, output_dir, f"link_feasibility_output_{timestamp}",
+                logger_instance=self.logger
+            )
 
             self.logger.info(f"💾 Stage 4 輸出已保存: {output_file}")
             return str(output_file)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+串流模式階段 4.1 候選池 - 精簡列式保存
+
+串流管線中衛星以批次流經 Stage 2 → 4.1，完整可連線時間序列逐批寫入追加文件；
+階段 4.2 池規劃與動態 D2 閾值分析需要全體候選衛星，但只讀取:
+- time_series[*].timestamp
+- time_series[*].visibility_metrics.is_connectable
+- time_series[*].position.latitude_deg / longitude_deg
+
+CandidatePoolColumns 每顆候選衛星只保存 (時間索引 int32, 緯度/經度 float64) 陣列，
+時間戳字串全體共用一份；by_constellation() 產生的條目以 CompactTimeSeries
+在迭代時才建立時間點 dict，與完整條目對池優化器/閾值分析器等價。
+"""
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+
+class CompactTimeSeries(Sequence):
+    """可連線時間點的唯讀序列 (迭代時才建立 dict)"""
+
+    __slots__ = ('_timestamps', '_time_indices', '_latitudes', '_longitudes')
+
+    def __init__(self, timestamps: List[str], time_indices: np.ndarray,
+                 latitudes: np.ndarray, longitudes: np.ndarray):
+        self._timestamps = timestamps
+        self._time_indices = time_indices
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+
+    def __len__(self) -> int:
+        return len(self._time_indices)
+
+    def _point(self, index: int) -> Dict[str, Any]:
+        return {
+            'timestamp': self._timestamps[self._time_indices[index]],
+            'visibility_metrics': {'is_connectable': True},
+            'position': {
+                'latitude_deg': float(self._latitudes[index]),
+                'longitude_deg': float(self._longitudes[index])
+            }
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._point(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._point(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self._point(index)
+
+
+class CandidatePoolColumns:
+    """
+    階段 4.1 候選池的精簡列式保存
+
+    只收錄 SatelliteFilter.filter_by_constellation() 輸出 (僅含可連線時間點) 的條目。
+    """
+
+    def __init__(self):
+        self.timestamps: List[str] = []
+        self._timestamp_index: Dict[str, int] = {}
+        self._candidates: Dict[str, List[Dict[str, Any]]] = {'starlink': [], 'oneweb': [], 'other': []}
+
+    def _intern(self, timestamp: str) -> int:
+        index = self._timestamp_index.get(timestamp)
+        if index is None:
+            index = self._timestamp_index[timestamp] = len(self.timestamps)
+            self.timestamps.append(timestamp)
+        return index
+
+    def add_batch(self, connectable_by_constellation: Dict[str, List[Dict[str, Any]]]) -> int:
+        """
+        收錄一個批次的候選衛星
+
+        Args:
+            connectable_by_constellation: {星座: [候選條目]} (SatelliteFilter 輸出)
+
+        Returns:
+            本批次收錄的候選衛星數
+        """
+        added = 0
+        for constellation, satellites in connectable_by_constellation.items():
+            bucket = self._candidates.setdefault(constellation, [])
+            for satellite in satellites:
+                time_series = satellite['time_series']
+                count = len(time_series)
+                # ✅ Fail-Fast: 候選條目只應包含可連線時間點
+                if not all(point['visibility_metrics']['is_connectable'] for point in time_series):
+                    raise ValueError(
+                        f"❌ Fail-Fast: 衛星 {satellite['satellite_id']} 候選條目含不可連線時間點\n"
+                        f"候選池須為 SatelliteFilter.filter_by_constellation() 輸出"
+                    )
+                bucket.append({
+                    'satellite_id': satellite['satellite_id'],
+                    'name': satellite['name'],
+                    'constellation': constellation,
+                    'service_window': satellite['service_window'],
+                    'time_indices': np.fromiter(
+                        (self._intern(point['timestamp']) for point in time_series), dtype=np.int32, count=count
+                    ),
+                    'latitude_deg': np.fromiter(
+                        (point['position']['latitude_deg'] for point in time_series), dtype=np.float64, count=count
+                    ),
+                    'longitude_deg': np.fromiter(
+                        (point['position']['longitude_deg'] for point in time_series), dtype=np.float64, count=count
+                    )
+                })
+                added += 1
+        return added
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._candidates.values())
+
+    @property
+    def nbytes(self) -> int:
+        """陣列佔用位元組 (不含 dict 與時間戳字串)"""
+        return sum(
+            candidate['time_indices'].nbytes + candidate['latitude_deg'].nbytes + candidate['longitude_deg'].nbytes
+            for bucket in self._candidates.values() for candidate in bucket
+        )
+
+    def satellite_ids(self, constellation: str) -> List[str]:
+        return [candidate['satellite_id'] for candidate in self._candidates.get(constellation, [])]
+
+    def by_constellation(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        精簡候選條目 {星座: [條目]} (time_series 為 CompactTimeSeries)
+
+        可直接傳入 optimize_satellite_pool() 與 DynamicThresholdAnalyzer.analyze_candidate_distances()
+        """
+        return {
+            constellation: [
+                {
+                    'satellite_id': candidate['satellite_id'],
+                    'name': candidate['name'],
+                    'constellation': constellation,
+                    'time_series': CompactTimeSeries(
+                        self.timestamps, candidate['time_indices'],
+                        candidate['latitude_deg'], candidate['longitude_deg']
+                    ),
+                    'service_window': candidate['service_window']
+                }
+                for candidate in bucket
+            ]
+            for constellation, bucket in self._candidates.items()
+        }
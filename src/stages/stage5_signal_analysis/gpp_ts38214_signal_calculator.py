@@ -17,8 +17,20 @@ import math
 import logging
 from typing import Dict, Any, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# 干擾模型參數 (逐點與向量化路徑共用，避免兩者結果不一致)
+# SOURCE: ITU-R S.1503-3 (2018) Table 2
+# Measured I/S ratio for LEO systems: -15 dB (median value)
+BASE_INTERFERENCE_RATIO_DB = -15.0
+
+# SOURCE: ITU-R P.452-17 (2019) Section 4.5.4, Eq. (39)
+# Low elevation angle interference increase: linear from 0 dB (10°) to 5 dB (0°)
+LOW_ELEVATION_THRESHOLD_DEG = 10.0
+LOW_ELEVATION_MAX_PENALTY_DB = 5.0
+
 
 class GPPTS38214SignalCalculator:
     """
@@ -412,10 +424,13 @@ class GPPTS38214SignalCalculator:
         # 仰角影響: 低仰角時地面干擾增加
         # SOURCE: ITU-R P.452-17 (2019) Section 4.5.4
         # Low elevation angle interference increase: maximum 5 dB penalty at 0° elevation
-        if elevation_deg < 10.0:
+        if elevation_deg < LOW_ELEVATION_THRESHOLD_DEG:
             # SOURCE: ITU-R P.452-17 Eq. (39)
             # Linear interpolation from 0 dB (10°) to 5 dB (0°)
-            elevation_penalty_db = 5.0 * (10.0 - elevation_deg) / 10.0
+            elevation_penalty_db = (
+                LOW_ELEVATION_MAX_PENALTY_DB * (LOW_ELEVATION_THRESHOLD_DEG - elevation_deg)
+                / LOW_ELEVATION_THRESHOLD_DEG
+            )
             # SOURCE: ITU-R P.452-17 Section 4.5.4, Figure 12
         else:
             elevation_penalty_db = 0.0
@@ -426,7 +441,7 @@ class GPPTS38214SignalCalculator:
         # 基礎干擾比 (I/S ratio)
         # SOURCE: ITU-R S.1503-3 (2018) Table 2
         # Measured I/S ratio for LEO systems: -15 dB (median value)
-        base_interference_ratio_db = -15.0  # ITU-R S.1503-3 測量中位數
+        base_interference_ratio_db = BASE_INTERFERENCE_RATIO_DB  # ITU-R S.1503-3 測量中位數
 
         # 總干擾功率
         interference_power_dbm = rsrp_dbm + base_interference_ratio_db + elevation_penalty_db + density_factor_db
@@ -491,6 +506,70 @@ class GPPTS38214SignalCalculator:
         }
 
 
+    def calculate_signal_quality_batch(self, tx_power_dbm: float, tx_gain_db: float,
+                                       rx_gain_db: float, path_loss_db: np.ndarray,
+                                       atmospheric_loss_db: np.ndarray, elevation_deg: np.ndarray,
+                                       satellite_density: float = 1.0) -> Dict[str, np.ndarray]:
+        """
+        向量化計算完整信號品質指標 (整條時間序列一次計算)
+
+        公式與運算順序與 calculate_complete_signal_quality() 逐項相同:
+        RSRP → 熱噪聲 (純量) → 干擾 → RSSI → RSRQ → RS-SINR
+
+        Args:
+            tx_power_dbm / tx_gain_db / rx_gain_db: 鏈路預算常數 (純量)
+            path_loss_db: 路徑損耗陣列 (dB)
+            atmospheric_loss_db: 大氣衰減陣列 (dB)
+            elevation_deg: 仰角陣列 (度)
+            satellite_density: 衛星密度因子
+
+        Returns:
+            Dict[str, np.ndarray]: rsrp_dbm / rsrq_db / rs_sinr_db / rssi_dbm /
+                                   interference_power_dbm (與輸入同形狀)，
+                                   noise_power_dbm (純量)
+        """
+        path_loss_db = np.asarray(path_loss_db, dtype=np.float64)
+        atmospheric_loss_db = np.asarray(atmospheric_loss_db, dtype=np.float64)
+        elevation_deg = np.asarray(elevation_deg, dtype=np.float64)
+
+        # 1. RSRP (3GPP TS 38.214 鏈路預算)
+        rsrp_dbm = tx_power_dbm + tx_gain_db + rx_gain_db - path_loss_db - atmospheric_loss_db
+
+        # 2. 噪聲功率 (Johnson-Nyquist，與時間無關)
+        noise_power_dbm = self.calculate_thermal_noise_power()
+
+        # 3. 干擾功率 (ITU-R S.1503-3 I/S 中位數 + ITU-R P.452-17 低仰角懲罰)
+        elevation_penalty_db = np.where(
+            elevation_deg < LOW_ELEVATION_THRESHOLD_DEG,
+            LOW_ELEVATION_MAX_PENALTY_DB * (LOW_ELEVATION_THRESHOLD_DEG - elevation_deg) / LOW_ELEVATION_THRESHOLD_DEG,
+            0.0
+        )
+        density_factor_db = 10 * math.log10(satellite_density)
+        interference_power_dbm = rsrp_dbm + BASE_INTERFERENCE_RATIO_DB + elevation_penalty_db + density_factor_db
+
+        rsrp_mw = 10 ** (rsrp_dbm / 10.0)
+        interference_mw = 10 ** (interference_power_dbm / 10.0)
+        noise_mw = 10 ** (noise_power_dbm / 10.0)
+
+        # 4. RSSI = 信號 (RSRP × 12 × N_RB) + 干擾 + 噪聲
+        rssi_dbm = 10 * np.log10(rsrp_mw * 12 * self.n_rb + interference_mw + noise_mw)
+
+        # 5. RSRQ = N × RSRP / RSSI
+        rsrq_db = 10 * np.log10(self.n_rb * rsrp_mw / 10 ** (rssi_dbm / 10.0))
+
+        # 6. RS-SINR = RSRP / (I + N)
+        sinr_db = 10 * np.log10(rsrp_mw / (interference_mw + noise_mw))
+
+        return {
+            'rsrp_dbm': rsrp_dbm,
+            'rsrq_db': rsrq_db,
+            'rs_sinr_db': sinr_db,
+            'rssi_dbm': rssi_dbm,
+            'noise_power_dbm': noise_power_dbm,
+            'interference_power_dbm': interference_power_dbm
+        }
+
+
 def create_3gpp_signal_calculator(config: Optional[Dict[str, Any]] = None) -> GPPTS38214SignalCalculator:
     """創建 3GPP TS 38.214 信號計算器實例"""
     return GPPTS38214SignalCalculator(config)
\ No newline at end of file
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+ITU-R P.676 氣體衰減仰角查表 (exact 模式預計算)
+
+學術標準: ITU-R Recommendation P.676-13 (08/2019)
+
+設計:
+- 頻率 / 溫度 / 氣壓 / 水蒸氣密度在單次執行中固定 (每個星座一組)，
+  逐時間點變化的只有仰角 → 衰減為仰角的一維函數
+- 以 ITU-Rpy exact 模式 (44 條 O₂ + 35 條 H₂O 譜線) 在均勻仰角網格上計算節點值
+- 節點之間使用 PCHIP 單調保形內插 (Fritsch & Carlson 1980)，不產生過衝
+- 建表後在網格中點與 exact 直接計算比對，記錄最大絕對誤差；
+  超過容許誤差時 Fail-Fast，要求提高網格解析度
+- 查表以 (f, T, P, ρ, 解析度, ITU-Rpy 版本) 為鍵持久化於磁碟，跨執行重用
+
+SOURCE:
+- ITU-R P.676-13 Annex 1 / Annex 2
+- Fritsch, F. N., & Carlson, R. E. (1980). "Monotone Piecewise Cubic Interpolation"
+  SIAM Journal on Numerical Analysis, 17(2), 238-246.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTION_DEG = 0.05
+DEFAULT_MAX_ERROR_DB = 0.01
+DEFAULT_CACHE_DIR = Path("data/cache/itur_p676")
+
+# 低仰角處衰減曲率最大 → 此範圍內每個網格中點都驗證，其餘每 VERIFY_STRIDE 個區間驗證一次
+DENSE_VERIFICATION_BELOW_DEG = 10.0
+VERIFY_STRIDE = 10
+
+# 與 ITUROfficalAtmosphericModel.calculate_total_attenuation 相同: 衛星在地平線以下
+BLOCKED_ATTENUATION_DB = 999.0
+
+
+class ITURAttenuationTable:
+    """
+    單一 (f, T, P, ρ) 組合的 ITU-R P.676 exact 模式衰減查表
+
+    節點值全部來自 ITUROfficalAtmosphericModel.calculate_total_attenuation()，
+    查表結果可追溯到 exact 模式，誤差上界記錄於 get_table_info()。
+    """
+
+    def __init__(self,
+                 model,
+                 frequency_ghz: float,
+                 resolution_deg: float = DEFAULT_RESOLUTION_DEG,
+                 max_error_db: float = DEFAULT_MAX_ERROR_DB,
+                 cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            model: ITUROfficalAtmosphericModel 實例 (提供 exact 模式計算與大氣參數)
+            frequency_ghz: 頻率 (GHz)
+            resolution_deg: 仰角網格間距 (度)
+            max_error_db: 中點驗證容許的最大絕對誤差 (dB)
+            cache_dir: 持久化目錄，None 表示不寫入磁碟
+
+        Raises:
+            ValueError: 參數無效或內插誤差超過 max_error_db
+        """
+        if not (0.0 < resolution_deg <= 5.0):
+            raise ValueError(f"仰角網格解析度超出範圍 (0, 5]°: {resolution_deg}")
+        if max_error_db <= 0.0:
+            raise ValueError(f"容許誤差必須 > 0 dB: {max_error_db}")
+
+        self.model = model
+        self.frequency_ghz = frequency_ghz
+        self.resolution_deg = resolution_deg
+        self.max_error_db = max_error_db
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+        self.metadata = self._build_metadata()
+        self.source = 'memory'
+
+        loaded = self._load() if self.cache_dir is not None else None
+        if loaded is not None:
+            self.elevation_deg, self.attenuation_db_nodes, stored = loaded
+            self.metadata.update(stored)
+            self.source = 'disk'
+        else:
+            self.elevation_deg, self.attenuation_db_nodes = self._build_nodes()
+            self.metadata.update(self._verify())
+            if self.cache_dir is not None:
+                self._save()
+
+        self._interpolator = PchipInterpolator(self.elevation_deg, self.attenuation_db_nodes)
+
+        logger.info(
+            f"✅ ITU-R P.676 衰減查表就緒 ({self.source}): f={frequency_ghz}GHz, "
+            f"{len(self.elevation_deg)} 個節點 @ {resolution_deg}°, "
+            f"最大內插誤差 {self.metadata['max_abs_error_db']:.2e} dB"
+        )
+
+    # ========== 查表 ==========
+
+    def attenuation_db(self, elevation_deg: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        查詢總氣體衰減 (dB)
+
+        Args:
+            elevation_deg: 仰角 (度)，純量或陣列
+
+        Returns:
+            衰減 (dB)；負仰角返回 999.0 (信號被地球遮擋)
+
+        Raises:
+            ValueError: 仰角 > 90° 或為 NaN
+        """
+        elevation = np.asarray(elevation_deg, dtype=np.float64)
+        if np.isnan(elevation).any():
+            raise ValueError("仰角包含 NaN")
+        if (elevation > 90.0).any():
+            raise ValueError(f"仰角超出有效範圍 (0-90°): {np.max(elevation)}°")
+
+        attenuation = np.where(
+            elevation < 0.0,
+            BLOCKED_ATTENUATION_DB,
+            self._interpolator(np.clip(elevation, 0.0, 90.0))
+        )
+        if attenuation.ndim == 0:
+            return float(attenuation)
+        return attenuation
+
+    def get_table_info(self) -> Dict[str, Any]:
+        """查表來源、參數與誤差上界 (可追溯到 exact 模式)"""
+        return dict(self.metadata, source=self.source, n_nodes=len(self.elevation_deg))
+
+    # ========== 建表 ==========
+
+    def _build_metadata(self) -> Dict[str, Any]:
+        model_info = self.model.get_model_info()
+        return {
+            'recommendation': 'ITU-R P.676-13',
+            'itur_mode': 'exact',
+            'itur_version': model_info['version'],
+            'interpolation': 'PCHIP (Fritsch & Carlson 1980)',
+            'frequency_ghz': self.frequency_ghz,
+            'temperature_k': self.model.temperature_k,
+            'pressure_hpa': self.model.pressure_hpa,
+            'water_vapor_density_g_m3': self.model.water_vapor_density,
+            'resolution_deg': self.resolution_deg,
+            'max_error_db': self.max_error_db,
+        }
+
+    def _exact(self, elevation_deg: float) -> float:
+        return self.model.calculate_total_attenuation(
+            frequency_ghz=self.frequency_ghz,
+            elevation_deg=float(elevation_deg)
+        )
+
+    def _build_nodes(self) -> Tuple[np.ndarray, np.ndarray]:
+        n_intervals = int(round(90.0 / self.resolution_deg))
+        if not np.isclose(n_intervals * self.resolution_deg, 90.0):
+            raise ValueError(f"仰角網格解析度必須整除 90°: {self.resolution_deg}")
+
+        elevation = np.linspace(0.0, 90.0, n_intervals + 1)
+        logger.info(f"🔧 建立 ITU-R P.676 exact 衰減查表: {len(elevation)} 個仰角節點...")
+
+        build_start = time.time()
+        attenuation = np.array([self._exact(el) for el in elevation])
+        self.metadata['build_time_s'] = time.time() - build_start
+
+        return elevation, attenuation
+
+    def _verify(self) -> Dict[str, Any]:
+        """網格中點與 exact 直接計算比對"""
+        interpolator = PchipInterpolator(self.elevation_deg, self.attenuation_db_nodes)
+        midpoints = 0.5 * (self.elevation_deg[:-1] + self.elevation_deg[1:])
+        indices = np.arange(len(midpoints))
+        selected = midpoints[(midpoints < DENSE_VERIFICATION_BELOW_DEG) | (indices % VERIFY_STRIDE == 0)]
+
+        exact = np.array([self._exact(el) for el in selected])
+        errors = np.abs(interpolator(selected) - exact)
+        worst = int(np.argmax(errors))
+
+        if errors[worst] > self.max_error_db:
+            raise ValueError(
+                f"ITU-R P.676 查表內插誤差超過容許值: {errors[worst]:.4f} dB > {self.max_error_db} dB\n"
+                f"最大誤差位置: 仰角 {selected[worst]:.3f}°\n"
+                f"請減小 atmospheric_model.attenuation_table.resolution_deg (當前 {self.resolution_deg}°)"
+            )
+
+        return {
+            'max_abs_error_db': float(errors[worst]),
+            'max_error_elevation_deg': float(selected[worst]),
+            'verified_points': int(len(selected)),
+        }
+
+    # ========== 持久化 ==========
+
+    def _cache_key(self) -> str:
+        key_fields = {k: self.metadata[k] for k in (
+            'itur_version', 'itur_mode', 'frequency_ghz', 'temperature_k',
+            'pressure_hpa', 'water_vapor_density_g_m3', 'resolution_deg'
+        )}
+        return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _cache_path(self) -> Path:
+        return self.cache_dir / f"p676_exact_{self._cache_key()}.npz"
+
+    def _load(self) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        path = self._cache_path()
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                stored = json.loads(str(data['metadata']))
+                elevation = data['elevation_deg']
+                attenuation = data['attenuation_db']
+        except Exception as e:
+            logger.warning(f"⚠️ 衰減查表檔案無法讀取，將重新建立: {path} ({e})")
+            return None
+
+        # 驗證誤差上界仍符合當前容許值
+        if stored.get('max_abs_error_db', np.inf) > self.max_error_db:
+            logger.info(f"衰減查表誤差 {stored.get('max_abs_error_db')} dB 超過當前容許值，重新建立")
+            return None
+
+        extra = {k: stored[k] for k in ('max_abs_error_db', 'max_error_elevation_deg',
+                                        'verified_points', 'build_time_s') if k in stored}
+        return elevation, attenuation, extra
+
+    def _save(self):
+        path = self._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先寫入暫存檔再原子替換，並行工作進程同時建表時不會讀到半成品
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+            np.savez(
+                tmp_path,
+                elevation_deg=self.elevation_deg,
+                attenuation_db=self.attenuation_db_nodes,
+                metadata=np.array(json.dumps(self.metadata, sort_keys=True))
+            )
+            os.replace(tmp_path, path)
+            logger.info(f"💾 衰減查表已保存: {path}")
+        except OSError as e:
+            logger.warning(f"⚠️ 衰減查表無法寫入磁碟 (僅保留於記憶體): {e}")
+
+
+_tables: Dict[Tuple, ITURAttenuationTable] = {}
+
+
+def get_attenuation_table(frequency_ghz: float,
+                          temperature_k: float,
+                          pressure_hpa: float,
+                          water_vapor_density_g_m3: float,
+                          resolution_deg: float = DEFAULT_RESOLUTION_DEG,
+                          max_error_db: float = DEFAULT_MAX_ERROR_DB,
+                          cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> ITURAttenuationTable:
+    """
+    獲取衰減查表 (進程內每組參數只建立一次)
+
+    Args:
+        frequency_ghz: 頻率 (GHz)
+        temperature_k: 溫度 (K)
+        pressure_hpa: 氣壓 (hPa)
+        water_vapor_density_g_m3: 水蒸氣密度 (g/m³)
+        resolution_deg: 仰角網格間距 (度)
+        max_error_db: 容許的最大內插誤差 (dB)
+        cache_dir: 持久化目錄
+
+    Returns:
+        ITURAttenuationTable
+    """
+    key = (frequency_ghz, temperature_k, pressure_hpa, water_vapor_density_g_m3,
+           resolution_deg, max_error_db, str(cache_dir))
+    if key not in _tables:
+        from .itur_official_atmospheric_model import create_itur_official_model
+        model = create_itur_official_model(
+            temperature_k=temperature_k,
+            pressure_hpa=pressure_hpa,
+            water_vapor_density_g_m3=water_vapor_density_g_m3
+        )
+        _tables[key] = ITURAttenuationTable(
+            model, frequency_ghz,
+            resolution_deg=resolution_deg,
+            max_error_db=max_error_db,
+            cache_dir=cache_dir
+        )
+    return _tables[key]
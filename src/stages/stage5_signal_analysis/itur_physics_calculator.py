@@ -17,6 +17,8 @@ import logging
 import math
 from typing import Dict, Any, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # 🚨 Grade A要求：使用學術級物理常數 (Astropy CODATA 2022, Fail-Fast)
@@ -95,6 +97,19 @@ class ITURPhysicsCalculator:
         # FSL (dB) = 92.45 + 20*log10(f_GHz) + 20*log10(d_km)
         return 92.45 + 20 * math.log10(frequency_ghz) + 20 * math.log10(distance_km)
 
+    def calculate_free_space_loss_batch(self, distance_km: np.ndarray, frequency_ghz: float) -> np.ndarray:
+        """
+        向量化自由空間損耗 (Friis 公式，與 calculate_free_space_loss 相同)
+
+        Args:
+            distance_km: 距離陣列 (公里)
+            frequency_ghz: 頻率 (GHz)
+
+        Returns:
+            np.ndarray: 自由空間損耗 (dB)
+        """
+        return 92.45 + 20 * math.log10(frequency_ghz) + 20 * np.log10(np.asarray(distance_km, dtype=np.float64))
+
     def calculate_receiver_gain_from_config(
         self,
         frequency_ghz: float,
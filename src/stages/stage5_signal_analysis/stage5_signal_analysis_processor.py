@@ -55,11 +55,17 @@ logger.info("✅ 使用 Astropy 官方物理常數 (CODATA 2022)")
 try:
     from src.shared.base import BaseStageProcessor
     from src.shared.base import ProcessingStatus, ProcessingResult, create_processing_result
+    from src.shared.base import IncrementalSatelliteStore
+    from src.shared.base.stage_cache import fingerprint_data
     from src.shared.validation import ValidationEngine
+    from src.shared.utils.stage_handoff import save_stage_output
 except ModuleNotFoundError:
     from shared.base import BaseStageProcessor
     from shared.base import ProcessingStatus, ProcessingResult, create_processing_result
+    from shared.base import IncrementalSatelliteStore
+    from shared.base.stage_cache import fingerprint_data
     from shared.validation import ValidationEngine
+    from shared.utils.stage_handoff import save_stage_output
 # Stage 5核心模組 (重構後專注信號品質分析)
 from .itur_physics_calculator import create_itur_physics_calculator
 from .stage5_compliance_validator import create_stage5_validator
@@ -112,6 +118,10 @@ class Stage5SignalAnalysisProcessor(BaseStageProcessor):
             self.max_workers, self.config, self.signal_thresholds
         )
 
+        # 🔁 增量模式: 只重新分析輸入時間序列或星座配置改變的衛星
+        self.incremental_store = IncrementalSatelliteStore.for_processor(self)
+        self.incremental_plan = None
+
         # ✅ 使用模組化輸出管理
         self.result_builder = ResultBuilder(self.validator, physics_consts)
         self.snapshot_manager = SnapshotManager(self.validator)
@@ -155,6 +165,8 @@ class Stage5SignalAnalysisProcessor(BaseStageProcessor):
                 processing_stats=self.processing_stats,
                 processing_time=processing_time
             )
+            if self.incremental_plan is not None:
+                result_data.setdefault('metadata', {})['incremental'] = self.incremental_plan.summary()
 
             # 💾 保存結果到文件 (移自 execute() 覆蓋)
             try:
@@ -287,7 +299,8 @@ class Stage5SignalAnalysisProcessor(BaseStageProcessor):
         self.logger.info("🔬 開始信號品質分析 (時間序列遍歷模式)...")
         self.logger.info(f"   ✅ constellation_configs 已載入: {list(constellation_configs.keys())}")
 
-        # 遍歷每個星座
+        # 遍歷每個星座 (先驗證配置並建立系統配置，再統一分析)
+        constellation_jobs = []
         for constellation, satellites in connectable_satellites.items():
             if not satellites:
                 continue
@@ -407,25 +420,102 @@ class Stage5SignalAnalysisProcessor(BaseStageProcessor):
                 'rx_antenna_efficiency': rx_antenna_efficiency
             }
 
+            constellation_jobs.append((constellation, satellites, system_config))
+
+        # 🔁 增量模式: 指紋 = 衛星輸入 (Stage 4 時間序列) + 星座 + 系統配置
+        incremental_plan = self.incremental_plan = None
+        reused: Dict[str, Any] = {}
+        if self.incremental_store is not None:
+            fingerprints = {
+                satellite['satellite_id']: fingerprint_data({
+                    'constellation': constellation,
+                    'system_config': system_config,
+                    'satellite': satellite
+                })
+                for constellation, satellites, system_config in constellation_jobs
+                for satellite in satellites
+                if 'satellite_id' in satellite
+            }
+            incremental_plan = self.incremental_plan = self.incremental_store.plan(fingerprints)
+            reused = self.incremental_store.load(incremental_plan.reused_ids)
+
+        for constellation, satellites, system_config in constellation_jobs:
+            dirty_satellites = [
+                satellite for satellite in satellites if satellite.get('satellite_id') not in reused
+            ]
+
             # ✅ 使用 WorkerManager 處理衛星 (自動選擇並行/順序模式)
-            constellation_results = self.worker_manager.process_satellites(
-                satellites=satellites,
-                constellation=constellation,
-                system_config=system_config,
-                time_series_analyzer=self.time_series_analyzer
-            )
+            if dirty_satellites:
+                constellation_results = self.worker_manager.process_satellites(
+                    satellites=dirty_satellites,
+                    constellation=constellation,
+                    system_config=system_config,
+                    time_series_analyzer=self.time_series_analyzer
+                )
+            else:
+                constellation_results = {'satellites': {}, 'stats': {}}
 
-            # 合併結果
-            analyzed_satellites.update(constellation_results['satellites'])
+            # 合併結果 (保持 Stage 4 輸入順序)
+            for satellite in satellites:
+                satellite_id = satellite.get('satellite_id')
+                if satellite_id in reused:
+                    analyzed_satellites[satellite_id] = reused[satellite_id]
+                    self._count_reused_signal_quality(reused[satellite_id])
+                elif satellite_id in constellation_results['satellites']:
+                    analyzed_satellites[satellite_id] = constellation_results['satellites'][satellite_id]
 
             # 更新統計
             for quality_level, count in constellation_results['stats'].items():
                 if quality_level in self.processing_stats:
                     self.processing_stats[quality_level] += count
 
+        if incremental_plan is not None:
+            self.incremental_store.save(incremental_plan.fingerprints, {
+                sat_id: entry for sat_id, entry in analyzed_satellites.items()
+                if sat_id in incremental_plan.fingerprints
+            })
+
         self.logger.info(f"✅ 信號分析完成: {len(analyzed_satellites)} 顆衛星")
         return analyzed_satellites
 
+    # ==================== 串流模式 (有界批次) ====================
+
+    def analyze_satellite_batch(self, connectable_satellites: Dict[str, List[Dict[str, Any]]],
+                                stage4_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        串流模式單批次信號分析 (處理統計跨批次累計)
+
+        Args:
+            connectable_satellites: {星座: [Stage 4 完整條目]} (一個有界批次)
+            stage4_metadata: Stage 4 輸出 metadata (含 constellation_configs)
+
+        Returns:
+            {衛星ID: 分析結果}
+        """
+        batch_input = {
+            'stage': 'stage4_link_feasibility',
+            'connectable_satellites': connectable_satellites,
+            'metadata': stage4_metadata
+        }
+        return self._perform_signal_analysis(self._extract_satellite_data(batch_input))
+
+    def build_streaming_output(self, analyzed_satellites: Dict[str, Any], stage4_output: Dict[str, Any],
+                               processing_time_seconds: float) -> Dict[str, Any]:
+        """串流模式 Stage 5 輸出 (與 process() 相同的 ResultBuilder 結構)"""
+        return self.result_builder.build(
+            analyzed_satellites=analyzed_satellites,
+            input_data=stage4_output,
+            processing_stats=self.processing_stats,
+            processing_time=processing_time_seconds
+        )
+
+    def _count_reused_signal_quality(self, analyzed_satellite: Dict[str, Any]) -> None:
+        """沿用上次結果的衛星計入品質統計 (與 WorkerManager 統計規則一致)"""
+        self.processing_stats['total_satellites_analyzed'] += 1
+        avg_quality = analyzed_satellite.get('summary', {}).get('average_quality_level', 'poor')
+        key = f"{avg_quality}_signals"
+        self.processing_stats[key if key in self.processing_stats else 'poor_signals'] += 1
+
     def _initialize_shared_services(self):
         """初始化共享服務 - 精簡為純粹信號分析"""
         # 移除預測和監控功能，專注純粹信號分析
@@ -452,18 +542,15 @@ class Stage5SignalAnalysisProcessor(BaseStageProcessor):
         return self.validator.run_validation_checks(results)
 
     def save_results(self, results: Dict[str, Any]) -> str:
-        """保存處理結果到文件"""
+        """保存處理結果到文件 (階段交接 HDF5 + 選用 JSON)"""
         try:
             timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-            output_file = self.output_dir / f"stage5_signal_analysis_{timestamp}.json"
-            
-            # 確保輸出目錄存在
-            self.output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 保存結果
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2, default=str)
-            
+
+            output_file = save_stage_output(
+                results, self.output_dir, f"stage5_signal_analysis_{timestamp}",
+                logger_instance=self.logger
+            )
+
             self.logger.info(f"Stage 5結果已保存: {output_file}")
             return str(output_file)
 
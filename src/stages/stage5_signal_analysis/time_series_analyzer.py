@@ -17,6 +17,8 @@ import logging
 import math
 from typing import Dict, Any, List, Optional
 
+import numpy as np
+
 # 🚨 Grade A要求：使用學術級物理常數 (Astropy CODATA 2022, Fail-Fast)
 logger = logging.getLogger(__name__)
 
@@ -106,7 +108,7 @@ class TimeSeriesAnalyzer:
         """
         分析單顆衛星的完整時間序列
 
-        逐時間點計算:
+        整條時間序列以陣列一次計算 (calculate_3gpp_signal_quality_batch):
         - RSRP (3GPP TS 38.214)
         - RSRQ (3GPP TS 38.214)
         - SINR (3GPP TS 38.214)
@@ -147,67 +149,91 @@ class TimeSeriesAnalyzer:
         sinr_values = []
         quality_counts = {'excellent': 0, 'good': 0, 'fair': 0, 'poor': 0}
 
+        # Step 1: 篩選可連接且數據完整的時間點
+        candidates = []
         for time_point in time_series:
-            try:
-                # ✅ Fail-Fast: 明確檢查必需字段，而非使用 .get() 回退
-                if 'visibility_metrics' not in time_point:
-                    self.logger.debug(f"時間點缺少 visibility_metrics，跳過")
-                    continue
+            # ✅ Fail-Fast: 明確檢查必需字段，而非使用 .get() 回退
+            if 'visibility_metrics' not in time_point:
+                self.logger.debug(f"時間點缺少 visibility_metrics，跳過")
+                continue
 
-                visibility_metrics = time_point['visibility_metrics']
+            visibility_metrics = time_point['visibility_metrics']
 
-                if 'elevation_deg' not in visibility_metrics:
-                    self.logger.debug(f"visibility_metrics 缺少 elevation_deg，跳過")
-                    continue
-                if 'distance_km' not in visibility_metrics:
-                    self.logger.debug(f"visibility_metrics 缺少 distance_km，跳過")
-                    continue
-                if 'is_connectable' not in visibility_metrics:
-                    self.logger.debug(f"visibility_metrics 缺少 is_connectable，跳過")
-                    continue
-                if 'timestamp' not in time_point:
-                    self.logger.debug(f"時間點缺少 timestamp，跳過")
-                    continue
+            if 'elevation_deg' not in visibility_metrics:
+                self.logger.debug(f"visibility_metrics 缺少 elevation_deg，跳過")
+                continue
+            if 'distance_km' not in visibility_metrics:
+                self.logger.debug(f"visibility_metrics 缺少 distance_km，跳過")
+                continue
+            if 'is_connectable' not in visibility_metrics:
+                self.logger.debug(f"visibility_metrics 缺少 is_connectable，跳過")
+                continue
+            if 'timestamp' not in time_point:
+                self.logger.debug(f"時間點缺少 timestamp，跳過")
+                continue
 
-                elevation_deg = visibility_metrics['elevation_deg']
-                distance_km = visibility_metrics['distance_km']
-                is_connectable_str = visibility_metrics['is_connectable']
-                # 🔧 修復: is_connectable 是字符串 "True"/"False"，需要轉換為布爾值
-                is_connectable = (is_connectable_str == 'True' or is_connectable_str == True)
-                timestamp = time_point['timestamp']
+            elevation_deg = visibility_metrics['elevation_deg']
+            distance_km = visibility_metrics['distance_km']
+            is_connectable_str = visibility_metrics['is_connectable']
+            # 🔧 修復: is_connectable 是字符串 "True"/"False"，需要轉換為布爾值
+            is_connectable = (is_connectable_str == 'True' or is_connectable_str == True)
 
-                if elevation_deg is None or distance_km is None:
-                    continue
+            if elevation_deg is None or distance_km is None:
+                continue
 
-                # ✅ 修復: 跳過不可連接的時間點 (負仰角、超出距離等)
-                # Stage 4 已標記 is_connectable=False，Stage 5 應忽略這些時間點
-                # SOURCE: Stage 4 visibility calculation results
-                if not is_connectable:
-                    continue
+            # ✅ 修復: 跳過不可連接的時間點 (負仰角、超出距離等)
+            # Stage 4 已標記 is_connectable=False，Stage 5 應忽略這些時間點
+            # SOURCE: Stage 4 visibility calculation results
+            if not is_connectable:
+                continue
+
+            candidates.append((time_point, elevation_deg, distance_km, is_connectable))
 
-                # 計算信號品質 (3GPP 標準)
-                signal_quality = self.calculate_3gpp_signal_quality(
-                    elevation_deg=elevation_deg,
-                    distance_km=distance_km,
+        # Step 2: 整條時間序列一次計算信號品質 (3GPP 標準) 與路徑/大氣損耗 (ITU-R 標準)
+        batch = None
+        if candidates:
+            try:
+                batch = self.calculate_3gpp_signal_quality_batch(
+                    elevation_deg=np.array([c[1] for c in candidates], dtype=np.float64),
+                    distance_km=np.array([c[2] for c in candidates], dtype=np.float64),
                     system_config=system_config,
                     constellation=constellation,
                     satellite_id=satellite_id
                 )
+            except Exception as e:
+                self.logger.error(f"3GPP 信號計算失敗: {e}", exc_info=True)
 
-                # ✅ 計算物理參數 (ITU-R 標準 + Stage 2 實際速度)
-                physics_params = self.calculate_itur_physics(
-                    elevation_deg=elevation_deg,
-                    distance_km=distance_km,
-                    frequency_ghz=system_config['frequency_ghz'],
-                    time_point=time_point  # ← 傳遞完整時間點數據以提取速度
-                )
-
-                # 構建時間點結果
-                # ✅ Fail-Fast: 如果信號計算失敗，offset 字段會缺失，直接跳過此時間點
-                if 'offset_mo_db' not in signal_quality or 'cell_offset_db' not in signal_quality:
+        # Step 3: 組裝逐時間點結果
+        for index, (time_point, elevation_deg, distance_km, is_connectable) in enumerate(candidates):
+            timestamp = time_point['timestamp']
+            try:
+                # ✅ Fail-Fast: 信號計算失敗的時間點沒有 A3 offset 數據，直接跳過
+                if batch is None or not batch['valid'][index]:
                     self.logger.debug(f"時間點 {timestamp} 缺少 A3 offset 數據，跳過")
                     continue
 
+                signal_quality = {
+                    'rsrp_dbm': batch['rsrp_dbm'][index].item(),
+                    'rsrq_db': batch['rsrq_db'][index].item(),
+                    'rs_sinr_db': batch['rs_sinr_db'][index].item(),
+                    'offset_mo_db': batch['offset_mo_db'],
+                    'cell_offset_db': batch['cell_offset_db']
+                }
+
+                # ✅ 計算物理參數 (ITU-R 標準 + Stage 2 實際速度)
+                try:
+                    physics_params = self._build_physical_parameters(
+                        elevation_deg=elevation_deg,
+                        distance_km=distance_km,
+                        frequency_ghz=system_config['frequency_ghz'],
+                        path_loss_db=batch['path_loss_db'][index].item(),
+                        atmospheric_loss_db=batch['atmospheric_loss_db'][index].item(),
+                        time_point=time_point  # ← 傳遞完整時間點數據以提取速度
+                    )
+                except Exception as e:
+                    self.logger.warning(f"ITU-R 物理計算失敗: {e}")
+                    physics_params = self._failed_physics_result(elevation_deg, distance_km)
+
                 time_point_result = {
                     'timestamp': timestamp,
                     'signal_quality': {
@@ -225,12 +251,9 @@ class TimeSeriesAnalyzer:
                 time_series_results.append(time_point_result)
 
                 # 收集統計數據
-                if signal_quality['rsrp_dbm'] is not None:
-                    rsrp_values.append(signal_quality['rsrp_dbm'])
-                if signal_quality['rsrq_db'] is not None:
-                    rsrq_values.append(signal_quality['rsrq_db'])
-                if signal_quality['rs_sinr_db'] is not None:
-                    sinr_values.append(signal_quality['rs_sinr_db'])
+                rsrp_values.append(signal_quality['rsrp_dbm'])
+                rsrq_values.append(signal_quality['rsrq_db'])
+                sinr_values.append(signal_quality['rs_sinr_db'])
 
                 # 品質分類統計
                 quality_level = self.classify_signal_quality(signal_quality['rsrp_dbm'])
@@ -310,46 +333,8 @@ class TimeSeriesAnalyzer:
             rx_gain_db = system_config['rx_gain_db']
             frequency_ghz = system_config['frequency_ghz']
 
-            # ✅ 使用 ITU-R P.676-13 官方大氣衰減模型 (ITU-Rpy)
-            from .itur_official_atmospheric_model import create_itur_official_model
-
-            # ✅ Grade A標準: Fail-Fast 模式 - 大氣參數必須在配置中提供
-            # 依據: docs/ACADEMIC_STANDARDS.md Line 265-274 禁止使用預設值
-            if 'atmospheric_model' not in self.config:
-                raise ValueError(
-                    "atmospheric_model 配置缺失\n"
-                    "Grade A 標準禁止使用預設值\n"
-                    "請在配置文件中提供:\n"
-                    "  atmospheric_model:\n"
-                    "    temperature_k: 283.0  # SOURCE: ITU-R P.835 mid-latitude\n"
-                    "    pressure_hpa: 1013.25  # SOURCE: ICAO Standard\n"
-                    "    water_vapor_density_g_m3: 7.5  # SOURCE: ITU-R P.835"
-                )
-
-            atmospheric_config = self.config['atmospheric_model']
-
-            required_params = ['temperature_k', 'pressure_hpa', 'water_vapor_density_g_m3']
-            missing_params = [p for p in required_params if p not in atmospheric_config]
-            if missing_params:
-                raise ValueError(
-                    f"大氣參數缺失: {missing_params}\n"
-                    f"Grade A 標準禁止使用預設值\n"
-                    f"請在 atmospheric_model 配置中提供所有必要參數:\n"
-                    f"  temperature_k: 實測值或 ITU-R P.835 標準值 (200-350K)\n"
-                    f"  pressure_hpa: 實測值或 ICAO 標準值 (500-1100 hPa)\n"
-                    f"  water_vapor_density_g_m3: 實測值或 ITU-R P.835 標準值 (0-30 g/m³)"
-                )
-
-            temperature_k = atmospheric_config['temperature_k']
-            pressure_hpa = atmospheric_config['pressure_hpa']
-            water_vapor_density = atmospheric_config['water_vapor_density_g_m3']
-
-            itur_model = create_itur_official_model(
-                temperature_k=temperature_k,
-                pressure_hpa=pressure_hpa,
-                water_vapor_density_g_m3=water_vapor_density
-            )
-            atmospheric_loss_db = itur_model.calculate_total_attenuation(
+            # ✅ 使用 ITU-R P.676-13 官方大氣衰減模型 (ITU-Rpy exact 模式)
+            atmospheric_loss_db = self._calculate_atmospheric_attenuation(
                 frequency_ghz=frequency_ghz,
                 elevation_deg=elevation_deg
             )
@@ -418,6 +403,193 @@ class TimeSeriesAnalyzer:
                 'rs_sinr_db': None  # 修復: 使用 3GPP 標準命名
             }
 
+    def calculate_3gpp_signal_quality_batch(
+        self,
+        elevation_deg: np.ndarray,
+        distance_km: np.ndarray,
+        system_config: Dict[str, Any],
+        constellation: Optional[str] = None,
+        satellite_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        向量化計算整條時間序列的 3GPP 信號品質與 ITU-R 損耗
+
+        與逐點 calculate_3gpp_signal_quality() + calculate_itur_physics() 使用相同公式:
+        - 路徑損耗: ITU-R P.525-4 Friis 公式
+        - 大氣衰減: ITU-R P.676-13 (exact 模式查表或逐點 exact)
+        - RSRP / RSSI / RSRQ / RS-SINR: 3GPP TS 38.214/38.215
+        - 測量偏移: 3GPP TS 38.331 (每顆衛星只計算一次)
+
+        Args:
+            elevation_deg: 仰角陣列 (度)
+            distance_km: 距離陣列 (公里)
+            system_config: 系統配置
+            constellation: 星座名稱 (用於計算測量偏移)
+            satellite_id: 衛星ID (用於衛星級別偏移)
+
+        Returns:
+            Dict: rsrp_dbm / rsrq_db / rs_sinr_db / rssi_dbm / interference_power_dbm /
+                  path_loss_db / atmospheric_loss_db 陣列、noise_power_dbm、
+                  offset_mo_db / cell_offset_db 純量，以及 valid 布林遮罩
+                  (逐點路徑中會計算失敗的時間點為 False)
+
+        Raises:
+            ValueError: 配置缺失 (Fail-Fast)
+        """
+        elevation_deg = np.asarray(elevation_deg, dtype=np.float64)
+        distance_km = np.asarray(distance_km, dtype=np.float64)
+
+        # 提取配置
+        tx_power_dbm = system_config['tx_power_dbm']
+        tx_gain_db = system_config['tx_gain_db']
+        rx_gain_db = system_config['rx_gain_db']
+        frequency_ghz = system_config['frequency_ghz']
+
+        # ✅ Grade A 標準: Fail-Fast 配置驗證
+        if 'signal_calculator' not in self.config:
+            raise ValueError(
+                "信號計算器配置缺失\n"
+                "Grade A 標準要求明確配置\n"
+                "必須提供:\n"
+                "  signal_calculator:\n"
+                "    bandwidth_mhz: 系統帶寬\n"
+                "    tx_power_dbm: 發射功率\n"
+                "    subcarrier_spacing_khz: 子載波間距\n"
+                "    noise_figure_db: 噪聲係數\n"
+                "    temperature_k: 接收器溫度"
+            )
+
+        from .itur_physics_calculator import create_itur_physics_calculator
+        from .gpp_ts38214_signal_calculator import create_3gpp_signal_calculator
+        physics_calc = create_itur_physics_calculator(self.config)
+        signal_calculator = create_3gpp_signal_calculator(self.config['signal_calculator'])
+
+        # 逐點路徑會拋出例外的輸入 (距離 <= 0、仰角 > 90° 或非有限值) 標記為無效
+        valid = np.isfinite(elevation_deg) & np.isfinite(distance_km) & (distance_km > 0) & (elevation_deg <= 90.0)
+
+        path_loss_db = np.full(distance_km.shape, np.nan)
+        path_loss_db[valid] = physics_calc.calculate_free_space_loss_batch(distance_km[valid], frequency_ghz)
+
+        atmospheric_loss_db = np.full(elevation_deg.shape, np.nan)
+        if valid.any():
+            atmospheric_loss_db[valid] = self._calculate_atmospheric_attenuation(
+                frequency_ghz=frequency_ghz,
+                elevation_deg=elevation_deg[valid]
+            )
+
+        with np.errstate(invalid='ignore'):
+            signal_quality = signal_calculator.calculate_signal_quality_batch(
+                tx_power_dbm=tx_power_dbm,
+                tx_gain_db=tx_gain_db,
+                rx_gain_db=rx_gain_db,
+                path_loss_db=path_loss_db,
+                atmospheric_loss_db=atmospheric_loss_db,
+                elevation_deg=elevation_deg,
+                satellite_density=1.0
+            )
+
+        # 🆕 計算 3GPP 測量偏移參數 (A3 事件需要)
+        # SOURCE: 3GPP TS 38.331 v18.3.0 Section 5.5.4.4
+        measurement_offsets = signal_calculator.calculate_measurement_offsets(
+            constellation=constellation or 'unknown',
+            satellite_id=satellite_id
+        )
+
+        valid &= (
+            np.isfinite(signal_quality['rsrp_dbm']) &
+            np.isfinite(signal_quality['rsrq_db']) &
+            np.isfinite(signal_quality['rs_sinr_db'])
+        )
+
+        return {
+            **signal_quality,
+            'path_loss_db': path_loss_db,
+            'atmospheric_loss_db': atmospheric_loss_db,
+            'offset_mo_db': measurement_offsets['offset_mo_db'],        # A3 事件: Ofn/Ofp
+            'cell_offset_db': measurement_offsets['cell_offset_db'],    # A3 事件: Ocn/Ocp
+            'valid': valid
+        }
+
+    def _calculate_atmospheric_attenuation(self, frequency_ghz: float, elevation_deg: float) -> float:
+        """
+        計算 ITU-R P.676-13 氣體衰減 (dB)
+
+        elevation_deg 可為純量或一維陣列。
+        預設使用 exact 模式預計算的仰角查表 (itur_attenuation_table)，
+        節點全部來自 ITU-Rpy exact 模式，內插誤差上界於建表時驗證並記錄。
+        atmospheric_model.attenuation_table.enabled = false 時逐點直接呼叫 ITU-Rpy。
+        """
+        # ✅ Grade A標準: Fail-Fast 模式 - 大氣參數必須在配置中提供
+        # 依據: docs/ACADEMIC_STANDARDS.md Line 265-274 禁止使用預設值
+        if 'atmospheric_model' not in self.config:
+            raise ValueError(
+                "atmospheric_model 配置缺失\n"
+                "Grade A 標準禁止使用預設值\n"
+                "請在配置文件中提供:\n"
+                "  atmospheric_model:\n"
+                "    temperature_k: 283.0  # SOURCE: ITU-R P.835 mid-latitude\n"
+                "    pressure_hpa: 1013.25  # SOURCE: ICAO Standard\n"
+                "    water_vapor_density_g_m3: 7.5  # SOURCE: ITU-R P.835"
+            )
+
+        atmospheric_config = self.config['atmospheric_model']
+
+        required_params = ['temperature_k', 'pressure_hpa', 'water_vapor_density_g_m3']
+        missing_params = [p for p in required_params if p not in atmospheric_config]
+        if missing_params:
+            raise ValueError(
+                f"大氣參數缺失: {missing_params}\n"
+                f"Grade A 標準禁止使用預設值\n"
+                f"請在 atmospheric_model 配置中提供所有必要參數:\n"
+                f"  temperature_k: 實測值或 ITU-R P.835 標準值 (200-350K)\n"
+                f"  pressure_hpa: 實測值或 ICAO 標準值 (500-1100 hPa)\n"
+                f"  water_vapor_density_g_m3: 實測值或 ITU-R P.835 標準值 (0-30 g/m³)"
+            )
+
+        temperature_k = atmospheric_config['temperature_k']
+        pressure_hpa = atmospheric_config['pressure_hpa']
+        water_vapor_density = atmospheric_config['water_vapor_density_g_m3']
+
+        table_config = atmospheric_config.get('attenuation_table', {})
+        if table_config.get('enabled', True):
+            from .itur_attenuation_table import (
+                get_attenuation_table, DEFAULT_RESOLUTION_DEG, DEFAULT_MAX_ERROR_DB, DEFAULT_CACHE_DIR
+            )
+            table = get_attenuation_table(
+                frequency_ghz=frequency_ghz,
+                temperature_k=temperature_k,
+                pressure_hpa=pressure_hpa,
+                water_vapor_density_g_m3=water_vapor_density,
+                resolution_deg=table_config.get('resolution_deg', DEFAULT_RESOLUTION_DEG),
+                max_error_db=table_config.get('max_error_db', DEFAULT_MAX_ERROR_DB),
+                cache_dir=table_config.get('cache_dir', DEFAULT_CACHE_DIR)
+            )
+            return table.attenuation_db(elevation_deg)
+
+        from .itur_official_atmospheric_model import create_itur_official_model
+        itur_model = create_itur_official_model(
+            temperature_k=temperature_k,
+            pressure_hpa=pressure_hpa,
+            water_vapor_density_g_m3=water_vapor_density
+        )
+        if np.ndim(elevation_deg) == 0:
+            return itur_model.calculate_total_attenuation(
+                frequency_ghz=frequency_ghz,
+                elevation_deg=elevation_deg
+            )
+
+        # 陣列輸入: 逐點 exact 計算，單點失敗記為 NaN (該時間點被跳過)
+        attenuation_db = np.full(np.shape(elevation_deg), np.nan)
+        for index, elevation in enumerate(elevation_deg):
+            try:
+                attenuation_db[index] = itur_model.calculate_total_attenuation(
+                    frequency_ghz=frequency_ghz,
+                    elevation_deg=float(elevation)
+                )
+            except (ValueError, RuntimeError) as e:
+                self.logger.debug(f"仰角 {elevation}° 大氣衰減計算失敗: {e}")
+        return attenuation_db
+
     def calculate_itur_physics(
         self,
         elevation_deg: float,
@@ -449,135 +621,124 @@ class TimeSeriesAnalyzer:
             physics_calc = create_itur_physics_calculator(self.config)
             path_loss_db = physics_calc.calculate_free_space_loss(distance_km, frequency_ghz)
 
-            # ✅ 使用 ITU-R P.676-13 官方大氣衰減模型 (ITU-Rpy)
-            from .itur_official_atmospheric_model import create_itur_official_model
+            # ✅ 使用 ITU-R P.676-13 官方大氣衰減模型 (ITU-Rpy exact 模式)
+            atmospheric_loss_db = self._calculate_atmospheric_attenuation(
+                frequency_ghz=frequency_ghz,
+                elevation_deg=elevation_deg
+            )
 
-            # ✅ Grade A標準: Fail-Fast 模式 - 大氣參數必須在配置中提供
-            # 依據: docs/ACADEMIC_STANDARDS.md Line 265-274 禁止使用預設值
-            if 'atmospheric_model' not in self.config:
-                raise ValueError(
-                    "atmospheric_model 配置缺失\n"
-                    "Grade A 標準禁止使用預設值\n"
-                    "請在配置文件中提供:\n"
-                    "  atmospheric_model:\n"
-                    "    temperature_k: 283.0  # SOURCE: ITU-R P.835 mid-latitude\n"
-                    "    pressure_hpa: 1013.25  # SOURCE: ICAO Standard\n"
-                    "    water_vapor_density_g_m3: 7.5  # SOURCE: ITU-R P.835"
-                )
+            return self._build_physical_parameters(
+                elevation_deg=elevation_deg,
+                distance_km=distance_km,
+                frequency_ghz=frequency_ghz,
+                path_loss_db=path_loss_db,
+                atmospheric_loss_db=atmospheric_loss_db,
+                time_point=time_point
+            )
 
-            atmospheric_config = self.config['atmospheric_model']
+        except Exception as e:
+            self.logger.warning(f"ITU-R 物理計算失敗: {e}")
+            return self._failed_physics_result(elevation_deg, distance_km)
 
-            required_params = ['temperature_k', 'pressure_hpa', 'water_vapor_density_g_m3']
-            missing_params = [p for p in required_params if p not in atmospheric_config]
-            if missing_params:
-                raise ValueError(
-                    f"大氣參數缺失: {missing_params}\n"
-                    f"Grade A 標準禁止使用預設值\n"
-                    f"請在 atmospheric_model 配置中提供所有必要參數:\n"
-                    f"  temperature_k: 實測值或 ITU-R P.835 標準值 (200-350K)\n"
-                    f"  pressure_hpa: 實測值或 ICAO 標準值 (500-1100 hPa)\n"
-                    f"  water_vapor_density_g_m3: 實測值或 ITU-R P.835 標準值 (0-30 g/m³)"
-                )
+    def _build_physical_parameters(
+        self,
+        elevation_deg: float,
+        distance_km: float,
+        frequency_ghz: float,
+        path_loss_db: float,
+        atmospheric_loss_db: float,
+        time_point: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        組裝單一時間點的物理參數 (都卜勒 / 傳播延遲 / ECEF 位置)
 
-            temperature_k = atmospheric_config['temperature_k']
-            pressure_hpa = atmospheric_config['pressure_hpa']
-            water_vapor_density = atmospheric_config['water_vapor_density_g_m3']
+        路徑損耗與大氣衰減由呼叫端提供 (逐點或整條時間序列批次計算)
+        """
+        # ✅ 使用 Stage 2 實際速度數據計算都卜勒頻移
+        doppler_shift_hz = 0.0
+        radial_velocity_ms = 0.0
 
-            itur_model = create_itur_official_model(
-                temperature_k=temperature_k,
-                pressure_hpa=pressure_hpa,
-                water_vapor_density_g_m3=water_vapor_density
-            )
-            atmospheric_loss_db = itur_model.calculate_total_attenuation(
-                frequency_ghz=frequency_ghz,
-                elevation_deg=elevation_deg
-            )
+        if time_point:
+            from .doppler_calculator import create_doppler_calculator
+            doppler_calc = create_doppler_calculator()
 
-            # ✅ 使用 Stage 2 實際速度數據計算都卜勒頻移
-            doppler_shift_hz = 0.0
-            radial_velocity_ms = 0.0
-
-            if time_point:
-                from .doppler_calculator import create_doppler_calculator
-                doppler_calc = create_doppler_calculator()
-
-                # ✅ Fail-Fast: 明確檢查必需字段
-                # 都卜勒計算是可選的，但如果數據存在就必須完整
-                if 'velocity_km_per_s' in time_point and 'position_km' in time_point:
-                    velocity_km_per_s = time_point['velocity_km_per_s']
-                    position_km = time_point['position_km']
-
-                    # ✅ Grade A標準: 觀測者位置必須從配置獲取，禁止硬編碼預設值
-                    # 依據: docs/ACADEMIC_STANDARDS.md Line 27-44
-                    if 'observer_position_km' not in self.config:
-                        self.logger.debug(
-                            "⚠️ 缺少 observer_position_km 配置，無法計算都卜勒頻移"
-                        )
-                    else:
-                        observer_position_km = self.config['observer_position_km']
-                        doppler_data = doppler_calc.calculate_doppler_shift(
-                            velocity_km_per_s=velocity_km_per_s,
-                            satellite_position_km=position_km,
-                            observer_position_km=observer_position_km,
-                            frequency_hz=frequency_ghz * 1e9
-                        )
-
-                        doppler_shift_hz = doppler_data['doppler_shift_hz']
-                        radial_velocity_ms = doppler_data['radial_velocity_ms']
-
-            # 傳播延遲 (精確計算)
-            propagation_delay_ms = (distance_km * 1000.0) / physics_consts.SPEED_OF_LIGHT * 1000.0
-
-            # ✅ 計算 ECEF 位置 (Stage 6 D2 事件需要)
-            # SOURCE: Bowring (1985) "The accuracy of geodetic latitude and height equations"
-            position_ecef_m = None
-            if time_point:
-                try:
-                    # Stage 4 在 time_point['position'] 中提供 lat/lon/alt
-                    # 參見: stage4_link_feasibility_processor.py:373-377
-                    # ✅ Fail-Fast: ECEF 位置計算是可選的，但需要明確檢查
-                    if 'position' not in time_point:
-                        self.logger.debug("時間點缺少 position 數據，跳過 ECEF 計算")
-                    else:
-                        position = time_point['position']
-                        if position and 'latitude_deg' in position and 'longitude_deg' in position and 'altitude_km' in position:
-                            lat_deg = position['latitude_deg']
-                            lon_deg = position['longitude_deg']
-                            alt_km = position['altitude_km']
-                            alt_m = alt_km * 1000.0  # 轉換為米
-
-                            # Geodetic → ECEF 轉換
-                            from src.shared.utils.coordinate_converter import geodetic_to_ecef
-                            ecef_x, ecef_y, ecef_z = geodetic_to_ecef(lat_deg, lon_deg, alt_m)
-                            position_ecef_m = [ecef_x, ecef_y, ecef_z]
-                except Exception as e:
-                    self.logger.debug(f"⚠️ ECEF 位置計算失敗: {e}")
-                    position_ecef_m = None
+            # ✅ Fail-Fast: 明確檢查必需字段
+            # 都卜勒計算是可選的，但如果數據存在就必須完整
+            if 'velocity_km_per_s' in time_point and 'position_km' in time_point:
+                velocity_km_per_s = time_point['velocity_km_per_s']
+                position_km = time_point['position_km']
+
+                # ✅ Grade A標準: 觀測者位置必須從配置獲取，禁止硬編碼預設值
+                # 依據: docs/ACADEMIC_STANDARDS.md Line 27-44
+                if 'observer_position_km' not in self.config:
+                    self.logger.debug(
+                        "⚠️ 缺少 observer_position_km 配置，無法計算都卜勒頻移"
+                    )
+                else:
+                    observer_position_km = self.config['observer_position_km']
+                    doppler_data = doppler_calc.calculate_doppler_shift(
+                        velocity_km_per_s=velocity_km_per_s,
+                        satellite_position_km=position_km,
+                        observer_position_km=observer_position_km,
+                        frequency_hz=frequency_ghz * 1e9
+                    )
+
+                    doppler_shift_hz = doppler_data['doppler_shift_hz']
+                    radial_velocity_ms = doppler_data['radial_velocity_ms']
+
+        # 傳播延遲 (精確計算)
+        propagation_delay_ms = (distance_km * 1000.0) / physics_consts.SPEED_OF_LIGHT * 1000.0
+
+        # ✅ 計算 ECEF 位置 (Stage 6 D2 事件需要)
+        # SOURCE: Bowring (1985) "The accuracy of geodetic latitude and height equations"
+        position_ecef_m = None
+        if time_point:
+            try:
+                # Stage 4 在 time_point['position'] 中提供 lat/lon/alt
+                # 參見: stage4_link_feasibility_processor.py:373-377
+                # ✅ Fail-Fast: ECEF 位置計算是可選的，但需要明確檢查
+                if 'position' not in time_point:
+                    self.logger.debug("時間點缺少 position 數據，跳過 ECEF 計算")
+                else:
+                    position = time_point['position']
+                    if position and 'latitude_deg' in position and 'longitude_deg' in position and 'altitude_km' in position:
+                        lat_deg = position['latitude_deg']
+                        lon_deg = position['longitude_deg']
+                        alt_km = position['altitude_km']
+                        alt_m = alt_km * 1000.0  # 轉換為米
+
+                        # Geodetic → ECEF 轉換
+                        from src.shared.utils.coordinate_converter import geodetic_to_ecef
+                        ecef_x, ecef_y, ecef_z = geodetic_to_ecef(lat_deg, lon_deg, alt_m)
+                        position_ecef_m = [ecef_x, ecef_y, ecef_z]
+            except Exception as e:
+                self.logger.debug(f"⚠️ ECEF 位置計算失敗: {e}")
+                position_ecef_m = None
 
-            return {
-                'distance_km': distance_km,  # ✅ Stage 6 需要此欄位計算 3GPP 事件
-                'elevation_deg': elevation_deg,  # ✅ Stage 6 需要此欄位計算可見性指標
-                'path_loss_db': path_loss_db,
-                'atmospheric_loss_db': atmospheric_loss_db,
-                'doppler_shift_hz': doppler_shift_hz,
-                'radial_velocity_ms': radial_velocity_ms,
-                'propagation_delay_ms': propagation_delay_ms,
-                'position_ecef_m': position_ecef_m,  # ✅ Stage 6 D2 事件需要此欄位
-                'itur_compliance': 'P.618-13',
-                'atmospheric_model': 'ITU-R_P.676-13',
-                'doppler_source': 'stage2_actual_velocity' if time_point else 'unavailable'
-            }
+        return {
+            'distance_km': distance_km,  # ✅ Stage 6 需要此欄位計算 3GPP 事件
+            'elevation_deg': elevation_deg,  # ✅ Stage 6 需要此欄位計算可見性指標
+            'path_loss_db': path_loss_db,
+            'atmospheric_loss_db': atmospheric_loss_db,
+            'doppler_shift_hz': doppler_shift_hz,
+            'radial_velocity_ms': radial_velocity_ms,
+            'propagation_delay_ms': propagation_delay_ms,
+            'position_ecef_m': position_ecef_m,  # ✅ Stage 6 D2 事件需要此欄位
+            'itur_compliance': 'P.618-13',
+            'atmospheric_model': 'ITU-R_P.676-13',
+            'doppler_source': 'stage2_actual_velocity' if time_point else 'unavailable'
+        }
 
-        except Exception as e:
-            self.logger.warning(f"ITU-R 物理計算失敗: {e}")
-            return {
-                'distance_km': distance_km if distance_km else None,  # ✅ 保留距離，即使計算失敗
-                'elevation_deg': elevation_deg if elevation_deg else None,  # ✅ 保留仰角，即使計算失敗
-                'path_loss_db': None,
-                'atmospheric_loss_db': None,
-                'doppler_shift_hz': None,
-                'propagation_delay_ms': None
-            }
+    def _failed_physics_result(self, elevation_deg: float, distance_km: float) -> Dict[str, Any]:
+        """ITU-R 物理計算失敗時的結果 (保留距離與仰角)"""
+        return {
+            'distance_km': distance_km if distance_km else None,  # ✅ 保留距離，即使計算失敗
+            'elevation_deg': elevation_deg if elevation_deg else None,  # ✅ 保留仰角，即使計算失敗
+            'path_loss_db': None,
+            'atmospheric_loss_db': None,
+            'doppler_shift_hz': None,
+            'propagation_delay_ms': None
+        }
 
     def classify_signal_quality(self, rsrp: float) -> str:
         """
@@ -21,7 +21,9 @@
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 # D2 事件地面距离计算模块
 # 使用共用的坐标转换和地面距离计算模块（移除重复实现）
@@ -30,6 +32,18 @@ from typing import Dict, Any, List, Optional
 from src.shared.utils.coordinate_converter import ecef_to_geodetic
 from src.shared.utils import haversine_distance
 
+from .signal_time_index import SignalTimeIndex
+from .threshold_sweep import ThresholdSweepResult, threshold_vector
+
+# NTPU 地面站座標
+# SOURCE: GPS Survey 2025-10-02
+NTPU_UE_LAT_DEG = 24.94388888
+NTPU_UE_LON_DEG = 121.37083333
+
+# D2 陣列預篩容差 (米): 向量化與逐點 Bowring/Haversine 僅有捨入級差異，
+# 預篩放寬 1 m 後由 detect_d2_events 做最終精確判斷
+D2_PREFILTER_MARGIN_M = 1.0
+
 
 class GPPEventDetector:
     """3GPP NTN 事件檢測器"""
@@ -95,11 +109,22 @@ class GPPEventDetector:
             }
         """
         self.logger.info("🔍 開始 3GPP 事件檢測...")
-        self.logger.info("   模式: 遍歷完整時間序列 (修正版)")
+        self.logger.info("   模式: 遍歷完整時間序列 (S×T 陣列索引)")
+
+        # Step 1: 單次遍歷建立 衛星 × 時間點 陣列索引
+        return self.detect_events_on_index(SignalTimeIndex(signal_analysis))
+
+    def detect_events_on_index(self, index: SignalTimeIndex) -> Dict[str, Any]:
+        """在已建立的 SignalTimeIndex 上檢測所有 3GPP 事件
+
+        索引只依賴 Stage 5 數據、與門檻無關，參數掃描可建立一次後
+        以不同門檻配置的檢測器重複使用。
 
-        # Step 1: 收集所有唯一時間戳
-        all_timestamps = self._collect_all_timestamps(signal_analysis)
-        self.logger.info(f"   收集到 {len(all_timestamps)} 個唯一時間點")
+        Returns:
+            與 detect_all_events() 相同格式
+        """
+        all_timestamps = index.timestamps
+        self.logger.info(f"   收集到 {len(all_timestamps)} 個唯一時間點 ({len(index.satellite_ids)} 顆衛星)")
 
         # ✅ Fail-Fast (P3-2): signal_analysis 中沒有時間點數據是致命錯誤
         # 移除原有的回退邏輯 (返回空結果)，改為立即拋出異常
@@ -121,56 +146,91 @@ class GPPEventDetector:
         time_points_with_events = 0
         satellites_participating = set()
 
-        # Step 3: 遍歷每個時間點
-        for timestamp in all_timestamps:
-            # 獲取該時間點可見的衛星
-            visible_satellites = self._get_visible_satellites_at(
-                signal_analysis,
-                timestamp
-            )
-
-            if len(visible_satellites) < 2:
+        # Step 3: 向量化觸發數值 (S×T)
+        # 運算順序與 detect_a3/a4/a5_events 完全相同，觸發判斷逐位元一致；
+        # 事件字典仍由 detect_*_events 對觸發的鄰近衛星建立
+        hysteresis = self.config['hysteresis_db']
+        a3_offset = self.config['a3_offset_db']
+        threshold_a4 = self.config['a4_threshold_dbm']
+        threshold_a5_1 = self.config['a5_threshold1_dbm']
+        threshold_a5_2 = self.config['a5_threshold2_dbm']
+        offset_freq = self.config['offset_frequency']
+        offset_cell = self.config['offset_cell']
+        hysteresis_m = self.config['hysteresis_km'] * 1000.0
+
+        rsrp = index.rsrp_dbm
+        a3_left = rsrp + index.offset_mo_db + index.cell_offset_db - hysteresis        # Mn + Ofn + Ocn - Hys
+        a3_right = rsrp + index.offset_mo_db + index.cell_offset_db + a3_offset        # Mp + Ofp + Ocp + Off
+        neighbor_trigger = rsrp + offset_freq + offset_cell - hysteresis               # A4 / A5 條件2
+        a4_candidate = neighbor_trigger > threshold_a4
+        a5_neighbor_candidate = neighbor_trigger > threshold_a5_2
+        a5_serving_degraded = (rsrp + hysteresis) < threshold_a5_1                     # A5 條件1
+        required_rsrp = threshold_a5_1 - hysteresis  # -43.0 dBm
+        poor_signal = rsrp < required_rsrp
+        ground_distance_m = index.ground_distance_m(NTPU_UE_LAT_DEG, NTPU_UE_LON_DEG)
+
+        # Step 4: 逐時間欄位檢測
+        for col in range(len(all_timestamps)):
+            rows = index.visible_rows(col)
+
+            if len(rows) < 2:
                 # 至少需要 2 顆衛星才能檢測事件
                 continue
 
             time_points_processed += 1
 
-            # 選擇服務衛星 (使用中位數 RSRP 策略)
-            serving_sat = self._select_serving_satellite(visible_satellites)
-            neighbors = [s for s in visible_satellites if s['satellite_id'] != serving_sat['satellite_id']]
+            def snapshots(selected_rows):
+                return [index.snapshot(row, col) for row in selected_rows]
 
-            if len(neighbors) == 0:
-                continue
+            # 選擇服務衛星 (使用中位數 RSRP 策略，穩定排序與 _select_serving_satellite 一致)
+            order = np.argsort(rsrp[rows, col], kind='stable')
+            serving_row = rows[order[len(rows) // 2]]
+            neighbor_rows = rows[rows != serving_row]
+            serving_sat = index.snapshot(serving_row, col)
 
             # 檢測該時間點的所有事件類型
-            a3_events_at_t = self.detect_a3_events(serving_sat, neighbors)
-            a4_events_at_t = self.detect_a4_events(serving_sat, neighbors)
+            a3_rows = neighbor_rows[a3_left[neighbor_rows, col] > a3_right[serving_row, col]]
+            a3_events_at_t = self.detect_a3_events(serving_sat, snapshots(a3_rows))
+            a4_rows = neighbor_rows[a4_candidate[neighbor_rows, col]]
+            a4_events_at_t = self.detect_a4_events(serving_sat, snapshots(a4_rows))
 
             # ⚠️ A5 特殊處理 (2025-10-10)
             # 問題: 中位數服務衛星 (RSRP ≈ -36 dBm) 不會滿足 A5 條件1 (RSRP < -43 dBm)
             # 解決: 額外檢測信號較差的衛星作為服務衛星的 A5 事件
             # 學術依據: A5 設計用於檢測「服務衛星劣化」場景，應允許檢測所有可能的劣化衛星
-            a5_events_at_t = self.detect_a5_events(serving_sat, neighbors)
+            a5_events_at_t = []
+            if a5_serving_degraded[serving_row, col]:
+                a5_rows = neighbor_rows[a5_neighbor_candidate[neighbor_rows, col]]
+                a5_events_at_t = self.detect_a5_events(serving_sat, snapshots(a5_rows))
 
             # 額外 A5 檢測: 嘗試信號較差的衛星作為服務衛星
-            # 策略: 選擇 RSRP < 25th percentile 的衛星作為備選服務衛星
-            threshold_a5_1 = self.config['a5_threshold1_dbm']
-            hysteresis = self.config['hysteresis_db']
-            required_rsrp = threshold_a5_1 - hysteresis  # -43.0 dBm
-
-            poor_signal_satellites = [s for s in visible_satellites
-                                     if s.get('signal_quality', {}).get('rsrp_dbm', 0) < required_rsrp]
-
-            if len(poor_signal_satellites) > 0:
-                # 從信號較差的衛星中選一個作為服務衛星
-                for poor_sat in poor_signal_satellites[:5]:  # 最多檢查5顆最差的衛星
-                    poor_neighbors = [s for s in visible_satellites
-                                    if s['satellite_id'] != poor_sat['satellite_id']]
-                    if len(poor_neighbors) > 0:
-                        additional_a5 = self.detect_a5_events(poor_sat, poor_neighbors)
-                        a5_events_at_t.extend(additional_a5)
-
-            d2_events_at_t = self.detect_d2_events(serving_sat, neighbors)
+            # 策略: 選擇 RSRP < 門檻1 - 遲滯 的衛星作為備選服務衛星
+            for poor_row in rows[poor_signal[rows, col]][:5]:  # 最多檢查5顆最差的衛星
+                if not a5_serving_degraded[poor_row, col]:
+                    continue
+                poor_neighbor_rows = rows[(rows != poor_row) & a5_neighbor_candidate[rows, col]]
+                additional_a5 = self.detect_a5_events(
+                    index.snapshot(poor_row, col), snapshots(poor_neighbor_rows)
+                )
+                a5_events_at_t.extend(additional_a5)
+
+            # D2: 以陣列地面距離預篩鄰近衛星，精確判斷仍由 detect_d2_events 完成
+            # 缺少 ECEF 的鄰近衛星保留於候選中，使 Fail-Fast 行為與逐點檢測一致
+            d2_candidates = []
+            if index.has_ecef[serving_row, col]:
+                threshold1_km, threshold2_km = self._resolve_d2_thresholds_km(serving_sat['constellation'])
+                serving_far = (
+                    ground_distance_m[serving_row, col] - hysteresis_m
+                    > threshold1_km * 1000.0 - D2_PREFILTER_MARGIN_M
+                )
+                if serving_far:
+                    neighbor_close = (
+                        ground_distance_m[neighbor_rows, col] + hysteresis_m
+                        < threshold2_km * 1000.0 + D2_PREFILTER_MARGIN_M
+                    )
+                    d2_rows = neighbor_rows[neighbor_close | ~index.has_ecef[neighbor_rows, col]]
+                    d2_candidates = snapshots(d2_rows)
+            d2_events_at_t = self.detect_d2_events(serving_sat, d2_candidates)
 
             # 累加事件
             all_a3_events.extend(a3_events_at_t)
@@ -184,10 +244,10 @@ class GPPEventDetector:
                 time_points_with_events += 1
 
             # 記錄參與的衛星
-            for sat in visible_satellites:
-                satellites_participating.add(sat['satellite_id'])
+            for row in rows:
+                satellites_participating.add(index.satellite_ids[row])
 
-        # Step 4: 統計結果
+        # Step 5: 統計結果
         total_events = len(all_a3_events) + len(all_a4_events) + len(all_a5_events) + len(all_d2_events)
 
         self.event_stats['a3_events'] = len(all_a3_events)
@@ -230,6 +290,169 @@ class GPPEventDetector:
             }
         }
 
+    def detect_threshold_sweep(
+        self,
+        index: SignalTimeIndex,
+        a3_offset_db: Optional[Sequence[float]] = None,
+        a4_threshold_dbm: Optional[Sequence[float]] = None,
+        a5_threshold1_dbm: Optional[Sequence[float]] = None,
+        a5_threshold2_dbm: Optional[Sequence[float]] = None,
+        d2_thresholds_km: Optional[Dict[str, Tuple[Sequence[float], Sequence[float]]]] = None
+    ) -> ThresholdSweepResult:
+        """單次遍歷計算多組門檻的事件數
+
+        與 detect_events_on_index() 使用相同的服務衛星選擇、A5 額外劣化衛星檢測與
+        D2 精確地面距離 (Bowring + Haversine)，每個門檻組合的事件數與以該組合
+        配置的檢測器完全一致。遲滯、偏移等其他參數取自 self.config。
+
+        Args:
+            index: SignalTimeIndex
+            a3_offset_db / a4_threshold_dbm: 門檻向量 (None = 使用目前配置值)
+            a5_threshold1_dbm / a5_threshold2_dbm: A5 雙門檻向量 (計數為兩者的網格)
+            d2_thresholds_km: 星座 → (threshold1 向量, threshold2 向量)；
+                未列出的星座使用目前配置值
+
+        Returns:
+            ThresholdSweepResult
+        """
+        if not index.timestamps:
+            raise ValueError(
+                "❌ signal_analysis 中沒有可用的時間點數據\n"
+                "3GPP 事件檢測需要完整的時間序列數據"
+            )
+
+        def vector(values, key):
+            return threshold_vector(self.config[key] if values is None else values)
+
+        a3_offsets = vector(a3_offset_db, 'a3_offset_db')
+        a4_thresholds = vector(a4_threshold_dbm, 'a4_threshold_dbm')
+        a5_thresholds1 = vector(a5_threshold1_dbm, 'a5_threshold1_dbm')
+        a5_thresholds2 = vector(a5_threshold2_dbm, 'a5_threshold2_dbm')
+
+        hysteresis = self.config['hysteresis_db']
+        offset_freq = self.config['offset_frequency']
+        offset_cell = self.config['offset_cell']
+        hysteresis_m = self.config['hysteresis_km'] * 1000.0
+
+        # 與 detect_events_on_index() 相同運算順序的門檻無關數值
+        rsrp = index.rsrp_dbm
+        a3_base = rsrp + index.offset_mo_db + index.cell_offset_db                     # Mp + Ofp + Ocp
+        a3_left = rsrp + index.offset_mo_db + index.cell_offset_db - hysteresis        # Mn + Ofn + Ocn - Hys
+        neighbor_trigger = rsrp + offset_freq + offset_cell - hysteresis               # A4 / A5 條件2
+        serving_trigger = rsrp + hysteresis                                            # A5 條件1
+        a5_required_rsrp = a5_thresholds1 - hysteresis
+
+        a3_counts = np.zeros(len(a3_offsets), dtype=np.int64)
+        a4_counts = np.zeros(len(a4_thresholds), dtype=np.int64)
+        a5_counts = np.zeros((len(a5_thresholds1), len(a5_thresholds2)), dtype=np.int64)
+
+        # D2: 星座 → (門檻1 向量, 門檻2 向量)，公里 → 米的換算與 detect_d2_events 相同
+        d2_vectors: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        d2_counts: Dict[str, np.ndarray] = {}
+
+        def d2_state(constellation: str):
+            if constellation not in d2_vectors:
+                if d2_thresholds_km and constellation in d2_thresholds_km:
+                    thresholds1, thresholds2 = d2_thresholds_km[constellation]
+                else:
+                    thresholds1, thresholds2 = self._resolve_d2_thresholds_km(constellation)
+                d2_vectors[constellation] = (threshold_vector(thresholds1), threshold_vector(thresholds2))
+                d2_counts[constellation] = np.zeros(
+                    (d2_vectors[constellation][0].size, d2_vectors[constellation][1].size), dtype=np.int64
+                )
+            thresholds1, thresholds2 = d2_vectors[constellation]
+            return thresholds1 * 1000.0, thresholds2 * 1000.0, d2_counts[constellation]
+
+        time_points_processed = 0
+        participating = np.zeros(len(index.satellite_ids), dtype=bool)
+
+        for col in range(len(index.timestamps)):
+            rows = index.visible_rows(col)
+            if len(rows) < 2:
+                continue
+
+            time_points_processed += 1
+            participating[rows] = True
+
+            order = np.argsort(rsrp[rows, col], kind='stable')
+            serving_row = rows[order[len(rows) // 2]]
+            neighbor_rows = rows[rows != serving_row]
+
+            # A3: Mn + Ofn + Ocn - Hys > (Mp + Ofp + Ocp) + Off
+            a3_sorted = np.sort(a3_left[neighbor_rows, col])
+            a3_counts += len(a3_sorted) - np.searchsorted(
+                a3_sorted, a3_base[serving_row, col] + a3_offsets, side='right'
+            )
+
+            # A4: Mn + Ofn + Ocn - Hys > Thresh
+            trigger_rows = neighbor_trigger[rows, col]
+            trigger_sorted = np.sort(trigger_rows)
+            above_all = len(trigger_sorted) - np.searchsorted(trigger_sorted, a4_thresholds, side='right')
+            a4_counts += above_all - (neighbor_trigger[serving_row, col] > a4_thresholds)
+
+            # A5: 中位數服務衛星 + 最多 5 顆 RSRP < 門檻1 - 遲滯 的劣化衛星
+            a5_above_all = len(trigger_sorted) - np.searchsorted(trigger_sorted, a5_thresholds2, side='right')
+            serving_degraded = serving_trigger[serving_row, col] < a5_thresholds1
+            a5_counts += np.outer(
+                serving_degraded, a5_above_all - (neighbor_trigger[serving_row, col] > a5_thresholds2)
+            )
+            rsrp_rows = rsrp[rows, col]
+            for i in range(len(a5_thresholds1)):
+                for position in np.flatnonzero(rsrp_rows < a5_required_rsrp[i])[:5]:
+                    if serving_trigger[rows[position], col] < a5_thresholds1[i]:
+                        a5_counts[i] += a5_above_all - (trigger_rows[position] > a5_thresholds2)
+
+            # D2: Ml1 - Hys > Thresh1 且 Ml2 + Hys < Thresh2 (精確地面距離)
+            serving_sat = index.snapshot(serving_row, col)
+            thresholds1_m, thresholds2_m, counts = d2_state(serving_sat['constellation'])
+            serving_far = (self._ground_distance_m(serving_sat) - hysteresis_m) > thresholds1_m
+            if serving_far.any():
+                neighbor_sorted = np.sort([
+                    self._ground_distance_m(index.snapshot(row, col)) + hysteresis_m
+                    for row in neighbor_rows
+                ])
+                counts += np.outer(serving_far, np.searchsorted(neighbor_sorted, thresholds2_m, side='left'))
+
+        for constellation in d2_thresholds_km or {}:
+            d2_state(constellation)
+
+        self.logger.info(
+            f"✅ 多門檻事件計數完成: {time_points_processed}/{len(index.timestamps)} 個時間點, "
+            f"A3×{len(a3_offsets)} A4×{len(a4_thresholds)} "
+            f"A5×{len(a5_thresholds1)}×{len(a5_thresholds2)} D2 星座 {sorted(d2_vectors)}"
+        )
+
+        return ThresholdSweepResult(
+            a3_offset_db=a3_offsets,
+            a3_counts=a3_counts,
+            a4_threshold_dbm=a4_thresholds,
+            a4_counts=a4_counts,
+            a5_threshold1_dbm=a5_thresholds1,
+            a5_threshold2_dbm=a5_thresholds2,
+            a5_counts=a5_counts,
+            d2_thresholds_km=d2_vectors,
+            d2_counts=d2_counts,
+            total_time_points=len(index.timestamps),
+            time_points_processed=time_points_processed,
+            participating_satellites=int(participating.sum())
+        )
+
+    @staticmethod
+    def _ground_distance_m(satellite: Dict[str, Any]) -> float:
+        """UE 到衛星地面投影點的 2D 距離 (米，與 detect_d2_events 相同算法)
+
+        ✅ Fail-Fast: 缺少 ECEF 位置時拋出異常
+        """
+        if 'position_ecef_m' not in satellite['physical_parameters']:
+            raise ValueError(
+                f"衛星 {satellite['satellite_id']} 缺少 position_ecef_m\n"
+                "D2 事件需要 ECEF 位置計算地面距離\n"
+                "請確保 Stage 5 提供 physical_parameters['position_ecef_m']"
+            )
+        ecef = satellite['physical_parameters']['position_ecef_m']
+        lat, lon, _ = ecef_to_geodetic(ecef[0], ecef[1], ecef[2])
+        return haversine_distance(NTPU_UE_LAT_DEG, NTPU_UE_LON_DEG, lat, lon)
+
     def detect_a3_events(
         self,
         serving_satellite: Dict[str, Any],
@@ -533,26 +756,9 @@ class GPPEventDetector:
             )
 
         constellation = serving_satellite['constellation']
+        threshold1_km, threshold2_km = self._resolve_d2_thresholds_km(constellation)
 
-        # ✅ Fail-Fast: 星座特定閾值必須存在（Stage 4 動態閾值已確保）
-        if constellation in self.config and isinstance(self.config[constellation], dict):
-            # 星座特定配置存在，閾值必須完整
-            if 'd2_threshold1_km' not in self.config[constellation]:
-                raise ValueError(
-                    f"星座 {constellation} 配置缺少 d2_threshold1_km\n"
-                    "Stage 4 動態閾值分析應該已設定此值\n"
-                    "請檢查 Stage 4 輸出的 metadata.dynamic_d2_thresholds"
-                )
-            if 'd2_threshold2_km' not in self.config[constellation]:
-                raise ValueError(
-                    f"星座 {constellation} 配置缺少 d2_threshold2_km\n"
-                    "Stage 4 動態閾值分析應該已設定此值\n"
-                    "請檢查 Stage 4 輸出的 metadata.dynamic_d2_thresholds"
-                )
-
-            threshold1_km = self.config[constellation]['d2_threshold1_km']
-            threshold2_km = self.config[constellation]['d2_threshold2_km']
-        else:
+        if not (constellation in self.config and isinstance(self.config[constellation], dict)):
             # 使用全局默認閾值（僅在沒有星座特定配置時）
             # 注意: 這應該只在測試或降級模式下發生
             self.logger.warning(
@@ -560,8 +766,6 @@ class GPPEventDetector:
                 f"  Threshold1: {self.config['d2_threshold1_km']} km\n"
                 f"  Threshold2: {self.config['d2_threshold2_km']} km"
             )
-            threshold1_km = self.config['d2_threshold1_km']
-            threshold2_km = self.config['d2_threshold2_km']
 
         hysteresis_km = self.config['hysteresis_km']
 
@@ -570,11 +774,6 @@ class GPPEventDetector:
         threshold2_m = threshold2_km * 1000.0
         hysteresis_m = hysteresis_km * 1000.0
 
-        # NTPU 地面站座標
-        # SOURCE: GPS Survey 2025-10-02
-        UE_LAT = 24.94388888
-        UE_LON = 121.37083333
-
         # ✅ Fail-Fast: 確保服務衛星有 ECEF 位置數據
         if 'position_ecef_m' not in serving_satellite['physical_parameters']:
             raise ValueError(
@@ -589,7 +788,7 @@ class GPPEventDetector:
             serving_ecef[0], serving_ecef[1], serving_ecef[2]
         )
         serving_ground_distance_m = haversine_distance(
-            UE_LAT, UE_LON, serving_lat, serving_lon
+            NTPU_UE_LAT_DEG, NTPU_UE_LON_DEG, serving_lat, serving_lon
         )
 
         # 條件1 (D2-1): Ml1 - Hys > Thresh1 (服務衛星地面距離劣於門檻1)
@@ -618,7 +817,7 @@ class GPPEventDetector:
                 neighbor_ecef[0], neighbor_ecef[1], neighbor_ecef[2]
             )
             neighbor_ground_distance_m = haversine_distance(
-                UE_LAT, UE_LON, neighbor_lat, neighbor_lon
+                NTPU_UE_LAT_DEG, NTPU_UE_LON_DEG, neighbor_lat, neighbor_lon
             )
 
             # 條件2 (D2-2): Ml2 + Hys < Thresh2 (鄰居衛星地面距離優於門檻2)
@@ -663,120 +862,30 @@ class GPPEventDetector:
 
         return d2_events
 
-    def _collect_all_timestamps(self, signal_analysis: Dict[str, Any]) -> List[str]:
-        """從所有衛星的 time_series 收集所有唯一時間戳
+    def _resolve_d2_thresholds_km(self, constellation: str):
+        """取得 D2 距離門檻 (threshold1_km, threshold2_km)
 
-        ✅ Fail-Fast: 確保所有衛星都有 time_series 數據和時間戳
-
-        Args:
-            signal_analysis: Stage 5 輸出的信號分析數據
-
-        Returns:
-            排序後的唯一時間戳列表
+        ✅ Fail-Fast: 星座特定閾值必須存在（Stage 4 動態閾值已確保）
+        沒有星座特定配置時使用全局默認閾值
         """
-        all_timestamps = set()
-
-        for sat_id, sat_data in signal_analysis.items():
-            # ✅ Fail-Fast: 確保 time_series 字段存在
-            if 'time_series' not in sat_data:
+        if constellation in self.config and isinstance(self.config[constellation], dict):
+            # 星座特定配置存在，閾值必須完整
+            if 'd2_threshold1_km' not in self.config[constellation]:
                 raise ValueError(
-                    f"衛星 {sat_id} 缺少 time_series 字段\n"
-                    "3GPP 事件檢測需要完整的時間序列數據\n"
-                    "請確保 Stage 5 提供所有衛星的 time_series"
+                    f"星座 {constellation} 配置缺少 d2_threshold1_km\n"
+                    "Stage 4 動態閾值分析應該已設定此值\n"
+                    "請檢查 Stage 4 輸出的 metadata.dynamic_d2_thresholds"
                 )
-
-            time_series = sat_data['time_series']
-
-            for point in time_series:
-                # ✅ Fail-Fast: 確保每個時間點都有 timestamp
-                if 'timestamp' not in point:
-                    raise ValueError(
-                        f"衛星 {sat_id} 的 time_series 中發現缺少 timestamp 的數據點\n"
-                        "Grade A 標準要求所有時間點必須有時間戳\n"
-                        f"問題數據點: {point}"
-                    )
-                all_timestamps.add(point['timestamp'])
-
-        return sorted(list(all_timestamps))
-
-    def _get_visible_satellites_at(
-        self,
-        signal_analysis: Dict[str, Any],
-        timestamp: str
-    ) -> List[Dict[str, Any]]:
-        """獲取特定時間點可見的衛星
-
-        ✅ Fail-Fast: 確保所有數據字段完整
-
-        Args:
-            signal_analysis: Stage 5 輸出的信號分析數據
-            timestamp: 目標時間戳
-
-        Returns:
-            該時間點可見的衛星列表，每個包含 satellite_id, signal_quality, physical_parameters
-        """
-        visible = []
-
-        for sat_id, sat_data in signal_analysis.items():
-            # ✅ Fail-Fast: 確保 time_series 字段存在
-            if 'time_series' not in sat_data:
+            if 'd2_threshold2_km' not in self.config[constellation]:
                 raise ValueError(
-                    f"衛星 {sat_id} 缺少 time_series 字段\n"
-                    "3GPP 事件檢測需要完整的時間序列數據\n"
-                    "請確保 Stage 5 提供所有衛星的 time_series"
+                    f"星座 {constellation} 配置缺少 d2_threshold2_km\n"
+                    "Stage 4 動態閾值分析應該已設定此值\n"
+                    "請檢查 Stage 4 輸出的 metadata.dynamic_d2_thresholds"
                 )
+            return (self.config[constellation]['d2_threshold1_km'],
+                    self.config[constellation]['d2_threshold2_km'])
 
-            time_series = sat_data['time_series']
-
-            # 找到該時間點的數據
-            for point in time_series:
-                if point.get('timestamp') == timestamp:
-                    # 檢查是否可連接 (is_connectable = True 表示可見且可用)
-                    # 注意: is_connectable 默認 False 是合理的（如果沒有這個字段，默認為不可連接）
-                    if point.get('is_connectable', False):
-                        # ✅ Fail-Fast: 確保 constellation 字段存在
-                        if 'constellation' not in sat_data:
-                            raise ValueError(
-                                f"衛星 {sat_id} 缺少 constellation 字段\n"
-                                "D2 事件檢測需要星座資訊\n"
-                                "請確保 Stage 5 提供完整的星座元數據"
-                            )
-
-                        # ✅ Fail-Fast: 確保 signal_quality 字段存在
-                        if 'signal_quality' not in point:
-                            raise ValueError(
-                                f"衛星 {sat_id} 在時間點 {timestamp} 缺少 signal_quality\n"
-                                "A3/A4/A5 事件檢測需要信號品質數據\n"
-                                "請確保 Stage 5 提供完整的 signal_quality"
-                            )
-
-                        # ✅ Fail-Fast: 確保 physical_parameters 字段存在
-                        if 'physical_parameters' not in point:
-                            raise ValueError(
-                                f"衛星 {sat_id} 在時間點 {timestamp} 缺少 physical_parameters\n"
-                                "D2 事件檢測需要物理參數（ECEF 位置）\n"
-                                "請確保 Stage 5 提供完整的 physical_parameters"
-                            )
-
-                        # ✅ Fail-Fast: 確保 summary 字段存在
-                        if 'summary' not in sat_data:
-                            raise ValueError(
-                                f"衛星 {sat_id} 缺少 summary 字段\n"
-                                "事件檢測需要衛星摘要數據\n"
-                                "請確保 Stage 5 提供完整的 summary"
-                            )
-
-                        visible.append({
-                            'satellite_id': sat_id,
-                            'constellation': sat_data['constellation'],
-                            'timestamp': timestamp,
-                            'signal_quality': point['signal_quality'],
-                            'physical_parameters': point['physical_parameters'],
-                            'summary': sat_data['summary']
-                        })
-                    break
-
-        return visible
+        return self.config['d2_threshold1_km'], self.config['d2_threshold2_km']
 
     def _select_serving_satellite(
         self,
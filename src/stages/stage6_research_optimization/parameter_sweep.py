@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Stage 6 參數掃描引擎 - 單次載入 Stage 5 數據，行程內評估所有門檻組合
+
+職責:
+1. Stage 5 signal_analysis 只建立一次 SignalTimeIndex (與門檻無關)
+2. 預設以 GPPEventDetector.detect_threshold_sweep() 單次遍歷取得所有門檻值的事件數，
+   每個組合的指標只是查表
+3. 逐組合模式: 以獨立的檢測器配置呼叫 detect_events_on_index()，多個工作行程並行評估
+   (fork 時索引以寫時複製共享，不重新序列化)
+4. 不讀寫任何配置文件，中斷時不會留下被修改的 YAML
+
+參數命名沿用 scripts/run_parameter_sweep.py: '{星座}_{參數}'。
+D2 距離門檻依星座套用 (detector.config[星座])；A3/A4/A5 門檻在 3GPP 事件檢測器中
+對所有衛星共用，因此無論星座前綴為何都寫入全域門檻。
+"""
+
+import copy
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .gpp_event_detector import GPPEventDetector
+from .signal_time_index import SignalTimeIndex
+from .threshold_sweep import d2_thresholds_for
+
+logger = logging.getLogger(__name__)
+
+# 參數類型 → 檢測器配置鍵
+SWEEP_PARAMETER_TYPES = {
+    'd2': ['d2_threshold1_km', 'd2_threshold2_km'],
+    'a3': ['a3_offset_db'],
+    'a4': ['a4_threshold_dbm'],
+    'a5': ['a5_threshold1_dbm', 'a5_threshold2_dbm'],
+}
+
+# 依星座套用的參數 (GPPEventDetector._resolve_d2_thresholds_km)
+CONSTELLATION_PARAMETERS = frozenset({'d2_threshold1_km', 'd2_threshold2_km'})
+
+SWEEP_CONSTELLATIONS = ('starlink', 'oneweb')
+
+# 工作行程狀態 (由 _init_sweep_worker 設定)
+_WORKER_INDEX: Optional[SignalTimeIndex] = None
+
+
+def base_detector_config(stage6_config: Optional[Dict[str, Any]] = None,
+                         metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    與 Stage 6 處理器相同的檢測器基準配置
+
+    GPPEventDetector 預設門檻 + Stage 6 配置，再套用 Stage 5 metadata 中
+    Stage 4 產生的動態 D2 門檻 (對應 Stage6Processor._apply_dynamic_thresholds)。
+    """
+    config = GPPEventDetector(stage6_config).config
+    dynamic_thresholds = (metadata or {}).get('dynamic_d2_thresholds') or {}
+    for constellation in SWEEP_CONSTELLATIONS:
+        thresholds = dynamic_thresholds.get(constellation)
+        if thresholds:
+            config.setdefault(constellation, {}).update({
+                'd2_threshold1_km': thresholds['d2_threshold1_km'],
+                'd2_threshold2_km': thresholds['d2_threshold2_km']
+            })
+    return config
+
+
+def apply_sweep_parameters(base_config: Dict[str, Any], params: Dict[str, float]) -> Dict[str, Any]:
+    """
+    將 '{星座}_{參數}' 形式的掃描參數套用到檢測器配置 (返回新字典)
+
+    Raises:
+        ValueError: 未知的星座前綴或參數名稱
+    """
+    config = copy.deepcopy(base_config)
+    for key, value in params.items():
+        constellation, _, name = key.partition('_')
+        if constellation not in SWEEP_CONSTELLATIONS or name not in base_config:
+            raise ValueError(
+                f"未知的掃描參數: {key}\n"
+                f"格式: '{{星座}}_{{參數}}'，星座: {SWEEP_CONSTELLATIONS}，"
+                f"參數: {sorted(p for names in SWEEP_PARAMETER_TYPES.values() for p in names)}"
+            )
+        if name in CONSTELLATION_PARAMETERS:
+            config.setdefault(constellation, {})[name] = value
+        else:
+            config[name] = value
+    return config
+
+
+def parameter_combinations(constellation: str, param_names: Sequence[str],
+                           sweep_ranges: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """星座掃描範圍的笛卡兒積 → 參數字典列表 (範圍中沒有的參數跳過)"""
+    values = {}
+    for name in param_names:
+        if name in sweep_ranges:
+            values[name] = list(sweep_ranges[name])
+        else:
+            logger.warning(f"⚠️ 參數 {name} 不在 {constellation} 掃描範圍中，跳過")
+    return [
+        {f"{constellation}_{name}": value for name, value in zip(values, combination)}
+        for combination in itertools.product(*values.values())
+    ] if values else []
+
+
+def sweep_threshold_vectors(configs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """檢測器配置列表 → detect_threshold_sweep() 的門檻向量參數 (各參數的唯一值)"""
+    def unique(values):
+        return sorted(set(values))
+
+    d2_thresholds_km = {}
+    for constellation in SWEEP_CONSTELLATIONS:
+        if any(isinstance(config.get(constellation), dict) for config in configs):
+            pairs = [d2_thresholds_for(config, constellation) for config in configs]
+            d2_thresholds_km[constellation] = (unique(p[0] for p in pairs), unique(p[1] for p in pairs))
+
+    return {
+        'a3_offset_db': unique(config['a3_offset_db'] for config in configs),
+        'a4_threshold_dbm': unique(config['a4_threshold_dbm'] for config in configs),
+        'a5_threshold1_dbm': unique(config['a5_threshold1_dbm'] for config in configs),
+        'a5_threshold2_dbm': unique(config['a5_threshold2_dbm'] for config in configs),
+        'd2_thresholds_km': d2_thresholds_km,
+    }
+
+
+def event_metrics(result: Dict[str, Any]) -> Dict[str, Any]:
+    """detect_events_on_index() 結果 → 掃描指標"""
+    summary = result['event_summary']
+    return {
+        'a3_count': summary['a3_count'],
+        'a4_count': summary['a4_count'],
+        'a5_count': summary['a5_count'],
+        'd2_count': summary['d2_count'],
+        'total_events': result['total_events'],
+        'time_points_processed': summary['time_points_processed'],
+        'participating_satellites': summary['participating_satellites'],
+    }
+
+
+def _evaluate(index: SignalTimeIndex, config: Dict[str, Any]) -> Dict[str, Any]:
+    return event_metrics(GPPEventDetector(config).detect_events_on_index(index))
+
+
+def _init_sweep_worker(index: SignalTimeIndex) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+    # 每個組合都會建立檢測器，避免工作行程重複輸出初始化/檢測日誌
+    logging.getLogger(GPPEventDetector.__module__).setLevel(logging.WARNING)
+
+
+def _evaluate_in_worker(config: Dict[str, Any]) -> Dict[str, Any]:
+    return _evaluate(_WORKER_INDEX, config)
+
+
+class ParameterSweepEngine:
+    """
+    行程內參數掃描引擎
+
+    使用方式:
+        engine = ParameterSweepEngine(stage5_data['signal_analysis'],
+                                      base_detector_config(stage6_config, stage5_data['metadata']))
+        results = engine.run(parameter_combinations('starlink', ['d2_threshold1_km'], ranges))
+    """
+
+    def __init__(self, signal_analysis: Dict[str, Any], base_config: Dict[str, Any],
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            signal_analysis: Stage 5 signal_analysis (建立一次索引)
+            base_config: 檢測器基準配置 (見 base_detector_config)
+            max_workers: 工作行程數 (None = CPU 核心數，1 = 主行程順序執行)
+        """
+        self.index = SignalTimeIndex(signal_analysis)
+        self.base_config = base_config
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        # ✅ Fail-Fast: 與 detect_all_events 相同，沒有時間點是致命錯誤
+        if not self.index.timestamps:
+            raise ValueError(
+                "❌ signal_analysis 中沒有可用的時間點數據\n"
+                "參數掃描需要 Stage 5 完整的時間序列數據"
+            )
+        logger.info(
+            f"📊 掃描索引已建立: {len(self.index.satellite_ids)} 顆衛星 × "
+            f"{len(self.index.timestamps)} 個時間點"
+        )
+
+    def evaluate(self, params: Dict[str, float]) -> Dict[str, Any]:
+        """於主行程評估單一參數組合"""
+        return _evaluate(self.index, apply_sweep_parameters(self.base_config, params))
+
+    def run(self, combinations: Iterable[Dict[str, float]], single_pass: bool = True) -> List[Dict[str, Any]]:
+        """
+        評估所有參數組合 (結果順序與輸入相同)
+
+        Args:
+            combinations: '{星座}_{參數}' 參數字典列表
+            single_pass: True = 單次遍歷多門檻計數；False = 逐組合完整檢測 (工作行程並行)
+
+        Returns:
+            [{'iteration', 'parameters', 'metrics'}, ...]
+        """
+        combinations = list(combinations)
+        configs = [apply_sweep_parameters(self.base_config, params) for params in combinations]
+        workers = min(self.max_workers, len(configs))
+
+        if single_pass:
+            logger.info(f"🚀 單次遍歷評估 {len(configs)} 個參數組合")
+            sweep = GPPEventDetector(self.base_config).detect_threshold_sweep(
+                self.index, **sweep_threshold_vectors(configs)
+            )
+            metrics = [sweep.event_metrics(config) for config in configs]
+        elif workers <= 1:
+            logger.info(f"🚀 逐組合評估 {len(configs)} 個參數組合 (單行程)")
+            metrics = [_evaluate(self.index, config) for config in configs]
+        else:
+            logger.info(f"🚀 逐組合評估 {len(configs)} 個參數組合 ({workers} 個工作行程)")
+            chunksize = max(1, len(configs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                                     initargs=(self.index,)) as executor:
+                metrics = []
+                for i, result in enumerate(executor.map(_evaluate_in_worker, configs, chunksize=chunksize), 1):
+                    metrics.append(result)
+                    if i % 50 == 0 or i == len(configs):
+                        logger.info(f"   掃描進度: {i}/{len(configs)}")
+
+        return [
+            {'iteration': i, 'parameters': params, 'metrics': result}
+            for i, (params, result) in enumerate(zip(combinations, metrics), 1)
+        ]
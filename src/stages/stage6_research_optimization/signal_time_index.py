@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Stage 5 信號時間序列索引 - Stage 6 事件檢測的稠密 (S×T) 陣列視圖
+
+職責:
+1. 單次遍歷 signal_analysis，建立 衛星 × 時間點 的稠密陣列
+2. 提供 RSRP / RSRQ / SINR / 3GPP 偏移 / 斜距 / 可連接旗標 / ECEF 位置
+3. 一次性計算所有點的 2D 地面距離 (D2 事件)
+4. 依需求重建事件檢測使用的衛星快照 (satellite_id / signal_quality / physical_parameters ...)
+
+取代舊版每個時間點線性掃描所有衛星 time_series 的 O(T × S × T) 流程，
+事件觸發條件可直接對每一個時間欄位做向量化比較。
+
+✅ Fail-Fast: 與逐時間點掃描相同的數據完整性檢查
+✅ 同一衛星重複時間戳時僅使用第一個數據點 (與舊版掃描語義一致)
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from src.shared.utils.coordinate_converter import ecef_to_geodetic_batch
+from src.shared.utils.ground_distance_calculator import haversine_distance_batch
+
+logger = logging.getLogger(__name__)
+
+
+class SignalTimeIndex:
+    """
+    signal_analysis 的 (S×T) 陣列索引
+
+    列 (row) 順序與 signal_analysis 的衛星順序相同，
+    欄 (column) 為排序後的唯一時間戳。
+    不存在或數據缺失的格子: 數值為 NaN，connectable 為 False。
+    """
+
+    def __init__(self, signal_analysis: Dict[str, Any]):
+        self.signal_analysis = signal_analysis
+        self.satellite_ids: List[str] = list(signal_analysis.keys())
+
+        # Step 1: 收集唯一時間戳 (Fail-Fast: time_series / timestamp 必須存在)
+        all_timestamps = set()
+        for sat_id, sat_data in signal_analysis.items():
+            if 'time_series' not in sat_data:
+                raise ValueError(
+                    f"衛星 {sat_id} 缺少 time_series 字段\n"
+                    "3GPP 事件檢測需要完整的時間序列數據\n"
+                    "請確保 Stage 5 提供所有衛星的 time_series"
+                )
+            for point in sat_data['time_series']:
+                if 'timestamp' not in point:
+                    raise ValueError(
+                        f"衛星 {sat_id} 的 time_series 中發現缺少 timestamp 的數據點\n"
+                        "Grade A 標準要求所有時間點必須有時間戳\n"
+                        f"問題數據點: {point}"
+                    )
+                all_timestamps.add(point['timestamp'])
+
+        self.timestamps: List[str] = sorted(all_timestamps)
+        self.column_of: Dict[str, int] = {ts: col for col, ts in enumerate(self.timestamps)}
+
+        shape = (len(self.satellite_ids), len(self.timestamps))
+        self.rsrp_dbm = np.full(shape, np.nan)
+        self.rsrq_db = np.full(shape, np.nan)
+        self.sinr_db = np.full(shape, np.nan)
+        self.offset_mo_db = np.zeros(shape)      # 3GPP 標準預設值 0.0 dB
+        self.cell_offset_db = np.zeros(shape)    # 3GPP 標準預設值 0.0 dB
+        self.distance_km = np.full(shape, np.nan)
+        self.position_ecef_m = np.full(shape + (3,), np.nan)
+        self.has_ecef = np.zeros(shape, dtype=bool)
+        self.connectable = np.zeros(shape, dtype=bool)
+        self.points = np.empty(shape, dtype=object)
+
+        # Step 2: 單次遍歷填入陣列
+        for row, (sat_id, sat_data) in enumerate(signal_analysis.items()):
+            for point in sat_data['time_series']:
+                col = self.column_of[point['timestamp']]
+                if self.points[row, col] is not None:
+                    continue  # 只使用第一個數據點
+                self.points[row, col] = point
+
+                # is_connectable 預設 False (沒有此字段視為不可連接)
+                if not point.get('is_connectable', False):
+                    continue
+                self._validate_connectable_point(sat_id, sat_data, point)
+
+                self.connectable[row, col] = True
+                signal_quality = point['signal_quality']
+                physical_parameters = point['physical_parameters']
+
+                self.rsrp_dbm[row, col] = signal_quality['rsrp_dbm']
+                self.rsrq_db[row, col] = _as_float(signal_quality.get('rsrq_db'))
+                self.sinr_db[row, col] = _as_float(signal_quality.get('rs_sinr_db'))
+                if 'offset_mo_db' in signal_quality:
+                    self.offset_mo_db[row, col] = signal_quality['offset_mo_db']
+                if 'cell_offset_db' in signal_quality:
+                    self.cell_offset_db[row, col] = signal_quality['cell_offset_db']
+                self.distance_km[row, col] = _as_float(physical_parameters.get('distance_km'))
+
+                if 'position_ecef_m' in physical_parameters:
+                    self.position_ecef_m[row, col] = physical_parameters['position_ecef_m']
+                    self.has_ecef[row, col] = True
+
+        self._ground_distance_cache: Dict[Tuple[float, float], np.ndarray] = {}
+
+    @staticmethod
+    def _validate_connectable_point(sat_id: str, sat_data: Dict[str, Any], point: Dict[str, Any]):
+        """✅ Fail-Fast: 可連接數據點必須具備事件檢測所需的全部字段"""
+        timestamp = point['timestamp']
+
+        if 'constellation' not in sat_data:
+            raise ValueError(
+                f"衛星 {sat_id} 缺少 constellation 字段\n"
+                "D2 事件檢測需要星座資訊\n"
+                "請確保 Stage 5 提供完整的星座元數據"
+            )
+        if 'signal_quality' not in point:
+            raise ValueError(
+                f"衛星 {sat_id} 在時間點 {timestamp} 缺少 signal_quality\n"
+                "A3/A4/A5 事件檢測需要信號品質數據\n"
+                "請確保 Stage 5 提供完整的 signal_quality"
+            )
+        if 'physical_parameters' not in point:
+            raise ValueError(
+                f"衛星 {sat_id} 在時間點 {timestamp} 缺少 physical_parameters\n"
+                "D2 事件檢測需要物理參數（ECEF 位置）\n"
+                "請確保 Stage 5 提供完整的 physical_parameters"
+            )
+        if 'summary' not in sat_data:
+            raise ValueError(
+                f"衛星 {sat_id} 缺少 summary 字段\n"
+                "事件檢測需要衛星摘要數據\n"
+                "請確保 Stage 5 提供完整的 summary"
+            )
+        if 'rsrp_dbm' not in point['signal_quality']:
+            raise ValueError(
+                f"衛星 {sat_id} 的 signal_quality 缺少 rsrp_dbm\n"
+                "服務衛星選擇需要 RSRP 數據\n"
+                "請確保 Stage 5 提供完整的 RSRP 測量值"
+            )
+
+    @property
+    def shape(self):
+        return self.connectable.shape
+
+    def visible_rows(self, col: int) -> np.ndarray:
+        """該時間欄位可連接衛星的列索引 (保持 signal_analysis 順序)"""
+        return np.flatnonzero(self.connectable[:, col])
+
+    def ground_distance_m(self, ue_lat_deg: float, ue_lon_deg: float) -> np.ndarray:
+        """
+        UE 到各衛星地面投影點的 2D 大圓距離 (S×T，米)
+
+        首次呼叫時一次性完成 ECEF → Geodetic (Bowring) 與 Haversine 計算，
+        沒有 ECEF 位置的格子為 NaN。
+        """
+        key = (ue_lat_deg, ue_lon_deg)
+        if key not in self._ground_distance_cache:
+            distance = np.full(self.shape, np.nan)
+            if self.has_ecef.any():
+                ecef = self.position_ecef_m[self.has_ecef]
+                lat, lon, _ = ecef_to_geodetic_batch(ecef[:, 0], ecef[:, 1], ecef[:, 2])
+                distance[self.has_ecef] = haversine_distance_batch(ue_lat_deg, ue_lon_deg, lat, lon)
+            self._ground_distance_cache[key] = distance
+        return self._ground_distance_cache[key]
+
+    def snapshot(self, row: int, col: int) -> Dict[str, Any]:
+        """重建單一衛星在單一時間點的快照 (detect_*_events 輸入格式)"""
+        sat_id = self.satellite_ids[row]
+        sat_data = self.signal_analysis[sat_id]
+        point = self.points[row, col]
+        return {
+            'satellite_id': sat_id,
+            'constellation': sat_data['constellation'],
+            'timestamp': self.timestamps[col],
+            'signal_quality': point['signal_quality'],
+            'physical_parameters': point['physical_parameters'],
+            'summary': sat_data['summary']
+        }
+
+
+def _as_float(value: Any) -> float:
+    """None / 缺失值 → NaN"""
+    return np.nan if value is None else value
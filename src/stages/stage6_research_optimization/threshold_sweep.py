@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+3GPP 事件多門檻計數結果 - GPPEventDetector.detect_threshold_sweep() 輸出
+
+服務衛星選擇 (中位數 RSRP) 與門檻無關，各事件的觸發條件只是同一組
+RSRP / 地面距離數值與門檻的比較，且各事件類型只依賴自己的門檻:
+
+- A3: a3_offset_db
+- A4: a4_threshold_dbm
+- A5: (a5_threshold1_dbm, a5_threshold2_dbm)
+- D2: 依服務衛星星座的 (d2_threshold1_km, d2_threshold2_km)
+
+因此單次遍歷即可對每個時間點排序觸發數值，以 searchsorted 累計計數得到
+每個門檻值 (或門檻網格) 的事件數；任一完整門檻組合的事件數為各類型計數之和。
+事件列表需要時以 GPPEventDetector.detect_events_on_index() 依選定組合產生。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ThresholdSweepResult:
+    """各事件類型在門檻向量 / 網格上的事件數"""
+    a3_offset_db: np.ndarray
+    a3_counts: np.ndarray                                   # (K_a3,)
+    a4_threshold_dbm: np.ndarray
+    a4_counts: np.ndarray                                   # (K_a4,)
+    a5_threshold1_dbm: np.ndarray
+    a5_threshold2_dbm: np.ndarray
+    a5_counts: np.ndarray                                   # (K_a5_1, K_a5_2)
+    d2_thresholds_km: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    d2_counts: Dict[str, np.ndarray]                        # 星座 → (K_d2_1, K_d2_2)
+    total_time_points: int
+    time_points_processed: int
+    participating_satellites: int
+
+    def event_metrics(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        單一檢測器配置的事件統計 (門檻值必須包含在掃描向量中)
+
+        Args:
+            config: GPPEventDetector 配置 (平面門檻 + 星座 D2 門檻)
+
+        Returns:
+            與 parameter_sweep.event_metrics() 相同的指標字典
+
+        Raises:
+            ValueError: 門檻值不在掃描向量中
+        """
+        a3_count = int(self.a3_counts[_position(self.a3_offset_db, config['a3_offset_db'], 'a3_offset_db')])
+        a4_count = int(self.a4_counts[_position(self.a4_threshold_dbm, config['a4_threshold_dbm'], 'a4_threshold_dbm')])
+        a5_count = int(self.a5_counts[
+            _position(self.a5_threshold1_dbm, config['a5_threshold1_dbm'], 'a5_threshold1_dbm'),
+            _position(self.a5_threshold2_dbm, config['a5_threshold2_dbm'], 'a5_threshold2_dbm')
+        ])
+
+        d2_count = 0
+        for constellation, (thresholds1, thresholds2) in self.d2_thresholds_km.items():
+            threshold1_km, threshold2_km = d2_thresholds_for(config, constellation)
+            d2_count += int(self.d2_counts[constellation][
+                _position(thresholds1, threshold1_km, f"{constellation}.d2_threshold1_km"),
+                _position(thresholds2, threshold2_km, f"{constellation}.d2_threshold2_km")
+            ])
+
+        return {
+            'a3_count': a3_count,
+            'a4_count': a4_count,
+            'a5_count': a5_count,
+            'd2_count': d2_count,
+            'total_events': a3_count + a4_count + a5_count + d2_count,
+            'time_points_processed': self.time_points_processed,
+            'participating_satellites': self.participating_satellites,
+        }
+
+
+def d2_thresholds_for(config: Dict[str, Any], constellation: str) -> Tuple[float, float]:
+    """檢測器配置中服務衛星星座的 D2 門檻 (與 GPPEventDetector._resolve_d2_thresholds_km 相同規則)"""
+    section = config.get(constellation)
+    if isinstance(section, dict):
+        return section['d2_threshold1_km'], section['d2_threshold2_km']
+    return config['d2_threshold1_km'], config['d2_threshold2_km']
+
+
+def threshold_vector(values: Any) -> np.ndarray:
+    """門檻值 (純量或序列) → 一維 float64 向量"""
+    return np.atleast_1d(np.asarray(values, dtype=np.float64))
+
+
+def _position(values: np.ndarray, value: float, name: str) -> int:
+    matches = np.flatnonzero(values == value)
+    if len(matches) == 0:
+        raise ValueError(f"門檻 {name}={value} 不在掃描向量中: {values.tolist()}")
+    return int(matches[0])
@@ -0,0 +1,122 @@
+"""
+Unit tests for the background result writer
+
+Checks that writes run in submission order on one worker thread, that write
+failures are collected instead of raised, that run_or_submit() stays
+synchronous without an active writer, that save_stage_output() returns
+the planned path which exists once the writer is flushed, and that an
+executor waits for pending writes before handing in-memory results on.
+
+Author: Orbit Engine Team
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.stage_executors.base_executor import StageExecutor
+from src.shared.utils.background_writer import (
+    BackgroundResultWriter,
+    get_active_writer,
+    run_or_submit
+)
+from src.shared.utils.stage_handoff import HANDOFF_SUFFIX, load_stage_output, save_stage_output
+
+
+# ==================== Test Fixtures ====================
+
+class InMemoryExecutor(StageExecutor):
+    """只使用基類前階段載入流程的最小執行器"""
+
+    def load_config(self):
+        return {}
+
+    def create_processor(self, config):
+        return None
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_writes_run_in_submission_order():
+    order = []
+    threads = set()
+
+    def write(i):
+        threads.add(threading.current_thread().name)
+        order.append(i)
+
+    with BackgroundResultWriter() as writer:
+        assert get_active_writer() is writer
+        for i in range(20):
+            run_or_submit(f"write-{i}", write, i)
+
+    assert order == list(range(20))
+    assert len(threads) == 1 and threading.current_thread().name not in threads
+    assert writer.completed == 20
+    assert get_active_writer() is None
+
+
+@pytest.mark.unit
+def test_write_errors_are_collected():
+    def fail():
+        raise OSError("disk full")
+
+    with BackgroundResultWriter() as writer:
+        writer.submit("stage3_output", fail)
+        writer.submit("stage4_output", lambda: None)
+
+    assert writer.errors == ["stage3_output: disk full"]
+    assert writer.completed == 1
+
+
+@pytest.mark.unit
+def test_run_or_submit_is_synchronous_without_writer():
+    calls = []
+
+    assert run_or_submit("sync", calls.append, 1) is None
+    assert calls == [1]
+
+
+@pytest.mark.unit
+def test_nested_writer_is_rejected():
+    with BackgroundResultWriter():
+        with pytest.raises(RuntimeError):
+            with BackgroundResultWriter():
+                pass
+
+
+@pytest.mark.unit
+def test_stage_output_exists_after_flush(tmp_path):
+    data = {'stage': 'stage3_coordinate_transformation', 'satellites': {'A': {'x': [1.0, 2.0]}}}
+
+    with BackgroundResultWriter() as writer:
+        output_file = save_stage_output(data, tmp_path, 'stage3_output')
+        assert output_file == tmp_path / f"stage3_output{HANDOFF_SUFFIX}"
+        writer.flush()
+        assert output_file.exists()
+
+    assert load_stage_output(output_file) == data
+
+
+@pytest.mark.unit
+def test_in_memory_handoff_waits_for_pending_writes():
+    previous_data = {'satellites': {'A': {'time_series': [{'x': 1.0}]}}}
+    written = []
+
+    def slow_write(data):
+        time.sleep(0.2)
+        written.append(data['satellites']['A']['time_series'][0]['x'])
+
+    with BackgroundResultWriter() as writer:
+        writer.submit('stage2_output', slow_write, previous_data)
+        handed_on = InMemoryExecutor(3, 'test')._load_previous_stage_data(
+            {'stage2': SimpleNamespace(data=previous_data)}
+        )
+        # 交出前背景序列化已完成 → 下一階段修改巢狀物件不會與寫入競爭
+        assert written == [1.0] and writer.pending_count == 0
+        handed_on['satellites']['A']['time_series'][0]['x'] = 2.0
+
+    assert handed_on == previous_data and written == [1.0]
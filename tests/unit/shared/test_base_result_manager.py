@@ -332,7 +332,7 @@ def test_save_results_standard_workflow(manager, temp_dir):
 
         with patch.object(manager, '_create_output_directory', return_value=output_dir):
             with patch.object(manager, '_generate_timestamp', return_value='20251015_143052'):
-                output_file = manager.save_results(test_results)
+                output_file = manager.save_results(test_results, output_format='json')
 
         # Check file was created
         output_path = Path(output_file)
@@ -354,7 +354,7 @@ def test_save_results_with_custom_filename(manager, temp_dir):
     test_results = {'stage': 5, 'data': {}}
 
     with patch.object(manager, '_create_output_directory', return_value=output_dir):
-        output_file = manager.save_results(test_results, custom_filename='custom_output')
+        output_file = manager.save_results(test_results, output_format='json', custom_filename='custom_output')
 
     output_path = Path(output_file)
     assert output_path.exists()
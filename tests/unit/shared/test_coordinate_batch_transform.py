@@ -0,0 +1,100 @@
+"""
+Unit tests for the vectorized TEME → WGS84 path
+
+Validates WGS84Manager.convert_cartesian_to_geodetic_batch against the scalar
+Bowring implementation, and SkyfieldCoordinateEngine.convert_teme_to_wgs84_batch
+against convert_teme_to_wgs84 on a shared time grid.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pytest
+
+from src.shared.coordinate_systems.wgs84_manager import WGS84Manager
+
+
+# ==================== Test Fixtures ====================
+
+@pytest.fixture(scope='module')
+def wgs84_manager():
+    return WGS84Manager()
+
+
+@pytest.fixture(scope='module')
+def coordinate_engine():
+    from src.shared.coordinate_systems.skyfield_coordinate_engine import SkyfieldCoordinateEngine
+    try:
+        return SkyfieldCoordinateEngine()
+    except RuntimeError as e:
+        pytest.skip(f"Skyfield 星歷數據不可用: {e}")
+
+
+def make_positions(n_sat, n_times, radius_km=6928.0, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = rng.normal(size=(n_sat, n_times, 3))
+    positions *= radius_km / np.linalg.norm(positions, axis=-1, keepdims=True)
+    velocities = rng.normal(size=(n_sat, n_times, 3)) * 7.5
+    return positions, velocities
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_geodetic_batch_matches_scalar(wgs84_manager):
+    positions, _ = make_positions(4, 25)
+    positions[0, 0] = [0.0, 0.0, 6900.0]  # 北極
+    positions[1, 0] = [0.0, 0.0, -6900.0]  # 南極
+    xyz_m = positions * 1000.0
+
+    lat, lon, alt = wgs84_manager.convert_cartesian_to_geodetic_batch(
+        xyz_m[..., 0], xyz_m[..., 1], xyz_m[..., 2]
+    )
+
+    assert lat.shape == (4, 25)
+    for i, j in np.ndindex(lat.shape):
+        expected = wgs84_manager.convert_cartesian_to_geodetic(*xyz_m[i, j].tolist())
+        np.testing.assert_allclose([lat[i, j], lon[i, j]], expected[:2], atol=1e-10)
+        assert alt[i, j] == pytest.approx(expected[2], abs=1e-6)
+
+
+@pytest.mark.unit
+def test_geodetic_batch_propagates_nan(wgs84_manager):
+    xyz_m = make_positions(1, 3)[0][0] * 1000.0
+    xyz_m[1] = np.nan
+
+    lat, lon, alt = wgs84_manager.convert_cartesian_to_geodetic_batch(
+        xyz_m[:, 0], xyz_m[:, 1], xyz_m[:, 2]
+    )
+
+    assert np.isnan([lat[1], lon[1], alt[1]]).all()
+    assert np.isfinite(lat[[0, 2]]).all()
+
+
+@pytest.mark.unit
+def test_teme_batch_matches_scalar(coordinate_engine):
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    times = [start + timedelta(seconds=30 * i) for i in range(12)]
+    positions, velocities = make_positions(3, len(times), seed=1)
+
+    result = coordinate_engine.convert_teme_to_wgs84_batch(positions, velocities, times)
+
+    assert result.latitude_deg.shape == (3, len(times))
+    for i, j in np.ndindex(result.latitude_deg.shape):
+        expected = coordinate_engine.convert_teme_to_wgs84(
+            positions[i, j].tolist(), velocities[i, j].tolist(), times[j]
+        )
+        assert result.latitude_deg[i, j] == pytest.approx(expected.latitude_deg, abs=1e-9)
+        assert result.longitude_deg[i, j] == pytest.approx(expected.longitude_deg, abs=1e-9)
+        assert result.altitude_m[i, j] == pytest.approx(expected.altitude_m, abs=1e-4)
+        assert result.accuracy_estimate_m[i, j] == pytest.approx(expected.accuracy_estimate_m)
+
+
+@pytest.mark.unit
+def test_teme_batch_rejects_time_axis_mismatch(coordinate_engine):
+    positions, velocities = make_positions(2, 5)
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        coordinate_engine.convert_teme_to_wgs84_batch(positions, velocities, [start] * 4)
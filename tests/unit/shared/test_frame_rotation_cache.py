@@ -0,0 +1,69 @@
+"""
+Unit tests for FrameRotationCache
+
+Checks that cached GCRS → ITRS matrices are identical to Skyfield's direct
+rotation_at() output, that repeated epochs are computed once, and that the
+LRU bound is respected.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pytest
+
+from skyfield.api import load
+from skyfield.framelib import itrs
+
+from src.shared.coordinate_systems.frame_rotation_cache import FrameRotationCache
+
+
+# ==================== Test Fixtures ====================
+
+@pytest.fixture(scope='module')
+def timescale():
+    return load.timescale(builtin=True)
+
+
+@pytest.fixture
+def time_grid():
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    return [start + timedelta(seconds=30 * i) for i in range(10)]
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_cached_matrices_match_skyfield(timescale, time_grid):
+    cache = FrameRotationCache(timescale, itrs)
+
+    rotation = cache.rotation_matrices(time_grid)
+
+    expected = itrs.rotation_at(timescale.from_datetimes(time_grid))
+    assert rotation.shape == (3, 3, len(time_grid))
+    np.testing.assert_array_equal(rotation, expected)
+
+
+@pytest.mark.unit
+def test_repeated_epochs_computed_once(timescale, time_grid):
+    cache = FrameRotationCache(timescale, itrs)
+
+    # 三顆衛星攤平在同一時間網格上
+    rotation = cache.rotation_matrices(time_grid * 3)
+    cache.rotation_matrices(time_grid[:4])
+
+    assert rotation.shape == (3, 3, 3 * len(time_grid))
+    np.testing.assert_array_equal(rotation[:, :, 0], rotation[:, :, len(time_grid)])
+    assert cache.misses == len(time_grid)
+    assert cache.hits == 4
+
+
+@pytest.mark.unit
+def test_lru_bound(timescale, time_grid):
+    cache = FrameRotationCache(timescale, itrs, max_entries=4)
+
+    cache.rotation_matrices(time_grid)
+
+    assert len(cache) == 4
+    assert cache.get_statistics()['cached_epochs'] == 4
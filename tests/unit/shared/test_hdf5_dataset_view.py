@@ -0,0 +1,172 @@
+"""
+Unit tests for the lazy HDF5 satellite dataset view
+
+Covers both on-disk layouts (Stage 2 constellation → satellite groups with
+gzip datasets, Stage 3 cache satellite groups with contiguous datasets),
+memory-mapped column access, padded stacking across satellites with
+different point counts, per-time slices, the Stage 3 cache round trip
+through Stage3ResultsManager, and the Stage 3 columnar block built straight
+from a Stage 2 file (rejected when a row has mid-series gaps).
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import h5py
+import numpy as np
+import pytest
+
+from src.shared.data_structures import OrbitalStateBlock
+from src.shared.utils.hdf5_dataset_view import SatelliteDatasetView
+from src.stages.stage3_coordinate_transformation.stage3_data_extractor import Stage3DataExtractor
+from src.stages.stage3_coordinate_transformation.stage3_results_manager import Stage3ResultsManager
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+
+
+def timestamps(n):
+    return [f"2025-10-02T02:{30 + i // 2:02d}:{30 * (i % 2):02d}+00:00" for i in range(n)]
+
+
+def write_stage2_file(path, time_indices):
+    """Stage 2 分組布局；time_indices: {constellation: {sat_id: 時間網格索引}}"""
+    with h5py.File(path, 'w') as f:
+        f.attrs['coordinate_system'] = 'TEME'
+        for constellation, sats in time_indices.items():
+            group = f.create_group(constellation)
+            for sat_id, indices in sats.items():
+                n = len(indices)
+                sat = group.create_group(sat_id)
+                sat.create_dataset('position_teme_km', data=np.arange(n * 3, dtype=float).reshape(n, 3),
+                                   compression='gzip')
+                sat.create_dataset('velocity_teme_km_s', data=np.ones((n, 3)), compression='gzip')
+                grid = timestamps(max(indices) + 1)
+                sat.create_dataset('timestamps_utc', data=np.array([grid[i] for i in indices], dtype='S32'))
+                sat.attrs['epoch_datetime'] = '2025-10-02T00:30:00+00:00'
+    return path
+
+
+@pytest.fixture
+def stage2_file(tmp_path):
+    return write_stage2_file(tmp_path / 'stage2.h5', {
+        'starlink': {'S1': range(4), 'S2': range(3)},
+        'oneweb': {'O1': range(5)}
+    })
+
+
+@pytest.fixture
+def geographic_coordinates():
+    return {
+        sat_id: {
+            'constellation': 'starlink',
+            'epoch_datetime': '2025-10-02T00:30:00+00:00',
+            'algorithm_used': 'SGP4',
+            'transformation_metadata': {'satellite_id': sat_id},
+            'time_series': [
+                {
+                    'timestamp': ts,
+                    'latitude_deg': 20.0 + row + i,
+                    'longitude_deg': 120.0 - i,
+                    'altitude_m': 550000.0 + 10 * i
+                }
+                for i, ts in enumerate(timestamps(4))
+            ]
+        }
+        for row, sat_id in enumerate(['A', 'B'])
+    }
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_stage2_layout_columns_and_slices(stage2_file):
+    with SatelliteDatasetView(stage2_file) as view:
+        assert view.satellite_ids == ['O1', 'S1', 'S2']
+        assert view.constellation('O1') == 'oneweb'
+        assert not view.is_memory_mapped('S1', 'position_teme_km')
+
+        np.testing.assert_array_equal(view.column('S1', 'position_teme_km', slice(1, 3)),
+                                      [[3, 4, 5], [6, 7, 8]])
+        assert view.timestamps('S2').tolist() == timestamps(3)
+        assert view.column('S2', 'timestamps_utc', 0) == timestamps(1)[0]
+
+
+@pytest.mark.unit
+def test_stack_and_time_slice_pad_short_satellites(stage2_file):
+    with SatelliteDatasetView(stage2_file) as view:
+        positions, lengths = view.stack('position_teme_km', ['S1', 'S2', 'O1'])
+        assert positions.shape == (3, 5, 3)
+        assert lengths.tolist() == [4, 3, 5]
+        assert np.isnan(positions[1, 3:]).all()
+
+        at_3 = view.at_time('position_teme_km', 3, ['S1', 'S2', 'O1'])
+        np.testing.assert_array_equal(at_3[0], [9, 10, 11])
+        assert np.isnan(at_3[1]).all()
+
+
+@pytest.mark.unit
+def test_stage3_cache_is_memory_mapped(tmp_path, geographic_coordinates):
+    manager = Stage3ResultsManager(output_dir=tmp_path, config={'cache_dir': str(tmp_path / 'cache')})
+    assert manager.save_to_cache('k', geographic_coordinates, {'total_satellites': 2})
+    _, cache_file = manager.check_cache('k')
+
+    with manager.open_cache_view(cache_file) as view:
+        assert view.is_memory_mapped('B', 'latitudes')
+        np.testing.assert_array_equal(view.column('B', 'latitudes'), [21.0, 22.0, 23.0, 24.0])
+
+    loaded = manager.load_from_cache(cache_file)
+    point = loaded['geographic_coordinates']['A']['time_series'][2]
+    assert point['timestamp'] == timestamps(4)[2]
+    assert point['latitude_deg'] == 22.0 and point['altitude_km'] == 550.02
+    assert loaded['geographic_coordinates']['A']['transformation_metadata'] == {'satellite_id': 'A'}
+
+
+@pytest.mark.unit
+def test_stage3_cache_attaches_geodetic_block(tmp_path, geographic_coordinates):
+    manager = Stage3ResultsManager(output_dir=tmp_path, config={'cache_dir': str(tmp_path / 'cache')})
+    manager.save_to_cache('k', geographic_coordinates, {})
+    _, cache_file = manager.check_cache('k')
+    block = OrbitalStateBlock(
+        satellite_ids=['B', 'A'],
+        constellations=['starlink'] * 2,
+        epoch_datetimes=['2025-10-02T00:30:00+00:00'] * 2,
+        time_start_utc=START,
+        interval_seconds=30.0,
+        positions_km=np.zeros((2, 4, 3)),
+        velocities_km_s=np.zeros((2, 4, 3)),
+        epoch_offsets_minutes=np.full(2, 120.0),
+        valid_mask=np.ones((2, 4), dtype=bool)
+    )
+
+    geodetic = manager.load_geodetic_block(cache_file, block)
+
+    np.testing.assert_array_equal(geodetic.latitude_deg[0], [21.0, 22.0, 23.0, 24.0])
+    np.testing.assert_array_equal(geodetic.altitude_m[1], [550000.0, 550010.0, 550020.0, 550030.0])
+    assert manager.load_geodetic_block(cache_file, block.select([0])) is None
+
+
+@pytest.mark.unit
+@pytest.mark.stage3
+def test_stage3_block_from_stage2_file(stage2_file):
+    block = Stage3DataExtractor().extract_orbital_state_block(str(stage2_file))
+
+    assert block.satellite_ids == ['O1', 'S1', 'S2']
+    assert block.interval_seconds == 30.0
+    np.testing.assert_array_equal(block.valid_mask.sum(axis=1), [5, 4, 3])
+    np.testing.assert_array_equal(block.positions_km[1, 3], [9, 10, 11])
+
+
+@pytest.mark.unit
+@pytest.mark.stage3
+def test_stage3_block_rejects_gapped_stage2_row(tmp_path):
+    # S1 缺少網格第 2 點 (SGP4 錯誤略過 / 自適應取樣窗口外)，首兩點仍與其他衛星一致
+    path = write_stage2_file(tmp_path / 'stage2_gapped.h5', {
+        'starlink': {'S1': [0, 1, 3, 4], 'S2': range(3)},
+        'oneweb': {'O1': range(5)}
+    })
+
+    assert Stage3DataExtractor().extract_orbital_state_block(str(path)) is None
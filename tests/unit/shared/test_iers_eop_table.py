@@ -0,0 +1,122 @@
+"""
+Unit tests for the sorted-array IERS EOP lookup
+
+Writes a synthetic finals2000A.all into a temporary cache directory and checks
+that IERSDataManager.get_eop_arrays() reproduces the scalar lookup chain
+(exact match → Bulletin A within 1 day → ±2 day linear interpolation).
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.coordinate_systems.iers_data_manager import IERSDataManager
+
+
+# ==================== Test Fixtures ====================
+
+FIRST_MJD = 60900
+GAP_MJDS = {60910, 60911, 60912, 60913}  # 4 天缺口 (窗口內無數據)
+
+
+def finals_line(mjd, x, y, ut1_utc, lod):
+    line = [' '] * 188
+    for start, text in (
+        (7, f"{mjd:8.2f}"),
+        (18, f"{x:9.6f}"), (27, f"{0.000091:9.6f}"),
+        (37, f"{y:9.6f}"), (46, f"{0.000087:9.6f}"),
+        (58, f"{ut1_utc:10.7f}"), (68, f"{0.0000123:10.7f}"),
+        (79, f"{lod:7.4f}"),
+    ):
+        line[start:start + len(text)] = text
+    return ''.join(line) + '\n'
+
+
+def eop_row(mjd):
+    return mjd, 0.1 + 1e-3 * (mjd - FIRST_MJD), 0.3 - 2e-3 * (mjd - FIRST_MJD), \
+        0.05 - 1e-4 * (mjd - FIRST_MJD) ** 2, 1.2
+
+
+@pytest.fixture
+def iers_manager(tmp_path):
+    mjds = [mjd for mjd in range(FIRST_MJD, FIRST_MJD + 30) if mjd not in GAP_MJDS]
+    (tmp_path / "finals2000A.all").write_text(''.join(finals_line(*eop_row(mjd)) for mjd in mjds))
+    return IERSDataManager(cache_dir=tmp_path)
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_exact_and_interpolated_values(iers_manager):
+    mjds = np.array([60901.0, 60901.25, 60905.5, 60929.0])
+
+    eop = iers_manager.get_eop_arrays(mjds)
+
+    assert eop['available'].all()
+    assert list(eop['data_source']) == ['USNO_Finals2000A', 'Interpolated', 'Interpolated', 'USNO_Finals2000A']
+    # 精確匹配保留文件中的誤差；插值使用固定誤差估計
+    np.testing.assert_allclose(eop['x_error'], [0.000091, 0.2, 0.2, 0.000091])
+    np.testing.assert_allclose(eop['ut1_utc_error'], [0.0000123, 0.1, 0.1, 0.0000123])
+
+    table_mjd = np.arange(FIRST_MJD, FIRST_MJD + 30, dtype=float)
+    table_ut1 = np.array([eop_row(mjd)[3] for mjd in table_mjd])
+    np.testing.assert_allclose(eop['ut1_utc_sec'], np.interp(mjds, table_mjd, table_ut1), atol=1e-7)
+
+
+def reference_lookup(eop_cache, mjd):
+    """原逐點查詢: 精確鍵 → ±2 天窗口 np.interp (逐筆掃描字典)"""
+    if f"{mjd:.1f}" in eop_cache:
+        eop = eop_cache[f"{mjd:.1f}"]
+        return eop.x_arcsec, eop.ut1_utc_sec, eop.x_error
+    window = sorted((eop.mjd, eop) for eop in eop_cache.values() if abs(eop.mjd - mjd) <= 2.0)
+    if len(window) < 2:
+        return None
+    mjds = [m for m, _ in window]
+    return (np.interp(mjd, mjds, [eop.x_arcsec for _, eop in window]),
+            np.interp(mjd, mjds, [eop.ut1_utc_sec for _, eop in window]), 0.2)
+
+
+@pytest.mark.unit
+def test_batch_matches_linear_scan_lookup(iers_manager):
+    mjds = np.linspace(FIRST_MJD - 3.0, FIRST_MJD + 33.0, 401)
+
+    eop = iers_manager.get_eop_arrays(mjds)
+
+    for i, mjd in enumerate(mjds):
+        expected = reference_lookup(iers_manager._eop_cache, mjd)
+        if expected is None:
+            assert not eop['available'][i]
+            assert np.isnan(eop['x_arcsec'][i])
+            continue
+        assert eop['available'][i]
+        actual = (eop['x_arcsec'][i], eop['ut1_utc_sec'][i], eop['x_error'][i])
+        np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.unit
+def test_window_and_gap_semantics(iers_manager):
+    # 缺口中心 (前後 2 天內無數據) → 無數據；缺口邊緣 → 窗口單側端點值 (同 np.interp)
+    eop = iers_manager.get_eop_arrays([60911.5, 60910.0, FIRST_MJD - 1.0, FIRST_MJD - 2.5])
+
+    assert list(eop['available']) == [False, True, True, False]
+    assert eop['x_arcsec'][1] == pytest.approx(eop_row(60909)[1])
+    assert eop['x_arcsec'][2] == pytest.approx(eop_row(FIRST_MJD)[1])
+    with pytest.raises(ValueError):
+        iers_manager.get_earth_orientation_parameters(datetime(2025, 9, 25, 12, tzinfo=timezone.utc))
+
+
+@pytest.mark.unit
+def test_bulletin_a_preferred_within_one_day(iers_manager):
+    iers_manager._parse_bulletin_a({'data': [
+        {'mjd': 60915.5, 'x': 0.5, 'y': 0.4, 'ut1_utc': -0.2, 'x_err': 0.01}
+    ]})
+
+    eop = iers_manager.get_eop_arrays([60915.1, 60916.2, 60917.0])
+
+    assert list(eop['data_source']) == ['IERS_BulletinA', 'IERS_BulletinA', 'USNO_Finals2000A']
+    np.testing.assert_allclose(eop['x_arcsec'][:2], 0.5)
+    assert eop['mjd'][0] == 60915.5
+    assert iers_manager.get_data_quality_report()['cache_size'] == 27
@@ -0,0 +1,115 @@
+"""
+Unit tests for the incremental per-satellite state store
+
+Checks that a second run only re-processes satellites whose input fingerprint
+changed, that stored entries round-trip, that a settings change invalidates
+the manifest, and that OrbitalStateBlock row fingerprints ignore padding and
+block layout (Stage 2 state entries rebuilt from disk hash equally).
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.base import IncrementalSatelliteStore
+from src.shared.data_structures import OrbitalStateBlock
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+
+
+def make_store(directory, settings='v1'):
+    return IncrementalSatelliteStore(2, directory, settings_fingerprint=settings)
+
+
+def make_block(satellite_ids, n_times, seed=0):
+    rng = np.random.default_rng(seed)
+    n_sat = len(satellite_ids)
+    return OrbitalStateBlock(
+        satellite_ids=list(satellite_ids),
+        constellations=['starlink'] * n_sat,
+        epoch_datetimes=['2025-10-02T00:30:00+00:00'] * n_sat,
+        time_start_utc=START,
+        interval_seconds=30.0,
+        positions_km=rng.normal(size=(n_sat, n_times, 3)) * 7000.0,
+        velocities_km_s=rng.normal(size=(n_sat, n_times, 3)) * 7.5,
+        epoch_offsets_minutes=np.full(n_sat, 120.0),
+        valid_mask=np.ones((n_sat, n_times), dtype=bool)
+    )
+
+
+@pytest.fixture(autouse=True)
+def incremental_env(monkeypatch):
+    monkeypatch.delenv('ORBIT_ENGINE_INCREMENTAL', raising=False)
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_second_run_reuses_unchanged_satellites(tmp_path):
+    first = make_store(tmp_path)
+    plan = first.plan({'A': 'a1', 'B': 'b1', 'C': 'c1'})
+    assert plan.dirty_ids == ['A', 'B', 'C'] and plan.is_full_run
+    first.save(plan.fingerprints, {sat_id: {'values': np.arange(3.0) + i} for i, sat_id in enumerate('ABC')})
+
+    second = make_store(tmp_path)
+    plan = second.plan({'A': 'a1', 'B': 'b2', 'D': 'd1'})
+
+    assert plan.dirty_ids == ['B', 'D']
+    assert plan.reused_ids == ['A']
+    assert plan.removed_ids == ['C']
+    assert plan.summary() == {
+        'enabled': True, 'dirty_satellites': 2, 'reused_satellites': 1, 'removed_satellites': 1
+    }
+    reused = second.load(plan.reused_ids)
+    np.testing.assert_array_equal(reused['A']['values'], np.arange(3.0))
+
+
+@pytest.mark.unit
+def test_save_replaces_previous_entries_file(tmp_path):
+    store = make_store(tmp_path)
+    store.save(store.plan({'A': 'a1'}).fingerprints, {'A': {'x': 1}})
+    store.save(store.plan({'A': 'a2'}).fingerprints, {'A': {'x': 2}})
+
+    assert len(list(tmp_path.glob('entries_*.h5'))) == 1
+    plan = store.plan({'A': 'a2'})
+    assert store.load(plan.reused_ids)['A']['x'] == 2
+
+
+@pytest.mark.unit
+def test_settings_change_reprocesses_everything(tmp_path):
+    store = make_store(tmp_path, settings='v1')
+    store.save(store.plan({'A': 'a1'}).fingerprints, {'A': {'x': 1}})
+
+    plan = make_store(tmp_path, settings='v2').plan({'A': 'a1'})
+
+    assert plan.dirty_ids == ['A'] and plan.is_full_run
+
+
+@pytest.mark.unit
+def test_disabled_by_default(monkeypatch):
+    class Processor:
+        stage_number = 2
+        config = {}
+
+    assert IncrementalSatelliteStore.for_processor(Processor()) is None
+
+
+@pytest.mark.unit
+def test_row_fingerprints_ignore_padding_and_layout():
+    block = make_block(['A', 'B'], 4)
+    padded = OrbitalStateBlock.concatenate([block, make_block(['C'], 6, seed=1)])
+    padded.positions_km[0, 4:] = 123.0  # 補齊區域的填充值不影響指紋
+
+    assert padded.row_fingerprints()[:2] == block.row_fingerprints()
+    assert block.select([1]).row_fingerprints() == block.row_fingerprints()[1:]
+
+    changed = make_block(['A', 'B'], 4)
+    changed.positions_km[0, 2, 0] += 1e-9
+    assert changed.row_fingerprints()[0] != block.row_fingerprints()[0]
+    assert changed.row_fingerprints()[1] == block.row_fingerprints()[1]
@@ -0,0 +1,134 @@
+"""
+Unit tests for OrbitalStateBlock
+
+Covers shape validation, legacy export views, concatenation of blocks with
+different point counts (Starlink 190 vs OneWeb 220) and round-tripping from
+the Stage 2 JSON `satellites` structure, and checks that every stage imports
+the same OrbitalStateBlock class.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.data_structures import OrbitalStateBlock
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+
+
+def make_block(satellite_ids, n_times, constellation='starlink', seed=0):
+    rng = np.random.default_rng(seed)
+    n_sat = len(satellite_ids)
+    return OrbitalStateBlock(
+        satellite_ids=list(satellite_ids),
+        constellations=[constellation] * n_sat,
+        epoch_datetimes=['2025-10-02T00:30:00+00:00'] * n_sat,
+        time_start_utc=START,
+        interval_seconds=30.0,
+        positions_km=rng.normal(size=(n_sat, n_times, 3)) * 7000.0,
+        velocities_km_s=rng.normal(size=(n_sat, n_times, 3)) * 7.5,
+        epoch_offsets_minutes=np.full(n_sat, 120.0),
+        valid_mask=np.ones((n_sat, n_times), dtype=bool)
+    )
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_shape_mismatch_raises():
+    with pytest.raises(ValueError):
+        OrbitalStateBlock(
+            satellite_ids=['1'],
+            constellations=['starlink'],
+            epoch_datetimes=['2025-10-02T00:30:00+00:00'],
+            time_start_utc=START,
+            interval_seconds=30.0,
+            positions_km=np.zeros((1, 4, 3)),
+            velocities_km_s=np.zeros((1, 5, 3)),
+            epoch_offsets_minutes=np.zeros(1),
+            valid_mask=np.ones((1, 4), dtype=bool)
+        )
+
+
+@pytest.mark.unit
+def test_time_axis_and_epoch_offsets():
+    block = make_block(['1', '2'], 4)
+    assert block.timestamps[1] == '2025-10-02T02:30:30+00:00'
+    np.testing.assert_allclose(block.time_since_epoch_minutes(0), [120.0, 120.5, 121.0, 121.5])
+
+
+@pytest.mark.unit
+def test_concatenate_pads_shorter_grid():
+    starlink = make_block(['1', '2'], 190)
+    oneweb = make_block(['3'], 220, constellation='oneweb', seed=1)
+
+    merged = OrbitalStateBlock.concatenate([starlink, oneweb])
+
+    assert merged.positions_km.shape == (3, 220, 3)
+    assert merged.point_counts.tolist() == [190, 190, 220]
+    assert np.isnan(merged.positions_km[0, 190:]).all()
+    np.testing.assert_array_equal(merged.positions_km[2], oneweb.positions_km[0])
+
+
+@pytest.mark.unit
+def test_concatenate_rejects_different_start():
+    block = make_block(['1'], 4)
+    other = make_block(['2'], 4)
+    other.time_start_utc = datetime(2025, 10, 2, 3, 0, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        OrbitalStateBlock.concatenate([block, other])
+
+
+@pytest.mark.unit
+def test_round_trip_through_stage2_json_structure():
+    block = OrbitalStateBlock.concatenate([
+        make_block(['1', '2'], 6),
+        make_block(['3'], 8, constellation='oneweb', seed=1)
+    ])
+    satellites = {}
+    for row, sat_id in enumerate(block.satellite_ids):
+        satellites.setdefault(block.constellations[row], {})[sat_id] = {
+            'satellite_id': sat_id,
+            'epoch_datetime': block.epoch_datetimes[row],
+            'orbital_states': block.to_orbital_states(row),
+            'algorithm_used': 'SGP4',
+            'coordinate_system': 'TEME'
+        }
+
+    rebuilt = OrbitalStateBlock.from_stage2_satellites(satellites)
+
+    assert rebuilt.satellite_ids == block.satellite_ids
+    assert rebuilt.interval_seconds == 30.0
+    np.testing.assert_array_equal(rebuilt.valid_mask, block.valid_mask)
+    np.testing.assert_allclose(rebuilt.positions_km[block.valid_mask], block.positions_km[block.valid_mask])
+    np.testing.assert_allclose(rebuilt.epoch_offsets_minutes, block.epoch_offsets_minutes)
+
+
+@pytest.mark.unit
+def test_geodetic_export_requires_stage3_columns():
+    block = make_block(['1'], 3)
+    with pytest.raises(ValueError):
+        block.to_geodetic_time_series(0)
+
+    shape = block.valid_mask.shape
+    geodetic = block.with_geodetic(np.full(shape, 25.0), np.full(shape, 121.0), np.full(shape, 550000.0))
+    series = geodetic.to_geodetic_time_series(0)
+    assert len(series) == 3
+    assert series[0]['altitude_km'] == 550.0
+    assert geodetic.positions_km is block.positions_km
+
+
+@pytest.mark.unit
+def test_stages_share_one_block_class():
+    from src.stages.stage2_orbital_computing import incremental_propagation
+    from src.stages.stage3_coordinate_transformation import stage3_data_extractor
+    from src.stages.stage4_link_feasibility.data_processing import coordinate_extractor
+
+    for module in (incremental_propagation, stage3_data_extractor, coordinate_extractor):
+        assert module.OrbitalStateBlock is OrbitalStateBlock
@@ -0,0 +1,98 @@
+"""
+Unit tests for the append-only per-satellite result spool
+
+Appends Stage 4 style candidate entries in several chunks and checks that
+they load back in the requested order (also after reopening read-only),
+that duplicate satellite IDs are rejected, and that chunks written through
+an active BackgroundResultWriter are complete once loaded.
+
+Author: Orbit Engine Team
+"""
+
+import h5py
+import pytest
+
+from src.shared.utils.background_writer import BackgroundResultWriter
+from src.shared.utils.satellite_result_spool import SPOOL_SUFFIX, SatelliteResultSpool
+
+
+# ==================== Test Fixtures ====================
+
+def candidate_entry(satellite_id, n_points):
+    return {
+        'satellite_id': satellite_id,
+        'name': f'STARLINK-{satellite_id}',
+        'constellation': 'starlink',
+        'time_series': [
+            {
+                'timestamp': f'2025-10-01T12:{minute:02d}:00+00:00',
+                'visibility_metrics': {'elevation_deg': 10.0 + minute, 'is_connectable': True},
+                'position': {'latitude_deg': 24.0 + 0.1 * minute, 'longitude_deg': 121.0}
+            }
+            for minute in range(n_points)
+        ],
+        'service_window': {'duration_minutes': float(n_points)}
+    }
+
+
+def chunks():
+    return [
+        {str(44700 + i): candidate_entry(str(44700 + i), 3 + i) for i in range(start, start + 4)}
+        for start in (0, 4, 8)
+    ]
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_append_and_load_in_requested_order(tmp_path):
+    path = tmp_path / f'stream{SPOOL_SUFFIX}'
+    with SatelliteResultSpool(path) as spool:
+        for chunk in chunks():
+            spool.append('stage4', chunk)
+        spool.append('stage4', {})
+
+        assert spool.count('stage4') == 12 and spool.count('stage5') == 0
+        assert spool.satellite_ids('stage4')[:2] == ['44700', '44701']
+
+        requested = ['44709', '44700', '44705']
+        loaded = spool.load('stage4', requested)
+        assert list(loaded) == requested
+        assert loaded['44705'] == candidate_entry('44705', 8)
+        assert spool.summary()['chunks'] == {'stage4': 3}
+
+        with pytest.raises(KeyError):
+            spool.load('stage4', ['99999'])
+
+    with SatelliteResultSpool(path, mode='r') as reopened:
+        assert reopened.satellite_ids('stage4') == [sid for chunk in chunks() for sid in chunk]
+        assert reopened.load('stage4', ['44711'])['44711'] == candidate_entry('44711', 14)
+        with pytest.raises(ValueError):
+            reopened.append('stage4', {'1': {}})
+
+
+@pytest.mark.unit
+def test_duplicate_satellite_rejected(tmp_path):
+    with SatelliteResultSpool(tmp_path / f'dup{SPOOL_SUFFIX}') as spool:
+        spool.append('stage4', {'44700': candidate_entry('44700', 2)})
+        with pytest.raises(ValueError):
+            spool.append('stage4', {'44700': candidate_entry('44700', 2)})
+        # 不同類別可使用相同衛星 ID
+        spool.append('stage5', {'44700': {'summary': {'average_quality_level': 'good'}}})
+        assert spool.count('stage5') == 1
+
+
+@pytest.mark.unit
+def test_background_writer_chunks_complete_on_load(tmp_path):
+    path = tmp_path / f'bg{SPOOL_SUFFIX}'
+    with BackgroundResultWriter() as writer:
+        with SatelliteResultSpool(path) as spool:
+            for chunk in chunks():
+                spool.append('stage4', chunk)
+            loaded = spool.load('stage4', ['44703', '44710'])
+    assert writer.errors == []
+    assert loaded['44710'] == candidate_entry('44710', 13)
+
+    h5py.File(tmp_path / 'plain.h5', 'w').close()
+    with pytest.raises(ValueError):
+        SatelliteResultSpool(tmp_path / 'plain.h5', mode='r')
@@ -0,0 +1,77 @@
+"""
+Unit tests for the shared-memory coordinate transform pool
+
+Covers the shared array descriptor round trip, lossless UTC epoch packing and
+parity of the persistent pool against the in-process conversion.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pytest
+
+from src.shared.coordinate_systems.shared_memory_pool import (
+    SharedArray,
+    datetimes_to_epoch_us,
+    epoch_us_to_datetimes,
+    get_transform_pool,
+    shutdown_transform_pool,
+)
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_shared_array_attach_sees_owner_writes():
+    owner = SharedArray.create((4, 3), np.float64)
+    try:
+        owner.array[...] = np.arange(12.0).reshape(4, 3)
+        attached = SharedArray.attach(owner.spec)
+        np.testing.assert_array_equal(attached.array, owner.array)
+        attached.array[0, 0] = -1.0
+        attached.close()
+        assert owner.array[0, 0] == -1.0
+    finally:
+        owner.close()
+
+
+@pytest.mark.unit
+def test_epoch_microseconds_round_trip():
+    start = datetime(2025, 10, 2, 2, 30, 0, 123456, tzinfo=timezone.utc)
+    times = [start + timedelta(seconds=30 * i) for i in range(5)]
+
+    epochs_us = datetimes_to_epoch_us(times)
+
+    assert epochs_us.dtype == np.int64
+    assert epoch_us_to_datetimes(epochs_us) == times
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+def test_pool_matches_in_process_conversion():
+    from src.shared.coordinate_systems.skyfield_coordinate_engine import SkyfieldCoordinateEngine
+    try:
+        engine = SkyfieldCoordinateEngine()
+    except RuntimeError as e:
+        pytest.skip(f"Skyfield 星歷數據不可用: {e}")
+
+    rng = np.random.default_rng(0)
+    positions = rng.normal(size=(300, 3))
+    positions *= 6928.0 / np.linalg.norm(positions, axis=-1, keepdims=True)
+    velocities = rng.normal(size=(300, 3)) * 7.5
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    times = [start + timedelta(seconds=30 * (i % 20)) for i in range(300)]
+
+    try:
+        outputs = get_transform_pool(2).convert(
+            positions, velocities, datetimes_to_epoch_us(times), chunk_size=100
+        )
+    finally:
+        shutdown_transform_pool()
+
+    expected = engine.convert_teme_to_wgs84_batch(positions, velocities, times)
+    assert outputs['success'].all()
+    np.testing.assert_allclose(outputs['latitude_deg'], expected.latitude_deg, atol=1e-9)
+    np.testing.assert_allclose(outputs['altitude_m'], expected.altitude_m, atol=1e-4)
@@ -0,0 +1,167 @@
+"""
+Unit tests for the content-addressed stage result cache
+
+Checks that BaseStageProcessor.execute() reuses a cached result for the same
+input / config / code, misses when the config changes, records its key as
+lineage for the next stage, and that LRU eviction keeps recently used entries.
+Also checks that the cache is opt-in and that the Stage 1 input fingerprint
+covers every TLE file the loader reads.
+
+Author: Orbit Engine Team
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+import src.shared.constants.system_constants as system_constants
+from src.shared.base import BaseStageProcessor, ProcessingStatus, create_processing_result
+from src.shared.base.stage_cache import LINEAGE_KEY, StageResultCache, evict_lru, fingerprint_data
+
+
+# ==================== Test Fixtures ====================
+
+class CountingProcessor(BaseStageProcessor):
+    """每次 process() 計數，輸出依輸入與配置決定"""
+
+    def __init__(self, config=None, stage_number=2):
+        super().__init__(stage_number=stage_number, stage_name='counting', config=config)
+        self.calls = 0
+        self.processing_stats = {}
+
+    def process(self, input_data):
+        self.calls += 1
+        self.processing_stats = {'total_satellites_processed': 2}
+        return create_processing_result(
+            status=ProcessingStatus.SUCCESS,
+            data={
+                'stage': self.stage_number,
+                'satellites': {'A': {'elevation_deg': [1.0, 2.0]}, 'B': {'elevation_deg': [3.0]}},
+                'scale': self.config.get('scale', 1),
+                'metadata': dict((input_data or {}).get('metadata', {}))
+            }
+        )
+
+    def validate_input(self, input_data):
+        return {'valid': True, 'errors': []}
+
+    def validate_output(self, output_data):
+        return {'valid': True, 'errors': []}
+
+
+@pytest.fixture(autouse=True)
+def stage_cache_env(tmp_path, monkeypatch):
+    paths = {f'stage{i}_output': str(tmp_path / f'out{i}') for i in range(1, 7)}
+    paths.update(validation_snapshots=str(tmp_path / 'validation'), environment='test')
+    monkeypatch.setattr(system_constants, 'get_current_paths', lambda: paths)
+    monkeypatch.setenv('ORBIT_ENGINE_TEST_MODE', '1')
+    monkeypatch.setenv('ORBIT_ENGINE_STAGE_CACHE', '1')
+    monkeypatch.setenv('ORBIT_ENGINE_STAGE_CACHE_DIR', str(tmp_path / 'cache'))
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_second_execute_is_served_from_cache():
+    input_data = {'metadata': {'source': 'tle'}}
+    first = CountingProcessor({'scale': 2})
+    result = first.execute(input_data)
+    assert result.metadata['stage_cache']['hit'] is False
+
+    second = CountingProcessor({'scale': 2})
+    cached = second.execute(input_data)
+
+    assert second.calls == 0
+    assert cached.metadata['stage_cache'] == {'key': result.metadata['stage_cache']['key'], 'hit': True}
+    assert cached.data['satellites'] == result.data['satellites']
+    assert second.processing_stats == {'total_satellites_processed': 2}
+
+
+@pytest.mark.unit
+def test_config_change_misses():
+    CountingProcessor({'scale': 2}).execute({'metadata': {}})
+
+    changed = CountingProcessor({'scale': 3})
+    result = changed.execute({'metadata': {}})
+
+    assert changed.calls == 1
+    assert result.data['scale'] == 3
+
+
+@pytest.mark.unit
+def test_key_is_recorded_as_downstream_lineage():
+    upstream = CountingProcessor(stage_number=2).execute({'metadata': {}})
+    key = upstream.data['metadata'][LINEAGE_KEY]['stage2']
+
+    downstream = CountingProcessor(stage_number=3)
+    assert downstream.cache_input_fingerprint(upstream.data) == f"stage2:{key}"
+    assert downstream.cache_input_fingerprint({'satellites': {'A': [1]}}) == \
+        fingerprint_data({'satellites': {'A': [1]}})
+
+
+@pytest.mark.unit
+def test_disabled_in_test_mode_by_default(monkeypatch):
+    monkeypatch.delenv('ORBIT_ENGINE_STAGE_CACHE')
+    assert StageResultCache.from_config({}) is None
+
+
+@pytest.mark.unit
+def test_opt_in_through_config(monkeypatch):
+    monkeypatch.delenv('ORBIT_ENGINE_STAGE_CACHE')
+    monkeypatch.delenv('ORBIT_ENGINE_TEST_MODE')
+    assert StageResultCache.from_config({}) is None
+    assert StageResultCache.from_config({'stage_cache': {'enabled': False}}) is None
+    assert StageResultCache.from_config({'stage_cache': {'enabled': True}}) is not None
+
+
+@pytest.mark.unit
+def test_stage1_fingerprint_covers_loaded_tle_files(tmp_path):
+    from src.stages.stage1_orbital_calculation.stage1_main_processor import Stage1MainProcessor
+
+    processor = Stage1MainProcessor({})
+    processor.tle_loader.tle_data_dir = tmp_path / 'tle_data'
+    tle_dir = processor.tle_loader.tle_data_dir / 'starlink' / 'tle'
+    tle_dir.mkdir(parents=True)
+    tle_file = tle_dir / 'starlink_20251001.tle'
+    tle_file.write_text('STARLINK-1\n1 ...\n2 ...\n')
+    baseline = processor.cache_input_fingerprint(None)
+
+    # 未載入的文件不影響指紋
+    (tle_dir / 'notes.txt').write_text('x')
+    assert processor.cache_input_fingerprint(None) == baseline
+
+    # 內容、修改時間、新增文件與目錄路徑皆改變指紋
+    tle_file.write_text('STARLINK-2\n1 ...\n2 ...\n')
+    changed_content = processor.cache_input_fingerprint(None)
+    assert changed_content != baseline
+    os.utime(tle_file, (time.time() - 3600, time.time() - 3600))
+    assert processor.cache_input_fingerprint(None) != changed_content
+    (tle_dir / 'starlink_20251002.tle').write_text('STARLINK-3\n')
+    with_new_file = processor.cache_input_fingerprint(None)
+    processor.tle_loader.tle_data_dir = tmp_path / 'other'
+    assert processor.cache_input_fingerprint(None) not in (with_new_file, changed_content, baseline)
+
+
+@pytest.mark.unit
+def test_fingerprint_covers_arrays_and_ignores_key_order():
+    assert fingerprint_data({'a': 1, 'b': [2.0]}) == fingerprint_data({'b': [2.0], 'a': 1})
+    assert fingerprint_data({'x': np.zeros(3)}) != fingerprint_data({'x': np.ones(3)})
+
+
+@pytest.mark.unit
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"entry{i}.stage_cache.h5"
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        paths.append(path)
+    os.utime(paths[0])  # 最近使用
+
+    assert evict_lru(tmp_path, '*.stage_cache.h5', max_entries=2) == 1
+    assert paths[0].exists() and paths[2].exists() and not paths[1].exists()
+
+    assert evict_lru(tmp_path, '*.stage_cache.h5', max_bytes=150) == 1
+    assert paths[0].exists()
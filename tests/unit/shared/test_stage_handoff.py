@@ -0,0 +1,148 @@
+"""
+Unit tests for the columnar HDF5 stage handoff format
+
+Checks that a stage result survives save/load with the same structure and
+values as the JSON round trip it replaces, that satellite time series are
+stored one dataset per field, the optional JSON export switch, and that the
+executors pick the newest stage output across handoff and JSON files.
+
+Author: Orbit Engine Team
+"""
+
+import json
+import os
+
+import h5py
+import numpy as np
+import pytest
+
+from scripts.stage_executors.executor_utils import find_latest_stage_output
+from src.shared.utils.stage_handoff import (
+    HANDOFF_SUFFIX,
+    JSON_EXPORT_ENV,
+    load_stage_handoff,
+    load_stage_output,
+    save_stage_handoff,
+    save_stage_output
+)
+
+
+# ==================== Test Fixtures ====================
+
+def make_time_series(n_points, offset):
+    time_series = []
+    for i in range(n_points):
+        point = {
+            'timestamp': f"2025-10-02T00:{i // 60:02d}:{i % 60:02d}+00:00",
+            'is_connectable': (i + offset) % 3 != 0,
+            'visibility_metrics': {
+                'elevation_deg': 10.0 + i + offset / 10,
+                'distance_km': 1200.5 - i,
+                'is_connectable': 'True'
+            },
+            'position_ecef_m': [1.0 * i, 2.0 * i, 3.0 * offset],
+            'signal_quality': {
+                'rsrp_dbm': -40.0 - i,
+                'path_loss_db': None if i % 4 == 0 else 160.25
+            }
+        }
+        if i % 5 == 0:
+            point['event_flags'] = ['a3'] * (i % 3)
+        time_series.append(point)
+    return time_series
+
+
+@pytest.fixture
+def stage_result():
+    return {
+        'stage': 'stage4_link_feasibility',
+        'metadata': {
+            'total_satellites': 3,
+            'constellation_configs': {'starlink': {'min_elevation_deg': 5.0}},
+            'ground_station/ntpu': (24.94, 121.37),
+            'sample_count': np.int64(42),
+            'notes': []
+        },
+        'satellites': {
+            f"STARLINK-{i}": {
+                'constellation': 'starlink',
+                'time_series': make_time_series(12, i),
+                'summary': {'max_elevation_deg': 21.0 + i, 'window_ids': [1, 2, 2.5, 'x']}
+            }
+            for i in range(3)
+        }
+    }
+
+
+def json_round_trip(data):
+    return json.loads(json.dumps(data, default=str))
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_round_trip_matches_json(stage_result, tmp_path):
+    path = save_stage_handoff(stage_result, tmp_path / f"stage4{HANDOFF_SUFFIX}")
+
+    loaded = load_stage_handoff(path)
+
+    expected = json_round_trip(stage_result)
+    expected['metadata']['sample_count'] = 42
+    assert loaded == expected
+    assert list(loaded['satellites']) == list(stage_result['satellites'])
+    assert list(loaded['satellites']['STARLINK-1']['time_series'][0]) == \
+        list(stage_result['satellites']['STARLINK-1']['time_series'][0])
+
+
+@pytest.mark.unit
+def test_time_series_fields_are_columns(stage_result, tmp_path):
+    path = save_stage_handoff(stage_result, tmp_path / f"stage4{HANDOFF_SUFFIX}")
+
+    with h5py.File(path, 'r') as f:
+        elevation = f['satellites/rows/time_series/values/visibility_metrics/elevation_deg']
+        assert elevation.attrs['kind'] == 'column'
+        assert elevation.shape == (36,)
+        assert f['satellites/rows/time_series/values/position_ecef_m'].shape == (36, 3)
+
+
+@pytest.mark.unit
+def test_selected_keys_only(stage_result, tmp_path):
+    path = save_stage_handoff(stage_result, tmp_path / f"stage4{HANDOFF_SUFFIX}")
+
+    loaded = load_stage_handoff(path, keys=['stage', 'metadata'])
+
+    assert set(loaded) == {'stage', 'metadata'}
+
+
+@pytest.mark.unit
+def test_json_export_is_optional(stage_result, tmp_path, monkeypatch):
+    monkeypatch.delenv(JSON_EXPORT_ENV, raising=False)
+    primary = save_stage_output(stage_result, tmp_path / 'a', 'stage4_output')
+    assert primary.name == f"stage4_output{HANDOFF_SUFFIX}"
+    assert not (tmp_path / 'a' / 'stage4_output.json').exists()
+
+    monkeypatch.setenv(JSON_EXPORT_ENV, '1')
+    save_stage_output(stage_result, tmp_path / 'b', 'stage4_output')
+    exported = load_stage_output(tmp_path / 'b' / 'stage4_output.json')
+    handoff = load_stage_output(tmp_path / 'b' / f"stage4_output{HANDOFF_SUFFIX}")
+    assert exported['satellites'] == handoff['satellites']
+
+
+@pytest.mark.unit
+def test_latest_stage_output_is_newest_across_formats(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output_dir = tmp_path / 'data' / 'outputs' / 'stage4'
+    output_dir.mkdir(parents=True)
+    stale_handoff = output_dir / f"stage4_old{HANDOFF_SUFFIX}"
+    newer_json = output_dir / 'stage4_new.json'
+    stale_handoff.write_bytes(b'')
+    newer_json.write_text('{}')
+    os.utime(stale_handoff, (1_000_000, 1_000_000))
+    os.utime(newer_json, (2_000_000, 2_000_000))
+
+    # 舊執行殘留的交接文件不應蓋過較新的 JSON 輸出
+    assert find_latest_stage_output(4).resolve() == newer_json
+
+    os.utime(stale_handoff, (3_000_000, 3_000_000))
+    assert find_latest_stage_output(4).resolve() == stale_handoff
+    assert find_latest_stage_output(5) is None
@@ -0,0 +1,154 @@
+"""
+Unit tests for Stage 2 adaptive (pass-window) time sampling
+
+Propagates synthetic LEO TLEs on the canonical 30 s grid both densely and
+adaptively, and checks that the adaptive path keeps exactly the grid points
+above the elevation mask while skipping most SGP4 evaluations, and that the
+root-found rise / culmination / set events are consistent with SGP4. Also
+checks that time-chunked frame rotations equal the one-shot Skyfield result.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from skyfield.framelib import itrs
+
+from src.stages.stage2_orbital_computing import adaptive_time_sampling
+from src.stages.stage2_orbital_computing.adaptive_time_sampling import AdaptiveTimeSampler, frame_rotation
+from src.stages.stage2_orbital_computing.sgp4_calculator import OUTSIDE_PASS_WINDOW, SGP4Calculator
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 1, 12, 0, tzinfo=timezone.utc)
+INTERVAL_S = 30.0
+N_TIMES = 480  # 4 小時
+
+
+def synthetic_tle(index, inclination, raan, mean_anomaly, mean_motion):
+    norad_id = 46000 + index
+    return {
+        'satellite_id': str(norad_id),
+        'line1': f'1 {norad_id:05d}U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+        'line2': f'2 {norad_id:05d} {inclination:8.4f} {raan:8.4f} 0001400  85.1234 '
+                 f'{mean_anomaly:8.4f} {mean_motion:11.8f}12345',
+        'epoch_datetime': '2025-10-01T06:00:00+00:00',
+    }
+
+
+@pytest.fixture(scope='module')
+def tle_list():
+    rng = np.random.default_rng(23)
+    return [
+        synthetic_tle(i, rng.choice([53.05, 87.9, 97.6]), rng.uniform(0, 360), rng.uniform(0, 360),
+                      rng.choice([15.06, 13.10]))
+        for i in range(60)
+    ]
+
+
+@pytest.fixture(scope='module')
+def time_grid():
+    return [START + timedelta(seconds=INTERVAL_S * i) for i in range(N_TIMES)]
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return SGP4Calculator()
+
+
+def make_sampler(calculator, elevation_mask_deg=0.0):
+    return AdaptiveTimeSampler.from_config(
+        {'enabled': True, 'ground_station': 'NTPU', 'elevation_mask_deg': elevation_mask_deg},
+        calculator.ts, INTERVAL_S
+    )
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.sgp4
+@pytest.mark.stage2
+@pytest.mark.parametrize('elevation_mask_deg', [0.0, 10.0])
+def test_adaptive_window_matches_dense_grid(calculator, tle_list, time_grid, elevation_mask_deg):
+    sampler = make_sampler(calculator, elevation_mask_deg)
+    dense = calculator.propagate_batch(tle_list, time_grid)
+
+    adaptive = calculator.propagate_adaptive(tle_list, time_grid, sampler)
+
+    # 可見窗口 = 完整網格中仰角 >= mask 的點，狀態與完整網格逐點一致
+    expected_window = sampler.elevation_deg(dense.states[..., :3], time_grid) >= elevation_mask_deg
+    assert expected_window.any()
+    np.testing.assert_array_equal(adaptive.valid_mask, expected_window)
+    np.testing.assert_allclose(adaptive.states[expected_window], dense.states[expected_window], atol=1e-9)
+    assert np.isnan(adaptive.states[~expected_window]).all()
+    assert (adaptive.error_codes[~expected_window] == OUTSIDE_PASS_WINDOW).all()
+
+    stats = adaptive.sampling_stats
+    assert stats['grid_points'] == dense.error_codes.size
+    assert stats['window_points'] == int(expected_window.sum())
+    assert stats['propagation_reduction_ratio'] > 0.7
+    assert stats['satellites_with_sgp4_errors'] == []
+
+
+@pytest.mark.unit
+@pytest.mark.sgp4
+@pytest.mark.stage2
+def test_pass_events_are_root_found_with_sgp4(calculator, tle_list, time_grid):
+    sampler = make_sampler(calculator)
+    adaptive = calculator.propagate_adaptive(tle_list, time_grid, sampler)
+    elevation = sampler.elevation_deg(adaptive.states[..., :3], time_grid)
+    tle_by_id = {tle['satellite_id']: tle for tle in tle_list}
+
+    events = [(sat_id, event) for sat_id, sat_events in adaptive.pass_events.items() for event in sat_events]
+    assert len(events) == adaptive.sampling_stats['pass_events'] > 0
+    assert sum(event['window_points'] for _, event in events) == int(adaptive.valid_mask.sum())
+
+    complete = [(sat_id, event) for sat_id, event in events if event['rise_utc'] and event['set_utc']]
+    assert complete
+    for sat_id, event in complete:
+        times = [datetime.fromisoformat(event[key]) for key in ('rise_utc', 'culmination_utc', 'set_utc')]
+        assert times[0] < times[1] < times[2]
+        assert event['duration_seconds'] == pytest.approx((times[2] - times[0]).total_seconds(), abs=1e-3)
+
+        # 升起 / 落下時刻的仰角 = mask；最高點不低於任何網格點
+        exact = calculator.propagate_batch([tle_by_id[sat_id]], times)
+        rise_el, culmination_el, set_el = sampler.elevation_deg(exact.states[..., :3], times)[0]
+        assert rise_el == pytest.approx(0.0, abs=0.01)
+        assert set_el == pytest.approx(0.0, abs=0.01)
+        assert culmination_el == pytest.approx(event['max_elevation_deg'], abs=1e-6)
+        row = adaptive.satellite_ids.index(sat_id)
+        window = (np.array(time_grid) >= times[0]) & (np.array(time_grid) <= times[2])
+        assert event['max_elevation_deg'] >= np.nanmax(elevation[row, window]) - 1e-9
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_sampler_configuration(calculator):
+    assert AdaptiveTimeSampler.from_config({'enabled': False}, calculator.ts, INTERVAL_S) is None
+
+    sampler = make_sampler(calculator)
+    assert sampler.describe()['ground_station']['name'] == 'NTPU'
+    # 地平線半角隨軌道高度遞增
+    half_angles = sampler.horizon_half_angle_rad(np.array([6928.0, 7578.0]))
+    assert half_angles[0] < half_angles[1]
+
+    with pytest.raises(ValueError):
+        AdaptiveTimeSampler.from_config(
+            {'enabled': True, 'ground_station': 'NTPU', 'coarse_step_seconds': 10}, calculator.ts, INTERVAL_S
+        )
+    with pytest.raises(ValueError):
+        AdaptiveTimeSampler.from_config(
+            {'enabled': True, 'ground_station': {'name': 'SITE_X', 'latitude_deg': 10.0}}, calculator.ts, INTERVAL_S
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_chunked_frame_rotation_matches_single_call(calculator, time_grid, monkeypatch):
+    t = calculator.ts.from_datetimes(time_grid)
+    expected = itrs.rotation_at(t)
+    monkeypatch.setattr(adaptive_time_sampling, 'ROTATION_CHUNK_TIMES', 100)
+    np.testing.assert_array_equal(frame_rotation(itrs, t), expected)
@@ -0,0 +1,161 @@
+"""
+Unit tests for the vectorized Stage 3 geometric prefilter
+
+Builds synthetic circular LEO orbits and checks that the array implementation
+(dense and pass_window modes, dict and OrbitalStateBlock input) keeps exactly
+the satellites the original per-point loop keeps.
+
+Author: Orbit Engine Team
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.data_structures import OrbitalStateBlock
+from src.stages.stage3_coordinate_transformation.geometric_prefilter import (
+    WGS84_SEMI_MAJOR_AXIS_M,
+    GeometricPrefilter
+)
+
+
+# ==================== Test Fixtures ====================
+
+NTPU = (24.9438888888889, 121.370833333333, 36.0)
+MU_KM3_S2 = 398600.4418
+START = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+INTERVAL_S = 30.0
+N_TIMES = 240
+
+
+def circular_orbit(altitude_km, inclination_deg, raan_deg, phase_deg, n_times=N_TIMES):
+    radius = WGS84_SEMI_MAJOR_AXIS_M / 1000.0 + altitude_km
+    rate = math.sqrt(MU_KM3_S2 / radius**3)
+    u = math.radians(phase_deg) + rate * np.arange(n_times) * INTERVAL_S
+    inc, raan = math.radians(inclination_deg), math.radians(raan_deg)
+    p = np.array([math.cos(raan), math.sin(raan), 0.0])
+    q = np.array([-math.sin(raan) * math.cos(inc), math.cos(raan) * math.cos(inc), math.sin(inc)])
+    positions = radius * (np.cos(u)[:, None] * p + np.sin(u)[:, None] * q)
+    velocities = radius * rate * (-np.sin(u)[:, None] * p + np.cos(u)[:, None] * q)
+    return positions, velocities
+
+
+@pytest.fixture(scope='module')
+def orbits():
+    rng = np.random.default_rng(22)
+    sats = {}
+    for i in range(80):
+        altitude = rng.choice([550.0, 1200.0])
+        sats[f"{60000 + i}"] = circular_orbit(altitude, rng.uniform(40, 100), rng.uniform(0, 360), rng.uniform(0, 360))
+    sats['low'] = circular_orbit(150.0, 53.0, 120.0, 0.0)
+    sats['high'] = circular_orbit(3000.0, 53.0, 120.0, 0.0)
+    return sats
+
+
+def teme_dict(orbits):
+    timestamps = [(START + timedelta(seconds=INTERVAL_S * j)).isoformat() for j in range(N_TIMES)]
+    data = {
+        sat_id: {'time_series': [
+            {'datetime_utc': timestamps[j], 'position_teme_km': positions[j].tolist(),
+             'velocity_teme_km_s': velocities[j].tolist()}
+            for j in range(N_TIMES)
+        ]}
+        for sat_id, (positions, velocities) in orbits.items()
+    }
+    data['empty'] = {'time_series': []}
+    return data
+
+
+def reference_filter(prefilter, teme_data):
+    """原逐點迴圈 (純量 _teme_to_rough_ecef / _calculate_rough_elevation)"""
+    retained = []
+    for sat_id, sat_data in teme_data.items():
+        for point in sat_data['time_series']:
+            position = point['position_teme_km']
+            altitude = math.sqrt(sum(x**2 for x in position)) - WGS84_SEMI_MAJOR_AXIS_M / 1000.0
+            if not prefilter.min_altitude_km <= altitude <= prefilter.max_altitude_km:
+                continue
+            dt = datetime.fromisoformat(point['datetime_utc'])
+            ecef = prefilter._teme_to_rough_ecef(position, dt)
+            if math.dist(ecef, prefilter.ground_station_ecef_km) > prefilter.max_slant_range_km:
+                continue
+            if prefilter._calculate_rough_elevation(ecef) < prefilter.min_rough_elevation_deg:
+                continue
+            retained.append(sat_id)
+            break
+    return retained
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage3
+@pytest.mark.parametrize('mode', ['dense', 'pass_window'])
+def test_array_filter_matches_point_loop(orbits, mode):
+    prefilter = GeometricPrefilter(*NTPU, mode=mode)
+    teme_data = teme_dict(orbits)
+
+    filtered = prefilter.filter_satellite_candidates(teme_data)
+
+    expected = reference_filter(prefilter, teme_data)
+    assert list(filtered) == expected
+    assert 0 < len(expected) < len(orbits)
+    stats = prefilter.last_statistics
+    assert stats['retained'] == len(expected)
+    assert stats['rejection_reasons']['no_valid_points'] == 1
+    assert stats['rejection_reasons']['altitude_too_low'] == 1
+    assert stats['rejection_reasons']['altitude_too_high'] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.stage3
+def test_pass_window_skips_orbit_segments(orbits):
+    teme_data = teme_dict(orbits)
+    dense = GeometricPrefilter(*NTPU, mode='dense')
+    pass_window = GeometricPrefilter(*NTPU, mode='pass_window')
+
+    assert list(pass_window.filter_satellite_candidates(teme_data)) == \
+        list(dense.filter_satellite_candidates(teme_data))
+    # 不可見段以地平線半角整段跳過，評估點數顯著減少
+    assert pass_window.last_statistics['points_evaluated'] < 0.25 * dense.last_statistics['points_evaluated']
+
+    # 半角隨高度遞增；550 km、-10° 門檻約 35°
+    half_angles = np.degrees(pass_window.horizon_half_angle_rad(
+        WGS84_SEMI_MAJOR_AXIS_M / 1000.0 + np.array([550.0, 1200.0])
+    ))
+    assert half_angles[0] < half_angles[1]
+    assert half_angles[0] == pytest.approx(35.0, abs=0.5)
+
+
+@pytest.mark.unit
+@pytest.mark.stage3
+@pytest.mark.parametrize('mode', ['dense', 'pass_window'])
+def test_block_input_matches_dict_input(orbits, mode):
+    sat_ids = list(orbits)
+    valid = np.ones((len(sat_ids), N_TIMES), dtype=bool)
+    valid[0, :] = False
+    block = OrbitalStateBlock(
+        satellite_ids=sat_ids,
+        constellations=['starlink'] * len(sat_ids),
+        epoch_datetimes=[START.isoformat()] * len(sat_ids),
+        time_start_utc=START,
+        interval_seconds=INTERVAL_S,
+        positions_km=np.stack([orbits[s][0] for s in sat_ids]),
+        velocities_km_s=np.stack([orbits[s][1] for s in sat_ids]),
+        epoch_offsets_minutes=np.zeros(len(sat_ids)),
+        valid_mask=valid
+    )
+    prefilter = GeometricPrefilter(*NTPU, mode=mode)
+
+    filtered_block = prefilter.filter_orbital_state_block(block)
+
+    teme_data = teme_dict(orbits)
+    teme_data[sat_ids[0]] = {'time_series': []}
+    expected = list(GeometricPrefilter(*NTPU, mode=mode).filter_satellite_candidates(teme_data))
+    assert filtered_block.satellite_ids == expected
+    assert prefilter.last_statistics['rejection_reasons']['no_valid_points'] == 1
+
+    with pytest.raises(ValueError):
+        GeometricPrefilter(*NTPU, mode='unknown')
@@ -0,0 +1,130 @@
+"""
+Unit tests for the Stage 6 SignalTimeIndex and array-based event detection
+
+Checks the (S×T) index layout and that GPPEventDetector.detect_all_events
+produces the same events as applying detect_a3/a4/a5/d2_events to the
+per-timestamp visible satellite lists directly.
+
+Author: Orbit Engine Team
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.shared.utils import geodetic_to_ecef
+from src.stages.stage6_research_optimization.gpp_event_detector import GPPEventDetector
+from src.stages.stage6_research_optimization.signal_time_index import SignalTimeIndex
+
+
+# ==================== Test Fixtures ====================
+
+def make_signal_analysis(n_sat=12, n_times=30, seed=0):
+    rnd = random.Random(seed)
+    signal_analysis = {}
+    for s in range(n_sat):
+        time_series = []
+        for t in range(n_times):
+            if rnd.random() < 0.2:
+                continue
+            lat = 24.9 + rnd.uniform(-25.0, 25.0)
+            lon = 121.4 + rnd.uniform(-25.0, 25.0)
+            time_series.append({
+                'timestamp': f"2025-10-02T00:{t // 60:02d}:{t % 60:02d}Z",
+                'is_connectable': rnd.random() < 0.6,
+                'signal_quality': {
+                    'rsrp_dbm': round(rnd.uniform(-50.0, -25.0), 1),
+                    'rsrq_db': -10.0,
+                    'rs_sinr_db': 5.0,
+                    'offset_mo_db': rnd.choice([0.0, 1.0]),
+                    'cell_offset_db': rnd.choice([0.0, -1.0])
+                },
+                'physical_parameters': {
+                    'distance_km': rnd.uniform(500.0, 2000.0),
+                    'position_ecef_m': list(geodetic_to_ecef(lat, lon, 550e3))
+                }
+            })
+        signal_analysis[f"SAT-{s}"] = {
+            'constellation': 'starlink' if s % 2 else 'oneweb',
+            'time_series': time_series,
+            'summary': {}
+        }
+    return signal_analysis
+
+
+@pytest.fixture
+def detector():
+    return GPPEventDetector({'starlink': {'d2_threshold1_km': 800, 'd2_threshold2_km': 1500}})
+
+
+def event_pairs(events):
+    return [(e['serving_satellite'], e['neighbor_satellite']) for e in events]
+
+
+def reference_events(detector, signal_analysis):
+    """逐時間點直接套用 detect_*_events 的參考結果"""
+    index = SignalTimeIndex(signal_analysis)
+    threshold = detector.config['a5_threshold1_dbm'] - detector.config['hysteresis_db']
+    result = {'a3_events': [], 'a4_events': [], 'a5_events': [], 'd2_events': []}
+    for col in range(len(index.timestamps)):
+        visible = [index.snapshot(row, col) for row in index.visible_rows(col)]
+        if len(visible) < 2:
+            continue
+        serving = detector._select_serving_satellite(visible)
+        neighbors = [s for s in visible if s['satellite_id'] != serving['satellite_id']]
+        result['a3_events'] += detector.detect_a3_events(serving, neighbors)
+        result['a4_events'] += detector.detect_a4_events(serving, neighbors)
+        result['a5_events'] += detector.detect_a5_events(serving, neighbors)
+        poor = [s for s in visible if s['signal_quality']['rsrp_dbm'] < threshold]
+        for poor_sat in poor[:5]:
+            others = [s for s in visible if s['satellite_id'] != poor_sat['satellite_id']]
+            result['a5_events'] += detector.detect_a5_events(poor_sat, others)
+        result['d2_events'] += detector.detect_d2_events(serving, neighbors)
+    return result
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_index_layout():
+    signal_analysis = make_signal_analysis()
+    index = SignalTimeIndex(signal_analysis)
+
+    assert index.shape == (12, len(index.timestamps))
+    assert index.timestamps == sorted(index.timestamps)
+
+    for row, sat_id in enumerate(index.satellite_ids):
+        for point in signal_analysis[sat_id]['time_series']:
+            col = index.column_of[point['timestamp']]
+            assert index.connectable[row, col] == point['is_connectable']
+            if point['is_connectable']:
+                assert index.rsrp_dbm[row, col] == point['signal_quality']['rsrp_dbm']
+                assert index.sinr_db[row, col] == point['signal_quality']['rs_sinr_db']
+    assert np.isnan(index.rsrp_dbm[~index.connectable]).all()
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+@pytest.mark.parametrize('seed', [1, 2])
+def test_detect_all_events_matches_per_timestamp_reference(detector, seed):
+    signal_analysis = make_signal_analysis(seed=seed)
+
+    result = detector.detect_all_events(signal_analysis)
+    expected = reference_events(detector, signal_analysis)
+
+    for event_type in ('a3_events', 'a4_events', 'a5_events', 'd2_events'):
+        assert event_pairs(result[event_type]) == event_pairs(expected[event_type])
+    assert result['total_events'] == sum(len(events) for events in expected.values())
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_missing_neighbor_ecef_fails_fast(detector):
+    signal_analysis = make_signal_analysis(seed=3)
+    for point in signal_analysis['SAT-3']['time_series']:
+        del point['physical_parameters']['position_ecef_m']
+
+    with pytest.raises(ValueError, match='position_ecef_m'):
+        detector.detect_all_events(signal_analysis)
@@ -0,0 +1,215 @@
+"""
+Unit tests for Stage 4 multi-ground-station visibility
+
+Checks that GroundStationNetwork.topocentric() broadcasts the single-station
+closed-form ECEF → ENU solution across K stations, and that
+analyze_station_network() yields identical per-station pools for columnar
+OrbitalStateBlock input (chunked) and legacy per-point dict input, and that a
+network outside the Stage 2 adaptive-sampling station or the Stage 3
+geometric-prefilter station is rejected.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.data_structures import OrbitalStateBlock
+from src.stages.stage2_orbital_computing.adaptive_time_sampling import resolve_station
+from src.stages.stage3_coordinate_transformation.geometric_prefilter import GeometricPrefilter
+from src.stages.stage4_link_feasibility.ground_station_network import (
+    GroundStationNetwork,
+    analyze_station_network,
+    check_adaptive_sampling_coverage,
+    check_geometric_prefilter_coverage
+)
+from src.stages.stage4_link_feasibility.link_budget_analyzer import LinkBudgetAnalyzer
+from src.stages.stage4_link_feasibility.skyfield_visibility_calculator import SkyfieldVisibilityCalculator
+
+
+# ==================== Test Fixtures ====================
+
+NTPU = SkyfieldVisibilityCalculator.NTPU_COORDINATES
+
+STATIONS = [
+    {'name': 'NTPU', 'latitude_deg': NTPU['latitude_deg'], 'longitude_deg': NTPU['longitude_deg'],
+     'altitude_m': NTPU['altitude_m']},
+    {'name': 'SITE_SOUTH', 'latitude_deg': 22.6273, 'longitude_deg': 120.3014, 'altitude_m': 10.0},
+    {'name': 'SITE_FAR', 'latitude_deg': -33.8688, 'longitude_deg': 151.2093, 'altitude_m': 50.0},
+]
+
+THRESHOLDS = {'starlink': 5.0, 'oneweb': 10.0}
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return SkyfieldVisibilityCalculator()
+
+
+@pytest.fixture
+def geodetic_block():
+    rng = np.random.default_rng(3)
+    n_sat, n_times = 7, 40
+    lat = rng.uniform(15.0, 35.0, (n_sat, n_times))
+    lon = rng.uniform(110.0, 130.0, (n_sat, n_times))
+    alt_m = rng.uniform(540e3, 1200e3, (n_sat, n_times))
+    valid = np.ones((n_sat, n_times), dtype=bool)
+    valid[2, 10:20] = False
+    block = OrbitalStateBlock(
+        satellite_ids=[f"{50000 + i}" for i in range(n_sat)],
+        constellations=['starlink'] * 4 + ['oneweb'] * 3,
+        epoch_datetimes=['2025-10-02T00:00:00+00:00'] * n_sat,
+        time_start_utc=datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc),
+        interval_seconds=30.0,
+        positions_km=np.zeros((n_sat, n_times, 3)),
+        velocities_km_s=np.zeros((n_sat, n_times, 3)),
+        epoch_offsets_minutes=np.zeros(n_sat),
+        valid_mask=valid
+    )
+    return block.with_geodetic(lat, lon, alt_m)
+
+
+def wgs84_entries(block, columnar):
+    entries = {}
+    for row, sat_id in enumerate(block.satellite_ids):
+        entry = {'constellation': block.constellations[row], 'wgs84_coordinates': block.to_geodetic_time_series(row)}
+        if columnar:
+            entry.update(geodetic_block=block, block_row=row)
+        entries[sat_id] = entry
+    return entries
+
+
+def point_arrays(sat_id, sat_data):
+    points = sat_data['wgs84_coordinates']
+    return ([p['timestamp'] for p in points],
+            np.array([p['latitude_deg'] for p in points]),
+            np.array([p['longitude_deg'] for p in points]),
+            np.array([p['altitude_m'] for p in points]))
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage4
+@pytest.mark.visibility
+def test_network_matches_single_station_batch(calculator, geodetic_block):
+    network = GroundStationNetwork.from_config(STATIONS)
+    lat, lon = geodetic_block.latitude_deg, geodetic_block.longitude_deg
+    alt_km = geodetic_block.altitude_m / 1000.0
+
+    elevation, azimuth, distance = network.topocentric(lat, lon, alt_km)
+
+    assert elevation.shape == (3,) + lat.shape
+    expected = calculator.calculate_topocentric_batch(
+        lat.ravel(), lon.ravel(), alt_km.ravel(), [geodetic_block.time_start_utc] * lat.size
+    )
+    np.testing.assert_allclose(elevation[0].ravel(), expected[0], atol=1e-9)
+    np.testing.assert_allclose(azimuth[0].ravel(), expected[1], atol=1e-9)
+    np.testing.assert_allclose(distance[0].ravel(), expected[2], atol=1e-9)
+
+    # 其他地面站: 與單站網路 (同一閉式解) 逐站一致
+    for k, station in enumerate(STATIONS[1:], start=1):
+        single = GroundStationNetwork.from_config([station]).topocentric(lat, lon, alt_km)
+        np.testing.assert_allclose(elevation[k], single[0][0], atol=1e-12)
+        np.testing.assert_allclose(distance[k], single[2][0], atol=1e-12)
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_block_and_dict_inputs_give_identical_pools(geodetic_block):
+    network = GroundStationNetwork.from_config(STATIONS)
+    analyzer = LinkBudgetAnalyzer()
+
+    # batch_elements 很小 → 每次只廣播 1 顆衛星 (測試分塊)
+    columnar = analyze_station_network(network, wgs84_entries(geodetic_block, True), THRESHOLDS.get,
+                                       analyzer, point_arrays, batch_elements=1)
+    legacy = analyze_station_network(network, wgs84_entries(geodetic_block, False), THRESHOLDS.get,
+                                     analyzer, point_arrays)
+
+    assert columnar['by_station'] == legacy['by_station']
+    assert columnar['metadata']['station_satellite_time_points'] == 3 * int(geodetic_block.valid_mask.sum())
+
+    ntpu = columnar['by_station']['NTPU']
+    assert ntpu['total_connectable'] > 0
+    assert columnar['by_station']['SITE_FAR']['total_connectable'] == 0
+
+    # 可連線點數與單站判斷一致 (星座門檻 + 距離約束)
+    elevation, _, distance = network.topocentric(
+        geodetic_block.latitude_deg, geodetic_block.longitude_deg, geodetic_block.altitude_m / 1000.0
+    )
+    for entry in ntpu['connectable_satellites']['oneweb']:
+        row = geodetic_block.index_of(entry['satellite_id'])
+        expected = analyzer.analyze_link_feasibility_batch(elevation[0, row], distance[0, row], 10.0)
+        assert entry['connectable_points'] == int((expected & geodetic_block.valid_mask[row]).sum())
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_station_config_resolution_and_validation():
+    network = GroundStationNetwork.from_config([{'name': 'NTPU'}, STATIONS[1]])
+    assert network.names == ['NTPU', 'SITE_SOUTH']
+    assert network.latitude_deg[0] == pytest.approx(24.9442)
+
+    with pytest.raises(ValueError):
+        GroundStationNetwork.from_config([STATIONS[1], STATIONS[1]])
+    with pytest.raises(ValueError):
+        GroundStationNetwork.from_config([{'name': 'SITE_X', 'latitude_deg': 10.0, 'longitude_deg': 20.0}])
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_network_must_match_adaptive_sampling_station():
+    adaptive_sampling = {'ground_station': resolve_station('NTPU'), 'elevation_mask_deg': 0.0}
+
+    check_adaptive_sampling_coverage(GroundStationNetwork.from_config([{'name': 'NTPU'}]), adaptive_sampling)
+    with pytest.raises(ValueError, match='SITE_SOUTH'):
+        check_adaptive_sampling_coverage(GroundStationNetwork.from_config(STATIONS[:2]), adaptive_sampling)
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_network_must_match_geometric_prefilter_station():
+    # 衛星固定在 SITE_FAR 上空 550 km (以預篩選的簡化 GMST 反轉回 TEME)
+    far = STATIONS[2]
+    n_times = 20
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    prefilter = GeometricPrefilter(NTPU['latitude_deg'], NTPU['longitude_deg'], NTPU['altitude_m'])
+    jd = prefilter._datetime_to_jd(start) + np.arange(n_times) * 30.0 / 86400.0
+    x_axis = prefilter._teme_to_rough_ecef_array(np.tile([1.0, 0.0, 0.0], (n_times, 1)), jd)
+    gmst = np.arctan2(-x_axis[:, 1], x_axis[:, 0])
+    ecef = SkyfieldVisibilityCalculator._geodetic_to_itrs_km(
+        np.full(n_times, far['latitude_deg']), np.full(n_times, far['longitude_deg']), np.full(n_times, 550.0)
+    )
+    teme = np.stack([
+        ecef[:, 0] * np.cos(gmst) - ecef[:, 1] * np.sin(gmst),
+        ecef[:, 0] * np.sin(gmst) + ecef[:, 1] * np.cos(gmst),
+        ecef[:, 2]
+    ], axis=-1)
+    block = OrbitalStateBlock(
+        satellite_ids=['59999'],
+        constellations=['starlink'],
+        epoch_datetimes=[start.isoformat()],
+        time_start_utc=start,
+        interval_seconds=30.0,
+        positions_km=teme[np.newaxis],
+        velocities_km_s=np.zeros((1, n_times, 3)),
+        epoch_offsets_minutes=np.zeros(1),
+        valid_mask=np.ones((1, n_times), dtype=bool)
+    )
+
+    # 只對 SITE_FAR 可見 → NTPU 預篩選將其排除
+    elevation, _, _ = GroundStationNetwork.from_config(STATIONS).topocentric(
+        np.full(n_times, far['latitude_deg']), np.full(n_times, far['longitude_deg']), np.full(n_times, 550.0)
+    )
+    assert (elevation[2] > 80.0).all() and (elevation[0] < 0.0).all()
+    assert prefilter.filter_orbital_state_block(block).n_satellites == 0
+
+    geometric_prefilter = {'enabled': True, 'ground_station': {'name': 'NTPU', **NTPU}}
+    check_geometric_prefilter_coverage(GroundStationNetwork.from_config(STATIONS[:1]), geometric_prefilter)
+    with pytest.raises(ValueError, match='SITE_FAR'):
+        check_geometric_prefilter_coverage(GroundStationNetwork.from_config(STATIONS), geometric_prefilter)
+    # 未記錄預篩選地面站 (舊版 Stage 3 輸出) → 全部視為未涵蓋
+    with pytest.raises(ValueError, match='NTPU'):
+        check_geometric_prefilter_coverage(GroundStationNetwork.from_config(STATIONS[:1]), {'enabled': True})
@@ -0,0 +1,202 @@
+"""
+Unit tests for Stage 2 incremental propagation helpers
+
+Checks TLE / propagation fingerprints, that per-satellite state entries taken
+from an OrbitalStateBlock rebuild an equivalent block (same row fingerprints),
+that the processor only marks satellites dirty when their TLE or time grid
+changes (a new reference time does not invalidate the manifest itself), and
+that adaptive-sampling metadata and pass events survive incremental reuse.
+
+Author: Orbit Engine Team
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.base.incremental_store import IncrementalSatelliteStore
+from src.shared.data_structures import OrbitalStateBlock
+from src.stages.stage2_orbital_computing.adaptive_time_sampling import AdaptiveTimeSampler
+from src.stages.stage2_orbital_computing.incremental_propagation import (
+    blocks_from_state_entries, propagation_fingerprint, state_entry_from_block, tle_fingerprint
+)
+from src.stages.stage2_orbital_computing.stage2_orbital_computing_processor import Stage2OrbitalPropagationProcessor
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+
+TLE = {
+    'norad_id': '44713',
+    'tle_line1': '1 44713U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+    'tle_line2': '2 44713  53.0540 123.4567 0001400  85.1234 274.9876 15.06391234 12345',
+}
+
+ISS_TLE = {
+    'satellite_id': '25544',
+    'name': 'ISS (ZARYA)',
+    'line1': '1 25544U 98067A   25274.50000000  .00016717  00000-0  10270-3 0  9009',
+    'line2': '2 25544  51.6400 208.9163 0006317  69.9862  25.2906 15.50377579 12345',
+    'epoch_datetime': '2025-10-01T12:00:00+00:00',
+}
+
+STARLINK_TLE = {
+    'satellite_id': '44713',
+    'name': 'STARLINK-1007',
+    'line1': '1 44713U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+    'line2': '2 44713  53.0540 123.4567 0001400  85.1234 274.9876 15.06391234 12345',
+    'epoch_datetime': '2025-10-01T06:00:00+00:00',
+}
+
+
+def synthetic_tle(index, raan, mean_anomaly):
+    norad_id = 46000 + index
+    return {
+        'satellite_id': str(norad_id),
+        'name': f'STARLINK-{norad_id}',
+        'line1': f'1 {norad_id:05d}U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+        'line2': f'2 {norad_id:05d}  53.0540 {raan:8.4f} 0001400  85.1234 {mean_anomaly:8.4f} 15.06391234 12345',
+        'epoch_datetime': '2025-10-01T06:00:00+00:00',
+    }
+
+
+@pytest.fixture
+def make_processor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('ORBIT_ENGINE_INCREMENTAL', '1')
+    monkeypatch.setenv('ORBIT_ENGINE_INCREMENTAL_DIR', str(tmp_path / 'incremental'))
+
+    def factory(reference_time='2025-10-01T12:00:00Z', adaptive=False):
+        stage1_dir = tmp_path / 'stage1'
+        stage1_dir.mkdir(exist_ok=True)
+        (stage1_dir / 'epoch_analysis.json').write_text(
+            json.dumps({'recommended_reference_time': reference_time})
+        )
+        processor = Stage2OrbitalPropagationProcessor({'stage1_output_dir': str(stage1_dir)})
+        if adaptive:
+            # 與 adaptive_sampling.enabled: true 初始化相同 (YAML 預設停用)
+            processor.adaptive_sampler = AdaptiveTimeSampler.from_config(
+                {'enabled': True, 'ground_station': 'NTPU'}, processor.sgp4_calculator.ts,
+                processor.time_interval_seconds
+            )
+            processor.incremental_store = IncrementalSatelliteStore.for_processor(
+                processor, settings={'adaptive_sampling': processor.adaptive_sampler.describe()}
+            )
+        return processor
+
+    return factory
+
+
+def make_block(satellite_ids, n_times):
+    rng = np.random.default_rng(0)
+    n_sat = len(satellite_ids)
+    valid = np.ones((n_sat, n_times), dtype=bool)
+    valid[0, -1] = False
+    return OrbitalStateBlock(
+        satellite_ids=list(satellite_ids),
+        constellations=['starlink', 'oneweb'][:n_sat],
+        epoch_datetimes=['2025-10-02T00:30:00+00:00'] * n_sat,
+        time_start_utc=START,
+        interval_seconds=30.0,
+        positions_km=rng.normal(size=(n_sat, n_times, 3)) * 7000.0,
+        velocities_km_s=rng.normal(size=(n_sat, n_times, 3)) * 7.5,
+        epoch_offsets_minutes=np.array([120.0, 95.0][:n_sat]),
+        valid_mask=valid
+    )
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_tle_fingerprint_tracks_tle_lines():
+    assert tle_fingerprint(TLE) == tle_fingerprint(dict(TLE))
+    updated = dict(TLE, tle_line1=TLE['tle_line1'].replace('25274.25', '25275.25'))
+    assert tle_fingerprint(updated) != tle_fingerprint(TLE)
+
+
+@pytest.mark.unit
+def test_propagation_fingerprint_tracks_tle_and_time_grid():
+    grid = (START, 190)
+    fingerprint = propagation_fingerprint(TLE, grid, 30.0)
+
+    assert propagation_fingerprint(dict(TLE), (START.replace(tzinfo=None), 190), 30.0) == fingerprint
+    assert propagation_fingerprint(TLE, (START + timedelta(days=1), 190), 30.0) != fingerprint
+    assert propagation_fingerprint(TLE, (START, 220), 30.0) != fingerprint
+    assert propagation_fingerprint(TLE, grid, 60.0) != fingerprint
+    updated = dict(TLE, tle_line2=TLE['tle_line2'].replace('12345', '12346'))
+    assert propagation_fingerprint(updated, grid, 30.0) != fingerprint
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_processor_reuses_satellites_whose_tle_and_grid_are_unchanged(make_processor):
+    first = make_processor()
+    plan, to_propagate = first._plan_incremental_propagation([ISS_TLE, STARLINK_TLE])
+    assert plan.dirty_ids == ['25544', '44713'] and len(to_propagate) == 2
+    first.incremental_store.save(plan.fingerprints, {sat_id: {'marker': np.zeros(1)} for sat_id in plan.dirty_ids})
+
+    # 只有 TLE 改變的衛星重新傳播
+    updated = dict(STARLINK_TLE, line2=STARLINK_TLE['line2'].replace('12345', '12346'))
+    plan, to_propagate = make_processor()._plan_incremental_propagation([ISS_TLE, updated])
+    assert plan.reused_ids == ['25544']
+    assert [sat['satellite_id'] for sat in to_propagate] == ['44713']
+
+    # 新參考時刻不使清單失效，只使網格移動的衛星重新傳播
+    next_day = make_processor('2025-10-02T12:00:00Z')
+    assert next_day.incremental_store.settings_fingerprint == first.incremental_store.settings_fingerprint
+    plan, _ = next_day._plan_incremental_propagation([ISS_TLE, STARLINK_TLE])
+    assert plan.dirty_ids == ['25544', '44713'] and plan.reused_ids == []
+
+
+@pytest.mark.unit
+def test_state_entries_rebuild_equivalent_block():
+    block = make_block(['A', 'B'], 5)
+    entries = {sat_id: state_entry_from_block(block, row) for row, sat_id in enumerate(block.satellite_ids)}
+
+    rebuilt, = blocks_from_state_entries(entries)
+
+    assert rebuilt.satellite_ids == ['A', 'B']
+    assert rebuilt.constellations == ['starlink', 'oneweb']
+    np.testing.assert_array_equal(rebuilt.valid_mask, block.valid_mask)
+    np.testing.assert_array_equal(rebuilt.epoch_offsets_minutes, block.epoch_offsets_minutes)
+    assert rebuilt.row_fingerprints() == block.row_fingerprints()
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_adaptive_sampling_metadata_survives_incremental_reuse(make_processor):
+    rng = np.random.default_rng(15)
+    satellites = [synthetic_tle(i, rng.uniform(0, 360), rng.uniform(0, 360)) for i in range(40)]
+    to_input = lambda sats: {'stage': 1, 'satellites': {sat['satellite_id']: sat for sat in sats}}
+
+    first = make_processor(adaptive=True)
+    full = first.process(to_input(satellites)).data
+    full_sampling = full['metadata']['adaptive_sampling']
+    with_pass = first.processing_stats['successful_propagations']
+    assert full_sampling['pass_event_count'] > 0 and len(full_sampling['pass_events']) == with_pass
+    assert full['validation']['overall_status']
+
+    # 全部沿用: 摘要與過境事件與完整傳播一致
+    reused = make_processor(adaptive=True).process(to_input(satellites)).data
+    assert reused['metadata']['incremental']['reused_satellites'] == with_pass
+    sampling = reused['metadata']['adaptive_sampling']
+    assert sampling['pass_events'] == full_sampling['pass_events']
+    assert sampling['pass_event_count'] == full_sampling['pass_event_count']
+    assert sampling['window_points'] == full_sampling['window_points']
+    assert sampling['reused_satellites'] == with_pass
+    assert reused['validation']['overall_status']
+
+    # 部分沿用: 重新傳播的衛星與沿用衛星的過境事件都在摘要中
+    changed_id = next(iter(full_sampling['pass_events']))
+    updated = [
+        dict(sat, line2=sat['line2'].replace('12345', '12346')) if sat['satellite_id'] == changed_id else sat
+        for sat in satellites
+    ]
+    partial = make_processor(adaptive=True).process(to_input(updated)).data
+    assert partial['metadata']['incremental']['reused_satellites'] == with_pass - 1
+    sampling = partial['metadata']['adaptive_sampling']
+    assert sampling['pass_events'] == full_sampling['pass_events']
+    assert sampling['window_points'] == full_sampling['window_points']
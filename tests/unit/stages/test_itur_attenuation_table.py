@@ -0,0 +1,91 @@
+"""
+Unit tests for the ITU-R P.676 elevation attenuation table
+
+Uses a deterministic slant-path model in place of ITU-Rpy to check node
+exactness, the verified interpolation error bound, disk persistence and the
+horizon / range handling shared with ITUROfficalAtmosphericModel.
+
+Author: Orbit Engine Team
+"""
+
+import numpy as np
+import pytest
+
+from src.stages.stage5_signal_analysis.itur_attenuation_table import ITURAttenuationTable
+
+
+# ==================== Test Fixtures ====================
+
+class SlantPathModel:
+    """等效天頂衰減 × 球面大氣路徑因子 (與 exact 模式同樣在低仰角急遽上升)"""
+
+    temperature_k = 283.0
+    pressure_hpa = 1013.25
+    water_vapor_density = 7.5
+
+    def __init__(self):
+        self.calls = 0
+
+    def calculate_total_attenuation(self, frequency_ghz, elevation_deg):
+        self.calls += 1
+        el = np.radians(elevation_deg)
+        ratio = 6371.0 / (6371.0 + 8.0)
+        return float(0.05 * frequency_ghz / np.sqrt(1.0 - (ratio * np.cos(el)) ** 2))
+
+    def get_model_info(self):
+        return {'version': 'test'}
+
+
+@pytest.fixture
+def model():
+    return SlantPathModel()
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage5
+def test_table_matches_model_within_reported_bound(model, tmp_path):
+    table = ITURAttenuationTable(model, 12.5, resolution_deg=0.05, max_error_db=0.01, cache_dir=tmp_path)
+
+    info = table.get_table_info()
+    assert info['itur_mode'] == 'exact'
+    assert info['max_abs_error_db'] <= 0.01
+
+    np.testing.assert_allclose(
+        table.attenuation_db(table.elevation_deg), table.attenuation_db_nodes, rtol=1e-12
+    )
+    samples = np.linspace(0.0, 90.0, 997)
+    exact = np.array([model.calculate_total_attenuation(12.5, el) for el in samples])
+    assert np.max(np.abs(table.attenuation_db(samples) - exact)) <= 0.01
+
+
+@pytest.mark.unit
+@pytest.mark.stage5
+def test_table_is_reloaded_from_disk(model, tmp_path):
+    first = ITURAttenuationTable(model, 12.5, resolution_deg=0.5, max_error_db=1.0, cache_dir=tmp_path)
+    calls_after_build = model.calls
+
+    second = ITURAttenuationTable(model, 12.5, resolution_deg=0.5, max_error_db=1.0, cache_dir=tmp_path)
+
+    assert model.calls == calls_after_build
+    assert second.source == 'disk'
+    np.testing.assert_array_equal(second.attenuation_db_nodes, first.attenuation_db_nodes)
+    assert second.attenuation_db(37.3) == first.attenuation_db(37.3)
+
+
+@pytest.mark.unit
+@pytest.mark.stage5
+def test_horizon_and_range_handling(model):
+    table = ITURAttenuationTable(model, 12.5, resolution_deg=0.5, max_error_db=1.0, cache_dir=None)
+
+    assert table.attenuation_db(-1.0) == 999.0
+    with pytest.raises(ValueError):
+        table.attenuation_db(90.5)
+
+
+@pytest.mark.unit
+@pytest.mark.stage5
+def test_coarse_grid_exceeding_tolerance_fails_fast(model):
+    with pytest.raises(ValueError, match='resolution_deg'):
+        ITURAttenuationTable(model, 12.5, resolution_deg=5.0, max_error_db=1e-4, cache_dir=None)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the in-process Stage 6 parameter sweep engine
+
+Checks that each sweep combination yields the same event counts as a
+GPPEventDetector configured with those thresholds, that worker processes
+reproduce the serial results, and how '{constellation}_{param}' keys map
+onto the detector config.
+
+Author: Orbit Engine Team
+"""
+
+import pytest
+
+from src.stages.stage6_research_optimization.gpp_event_detector import GPPEventDetector
+from src.stages.stage6_research_optimization.parameter_sweep import (
+    ParameterSweepEngine,
+    apply_sweep_parameters,
+    base_detector_config,
+    parameter_combinations
+)
+
+from .test_gpp_event_index import make_signal_analysis
+
+
+# ==================== Test Fixtures ====================
+
+SWEEP_RANGES = {
+    'd2_threshold1_km': [800.0, 1500.0],
+    'a3_offset_db': [1.0, 3.0],
+    'a4_threshold_dbm': [-40.0, -30.0],
+}
+
+METADATA = {
+    'dynamic_d2_thresholds': {
+        'starlink': {'d2_threshold1_km': 800.0, 'd2_threshold2_km': 1500.0},
+        'oneweb': {'d2_threshold1_km': 1500.0, 'd2_threshold2_km': 2200.0},
+    }
+}
+
+
+@pytest.fixture(scope='module')
+def signal_analysis():
+    return make_signal_analysis(n_sat=10, n_times=20, seed=3)
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_sweep_matches_detector_per_combination(signal_analysis):
+    base = base_detector_config(None, METADATA)
+    engine = ParameterSweepEngine(signal_analysis, base, max_workers=1)
+    combinations = parameter_combinations('starlink', list(SWEEP_RANGES), SWEEP_RANGES)
+    assert len(combinations) == 8
+
+    results = engine.run(combinations)
+
+    for entry, params in zip(results, combinations):
+        expected = GPPEventDetector(apply_sweep_parameters(base, params)).detect_all_events(signal_analysis)
+        assert entry['parameters'] == params
+        assert entry['metrics']['total_events'] == expected['total_events']
+        assert entry['metrics']['d2_count'] == expected['event_summary']['d2_count']
+        assert entry['metrics']['a3_count'] == expected['event_summary']['a3_count']
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_worker_processes_reproduce_serial_results(signal_analysis):
+    base = base_detector_config(None, METADATA)
+    combinations = parameter_combinations('oneweb', list(SWEEP_RANGES), SWEEP_RANGES)
+
+    serial = ParameterSweepEngine(signal_analysis, base, max_workers=1).run(combinations)
+    parallel = ParameterSweepEngine(signal_analysis, base, max_workers=2).run(combinations)
+
+    assert parallel == serial
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_apply_sweep_parameters_routes_d2_per_constellation():
+    base = base_detector_config(None, METADATA)
+    config = apply_sweep_parameters(base, {'oneweb_d2_threshold1_km': 1800.0, 'oneweb_a3_offset_db': 4.0})
+
+    assert config['oneweb']['d2_threshold1_km'] == 1800.0
+    assert config['starlink']['d2_threshold1_km'] == 800.0
+    assert config['a3_offset_db'] == 4.0
+    assert base['oneweb']['d2_threshold1_km'] == 1500.0  # 基準配置不被修改
+
+    with pytest.raises(ValueError):
+        apply_sweep_parameters(base, {'iridium_a3_offset_db': 1.0})
@@ -0,0 +1,134 @@
+"""
+Unit tests for the Stage 2 pass predictor and per-station pass index
+
+Predicts passes of synthetic LEO TLEs over two stations and checks that the
+sorted-array PassIndex answers time-range queries exactly like a linear scan
+over all pass records, that instantaneous visibility agrees with the
+dense-grid elevation, that the events-only path matches propagate_adaptive, and
+that duplicate satellite IDs are rejected.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.stages.stage2_orbital_computing.adaptive_time_sampling import AdaptiveTimeSampler
+from src.stages.stage2_orbital_computing.pass_predictor import PassIndex, PassPredictor
+from src.stages.stage2_orbital_computing.sgp4_calculator import SGP4Calculator
+
+
+# ==================== Test Fixtures ====================
+
+START = datetime(2025, 10, 1, 12, 0, tzinfo=timezone.utc)
+END = START + timedelta(hours=4)
+SITE_SOUTH = {'name': 'SITE_SOUTH', 'latitude_deg': 22.6273, 'longitude_deg': 120.3014, 'altitude_m': 10.0}
+
+
+def synthetic_tle(index, raan, mean_anomaly):
+    norad_id = 47000 + index
+    return {
+        'satellite_id': str(norad_id),
+        'line1': f'1 {norad_id:05d}U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+        'line2': f'2 {norad_id:05d}  53.0540 {raan:8.4f} 0001400  85.1234 {mean_anomaly:8.4f} 15.06391234 12345',
+        'epoch_datetime': '2025-10-01T06:00:00+00:00',
+    }
+
+
+@pytest.fixture(scope='module')
+def tle_list():
+    rng = np.random.default_rng(24)
+    return [synthetic_tle(i, rng.uniform(0, 360), rng.uniform(0, 360)) for i in range(40)]
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return SGP4Calculator()
+
+
+@pytest.fixture(scope='module')
+def indexes(calculator, tle_list):
+    predictor = PassPredictor(stations=['NTPU', SITE_SOUTH], elevation_mask_deg=10.0,
+                              calculator=calculator, batch_satellites=15)
+    return predictor.predict(tle_list, START, END)
+
+
+def linear_scan(index, start, end, min_elevation_deg=None):
+    return [
+        record for record in index.records()
+        if record.rise_utc <= end and record.set_utc >= start
+        and (min_elevation_deg is None or record.max_elevation_deg >= min_elevation_deg)
+    ]
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage2
+@pytest.mark.sgp4
+def test_pass_records_per_station(indexes):
+    assert list(indexes) == ['NTPU', 'SITE_SOUTH']
+    for name, index in indexes.items():
+        records = index.records()
+        assert len(records) > 0
+        assert [r.rise_utc for r in records] == sorted(r.rise_utc for r in records)
+        for record in records:
+            assert record.station == name
+            assert record.rise_utc <= record.culmination_utc <= record.set_utc
+            assert record.max_elevation_deg >= 10.0
+            assert START <= record.rise_utc and record.set_utc <= END
+            if not (record.rise_truncated or record.set_truncated):
+                assert 0 < record.duration_seconds < 20 * 60
+        assert records[0].to_dict()['duration_seconds'] == pytest.approx(records[0].duration_seconds)
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_range_queries_match_linear_scan(indexes):
+    index = indexes['NTPU']
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        start = START + timedelta(seconds=float(rng.uniform(-600, 4 * 3600)))
+        end = start + timedelta(seconds=float(rng.choice([0.0, 60.0, 900.0, 7200.0])))
+        min_elevation = rng.choice([None, 30.0])
+        assert index.query(start, end, min_elevation) == linear_scan(index, start, end, min_elevation)
+
+    satellites = index.satellites_between(START.isoformat(), END.isoformat())
+    assert satellites == sorted({record.satellite_id for record in index.records()})
+    assert index.query(END + timedelta(hours=1), END + timedelta(hours=2)) == []
+    with pytest.raises(ValueError):
+        index.query(END, START)
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+@pytest.mark.sgp4
+def test_visible_at_matches_dense_elevation(calculator, tle_list, indexes):
+    sampler = AdaptiveTimeSampler.from_config(
+        {'enabled': True, 'ground_station': 'NTPU', 'elevation_mask_deg': 10.0}, calculator.ts, 30.0
+    )
+    times = [START + timedelta(seconds=30.0 * j) for j in range(0, 481, 7)]
+    dense = calculator.propagate_batch(tle_list, times)
+    elevation = sampler.elevation_deg(dense.states[..., :3], times)
+
+    for column, time in enumerate(times):
+        expected = sorted(dense.satellite_ids[row] for row in np.flatnonzero(elevation[:, column] >= 10.0))
+        assert sorted(record.satellite_id for record in indexes['NTPU'].visible_at(time)) == expected
+
+    # Stage 2 自適應取樣輸出的過境事件可直接建立相同索引
+    grid = [START + timedelta(seconds=30.0 * j) for j in range(481)]
+    result = calculator.propagate_adaptive(tle_list, grid, sampler)
+    rebuilt = PassIndex.from_pass_events('NTPU', result.pass_events)
+    assert rebuilt.records() == indexes['NTPU'].records()
+    assert len(PassIndex('NTPU', [])) == 0 and PassIndex('NTPU', []).query(START, END) == []
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_duplicate_satellite_ids_rejected(calculator, tle_list):
+    predictor = PassPredictor(stations=['NTPU'], calculator=calculator)
+    duplicate = dict(tle_list[1], satellite_id=tle_list[0]['satellite_id'])
+    with pytest.raises(ValueError, match=tle_list[0]['satellite_id']):
+        predictor.predict(tle_list[:3] + [duplicate], START, END)
@@ -0,0 +1,120 @@
+"""
+Unit tests for SGP4Calculator.propagate_batch
+
+Validates that the vectorized SatrecArray path reproduces the per-point
+Skyfield path (calculate_position) for multiple satellites on a shared grid,
+and that the Stage 2 batch mode is the default and rejects duplicate IDs.
+
+Author: Orbit Engine Team
+"""
+
+import json
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pytest
+
+from src.stages.stage2_orbital_computing.sgp4_calculator import SGP4Calculator
+from src.stages.stage2_orbital_computing.stage2_orbital_computing_processor import Stage2OrbitalPropagationProcessor
+
+
+# ==================== Test Fixtures ====================
+
+ISS_TLE = {
+    'satellite_id': '25544',
+    'name': 'ISS (ZARYA)',
+    'line1': '1 25544U 98067A   25274.50000000  .00016717  00000-0  10270-3 0  9009',
+    'line2': '2 25544  51.6400 208.9163 0006317  69.9862  25.2906 15.50377579 12345',
+    'epoch_datetime': '2025-10-01T12:00:00+00:00',
+}
+
+STARLINK_TLE = {
+    'satellite_id': '44713',
+    'name': 'STARLINK-1007',
+    'line1': '1 44713U 19074A   25274.25000000  .00001103  00000-0  92890-4 0  9997',
+    'line2': '2 44713  53.0540 123.4567 0001400  85.1234 274.9876 15.06391234 12345',
+    'epoch_datetime': '2025-10-01T06:00:00+00:00',
+}
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    return SGP4Calculator()
+
+
+@pytest.fixture
+def time_grid():
+    start = datetime(2025, 10, 1, 12, 30, tzinfo=timezone.utc)
+    return [start + timedelta(seconds=30 * i) for i in range(60)]
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    stage1_dir = tmp_path / 'stage1'
+    stage1_dir.mkdir()
+    (stage1_dir / 'epoch_analysis.json').write_text(
+        json.dumps({'recommended_reference_time': '2025-10-01T12:00:00Z'})
+    )
+    monkeypatch.setenv('ORBIT_ENGINE_INCREMENTAL', '0')
+    return Stage2OrbitalPropagationProcessor({'stage1_output_dir': str(stage1_dir)})
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.sgp4
+@pytest.mark.stage2
+def test_batch_shape(calculator, time_grid):
+    result = calculator.propagate_batch([ISS_TLE, STARLINK_TLE], time_grid)
+
+    assert result.satellite_ids == ['25544', '44713']
+    assert result.states.shape == (2, len(time_grid), 6)
+    assert result.error_codes.shape == (2, len(time_grid))
+    assert result.valid_mask.all()
+
+
+@pytest.mark.unit
+@pytest.mark.sgp4
+@pytest.mark.stage2
+def test_batch_matches_per_point_path(calculator, time_grid):
+    tle_list = [ISS_TLE, STARLINK_TLE]
+    result = calculator.propagate_batch(tle_list, time_grid)
+
+    for row, tle_data in enumerate(tle_list):
+        epoch = datetime.fromisoformat(tle_data['epoch_datetime'])
+        for col in (0, 17, len(time_grid) - 1):
+            minutes = (time_grid[col] - epoch).total_seconds() / 60.0
+            reference = calculator.calculate_position(tle_data, minutes)
+
+            assert result.time_since_epoch_minutes[row, col] == pytest.approx(minutes)
+            np.testing.assert_allclose(
+                result.states[row, col, :3], [reference.x, reference.y, reference.z], atol=1e-6
+            )
+            np.testing.assert_allclose(
+                result.states[row, col, 3:], [reference.vx, reference.vy, reference.vz], atol=1e-9
+            )
+
+
+@pytest.mark.unit
+@pytest.mark.sgp4
+@pytest.mark.stage2
+def test_batch_skips_invalid_tle(calculator, time_grid):
+    broken = {**ISS_TLE, 'satellite_id': 'broken', 'line2': ''}
+    result = calculator.propagate_batch([broken, STARLINK_TLE], time_grid)
+
+    assert result.satellite_ids == ['44713']
+    assert result.failed_satellites == ['broken']
+    assert result.states.shape == (1, len(time_grid), 6)
+
+
+@pytest.mark.unit
+@pytest.mark.stage2
+def test_processor_batch_mode_by_default_and_rejects_duplicate_ids(processor):
+    assert processor.batch_propagation is True
+
+    blocks = list(processor.iter_orbital_state_blocks([ISS_TLE, STARLINK_TLE]))
+    assert sorted(sat_id for block in blocks for sat_id in block.satellite_ids) == ['25544', '44713']
+
+    duplicate = {**STARLINK_TLE, 'line2': ISS_TLE['line2']}
+    with pytest.raises(ValueError, match='44713'):
+        list(processor.iter_orbital_state_blocks([ISS_TLE, STARLINK_TLE, duplicate]))
@@ -0,0 +1,154 @@
+"""
+Unit tests for the streaming-mode Stage 4.1 candidate pool columns
+
+Builds SatelliteFilter-style candidate entries in several batches and checks
+that pool optimization and the dynamic D2 threshold analysis give identical
+results on the compact CandidatePoolColumns entries and on the full entries,
+and that the streaming Stage 4 output reports the satellite counts it is given.
+
+Author: Orbit Engine Team
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.stages.stage4_link_feasibility.dynamic_threshold_analyzer import DynamicThresholdAnalyzer
+from src.stages.stage4_link_feasibility.pool_optimizer import optimize_satellite_pool
+from src.stages.stage4_link_feasibility.stage4_config_manager import Stage4ConfigManager
+from src.stages.stage4_link_feasibility.stage4_link_feasibility_processor import Stage4LinkFeasibilityProcessor
+from src.stages.stage4_link_feasibility.streaming_candidates import CandidatePoolColumns, CompactTimeSeries
+
+
+# ==================== Test Fixtures ====================
+
+CONSTELLATION_CONFIGS = {
+    'starlink': {'expected_visible_satellites': [3, 6], 'target_coverage_rate': 0.9},
+    'oneweb': {'expected_visible_satellites': [1, 3], 'target_coverage_rate': 0.9},
+}
+NTPU = {'lat': 24.9441, 'lon': 121.3714}
+STAGE4_CONFIG = Path(__file__).resolve().parents[3] / 'config' / 'stage4_link_feasibility_config.yaml'
+
+
+def make_candidate(satellite_id, constellation, rng, n_times=120):
+    start = int(rng.integers(0, n_times - 10))
+    indices = range(start, min(n_times, start + int(rng.integers(5, 25))))
+    return {
+        'satellite_id': satellite_id,
+        'name': f'{constellation.upper()}-{satellite_id}',
+        'constellation': constellation,
+        'time_series': [
+            {
+                'timestamp': f'2025-10-01T{12 + t // 120:02d}:{(t // 2) % 60:02d}:{30 * (t % 2):02d}+00:00',
+                'visibility_metrics': {
+                    'elevation_deg': float(rng.uniform(10, 80)),
+                    'distance_km': float(rng.uniform(550, 1500)),
+                    'is_connectable': True
+                },
+                'position': {
+                    'latitude_deg': float(rng.uniform(15, 35)),
+                    'longitude_deg': float(rng.uniform(110, 130)),
+                    'altitude_km': 550.0
+                }
+            }
+            for t in indices
+        ],
+        'service_window': {'duration_minutes': len(indices) / 2}
+    }
+
+
+@pytest.fixture(scope='module')
+def batches():
+    rng = np.random.default_rng(25)
+    return [
+        {
+            'starlink': [make_candidate(str(44000 + 100 * b + i), 'starlink', rng) for i in range(25)],
+            'oneweb': [make_candidate(str(60000 + 100 * b + i), 'oneweb', rng) for i in range(8)],
+            'other': [],
+        }
+        for b in range(3)
+    ]
+
+
+@pytest.fixture(scope='module')
+def full_candidates(batches):
+    return {
+        constellation: [sat for batch in batches for sat in batch[constellation]]
+        for constellation in ('starlink', 'oneweb', 'other')
+    }
+
+
+@pytest.fixture(scope='module')
+def columns(batches):
+    columns = CandidatePoolColumns()
+    for batch in batches:
+        columns.add_batch(batch)
+    return columns
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_compact_entries_preserve_connectable_points(columns, full_candidates):
+    assert len(columns) == 99
+    compact = columns.by_constellation()
+    assert columns.satellite_ids('oneweb') == [sat['satellite_id'] for sat in full_candidates['oneweb']]
+
+    full = full_candidates['starlink'][7]
+    entry = compact['starlink'][7]
+    assert isinstance(entry['time_series'], CompactTimeSeries)
+    assert len(entry['time_series']) == len(full['time_series'])
+    for point, full_point in zip(entry['time_series'], full['time_series']):
+        assert point['timestamp'] == full_point['timestamp']
+        assert point['position']['latitude_deg'] == full_point['position']['latitude_deg']
+        assert point['visibility_metrics']['is_connectable']
+    assert entry['time_series'][-1] == list(entry['time_series'])[-1]
+    assert entry['service_window'] == full['service_window']
+
+    with pytest.raises(ValueError):
+        rejected = make_candidate('1', 'starlink', np.random.default_rng(0))
+        rejected['time_series'][0]['visibility_metrics']['is_connectable'] = False
+        CandidatePoolColumns().add_batch({'starlink': [rejected]})
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_pool_optimization_matches_full_entries(columns, full_candidates):
+    full_result = optimize_satellite_pool(full_candidates, CONSTELLATION_CONFIGS)
+    compact_result = optimize_satellite_pool(columns.by_constellation(), CONSTELLATION_CONFIGS)
+
+    for constellation in ('starlink', 'oneweb'):
+        full_ids = [sat['satellite_id'] for sat in full_result['optimized_pools'][constellation]]
+        compact_ids = [sat['satellite_id'] for sat in compact_result['optimized_pools'][constellation]]
+        assert compact_ids == full_ids and len(full_ids) > 0
+    assert compact_result['optimization_metrics'] == full_result['optimization_metrics']
+    assert compact_result['validation_results'] == full_result['validation_results']
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_dynamic_thresholds_match_full_entries(columns, full_candidates):
+    analyzer = DynamicThresholdAnalyzer()
+    full_analysis = analyzer.analyze_candidate_distances(full_candidates, NTPU)
+    compact_analysis = analyzer.analyze_candidate_distances(columns.by_constellation(), NTPU)
+    assert compact_analysis == full_analysis
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+def test_streaming_output_reports_explicit_counts(columns, full_candidates, monkeypatch):
+    monkeypatch.setenv('ORBIT_ENGINE_INCREMENTAL', '0')
+    processor = Stage4LinkFeasibilityProcessor(Stage4ConfigManager().load_config(custom_path=STAGE4_CONFIG))
+    dynamic_thresholds, _, optimization_results = processor.plan_streaming_pools(columns.by_constellation())
+    optimized_pools = optimize_satellite_pool(full_candidates, CONSTELLATION_CONFIGS)['optimized_pools']
+
+    output = processor.build_streaming_output(
+        120, 99, full_candidates, optimized_pools, optimization_results, dynamic_thresholds
+    )
+
+    assert output['metadata']['total_input_satellites'] == 120
+    assert output['metadata']['total_processed_satellites'] == 99
+    assert output['feasibility_summary']['candidate_pool']['total_connectable'] == 99
+    assert all('time_series' not in sat for sat in output['connectable_satellites_candidate']['starlink'])
@@ -0,0 +1,134 @@
+"""
+Unit tests for one-pass multi-threshold 3GPP event counting
+
+Checks that GPPEventDetector.detect_threshold_sweep yields, for every
+threshold in the swept vectors (and every A5 / D2 threshold pair), the same
+event counts as a detector configured with that threshold, and that the
+sweep engine's single-pass mode matches per-combination detection.
+
+Author: Orbit Engine Team
+"""
+
+import itertools
+
+import pytest
+
+from src.stages.stage6_research_optimization.gpp_event_detector import GPPEventDetector
+from src.stages.stage6_research_optimization.parameter_sweep import (
+    ParameterSweepEngine,
+    base_detector_config,
+    parameter_combinations
+)
+from src.stages.stage6_research_optimization.signal_time_index import SignalTimeIndex
+
+from .test_gpp_event_index import make_signal_analysis
+
+
+# ==================== Test Fixtures ====================
+
+BASE_CONFIG = {
+    'starlink': {'d2_threshold1_km': 800.0, 'd2_threshold2_km': 1500.0},
+    'oneweb': {'d2_threshold1_km': 1500.0, 'd2_threshold2_km': 2200.0},
+}
+
+A3_OFFSETS = [0.0, 2.0, 5.0, 10.0]
+A4_THRESHOLDS = [-45.0, -35.0, -30.0]
+A5_THRESHOLDS1 = [-40.0, -35.0, -30.0]
+A5_THRESHOLDS2 = [-45.0, -38.0, -30.0]
+D2_THRESHOLDS = {
+    'starlink': ([500.0, 1200.0], [1000.0, 2500.0]),
+    'oneweb': ([1500.0], [1800.0, 3000.0]),
+}
+
+
+@pytest.fixture(scope='module')
+def signal_analysis():
+    return make_signal_analysis(n_sat=10, n_times=25, seed=5)
+
+
+@pytest.fixture(scope='module')
+def sweep(signal_analysis):
+    return GPPEventDetector(BASE_CONFIG).detect_threshold_sweep(
+        SignalTimeIndex(signal_analysis),
+        a3_offset_db=A3_OFFSETS,
+        a4_threshold_dbm=A4_THRESHOLDS,
+        a5_threshold1_dbm=A5_THRESHOLDS1,
+        a5_threshold2_dbm=A5_THRESHOLDS2,
+        d2_thresholds_km=D2_THRESHOLDS
+    )
+
+
+def detect(signal_analysis, **overrides):
+    config = {key: dict(value) for key, value in BASE_CONFIG.items()}
+    for key, value in overrides.items():
+        if isinstance(value, dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return GPPEventDetector(config).detect_all_events(signal_analysis)['event_summary']
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_single_threshold_counts_match_detector(signal_analysis, sweep):
+    for i, offset in enumerate(A3_OFFSETS):
+        assert sweep.a3_counts[i] == detect(signal_analysis, a3_offset_db=offset)['a3_count']
+    for i, threshold in enumerate(A4_THRESHOLDS):
+        assert sweep.a4_counts[i] == detect(signal_analysis, a4_threshold_dbm=threshold)['a4_count']
+
+    summary = detect(signal_analysis)
+    assert sweep.time_points_processed == summary['time_points_processed']
+    assert sweep.participating_satellites == summary['participating_satellites']
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_a5_and_d2_grids_match_detector(signal_analysis, sweep):
+    assert sweep.a5_counts.shape == (3, 3)
+    for (i, t1), (j, t2) in itertools.product(enumerate(A5_THRESHOLDS1), enumerate(A5_THRESHOLDS2)):
+        expected = detect(signal_analysis, a5_threshold1_dbm=t1, a5_threshold2_dbm=t2)['a5_count']
+        assert sweep.a5_counts[i, j] == expected
+
+    assert sum(sweep.a5_counts.ravel()) > 0
+    for constellation, (thresholds1, thresholds2) in D2_THRESHOLDS.items():
+        other = 'oneweb' if constellation == 'starlink' else 'starlink'
+        for (i, t1), (j, t2) in itertools.product(enumerate(thresholds1), enumerate(thresholds2)):
+            # 另一星座的門檻設為不可能觸發，使計數只包含本星座服務衛星
+            summary = detect(
+                signal_analysis,
+                **{constellation: {'d2_threshold1_km': t1, 'd2_threshold2_km': t2},
+                   other: {'d2_threshold1_km': 1e9, 'd2_threshold2_km': 0.0}}
+            )
+            assert sweep.d2_counts[constellation][i, j] == summary['d2_count']
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_engine_single_pass_matches_per_combination(signal_analysis):
+    ranges = {
+        'd2_threshold1_km': [500.0, 1200.0],
+        'd2_threshold2_km': [1000.0, 2500.0],
+        'a3_offset_db': [1.0, 4.0],
+        'a5_threshold1_dbm': [-40.0, -32.0],
+    }
+    engine = ParameterSweepEngine(signal_analysis, base_detector_config(BASE_CONFIG), max_workers=1)
+    combinations = parameter_combinations('starlink', list(ranges), ranges)
+
+    assert engine.run(combinations) == engine.run(combinations, single_pass=False)
+
+
+@pytest.mark.unit
+@pytest.mark.stage6
+def test_event_metrics_rejects_unswept_threshold(sweep):
+    config = base_detector_config(BASE_CONFIG)
+    config.update(a3_offset_db=0.0, a4_threshold_dbm=-45.0, a5_threshold1_dbm=-40.0,
+                  a5_threshold2_dbm=-45.0)
+    config['starlink'].update(d2_threshold1_km=500.0, d2_threshold2_km=1000.0)
+    config['oneweb'].update(d2_threshold1_km=1500.0, d2_threshold2_km=1800.0)
+    assert sweep.event_metrics(config)['total_events'] >= 0
+
+    config['a3_offset_db'] = 7.0
+    with pytest.raises(ValueError):
+        sweep.event_metrics(config)
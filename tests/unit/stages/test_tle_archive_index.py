@@ -0,0 +1,127 @@
+"""
+Unit tests for the Stage 1 TLE archive index
+
+Checks that "closest TLE per satellite to time X" matches a brute-force scan
+of the archive in both selection modes, that updates only re-index new or
+changed files, and that TLEDataLoader assembles the reference-time catalog
+from the index.
+
+Author: Orbit Engine Team
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.stages.stage1_orbital_calculation.tle_archive_index import TLEArchiveIndex
+from src.stages.stage1_orbital_calculation.tle_data_loader import TLEDataLoader
+
+from .test_tle_stream_parser import tle_lines
+
+
+# ==================== Test Fixtures ====================
+
+CONSTELLATIONS = ['starlink', 'oneweb']
+YEAR_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def write_day(root, constellation, day, norad_ids, rng):
+    """寫入一天的存檔文件，每顆衛星 epoch 在當天內隨機"""
+    directory = root / constellation / 'tle'
+    directory.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for norad_id in norad_ids:
+        epoch_day = day + rng.uniform(0.0, 0.99)
+        line1, line2 = tle_lines(f"{norad_id:05d}", epoch_day, 15.05)
+        lines += [f"{constellation.upper()}-{norad_id}", line1, line2]
+    date = (YEAR_START + timedelta(days=day - 1)).strftime('%Y%m%d')
+    path = directory / f"{constellation}_{date}.tle"
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    rng = np.random.default_rng(0)
+    root = tmp_path / 'tle_data'
+    for day in range(270, 276):
+        # 部分衛星只出現在部分日期
+        write_day(root, 'starlink', day, [44000 + i for i in range(8) if (i + day) % 3], rng)
+        write_day(root, 'oneweb', day, [48000 + i for i in range(4)], rng)
+    return root
+
+
+def brute_force(index, reference_time, mode):
+    t = np.datetime64(reference_time.replace(tzinfo=None), 'us')
+    best = {}
+    for entry in index.entries:
+        key = (str(entry['constellation']), str(entry['norad_id']))
+        gap = entry['epoch'] - t
+        if mode == 'latest_before':
+            if gap > np.timedelta64(0, 'us'):
+                continue
+            score = -gap
+        else:
+            score = abs(gap)
+        if key not in best or score < best[key][0]:
+            best[key] = (score, entry['epoch'])
+    return {key: epoch for key, (_, epoch) in best.items()}
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.parametrize('mode', ['nearest', 'latest_before'])
+def test_closest_matches_brute_force(archive, tmp_path, mode):
+    index = TLEArchiveIndex(archive, tmp_path / 'index')
+    index.update(CONSTELLATIONS)
+
+    for hours in (0, 30, 61, 200):
+        reference_time = datetime(2025, 9, 27, tzinfo=timezone.utc) + timedelta(hours=hours)
+        selection = index.closest(reference_time, mode=mode)
+        got = {(str(s['constellation']), str(s['norad_id'])): s['epoch'] for s in selection}
+        assert got == brute_force(index, reference_time, mode)
+
+
+@pytest.mark.unit
+def test_update_reindexes_only_changed_files(archive, tmp_path):
+    index = TLEArchiveIndex(archive, tmp_path / 'index')
+    assert index.update(CONSTELLATIONS)['indexed_files'] == 12
+
+    reopened = TLEArchiveIndex(archive, tmp_path / 'index')
+    assert reopened.update(CONSTELLATIONS) == {
+        'indexed_files': 0, 'reused_files': 12, 'removed_files': 0, 'total_records': len(index.entries)
+    }
+
+    changed = write_day(archive, 'oneweb', 275, [48000, 48001], np.random.default_rng(1))
+    os.utime(changed, ns=(1, 1))
+    (archive / 'starlink' / 'tle' / 'starlink_20250927.tle').unlink()
+    stats = reopened.update(CONSTELLATIONS)
+
+    assert stats['indexed_files'] == 1 and stats['removed_files'] == 1 and stats['reused_files'] == 10
+    fresh = TLEArchiveIndex(archive, tmp_path / 'fresh')
+    fresh.update(CONSTELLATIONS)
+    np.testing.assert_array_equal(np.sort(reopened.entries[['norad_id', 'epoch']]),
+                                  np.sort(fresh.entries[['norad_id', 'epoch']]))
+
+
+@pytest.mark.unit
+def test_loader_assembles_reference_time_catalog(archive, tmp_path):
+    reference_time = datetime(2025, 9, 29, 12, tzinfo=timezone.utc)
+    loader = TLEDataLoader(str(archive))
+
+    scan_result, satellites = loader.load_archive_satellites(
+        reference_time, index_dir=str(tmp_path / 'index'), selection_mode='latest_before'
+    )
+
+    index = TLEArchiveIndex(archive, tmp_path / 'index')
+    expected = index.closest(reference_time, mode='latest_before')
+    assert scan_result['total_satellites'] == len(satellites) == len(expected)
+    assert scan_result['constellations']['oneweb']['satellite_count'] == 4
+    for satellite in satellites:
+        epoch = datetime.fromisoformat(satellite['epoch_datetime'])
+        assert epoch <= reference_time
+        assert satellite['source_file'].endswith('.tle')
+    assert {s['norad_id'] for s in satellites} == set(expected['norad_id'].tolist())
@@ -0,0 +1,118 @@
+"""
+Unit tests for the Stage 1 streaming TLE parser
+
+Checks that one streaming pass skips malformed records, repairs checksums,
+parses epochs and builds the columnar catalog, that sample limits count
+3-line groups as before, and that parallel parsing of several files matches
+serial parsing.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.stages.stage1_orbital_calculation.tle_stream_parser import (
+    iter_tle_records,
+    parse_tle_file,
+    parse_tle_files
+)
+from src.stages.stage1_orbital_calculation.validators.checksum_validator import ChecksumValidator
+
+
+# ==================== Test Fixtures ====================
+
+def reference_checksum(line):
+    checksum = 0
+    for char in line[:68]:
+        if char.isdigit():
+            checksum += int(char)
+        elif char == '-':
+            checksum += 1
+    return checksum % 10
+
+
+def tle_lines(norad_id, epoch_day, mean_motion, corrupt_checksum=False):
+    line1 = f"1 {norad_id}U 19074A   25{epoch_day:012.8f}  .00001103  00000-0  92890-4 0  999"
+    line2 = f"2 {norad_id}  53.0540 123.4567 0001400  85.1234 274.9876 {mean_motion:11.8f}12345"
+    checksum1 = reference_checksum(line1)
+    if corrupt_checksum:
+        checksum1 = (checksum1 + 1) % 10
+    return line1 + str(checksum1), line2 + str(reference_checksum(line2))
+
+
+def write_tle_file(path, n_records, start_id=44000):
+    lines = []
+    for i in range(n_records):
+        line1, line2 = tle_lines(f"{start_id + i:05d}", 274.5 + i * 0.01, 15.05, corrupt_checksum=(i == 1))
+        if i == 2:
+            line2 = line2[:-2]  # 長度錯誤 → 跳過
+        lines += [f"STARLINK-{i}", line1, line2, ""]
+    lines.append("INCOMPLETE-GROUP")
+    path.write_text("\n".join(lines), encoding='utf-8')
+    return str(path)
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+def test_stream_parse_validates_and_repairs_in_one_pass(tmp_path):
+    path = write_tle_file(tmp_path / 'starlink_20251002.tle', 5)
+
+    records = list(iter_tle_records(path))
+
+    assert [r.name for r in records] == ['STARLINK-0', 'STARLINK-1', 'STARLINK-3', 'STARLINK-4']
+    assert [r.checksum_fixes for r in records] == [0, 1, 0, 0]
+    for record in records:
+        assert int(record.line1[-1]) == reference_checksum(record.line1)
+    assert records[0].epoch == datetime(2025, 10, 1, 12, tzinfo=timezone.utc)
+    assert records[0].mean_motion == 15.05
+
+
+@pytest.mark.unit
+def test_catalog_columns_and_satellite_dicts(tmp_path):
+    path = write_tle_file(tmp_path / 'starlink_20251002.tle', 5)
+
+    catalog = parse_tle_file(path, 'starlink')
+
+    assert len(catalog) == 4 and catalog.checksum_fixes == 1
+    assert catalog.records['epoch'].dtype == np.dtype('datetime64[us]')
+    np.testing.assert_array_equal(catalog.records['mean_motion'], np.full(4, 15.05))
+    satellite = catalog.to_satellites()[0]
+    assert satellite['satellite_id'] == satellite['norad_id'] == '44000'
+    assert satellite['tle_line1'] == satellite['line1']
+    assert satellite['epoch_datetime'] == '2025-10-01T12:00:00+00:00'
+    assert satellite['constellation'] == 'starlink' and satellite['source_file'] == path
+
+
+@pytest.mark.unit
+def test_limit_counts_three_line_groups(tmp_path):
+    path = write_tle_file(tmp_path / 'starlink_20251002.tle', 6)
+
+    # 前 3 組中第 3 組格式無效，與舊版 lines[:limit * 3] 行為一致
+    assert [r.norad_id for r in iter_tle_records(path, limit=3)] == ['44000', '44001']
+
+
+@pytest.mark.unit
+def test_parallel_parse_matches_serial(tmp_path):
+    jobs = [
+        (write_tle_file(tmp_path / 'starlink_20251002.tle', 6), 'starlink', None),
+        (write_tle_file(tmp_path / 'oneweb_20251002.tle', 4, start_id=48000), 'oneweb', None),
+    ]
+
+    serial = parse_tle_files(jobs, max_workers=1)
+    parallel = parse_tle_files(jobs, max_workers=2)
+
+    assert [c.constellation for c in parallel] == ['starlink', 'oneweb']
+    for a, b in zip(serial, parallel):
+        np.testing.assert_array_equal(a.records, b.records)
+
+
+@pytest.mark.unit
+def test_checksum_matches_reference_algorithm():
+    validator = ChecksumValidator()
+    line1, line2 = tle_lines('44713', 274.25, 15.06391234)
+    for line in (line1, line2, '1 ' + '-+.9 A' * 12):
+        assert validator.calculate_checksum(line) == reference_checksum(line)
@@ -0,0 +1,62 @@
+"""
+Unit tests for SkyfieldVisibilityCalculator.calculate_topocentric_batch
+
+Validates the closed-form ECEF → ENU batch path against the per-point
+Skyfield altaz() computation for the NTPU ground station.
+
+Author: Orbit Engine Team
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+import pytest
+
+from src.stages.stage4_link_feasibility.skyfield_visibility_calculator import SkyfieldVisibilityCalculator
+
+
+# ==================== Test Fixtures ====================
+
+@pytest.fixture(scope='module')
+def calculator():
+    return SkyfieldVisibilityCalculator()
+
+
+@pytest.fixture
+def satellite_track():
+    rng = np.random.default_rng(0)
+    start = datetime(2025, 10, 2, 2, 30, tzinfo=timezone.utc)
+    n_points = 50
+    return (
+        rng.uniform(0.0, 50.0, n_points),
+        rng.uniform(100.0, 145.0, n_points),
+        rng.uniform(500.0, 1300.0, n_points),
+        [start + timedelta(seconds=30 * i) for i in range(n_points)]
+    )
+
+
+# ==================== Tests ====================
+
+@pytest.mark.unit
+@pytest.mark.stage4
+@pytest.mark.visibility
+def test_batch_matches_skyfield_altaz(calculator, satellite_track):
+    lat, lon, alt_km, timestamps = satellite_track
+
+    elevation, azimuth, distance = calculator.calculate_topocentric_batch(lat, lon, alt_km, timestamps)
+
+    for i, timestamp in enumerate(timestamps):
+        expected = calculator.calculate_topocentric_position(lat[i], lon[i], alt_km[i], timestamp)
+        # 亞毫度精度要求
+        assert elevation[i] == pytest.approx(expected[0], abs=1e-6)
+        assert (azimuth[i] - expected[1] + 180.0) % 360.0 - 180.0 == pytest.approx(0.0, abs=1e-6)
+        assert distance[i] == pytest.approx(expected[2], abs=1e-6)
+
+
+@pytest.mark.unit
+@pytest.mark.stage4
+@pytest.mark.visibility
+def test_batch_requires_matching_timestamps(calculator, satellite_track):
+    lat, lon, alt_km, timestamps = satellite_track
+    with pytest.raises(ValueError):
+        calculator.calculate_topocentric_batch(lat, lon, alt_km, timestamps[:-1])